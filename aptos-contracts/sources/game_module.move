@@ -1,8 +1,11 @@
 module challenge_wow_aptos::game_module {
     use std::signer;
     use std::error;
-    use std::string;
+    use std::string::{Self, String};
+    use std::vector;
     use aptos_framework::coin;
+    use aptos_token::token;
+    use aptos_token::token_transfers;
 
     struct PlayerData has key, store {
         score: u64,
@@ -75,4 +78,45 @@ module challenge_wow_aptos::game_module {
         let coin_to_burn = coin::withdraw<MyToken>(account, amount);
         coin::burn<MyToken>(coin_to_burn, &caps.burn_cap);
     }
+
+    /// Mint một token (token v1, bản duy nhất) cho mỗi người thắng trong collection của admin rồi offer cho họ,
+    /// tất cả trong một transaction. Collection phải được tạo trước; một phần tử lỗi thì cả lô bị hủy.
+    public entry fun batch_mint_and_offer(
+        admin: &signer,
+        collection: String,
+        names: vector<String>,
+        descriptions: vector<String>,
+        uris: vector<String>,
+        recipients: vector<address>,
+    ) {
+        let n = vector::length(&names);
+        assert!(
+            vector::length(&descriptions) == n && vector::length(&uris) == n && vector::length(&recipients) == n,
+            error::invalid_argument(3)
+        );
+        let creator = signer::address_of(admin);
+        let i = 0;
+        while (i < n) {
+            let name = *vector::borrow(&names, i);
+            token::create_token_script(
+                admin,
+                collection,
+                name,
+                *vector::borrow(&descriptions, i),
+                1,
+                1,
+                *vector::borrow(&uris, i),
+                @0x0,
+                0,
+                0,
+                vector[true, true, true, true, true],
+                vector::empty<String>(),
+                vector::empty<vector<u8>>(),
+                vector::empty<String>(),
+            );
+            let token_id = token::create_token_id_raw(creator, collection, name, 0);
+            token_transfers::offer(admin, *vector::borrow(&recipients, i), token_id, 1);
+            i = i + 1;
+        };
+    }
 }
@@ -1,6 +1,6 @@
 "use client";
 
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { useRouter } from "next/navigation";
 import { useQuery, useMutation } from "@tanstack/react-query";
 import { Button } from "@/components/ui/button";
@@ -172,15 +172,54 @@ export default function Lobby() {
 
   const { mutate: join, isPending } = useJoinRoomMutation();
 
+  // Version cuối cùng của danh sách phòng mà client đã áp dụng
+  const lobbyVersionRef = useRef<number | null>(null);
+  // Mỗi server worker đánh version riêng, epoch đổi khi kết nối sang worker khác
+  const lobbyEpochRef = useRef<string | null>(null);
+
+  const applyLobbyDelta = (delta: any) => {
+    for (const status of [GameStatus.WAITING, GameStatus.IN_PROGRESS]) {
+      queryClient.setQueryData<Room[]>(["rooms", status], (current) => {
+        if (!current) return current;
+        const others = current.filter((room) => room.id !== delta.roomId);
+        if (delta.op === "room_removed" || delta.room.status !== status) {
+          return others;
+        }
+        const existing = current.find((room) => room.id === delta.roomId);
+        const merged = { ...existing, ...delta.room } as Room;
+        return existing
+          ? current.map((room) => (room.id === delta.roomId ? merged : room))
+          : [merged, ...others];
+      });
+    }
+  };
+
   const { isWsConnected, sendMessage } = useWebSocket({
     url: "/lobby",
     onMessage: (data) => {
-      if (data.type === "room_update") {
-        setHasNewRoom(true);
-        queryClient.refetchQueries({
-          queryKey: ["rooms"],
-          type: "active",
-        });
+      if (data.type === "lobby_snapshot") {
+        lobbyVersionRef.current = data.version;
+        lobbyEpochRef.current = data.epoch;
+        for (const status of [GameStatus.WAITING, GameStatus.IN_PROGRESS]) {
+          queryClient.setQueryData<Room[]>(["rooms", status], (current) => {
+            const previous = new Map((current || []).map((room) => [room.id, room]));
+            return data.rooms
+              .filter((room: Room) => room.status === status)
+              .map((room: Room) => ({ ...previous.get(room.id), ...room }));
+          });
+        }
+      } else if (data.type === "lobby_delta") {
+        const last = lobbyVersionRef.current;
+        if (last === null || data.epoch !== lobbyEpochRef.current) return;
+        if (data.version <= last) return;
+        if (data.version !== last + 1) {
+          // Lỡ mất delta: xin server gửi phần còn thiếu
+          sendMessage({ type: "lobby_resume", version: last, epoch: lobbyEpochRef.current });
+          return;
+        }
+        lobbyVersionRef.current = data.version;
+        if (data.op === "room_added") setHasNewRoom(true);
+        applyLobbyDelta(data);
       }
     },
   });
@@ -0,0 +1,231 @@
+"""
+Fullnode Aptos giả (REST /v1) chạy trên localhost để chạy AptosService / AptosTxPipeline mà không cần devnet.
+- Nhận transaction BCS (`POST /v1/transactions`), kiểm tra chữ ký và sequence number như mempool thật:
+  sequence cũ hơn của tài khoản → 400 SEQUENCE_NUMBER_TOO_OLD, vượt quá sequence hiện tại + `--mempool-depth`
+  → 400 SEQUENCE_NUMBER_TOO_NEW; sequence lớn hơn nhưng hợp lệ thì nằm chờ trong mempool tới khi các số trước đến đủ.
+- Transaction được thực thi sau `--latency-ms` (thời gian tới khi block chứa nó được commit), theo đúng thứ tự sequence
+  của từng tài khoản. Token v1 (0x3::token, 0x3::token_transfers) được mô phỏng đủ để có các lỗi mà code gọi tới
+  xử lý: ECOLLECTION_ALREADY_EXISTS, ECOLLECTION_NOT_PUBLISHED, ETOKEN_DATA_ALREADY_EXISTS; cả
+  game_module::batch_mint_and_offer (ở bất kỳ địa chỉ nào); hàm khác luôn thành công.
+- Đọc được resource 0x3::token::Collections và `POST /v1/tables/{handle}/item` của bảng collection_data.
+- `GET /v1/transactions/by_hash/{hash}`: 404 khi chưa thấy, `pending_transaction` khi còn trong mempool.
+- `GET /__standin/stats` trả về bộ đếm (đã nhận, bị từ chối theo lý do, đã thực thi, thất bại, số lần hỏi trạng thái).
+
+    python -m benchmarks.aptos_node_standin --port 8090 --latency-ms 500
+    APTOS_NODE_URL=http://127.0.0.1:8090/v1 uvicorn main:app
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+from collections import Counter
+from typing import Any, Dict, Optional, Set, Tuple
+
+import uvicorn
+from aptos_sdk.account_address import AccountAddress
+from aptos_sdk.bcs import Deserializer
+from aptos_sdk.transactions import EntryFunction, SignedTransaction
+from fastapi import FastAPI, Request, Response
+
+CHAIN_ID = 4  # chain id của mạng local
+
+
+class Ledger:
+    """Trạng thái chain: sequence của từng tài khoản, mempool, transaction đã thực thi và token v1."""
+    def __init__(self, mempool_depth: int = 100):
+        self.mempool_depth = mempool_depth
+        self.sequences: Dict[str, int] = {}
+        # sender -> sequence -> (hash, transaction)
+        self.mempool: Dict[str, Dict[int, Tuple[str, SignedTransaction]]] = {}
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.committed: Dict[str, Dict[str, Any]] = {}
+        self.collections: Set[Tuple[str, str]] = set()
+        self.tokens: Set[Tuple[str, str, str]] = set()
+        self.offers: Dict[Tuple[str, str, str], str] = {}
+        self.version = 0
+        self.counters: Counter = Counter()
+
+    def submit(self, txn_hash: str, signed: SignedTransaction) -> Optional[str]:
+        """Đưa transaction vào mempool; trả về mã lỗi validation nếu bị từ chối."""
+        raw = signed.transaction
+        sender = str(raw.sender)
+        current = self.sequences.get(sender, 0)
+        if not signed.verify():
+            return "INVALID_SIGNATURE"
+        if raw.sequence_number < current:
+            return "SEQUENCE_NUMBER_TOO_OLD"
+        if raw.sequence_number >= current + self.mempool_depth:
+            return "SEQUENCE_NUMBER_TOO_NEW"
+        queued = self.mempool.setdefault(sender, {})
+        if raw.sequence_number in queued and queued[raw.sequence_number][0] != txn_hash:
+            return "SEQUENCE_NUMBER_ALREADY_IN_MEMPOOL"
+        queued[raw.sequence_number] = (txn_hash, signed)
+        self.pending[txn_hash] = {"type": "pending_transaction", "hash": txn_hash, **_summary(raw)}
+        return None
+
+    def commit_ready(self, sender: str) -> None:
+        """Thực thi các transaction liền mạch tính từ sequence hiện tại của tài khoản (các số sau chỗ hổng tiếp tục chờ)."""
+        queued = self.mempool.get(sender, {})
+        while self.sequences.get(sender, 0) in queued:
+            seq = self.sequences.get(sender, 0)
+            txn_hash, signed = queued.pop(seq)
+            self.sequences[sender] = seq + 1
+            self.version += 1
+            vm_status = self.execute(sender, signed.transaction.payload.value)
+            success = vm_status == "Executed successfully"
+            self.counters["executed" if success else "failed"] += 1
+            del self.pending[txn_hash]
+            self.committed[txn_hash] = {
+                "type": "user_transaction", "hash": txn_hash, "version": str(self.version),
+                "success": success, "vm_status": vm_status, **_summary(signed.transaction),
+            }
+
+    def execute(self, sender: str, payload: Any) -> str:
+        if not isinstance(payload, EntryFunction):
+            return "Executed successfully"
+        function = f"{payload.module}::{payload.function}"
+        args = payload.args
+        if function == "0x3::token::create_collection_script":
+            key = (sender, _str(args[0]))
+            if key in self.collections:
+                return _abort("0x3::token", "ECOLLECTION_ALREADY_EXISTS", 0x80001)
+            self.collections.add(key)
+        elif function == "0x3::token::create_token_script":
+            collection, name = _str(args[0]), _str(args[1])
+            if (sender, collection) not in self.collections:
+                return _abort("0x3::token", "ECOLLECTION_NOT_PUBLISHED", 0x60002)
+            if (sender, collection, name) in self.tokens:
+                return _abort("0x3::token", "ETOKEN_DATA_ALREADY_EXISTS", 0x80009)
+            self.tokens.add((sender, collection, name))
+        elif function == "0x3::token_transfers::offer_script":
+            creator = str(AccountAddress(args[1]))
+            token = (creator, _str(args[2]), _str(args[3]))
+            # Token đã offer thì nằm trong PendingClaims, không còn trong TokenStore của creator
+            if creator != sender or token not in self.tokens or token in self.offers:
+                return _abort("0x3::token", "EINSUFFICIENT_BALANCE", 0x10005)
+            self.offers[token] = str(AccountAddress(args[0]))
+        elif function.endswith("::game_module::batch_mint_and_offer"):
+            # Một phần tử lỗi thì cả transaction bị hủy: kiểm tra hết rồi mới ghi
+            collection = _str(args[0])
+            names = Deserializer(args[1]).sequence(Deserializer.str)
+            recipients = Deserializer(args[4]).sequence(AccountAddress.deserialize)
+            if (sender, collection) not in self.collections:
+                return _abort("0x3::token", "ECOLLECTION_NOT_PUBLISHED", 0x60002)
+            if len(set(names)) != len(names) or any((sender, collection, name) in self.tokens for name in names):
+                return _abort("0x3::token", "ETOKEN_DATA_ALREADY_EXISTS", 0x80009)
+            for name, recipient in zip(names, recipients):
+                self.tokens.add((sender, collection, name))
+                self.offers[(sender, collection, name)] = str(recipient)
+        return "Executed successfully"
+
+
+def _summary(raw) -> Dict[str, Any]:
+    return {"sender": str(raw.sender), "sequence_number": str(raw.sequence_number)}
+
+
+def _str(arg: bytes) -> str:
+    return Deserializer(arg).str()
+
+
+def _abort(module: str, reason: str, code: int) -> str:
+    return f"Move abort in {module}: {reason}({hex(code)})"
+
+
+def _hash(body: bytes) -> str:
+    prefix = hashlib.sha3_256(b"APTOS::Transaction").digest()
+    return "0x" + hashlib.sha3_256(prefix + b"\x00" + body).hexdigest()
+
+
+# ==================================
+# HTTP
+# ==================================
+
+def create_app(ledger: Ledger, latency_ms: float = 500) -> FastAPI:
+    app = FastAPI(title="Aptos node stand-in")
+    app.state.ledger = ledger
+    # Giữ tham chiếu tới các task commit để không bị thu gom giữa chừng
+    commits: Set[asyncio.Task] = set()
+
+    def respond(data: Any, status: int = 200) -> Response:
+        return Response(json.dumps(data), status_code=status, media_type="application/json")
+
+    def error(status: int, message: str, error_code: str, vm_error_code: Optional[int] = None) -> Response:
+        return respond({"message": message, "error_code": error_code, "vm_error_code": vm_error_code}, status)
+
+    async def commit_later(sender: str) -> None:
+        await asyncio.sleep(latency_ms / 1000)
+        ledger.commit_ready(sender)
+
+    @app.get("/__standin/stats")
+    async def stats():
+        return {
+            **ledger.counters,
+            "mempool": sum(len(q) for q in ledger.mempool.values()),
+            "committed": len(ledger.committed),
+            "version": ledger.version,
+        }
+
+    @app.get("/v1")
+    async def info():
+        return respond({"chain_id": CHAIN_ID, "ledger_version": str(ledger.version), "node_role": "full_node"})
+
+    @app.get("/v1/accounts/{address}")
+    async def account(address: str):
+        sender = str(AccountAddress.from_str(address))
+        return respond({"sequence_number": str(ledger.sequences.get(sender, 0)), "authentication_key": sender})
+
+    @app.get("/v1/accounts/{address}/resource/{resource_type:path}")
+    async def resource(address: str, resource_type: str):
+        ledger.counters["resource_reads"] += 1
+        creator = str(AccountAddress.from_str(address))
+        # Bảng collection_data của token v1: handle là địa chỉ tài khoản tạo
+        if resource_type == "0x3::token::Collections" and any(c == creator for c, _ in ledger.collections):
+            return respond({"type": resource_type, "data": {"collection_data": {"handle": creator}}})
+        return error(404, f"Resource not found by Address({address}), Struct tag({resource_type})", "resource_not_found")
+
+    @app.post("/v1/tables/{handle}/item")
+    async def table_item(handle: str, request: Request):
+        ledger.counters["table_reads"] += 1
+        body = await request.json()
+        if (handle, body.get("key")) not in ledger.collections:
+            return error(404, f"Table Item not found by Table handle({handle})", "table_item_not_found")
+        return respond({"name": body["key"], "supply": "0", "maximum": "1000000"})
+
+    @app.post("/v1/transactions")
+    async def submit(request: Request):
+        body = await request.body()
+        try:
+            signed = SignedTransaction.deserialize(Deserializer(body))
+        except Exception as e:
+            return error(400, f"Failed to deserialize input into SignedTransaction: {e}", "invalid_input")
+        txn_hash = _hash(body)
+        rejected = ledger.submit(txn_hash, signed)
+        if rejected:
+            ledger.counters[f"rejected_{rejected.lower()}"] += 1
+            return error(400, f"Invalid transaction: Type: Validation Code: {rejected}", "vm_error")
+        ledger.counters["submitted"] += 1
+        task = asyncio.create_task(commit_later(str(signed.transaction.sender)))
+        commits.add(task)
+        task.add_done_callback(commits.discard)
+        return respond(ledger.pending[txn_hash], 202)
+
+    @app.get("/v1/transactions/by_hash/{txn_hash}")
+    async def by_hash(txn_hash: str):
+        ledger.counters["status_reads"] += 1
+        txn = ledger.committed.get(txn_hash) or ledger.pending.get(txn_hash)
+        if txn is None:
+            return error(404, f"Transaction not found by Transaction hash({txn_hash})", "transaction_not_found")
+        return respond(txn)
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=500, help="thời gian từ lúc nhận tới lúc transaction được thực thi")
+    parser.add_argument("--mempool-depth", type=int, default=100, help="số sequence tối đa vượt trước sequence của tài khoản")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(Ledger(args.mempool_depth), args.latency_ms), host=args.host, port=args.port, log_level="warning")
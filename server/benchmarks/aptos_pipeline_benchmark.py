@@ -0,0 +1,152 @@
+"""
+So sánh mint NFT Aptos (create_collection + create_token + offer) qua AptosService trên fullnode giả
+(benchmarks.aptos_node_standin) với độ trễ commit `--latency-ms`. Mỗi chế độ dùng tài khoản admin mới, mint thử
+một lần để tạo collection rồi dựng lại AptosService như sau khi khởi động lại (registry nạp lại từ chain):
+  - uncached:  như serial nhưng mint nào cũng gửi create_collection_script và chờ nó thất bại ECOLLECTION_ALREADY_EXISTS
+               (trước khi có CollectionRegistry)
+  - serial:    từng mint một, mỗi transaction chờ xác nhận rồi mới gửi cái sau (như trước khi có AptosTxPipeline:
+               RewardQueue khóa mint Aptos, _submit_transaction gửi rồi mới tới transaction kế)
+  - pipelined: `--mints` mint cùng lúc trên một tài khoản admin, sequence cấp ở local, tối đa `--inflight` transaction đang bay
+  - sharded:   như pipelined nhưng chia cho `--accounts` tài khoản admin
+  - batched:   như pipelined nhưng qua BatchRewardMinter: tối đa `--batch-size` người thắng mỗi transaction
+               game_module::batch_mint_and_offer
+
+Kết quả: số mint/giây, độ trễ mỗi mint (p50/p95/max), số transaction mỗi mint (phí gas tính theo transaction,
+kể cả transaction thất bại), số lần hỏi trạng thái và số transaction bị node từ chối.
+
+    python -m benchmarks.aptos_pipeline_benchmark --mints 60 --latency-ms 500 --accounts 4
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+from aptos_sdk.account import Account
+
+from benchmarks.loadtest import free_port, percentiles, wait_ready
+from services.aptos_collection_registry import CollectionRegistry
+from services.batch_reward_minter import BatchRewardMinter
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+COLLECTION_NAME = "ChallengeWave Winners"
+
+
+class UncachedRegistry(CollectionRegistry):
+    def has(self, address, name) -> bool:
+        return False
+
+
+def make_service(keys: List[Account], inflight: int, registry: CollectionRegistry):
+    from services.aptos_service import AptosService
+    from services.aptos_tx_pipeline import AptosTxPipeline
+
+    os.environ["APTOS_ADMIN_PRIVATE_KEY"] = keys[0].private_key.hex()
+    service = AptosService()
+    service.pipeline = AptosTxPipeline(service.client, keys, max_inflight=inflight)
+    service.collections = registry
+    return service
+
+
+async def mint_once(service, recipient: str, index: int) -> Dict:
+    return await service.mint_nft_to_player(
+        recipient_address=recipient,
+        collection_name=COLLECTION_NAME,
+        token_name=f"Winner Trophy - Bench {index}",
+        token_description="benchmark",
+        token_uri=f"https://challengewave.com/nft/bench-{index}/metadata.json",
+    )
+
+
+async def run_mode(
+    args, name: str, standin_url: str, accounts: int, inflight: int, concurrent: bool, cached: bool = True, batch_size: int = 1,
+) -> None:
+    keys = [Account.generate() for _ in range(accounts)]
+    recipient = str(Account.generate().address())
+
+    # Tạo collection cho mọi tài khoản, rồi dựng service mới với registry rỗng (path="" để không ghi file)
+    setup = make_service(keys, inflight, CollectionRegistry(path=""))
+    await asyncio.gather(*(mint_once(setup, recipient, -1 - i) for i in range(accounts)))
+    await setup.pipeline.close()
+    await setup.client.close()
+
+    # Mint đầu tiên tự nạp registry từ chain (AptosService._warm_once)
+    service = make_service(keys, inflight, CollectionRegistry(path="") if cached else UncachedRegistry(path=""))
+    minter = BatchRewardMinter(service, batch_size, args.batch_delay_ms) if batch_size > 1 else service
+
+    async with httpx.AsyncClient(base_url=standin_url) as node:
+        before = (await node.get("/__standin/stats")).json()
+        latencies: List[float] = []
+        failures = 0
+
+        async def mint(index: int) -> None:
+            nonlocal failures
+            started = time.perf_counter()
+            result = await mint_once(minter, recipient, index)
+            if not result.get("success"):
+                failures += 1
+                print(f"  mint {index} failed: {result.get('error')}")
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        if concurrent:
+            await asyncio.gather(*(mint(i) for i in range(args.mints)))
+        else:
+            for i in range(args.mints):
+                await mint(i)
+        elapsed = time.perf_counter() - started
+        after = (await node.get("/__standin/stats")).json()
+
+    await service.pipeline.close()
+    await service.client.close()
+    delta = lambda key: after.get(key, 0) - before.get(key, 0)
+    rejected = sum(v - before.get(k, 0) for k, v in after.items() if k.startswith("rejected_"))
+    print(f"{name:<10} | {args.mints / elapsed:6.2f} mints/s | {elapsed:6.1f}s | mint {percentiles(latencies)}")
+    transactions = delta("executed") + delta("failed")
+    print(f"{'':<10} | {transactions / args.mints:.2f} txns/mint, executed {delta('executed')}, failed {delta('failed')}, rejected {rejected}, "
+          f"status reads {delta('status_reads')}, resyncs {service.pipeline.resyncs}, mint failures {failures}")
+
+
+async def main(args):
+    port = free_port()
+    standin_url = f"http://127.0.0.1:{port}"
+    standin = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.aptos_node_standin", "--port", str(port), "--latency-ms", str(args.latency_ms)],
+        cwd=SERVER_DIR,
+    )
+    # AptosService đọc APTOS_NODE_URL lúc import
+    os.environ["APTOS_NODE_URL"] = f"{standin_url}/v1"
+    os.environ.setdefault("APTOS_GAME_MODULE_ADDRESS", str(Account.generate().address()))
+    try:
+        await wait_ready(f"{standin_url}/__standin/stats", standin)
+        print(f"{args.mints} mints, commit latency {args.latency_ms} ms")
+        modes = args.modes.split(",")
+        if "uncached" in modes:
+            await run_mode(args, "uncached", standin_url, accounts=1, inflight=1, concurrent=False, cached=False)
+        if "serial" in modes:
+            await run_mode(args, "serial", standin_url, accounts=1, inflight=1, concurrent=False)
+        if "pipelined" in modes:
+            await run_mode(args, "pipelined", standin_url, accounts=1, inflight=args.inflight, concurrent=True)
+        if "sharded" in modes:
+            await run_mode(args, "sharded", standin_url, accounts=args.accounts, inflight=args.inflight, concurrent=True)
+        if "batched" in modes:
+            await run_mode(args, "batched", standin_url, accounts=1, inflight=args.inflight, concurrent=True, batch_size=args.batch_size)
+    finally:
+        standin.terminate()
+        standin.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mints", type=int, default=60)
+    parser.add_argument("--latency-ms", type=float, default=500, help="thời gian từ lúc node nhận tới lúc transaction được thực thi")
+    parser.add_argument("--inflight", type=int, default=16, help="số transaction đang bay tối đa mỗi tài khoản")
+    parser.add_argument("--accounts", type=int, default=4, help="số tài khoản admin ở chế độ sharded")
+    parser.add_argument("--batch-size", type=int, default=20, help="số người thắng mỗi transaction ở chế độ batched")
+    parser.add_argument("--batch-delay-ms", type=int, default=200, help="thời gian chờ tối đa để gom lô")
+    parser.add_argument("--modes", default="uncached,serial,pipelined,sharded,batched")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,122 @@
+"""
+So sánh chi phí encode khi broadcast một message tới N kết nối:
+  - per_socket: cách cũ, mỗi socket chạy lại jsonable_encoder + json.dumps
+  - once:       WebSocketManager hiện tại, encode một lần rồi gửi cùng frame cho mọi socket
+
+Socket giả không làm I/O, nên thời gian đo được chủ yếu là chi phí encode.
+Trước khi đo, kiểm tra rằng socket đã đăng ký nhưng đang rảnh vẫn gửi qua Outbox của nó
+và ngắt kết nối thì writer task của Outbox dừng.
+
+    python -m benchmarks.broadcast_benchmark --connections 10 100 1000
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from unittest import mock
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.websockets import WebSocketState
+
+import services.websocket_manager as ws_module
+from helpers.json_helper import encode_frame
+from services.websocket_manager import WebSocketManager
+
+
+class FakeSocket:
+    client_state = WebSocketState.CONNECTED
+
+    def __init__(self):
+        self.sent = 0
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        pass
+
+    async def send_text(self, frame: str):
+        self.sent += 1
+
+    async def send_json(self, data):
+        json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        self.sent += 1
+
+
+def sample_message(players: int = 8) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "type": "game_ended",
+        "payload": {
+            "leaderboard": [
+                {
+                    "rank": i + 1, "walletId": f"0x{i:064x}", "username": f"player{i}",
+                    "score": 1000 - i * 50, "correctAnswers": 7, "totalAnswers": 10,
+                    "accuracy": 70.0, "averageTime": 3.2, "isWinner": i == 0, "endedAt": now,
+                }
+                for i in range(players)
+            ],
+            "endedAt": now,
+        },
+    }
+
+
+async def per_socket(sockets, message):
+    await asyncio.gather(*(s.send_json(jsonable_encoder(message)) for s in sockets))
+
+
+async def check_outbox_path():
+    """Outbox rỗng vẫn phải nhận frame (không được rơi vào nhánh gửi trực tiếp), và disconnect dừng writer task."""
+    manager = WebSocketManager()
+    socket = FakeSocket()
+    await manager.connect_room(socket, "room", "wallet")
+    outbox = manager.outboxes[socket]
+    with mock.patch.object(outbox, "enqueue", wraps=outbox.enqueue) as enqueue:
+        await manager.broadcast_to_room("room", sample_message())
+    assert enqueue.call_count == 1, "idle registered socket bypassed its Outbox"
+    task = outbox._task
+    manager.disconnect_room(socket, "room")
+    await asyncio.gather(task, return_exceptions=True)
+    assert task.done() and socket not in manager.outboxes, "disconnect left the Outbox writer running"
+
+
+async def run(connections: int, rounds: int):
+    manager = WebSocketManager()
+    sockets = [FakeSocket() for _ in range(connections)]
+    for i, s in enumerate(sockets):
+        await manager.connect_room(s, "room", f"wallet{i}")
+    message = sample_message()
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await per_socket(sockets, message)
+    old = (time.perf_counter() - start) / rounds
+
+    with mock.patch.object(ws_module, "encode_frame", wraps=encode_frame) as encode:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await manager.broadcast_to_room("room", message)
+        new = (time.perf_counter() - start) / rounds
+        encodes_per_broadcast = encode.call_count / rounds
+    for s in sockets:
+        manager.disconnect_room(s, "room")
+
+    print(
+        f"{connections:>6} conns | per_socket {old * 1e3:8.3f} ms | once {new * 1e3:8.3f} ms "
+        f"| encodes/broadcast: {connections} -> {encodes_per_broadcast:.0f} | speedup x{old / new:.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(check_outbox_path())
+    for connections in args.connections:
+        asyncio.run(run(connections, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+So sánh trao NFT EVM (mintGameNFT + submitGameResult cho mỗi phòng) trên node giả (benchmarks.evm_rpc_standin)
+với thời gian block `--block-time-ms`:
+  - sync-inline: BlockchainService (web3 đồng bộ) gọi thẳng trên event loop, như NFTController trước đây
+  - sync-thread: BlockchainService trên một thread riêng, từng phòng một (như RewardQueue trước đây)
+  - async:       AsyncBlockchainService, `--rooms` phòng cùng lúc
+
+Kết quả: số phòng/giây, độ trễ event loop lớn nhất trong lúc chạy (một task ngủ 10 ms đo độ trễ thức dậy)
+và số RPC mỗi transaction theo method (đếm ở node giả).
+
+    python -m benchmarks.evm_benchmark --rooms 20 --block-time-ms 1000
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+from eth_account import Account
+
+from benchmarks.loadtest import free_port, wait_ready
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+NFT_ADDRESS = "0x" + "11" * 20
+GAME_ADDRESS = "0x" + "22" * 20
+
+
+async def measure_lag(stop: asyncio.Event, lags: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append((time.perf_counter() - started - 0.01) * 1000)
+
+
+async def run_mode(args, mode: str, standin_url: str) -> None:
+    rooms = [str(uuid.uuid4()) for _ in range(args.rooms)]
+    winner = Account.create().address
+    if mode == "async":
+        from services.async_blockchain_service import AsyncBlockchainService
+        service = AsyncBlockchainService()
+
+        async def award(room_id: str) -> None:
+            await service.mint_nft(room_id, f"https://challengewave.com/nft/{room_id}")
+            await service.submit_game_result(room_id, winner, 100, "0x" + "00" * 32)
+    else:
+        from services.nft_service import BlockchainService
+        service = BlockchainService()
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        def award_sync(room_id: str) -> None:
+            service.mint_nft(room_id, f"https://challengewave.com/nft/{room_id}")
+            service.submit_game_result(room_id, winner, 100, "0x" + "00" * 32)
+
+        async def award(room_id: str) -> None:
+            if mode == "sync-inline":
+                award_sync(room_id)
+            else:
+                await asyncio.get_running_loop().run_in_executor(executor, award_sync, room_id)
+
+    async with httpx.AsyncClient(base_url=standin_url) as node:
+        before = (await node.get("/__standin/stats")).json()
+        stop, lags = asyncio.Event(), []
+        lag_task = asyncio.create_task(measure_lag(stop, lags))
+        await asyncio.sleep(0)
+        started = time.perf_counter()
+        if mode == "async":
+            await asyncio.gather(*(award(room_id) for room_id in rooms))
+        else:
+            for room_id in rooms:
+                await award(room_id)
+                await asyncio.sleep(0)  # sync-inline: cho task đo độ trễ chạy giữa hai phòng
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await lag_task
+        after = (await node.get("/__standin/stats")).json()
+
+    if mode == "async":
+        await service.close()
+    transactions = 2 * args.rooms
+    calls = {
+        method: (n - before["calls"].get(method, 0)) / transactions
+        for method, n in after["calls"].items() if n - before["calls"].get(method, 0)
+    }
+    print(f"{mode:<12} | {args.rooms / elapsed:6.2f} rooms/s | {elapsed:6.1f}s | max loop lag {max(lags, default=0):8.1f} ms "
+          f"| reverted {after.get('reverted', 0) - before.get('reverted', 0)}")
+    print(f"{'':<12} | RPC per txn: " + ", ".join(f"{method} {n:.2f}" for method, n in sorted(calls.items())))
+
+
+async def main(args):
+    port = free_port()
+    standin_url = f"http://127.0.0.1:{port}"
+    standin = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.evm_rpc_standin", "--port", str(port), "--block-time-ms", str(args.block_time_ms)],
+        cwd=SERVER_DIR,
+    )
+    # services.nft_service đọc cấu hình lúc import
+    os.environ.update({
+        "OLYM3_RPC_URL": standin_url, "PRIVATE_KEY": Account.create().key.hex(),
+        "NFT_CONTRACT_ADDRESS": NFT_ADDRESS, "GAME_CONTRACT_ADDRESS": GAME_ADDRESS,
+    })
+    try:
+        await wait_ready(f"{standin_url}/__standin/stats", standin)
+        print(f"{args.rooms} rooms x 2 transactions, block time {args.block_time_ms} ms")
+        for mode in args.modes.split(","):
+            await run_mode(args, mode, standin_url)
+    finally:
+        standin.terminate()
+        standin.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--block-time-ms", type=float, default=1000)
+    parser.add_argument("--modes", default="sync-inline,sync-thread,async")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,217 @@
+"""
+Node EVM giả (JSON-RPC qua HTTP) chạy trên localhost để chạy BlockchainService / AsyncBlockchainService
+mà không cần RPC Olym3 hay contract đã deploy.
+- Nhận transaction đã ký (`eth_sendRawTransaction`, legacy), khôi phục người gửi, kiểm tra nonce như node thật:
+  nonce đã dùng → "nonce too low", gửi trùng → "already known"; nonce lớn hơn thì nằm chờ trong mempool.
+- Mỗi `--block-time-ms` đào một block gồm các transaction có nonce liền mạch của từng tài khoản.
+  ChallengeWaveNFT.mintGameNFT / ChallengeWaveGame.submitGameResult được mô phỏng theo ABI (ở bất kỳ địa chỉ nào):
+  mint lần hai cho cùng phòng hoặc submit khi phòng chưa có NFT thì transaction revert (receipt status 0),
+  `eth_call` cùng lời gọi trả về lỗi "execution reverted: ..." như node thật.
+- `eth_getTransactionCount` (latest / pending), `eth_gasPrice`, `eth_getTransactionReceipt`, `eth_call` getNFTByRoom.
+- `GET /__standin/stats` trả về số lần gọi mỗi RPC method và số transaction đã đào / revert.
+
+    python -m benchmarks.evm_rpc_standin --port 8545 --block-time-ms 1000
+    OLYM3_RPC_URL=http://127.0.0.1:8545 uvicorn main:app
+"""
+import argparse
+import asyncio
+from contextlib import asynccontextmanager
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import uvicorn
+from eth_abi import encode
+from eth_account import Account
+from eth_account._utils.legacy_transactions import Transaction
+from fastapi import FastAPI, Request
+from web3 import Web3
+
+from services.nft_service import game_contract_abi, nft_contract_abi
+
+CHAIN_ID = 31337
+GAS_PRICE = 1_000_000_000
+ZERO_ADDRESS = "0x" + "0" * 40
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str, data: Optional[str] = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+def _revert_data(reason: str) -> str:
+    # Error(string)
+    return "0x08c379a0" + encode(["string"], [reason]).hex()
+
+
+class EvmChain:
+    """Trạng thái chain: nonce đã đào của từng tài khoản, mempool, receipt và NFT của từng phòng."""
+    def __init__(self):
+        web3 = Web3()
+        self.contracts = [web3.eth.contract(abi=nft_contract_abi()), web3.eth.contract(abi=game_contract_abi())]
+        self.block_number = 0
+        self.nonces: Dict[str, int] = {}
+        # sender -> nonce -> (hash, transaction)
+        self.mempool: Dict[str, Dict[int, Tuple[str, Any]]] = {}
+        self.receipts: Dict[str, Dict[str, Any]] = {}
+        # room_id bytes16 -> (owner, uri)
+        self.room_nfts: Dict[bytes, Tuple[str, str]] = {}
+        self.counters: Counter = Counter()
+
+    def pending_nonce(self, sender: str) -> int:
+        nonce = self.nonces.get(sender, 0)
+        while nonce in self.mempool.get(sender, {}):
+            nonce += 1
+        return nonce
+
+    def send_raw(self, raw: bytes) -> str:
+        tx = Transaction.from_bytes(raw)
+        sender = Account.recover_transaction(raw)
+        tx_hash = Web3.to_hex(Web3.keccak(raw))
+        if tx_hash in self.receipts or any(h == tx_hash for h, _ in self.mempool.get(sender, {}).values()):
+            raise RpcError(-32000, "already known")
+        if tx.nonce < self.nonces.get(sender, 0):
+            raise RpcError(-32000, "nonce too low")
+        if tx.nonce in self.mempool.get(sender, {}):
+            raise RpcError(-32000, "replacement transaction underpriced")
+        self.mempool.setdefault(sender, {})[tx.nonce] = (tx_hash, tx)
+        return tx_hash
+
+    def mine(self) -> None:
+        self.block_number += 1
+        index = 0
+        for sender, queued in self.mempool.items():
+            while self.nonces.get(sender, 0) in queued:
+                nonce = self.nonces.get(sender, 0)
+                tx_hash, tx = queued.pop(nonce)
+                self.nonces[sender] = nonce + 1
+                reverted = self.execute(sender, tx.data, tx.value) is not None
+                self.counters["reverted" if reverted else "mined"] += 1
+                self.receipts[tx_hash] = {
+                    "transactionHash": tx_hash, "transactionIndex": hex(index),
+                    "blockHash": "0x" + f"{self.block_number:064x}", "blockNumber": hex(self.block_number),
+                    "from": sender, "to": Web3.to_checksum_address(tx.to), "contractAddress": None,
+                    "cumulativeGasUsed": hex(50000 * (index + 1)), "gasUsed": hex(50000),
+                    "effectiveGasPrice": hex(tx.gasPrice), "logs": [], "logsBloom": "0x" + "00" * 256,
+                    "status": "0x0" if reverted else "0x1", "type": "0x0",
+                }
+                index += 1
+
+    def decode(self, data: bytes):
+        for contract in self.contracts:
+            try:
+                return contract.decode_function_input(data)
+            except ValueError:
+                continue
+        return None, {}
+
+    def execute(self, sender: str, data: bytes, value: int, dry_run: bool = False) -> Optional[str]:
+        """Chạy lời gọi; trả về lý do revert hoặc None nếu thành công."""
+        function, params = self.decode(data)
+        name = function.fn_name if function else None
+        if name == "mintGameNFT":
+            if params["roomId"] in self.room_nfts:
+                return "NFT already exists for this room"
+            if not dry_run:
+                self.room_nfts[params["roomId"]] = (sender, params["metadataURI"])
+        elif name == "submitGameResult":
+            nft = self.room_nfts.get(params["roomId"])
+            if nft is None:
+                return "NFT not minted for this room"
+            if not dry_run:
+                self.room_nfts[params["roomId"]] = (params["winner"], nft[1])
+        return None
+
+    def call(self, call: Dict[str, Any]) -> str:
+        data = bytes.fromhex((call.get("data") or call.get("input") or "0x")[2:])
+        function, params = self.decode(data)
+        if function is not None and function.fn_name == "getNFTByRoom":
+            owner, uri = self.room_nfts.get(params["roomId"], (ZERO_ADDRESS, ""))
+            exists = params["roomId"] in self.room_nfts
+            return "0x" + encode(
+                ["uint256", "address", "address", "string", "bool"], [1 if exists else 0, owner, owner, uri, exists]
+            ).hex()
+        reason = self.execute(call.get("from") or ZERO_ADDRESS, data, int(call.get("value") or "0x0", 16), dry_run=True)
+        if reason:
+            raise RpcError(3, f"execution reverted: {reason}", _revert_data(reason))
+        return "0x"
+
+
+# ==================================
+# HTTP
+# ==================================
+
+def create_app(chain: EvmChain, block_time_ms: float = 1000) -> FastAPI:
+    async def miner():
+        while True:
+            await asyncio.sleep(block_time_ms / 1000)
+            chain.mine()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        task = asyncio.create_task(miner())
+        yield
+        task.cancel()
+
+    app = FastAPI(title="EVM JSON-RPC stand-in", lifespan=lifespan)
+    app.state.chain = chain
+    calls: Counter = Counter()
+
+    def dispatch(method: str, params: List[Any]) -> Any:
+        if method == "eth_chainId":
+            return hex(CHAIN_ID)
+        if method == "net_version":
+            return str(CHAIN_ID)
+        if method == "eth_blockNumber":
+            return hex(chain.block_number)
+        if method == "eth_gasPrice":
+            return hex(GAS_PRICE)
+        if method == "eth_getTransactionCount":
+            sender = Web3.to_checksum_address(params[0])
+            tag = params[1] if len(params) > 1 else "latest"
+            return hex(chain.pending_nonce(sender) if tag == "pending" else chain.nonces.get(sender, 0))
+        if method == "eth_sendRawTransaction":
+            return chain.send_raw(bytes.fromhex(params[0][2:]))
+        if method == "eth_getTransactionReceipt":
+            return chain.receipts.get(params[0])
+        if method == "eth_call":
+            return chain.call(params[0])
+        if method == "eth_estimateGas":
+            return hex(50000)
+        raise RpcError(-32601, f"the method {method} does not exist/is not available")
+
+    def handle(request: Dict[str, Any]) -> Dict[str, Any]:
+        method = request.get("method")
+        calls[method] += 1
+        try:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "result": dispatch(method, request.get("params") or [])}
+        except RpcError as e:
+            error = {"code": e.code, "message": e.message}
+            if e.data:
+                error["data"] = e.data
+            return {"jsonrpc": "2.0", "id": request.get("id"), "error": error}
+
+    @app.get("/__standin/stats")
+    async def stats():
+        return {"calls": dict(sorted(calls.items())), **chain.counters, "block": chain.block_number}
+
+    @app.post("/")
+    async def rpc(request: Request):
+        body = await request.json()
+        if isinstance(body, list):
+            return [handle(item) for item in body]
+        return handle(body)
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--block-time-ms", type=float, default=1000)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(EvmChain(), args.block_time_ms), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,263 @@
+"""
+Load test end-to-end: chạy server thật (uvicorn main:app) trên localhost, dữ liệu nằm trong PostgREST giả
+(benchmarks.postgrest_standin), rồi mô phỏng N phòng chơi cùng lúc như client thật:
+  - host tạo phòng qua `POST /api/rooms` + chỉnh settings, các người chơi khác vào qua `POST /api/join-room`
+  - mọi người chơi mở `/ws/{room_id}?wallet_id=...`, host gửi `start_game`
+  - mỗi `next_question`, người chơi "suy nghĩ" theo phân phối log-normal rồi gửi `submit_answer`
+    (một phần người chơi bỏ qua câu để đi qua nhánh hết giờ)
+
+Kết quả:
+  - answer_submitted: độ trễ từ lúc gửi submit_answer tới lúc nhận answer_submitted (p50/p95/p99)
+  - next_question skew: chênh lệch thời điểm các thành viên cùng phòng nhận cùng một câu hỏi
+  - số request tới DB mỗi game (đếm ở PostgREST giả, gồm cả lần ghi cuối khi server tắt)
+  - CPU của process server mỗi phòng
+
+Server cần đủ cấu hình để import được main (config/firebase_key.json, biến môi trường blockchain);
+SUPABASE_URL / SUPABASE_KEY được trỏ sang PostgREST giả. Nhiều phòng thì nhớ tăng `ulimit -n`.
+
+    python -m benchmarks.loadtest --rooms 500 --players 4 --questions 5 --ramp 10 --db-latency-ms 2
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import psutil
+import websockets
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+
+
+class Metrics:
+    def __init__(self):
+        self.answer_latency_ms: List[float] = []
+        # {(room_id, questionIndex): [thời điểm từng thành viên nhận next_question]}
+        self.next_question_at: Dict[tuple, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.games_started = 0
+        self.games_finished = 0
+
+    def skew_ms(self) -> List[float]:
+        return [(max(times) - min(times)) * 1e3 for times in self.next_question_at.values() if len(times) > 1]
+
+
+def percentiles(values: List[float]) -> str:
+    if not values:
+        return "n=0"
+    values = sorted(values)
+    pick = lambda p: values[min(len(values) - 1, int(p / 100 * len(values)))]
+    return f"p50 {pick(50):8.1f} | p95 {pick(95):8.1f} | p99 {pick(99):8.1f} | max {values[-1]:8.1f} ms (n={len(values)})"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_ready(url: str, process: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{url} exited with code {process.returncode}")
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+# ==================================
+# Người chơi
+# ==================================
+
+async def play(
+    args, metrics: Metrics, ws_url: str, room_id: str, wallet_id: str,
+    is_host: bool, everyone_connected: asyncio.Event, connected: List[str],
+):
+    think_mu = math.log(args.think_median)
+    pending: Optional[asyncio.Task] = None
+    sent_at: Optional[float] = None
+
+    async def answer(ws, question: dict, time_limit: float):
+        nonlocal sent_at
+        if random.random() < args.skip_rate:
+            return
+        think = random.lognormvariate(think_mu, args.think_sigma)
+        await asyncio.sleep(min(think, max(0.0, time_limit - 0.5)))
+        sent_at = time.perf_counter()
+        await ws.send(json.dumps({"type": "submit_answer", "data": {"answer": random.choice(question.get("options") or [""])}}))
+
+    async with websockets.connect(f"{ws_url}/ws/{room_id}?wallet_id={wallet_id}", max_size=None, open_timeout=60) as ws:
+        connected.append(wallet_id)
+        if len(connected) == args.players:
+            everyone_connected.set()
+        if is_host:
+            await everyone_connected.wait()
+            await asyncio.sleep(0.2)
+            await ws.send(json.dumps({"type": "start_game"}))
+
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                kind = message.get("type")
+                payload = message.get("payload") or {}
+                if kind == "game_started" and is_host:
+                    metrics.games_started += 1
+                elif kind == "next_question":
+                    metrics.next_question_at[(room_id, payload.get("questionIndex"))].append(time.perf_counter())
+                    if pending:
+                        pending.cancel()
+                    time_limit = (payload.get("timing") or {}).get("timePerQuestion") or args.time_per_question
+                    pending = asyncio.create_task(answer(ws, payload.get("question") or {}, time_limit))
+                elif kind == "answer_submitted" and sent_at is not None:
+                    metrics.answer_latency_ms.append((time.perf_counter() - sent_at) * 1e3)
+                    sent_at = None
+                elif kind == "error":
+                    metrics.errors[message.get("message") or payload.get("message") or "error"] += 1
+                elif kind == "game_ended":
+                    if is_host:
+                        metrics.games_finished += 1
+                    return
+        finally:
+            if pending:
+                pending.cancel()
+
+
+async def run_room(args, metrics: Metrics, http: httpx.AsyncClient, ws_url: str, index: int, run_id: str):
+    wallets = [f"lt-{run_id}-{index}-{p}" for p in range(args.players)]
+    try:
+        res = await http.post("/api/rooms", json={
+            "walletId": wallets[0], "username": wallets[0], "totalQuestions": args.questions,
+            "countdownDuration": args.countdown,
+        })
+        res.raise_for_status()
+        room_id = res.json()["id"]
+
+        hard = medium = args.questions // 3
+        res = await http.put(f"/api/rooms/{room_id}/settings", json={
+            "timePerQuestion": args.time_per_question,
+            "questions": {"easy": args.questions - hard - medium, "medium": medium, "hard": hard},
+        })
+        res.raise_for_status()
+        for wallet_id in wallets[1:]:
+            res = await http.post("/api/join-room", json={"roomId": room_id, "walletId": wallet_id, "username": wallet_id})
+            res.raise_for_status()
+    except httpx.HTTPError as e:
+        metrics.errors[f"http: {e}"] += 1
+        return
+
+    everyone_connected, connected = asyncio.Event(), []
+    results = await asyncio.gather(*(
+        play(args, metrics, ws_url, room_id, wallet_id, i == 0, everyone_connected, connected)
+        for i, wallet_id in enumerate(wallets)
+    ), return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            metrics.errors[f"ws: {type(result).__name__}: {result}"] += 1
+
+
+# ==================================
+# Điều phối
+# ==================================
+
+async def main(args):
+    standin_port, server_port = free_port(), free_port()
+    standin_url = f"http://127.0.0.1:{standin_port}"
+    server_url = f"http://127.0.0.1:{server_port}"
+    log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+
+    standin = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.postgrest_standin", "--port", str(standin_port),
+         "--questions", str(args.question_bank), "--latency-ms", str(args.db_latency_ms)],
+        cwd=SERVER_DIR, stdout=log, stderr=log,
+    )
+    env = {**os.environ, "SUPABASE_URL": standin_url, "SUPABASE_KEY": os.getenv("SUPABASE_KEY") or "standin"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(server_port), "--log-level", "warning"],
+        cwd=SERVER_DIR, env=env, stdout=log, stderr=log,
+    )
+    metrics = Metrics()
+    try:
+        await wait_ready(f"{standin_url}/__standin/stats", standin)
+        await wait_ready(f"{server_url}/api/rooms", server)
+
+        async with httpx.AsyncClient(base_url=standin_url) as db:
+            # Chỉ đếm request của các game, không tính lúc server khởi động
+            await db.post("/__standin/reset")
+
+            server_process = psutil.Process(server.pid)
+            cpu_before = server_process.cpu_times()
+            started = time.perf_counter()
+            limits = httpx.Limits(max_connections=args.http_connections)
+            run_id = uuid.uuid4().hex[:6]
+            async with httpx.AsyncClient(base_url=server_url, limits=limits, timeout=60) as http:
+                async def delayed(index: int):
+                    await asyncio.sleep(args.ramp * index / max(1, args.rooms))
+                    await run_room(args, metrics, http, server_url.replace("http", "ws"), index, run_id)
+
+                await asyncio.wait_for(asyncio.gather(*(delayed(i) for i in range(args.rooms))), args.timeout)
+            elapsed = time.perf_counter() - started
+            cpu_after = server_process.cpu_times()
+
+            # Tắt server như khi deploy để hàng đợi ghi được flush, rồi mới đọc bộ đếm
+            server.send_signal(signal.SIGINT)
+            server.wait(timeout=60)
+            db_stats = (await db.get("/__standin/stats")).json()
+    finally:
+        for process in (server, standin):
+            if process.poll() is None:
+                process.terminate()
+                process.wait(timeout=30)
+        if log is not subprocess.DEVNULL:
+            log.close()
+
+    games = max(1, metrics.games_finished)
+    cpu_seconds = (cpu_after.user + cpu_after.system) - (cpu_before.user + cpu_before.system)
+    print(f"{args.rooms} rooms x {args.players} players x {args.questions} questions, "
+          f"ramp {args.ramp}s, think median {args.think_median}s, DB latency {args.db_latency_ms} ms")
+    print(f"games started {metrics.games_started}, finished {metrics.games_finished} in {elapsed:.1f}s")
+    print(f"answer_submitted     | {percentiles(metrics.answer_latency_ms)}")
+    print(f"next_question skew   | {percentiles(metrics.skew_ms())}")
+    print(f"server CPU           | {cpu_seconds:.2f}s total, {cpu_seconds / max(1, args.rooms) * 1e3:.1f} ms/room")
+    print(f"DB requests          | {db_stats['total']} total, {db_stats['total'] / games:.1f}/game")
+    for name, n in sorted(db_stats["calls"].items(), key=lambda item: -item[1]):
+        print(f"  {name:<32} {n:>8} {n / games:>8.1f}/game")
+    if metrics.errors:
+        print("errors:")
+        for message, n in metrics.errors.most_common(10):
+            print(f"  {n:>6} {message}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=100)
+    parser.add_argument("--players", type=int, default=4, help="tối đa 4 người mỗi phòng")
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--time-per-question", type=int, default=10)
+    parser.add_argument("--countdown", type=int, default=3)
+    parser.add_argument("--ramp", type=float, default=5, help="số giây để mở hết các phòng")
+    parser.add_argument("--think-median", type=float, default=3, help="trung vị thời gian suy nghĩ (giây)")
+    parser.add_argument("--think-sigma", type=float, default=0.6, help="độ lệch của log thời gian suy nghĩ")
+    parser.add_argument("--skip-rate", type=float, default=0.05, help="tỉ lệ câu người chơi không trả lời")
+    parser.add_argument("--question-bank", type=int, default=300, help="số câu hỏi mỗi độ khó trong DB giả")
+    parser.add_argument("--db-latency-ms", type=float, default=2)
+    parser.add_argument("--http-connections", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=900)
+    parser.add_argument("--server-log", help="ghi stdout/stderr của server và DB giả ra file")
+    asyncio.run(main(parser.parse_args()))
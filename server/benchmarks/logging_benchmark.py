@@ -0,0 +1,116 @@
+"""
+So sánh số frame WebSocket gửi được mỗi giây khi ghi log cho từng frame:
+  - print:          cách cũ, `print(f"SEND_JSON: {data}")` cho mỗi frame, ghi thẳng ra stdout ở event loop
+  - logger_debug:   config.logging_config, nhóm ws ở DEBUG, mọi frame đều được ghi (qua hàng đợi + thread)
+  - logger_sampled: như trên nhưng LOG_SAMPLE_EVERY_WS=N, chỉ 1/N frame được ghi
+  - logger_info:    cấu hình mặc định (INFO), log DEBUG của mỗi frame bị bỏ ngay ở `isEnabledFor`
+  - none:           không ghi log, làm mốc
+
+Log được ghi vào một pipe như stdout của container, socket giả không làm I/O. `--sink-delay-us` làm đầu đọc
+pipe chậm lại (terminal, log driver bị nghẽn): khi pipe đầy, print chặn cả event loop, còn logger chỉ bỏ bớt bản ghi.
+
+    python -m benchmarks.logging_benchmark --frames 20000 --sample-every 100
+    python -m benchmarks.logging_benchmark --frames 20000 --sink-delay-us 50
+"""
+import argparse
+import asyncio
+import io
+import logging
+import os
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+
+from fastapi.websockets import WebSocketState
+
+import config.logging_config as logging_config
+from config.logging_config import WS, get_logger, setup_logging, shutdown_logging
+from helpers.json_helper import encode_frame, send_text_safe
+
+log = get_logger(WS)
+
+
+class FakeSocket:
+    client_state = WebSocketState.CONNECTED
+
+    async def send_text(self, frame: str):
+        pass
+
+
+def sample_message(i: int) -> dict:
+    return {
+        "type": "next_question",
+        "payload": {
+            "questionIndex": i % 10,
+            "question": {
+                "id": f"q-{i}", "text": "Which consensus mechanism does Aptos use?",
+                "options": ["PoW", "AptosBFT", "PoH", "DPoS"], "difficulty": "medium",
+            },
+            "timing": {"questionStartAt": 1_700_000_000_000 + i, "questionEndAt": 1_700_000_015_000 + i, "timePerQuestion": 15},
+            "config": {"points": 200, "timeBonus": True},
+        },
+    }
+
+
+async def send_frames(frames: int, mode: str) -> float:
+    socket = FakeSocket()
+    start = time.perf_counter()
+    for i in range(frames):
+        data = sample_message(i)
+        if mode == "print":
+            print(f"SEND_JSON: {data}")
+        elif mode != "none":
+            log.debug("SEND_JSON: %s", data)
+        await send_text_safe(socket, encode_frame(data))
+    return time.perf_counter() - start
+
+
+# Đọc từng dòng log và nghỉ `delay` giây sau mỗi dòng
+SLOW_READER = "import sys, time\ndelay = float(sys.argv[1])\nfor line in sys.stdin:\n    time.sleep(delay)"
+
+
+def run(mode: str, frames: int, sample_every: int, sink_delay_us: float) -> None:
+    if sink_delay_us:
+        command = [sys.executable, "-c", SLOW_READER, str(sink_delay_us / 1e6)]
+    else:
+        command = ["cat"]
+    sink = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL)
+    stream = io.TextIOWrapper(sink.stdin, line_buffering=True)
+
+    os.environ["LOG_SAMPLE_EVERY_WS"] = str(sample_every if mode == "logger_sampled" else 1)
+    setup_logging(stream)
+    log.setLevel(logging.INFO if mode == "logger_info" else logging.DEBUG)
+    try:
+        with redirect_stdout(stream):
+            elapsed = asyncio.run(send_frames(frames, mode))
+        dropped = logging_config.dropped_records()
+        started_flush = time.perf_counter()
+        shutdown_logging()
+        flush = time.perf_counter() - started_flush
+    finally:
+        shutdown_logging()
+        stream.close()
+        sink.wait()
+
+    print(
+        f"{mode:>15} | {frames / elapsed:10.0f} frames/s | {elapsed / frames * 1e6:7.2f} us/frame "
+        f"| flush after loop {flush * 1e3:7.1f} ms | dropped {dropped}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--sample-every", type=int, default=100)
+    parser.add_argument("--sink-delay-us", type=float, default=0, help="thời gian đầu đọc log nghỉ sau mỗi dòng")
+    parser.add_argument("--modes", nargs="+", default=["none", "print", "logger_debug", "logger_sampled", "logger_info"])
+    args = parser.parse_args()
+    if sys.platform == "win32" and not args.sink_delay_us:
+        parser.error("cần lệnh `cat` để làm pipe nhận log, hoặc dùng --sink-delay-us")
+    for mode in args.modes:
+        run(mode, args.frames, args.sample_every, args.sink_delay_us)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+PostgREST giả chạy trên localhost để chạy server (và load test) mà không cần project Supabase thật.
+- Dữ liệu nằm trong bộ nhớ (config.fake_supabase.Tables, dùng chung với client giả SUPABASE_BACKEND=fake).
+- Hỗ trợ phần API mà các repository dùng: select (kể cả embed `room_players(*)`), eq/neq/gt/gte/lt/lte/in/is,
+  order, limit/offset, count=exact, insert, upsert (on_conflict), update, delete, single.
+- RPC chưa đăng ký trả về 404 như PostgREST khi DB chưa có hàm (RankEngine tự chuyển sang upsert theo lô).
+- Mỗi request được đếm theo (method, bảng); `GET /__standin/stats` trả về bộ đếm, `POST /__standin/reset` xóa bộ đếm.
+- `--latency-ms` thêm độ trễ cho mỗi request để mô phỏng round trip tới DB thật.
+
+    python -m benchmarks.postgrest_standin --port 54321 --questions 300 --latency-ms 2
+    SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_KEY=standin uvicorn main:app
+"""
+import argparse
+import asyncio
+import json
+from collections import Counter
+from typing import Any, Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+from config.fake_supabase import PostgrestError, Tables
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+# ==================================
+# HTTP
+# ==================================
+
+def create_app(tables: Tables, latency_ms: float = 0) -> FastAPI:
+    app = FastAPI(title="PostgREST stand-in")
+    calls: Counter = Counter()
+    rpcs: Dict[str, Any] = {}
+    app.state.tables, app.state.calls, app.state.rpcs = tables, calls, rpcs
+
+    def respond(data: Any, request: Request, status: int = 200, total: Optional[int] = None, offset: int = 0) -> Response:
+        headers = {}
+        if total is not None:
+            end = offset + len(data) - 1 if data else offset
+            headers["Content-Range"] = f"{offset}-{end}/{total}" if data else f"*/{total}"
+        if "vnd.pgrst.object" in request.headers.get("accept", ""):
+            if len(data) != 1:
+                return error(PostgrestError(406, "PGRST116", f"JSON object requested, multiple (or no) rows returned ({len(data)})"))
+            data = data[0]
+        return Response(json.dumps(data, default=str), status_code=status, media_type="application/json", headers=headers)
+
+    def error(e: PostgrestError) -> Response:
+        body = {"code": e.code, "message": e.message, "details": None, "hint": None}
+        return Response(json.dumps(body), status_code=e.status, media_type="application/json")
+
+    @app.get("/__standin/stats")
+    async def stats():
+        return {
+            "calls": {f"{method} {table}": n for (method, table), n in sorted(calls.items())},
+            "total": sum(calls.values()),
+            "rows": {table: len(rows) for table, rows in tables.rows.items()},
+        }
+
+    @app.post("/__standin/reset")
+    async def reset():
+        calls.clear()
+        return {"ok": True}
+
+    @app.post("/rest/v1/rpc/{name}")
+    async def rpc(name: str, request: Request):
+        calls[("RPC", name)] += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        handler = rpcs.get(name)
+        if handler is None:
+            return error(PostgrestError(404, "PGRST202", f"Could not find the function public.{name}"))
+        return respond(handler(tables, await request.json()), request)
+
+    @app.api_route("/rest/v1/{table}", methods=["GET", "HEAD", "POST", "PATCH", "DELETE"])
+    async def table_route(table: str, request: Request):
+        calls[(request.method, table)] += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+        params = request.query_params
+        filters = [(k, v) for k, v in params.multi_items() if k not in RESERVED_PARAMS]
+        prefer = request.headers.get("prefer", "")
+        representation = "return=representation" in prefer
+        try:
+            if request.method in ("GET", "HEAD"):
+                rows = tables.select(table, params.get("select", "*"), filters, params.get("order"))
+                total = len(rows) if "count=" in prefer else None
+                offset = int(params.get("offset") or 0)
+                rows = rows[offset:]
+                if params.get("limit") is not None:
+                    rows = rows[:int(params["limit"])]
+                return respond([] if request.method == "HEAD" else rows, request, total=total, offset=offset)
+
+            if request.method == "POST":
+                body = await request.json()
+                rows = tables.insert(
+                    table, body if isinstance(body, list) else [body],
+                    on_conflict=params.get("on_conflict"),
+                    upsert="resolution=" in prefer,
+                    ignore_duplicates="resolution=ignore-duplicates" in prefer,
+                )
+                return respond(rows if representation else [], request, status=201)
+
+            if request.method == "PATCH":
+                rows = tables.update(table, await request.json(), filters)
+            else:
+                rows = tables.delete(table, filters)
+            return respond(rows if representation else [], request)
+        except PostgrestError as e:
+            return error(e)
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--questions", type=int, default=300, help="số câu hỏi mỗi độ khó được tạo sẵn")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    tables = Tables()
+    tables.seed_questions(args.questions)
+    uvicorn.run(create_app(tables, args.latency_ms), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,134 @@
+"""
+So sánh chi phí tính lại rank của user_stats:
+  - per_row:     cách cũ, SELECT toàn bộ rồi một UPDATE cho mỗi user
+  - set_based:   một câu UPDATE dùng window function, chỉ ghi dòng có rank thay đổi
+  - incremental: set-based nhưng chỉ trong khoảng điểm của những người vừa chơi
+
+Dùng SQLite trong bộ nhớ làm bản thay thế Postgres ở local (cùng window function, không cần server).
+Số round trip được in kèm; với Supabase mỗi round trip là một request HTTP tới PostgREST,
+nên cột `est_at_rtt` ước tính thời gian thực tế với độ trễ mạng `--rtt-ms`.
+
+    python -m benchmarks.rank_benchmark --users 10000 100000
+"""
+import argparse
+import random
+import sqlite3
+import time
+
+SET_BASED_SQL = """
+WITH ranked AS (
+    SELECT wallet_id,
+           :base + row_number() OVER (ORDER BY total_score DESC, wallet_id ASC) AS new_rank
+    FROM user_stats
+    WHERE (:lo IS NULL OR total_score >= :lo)
+      AND (:hi IS NULL OR total_score <= :hi)
+)
+UPDATE user_stats
+SET rank = ranked.new_rank
+FROM ranked
+WHERE user_stats.wallet_id = ranked.wallet_id
+  AND user_stats.rank IS NOT ranked.new_rank
+"""
+
+
+def make_db(users: int, seed: int) -> sqlite3.Connection:
+    rng = random.Random(seed)
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE user_stats (wallet_id TEXT PRIMARY KEY, total_score INTEGER, rank INTEGER)")
+    db.execute("CREATE INDEX user_stats_total_score_wallet_idx ON user_stats (total_score DESC, wallet_id ASC)")
+    db.executemany(
+        "INSERT INTO user_stats VALUES (?, ?, 0)",
+        ((f"0x{i:08x}", rng.randint(0, 50_000)) for i in range(users)),
+    )
+    db.commit()
+    return db
+
+
+def per_row(db: sqlite3.Connection) -> int:
+    rows = db.execute("SELECT wallet_id FROM user_stats ORDER BY total_score DESC").fetchall()
+    for idx, (wallet_id,) in enumerate(rows):
+        db.execute("UPDATE user_stats SET rank = ? WHERE wallet_id = ?", (idx + 1, wallet_id))
+    db.commit()
+    return 1 + len(rows)
+
+
+def set_based(db: sqlite3.Connection, lo=None, hi=None) -> int:
+    base = 0
+    if hi is not None:
+        base = db.execute("SELECT count(*) FROM user_stats WHERE total_score > ?", (hi,)).fetchone()[0]
+    db.execute(SET_BASED_SQL, {"base": base, "lo": lo, "hi": hi})
+    db.commit()
+    # Trong Postgres cả hai bước nằm trong hàm recalculate_user_ranks: một lần gọi RPC
+    return 1
+
+
+def play_game(db: sqlite3.Connection, rng: random.Random, players: int) -> dict:
+    wallets = [w for (w,) in db.execute("SELECT wallet_id FROM user_stats ORDER BY random() LIMIT ?", (players,))]
+    changes = {}
+    for wallet_id in wallets:
+        old = db.execute("SELECT total_score FROM user_stats WHERE wallet_id = ?", (wallet_id,)).fetchone()[0]
+        new = old + rng.randint(0, 400)
+        db.execute("UPDATE user_stats SET total_score = ? WHERE wallet_id = ?", (new, wallet_id))
+        changes[wallet_id] = (old, new)
+    db.commit()
+    return changes
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run(users: int, players: int, rtt_ms: float, seed: int) -> None:
+    rng = random.Random(seed)
+    db = make_db(users, seed)
+    set_based(db)  # rank ban đầu
+
+    print(f"\n== {users:,} users, {players} players per game, rtt {rtt_ms} ms ==")
+    print(f"{'strategy':<12} {'round_trips':>12} {'db_time_s':>10} {'est_at_rtt_s':>13} {'rows_changed':>13}")
+
+    def report(name, round_trips, elapsed):
+        changed = db.total_changes - report.before
+        report.before = db.total_changes
+        est = elapsed + round_trips * rtt_ms / 1000
+        print(f"{name:<12} {round_trips:>12,} {elapsed:>10.3f} {est:>13.3f} {changed:>13,}")
+
+    play_game(db, rng, players)
+    report.before = db.total_changes
+    round_trips, elapsed = timed(per_row, db)
+    report("per_row", round_trips, elapsed)
+
+    play_game(db, rng, players)
+    report.before = db.total_changes
+    round_trips, elapsed = timed(set_based, db)
+    report("set_based", round_trips, elapsed)
+
+    changes = play_game(db, rng, players)
+    report.before = db.total_changes
+    scores = [s for pair in changes.values() for s in pair]
+    round_trips, elapsed = timed(set_based, db, lo=min(scores), hi=max(scores))
+    report("incremental", round_trips, elapsed)
+
+    # Kiểm tra incremental cho ra cùng kết quả với xếp hạng lại toàn bộ
+    expected = db.execute(
+        "SELECT wallet_id, row_number() OVER (ORDER BY total_score DESC, wallet_id ASC) FROM user_stats"
+    ).fetchall()
+    actual = dict(db.execute("SELECT wallet_id, rank FROM user_stats").fetchall())
+    assert all(actual[w] == r for w, r in expected), "incremental ranks diverged from full recalculation"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--rtt-ms", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for users in args.users:
+        run(users, args.players, args.rtt_ms, args.seed)
+
+
+if __name__ == "__main__":
+    main()
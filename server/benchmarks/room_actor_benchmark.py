@@ -0,0 +1,128 @@
+"""
+Thông lượng xử lý submit khi N phòng x 4 người chơi cùng trả lời, mỗi phòng chơi nhiều câu liên tiếp:
+  - direct: mỗi submit chạy ngay trong task của kết nối, các submit của cùng phòng xen kẽ nhau ở mỗi await
+  - actor:  submit được đưa vào RoomActors và chạy tuần tự theo phòng; room chỉ được đưa vào hàng đợi ghi
+            một lần sau mỗi loạt event của phòng (RoomStateStore.defer + on_drained) như trong main.py
+
+Dùng RoomStateStore + AnswerTally + repository trong bộ nhớ như khi chạy thật; broadcast được thay bằng
+`asyncio.sleep(0)` để giữ các điểm await. Cột advances đếm số lần chuyển câu, phải bằng rooms x questions.
+
+    python -m benchmarks.room_actor_benchmark --rooms 1000 --players 4 --questions 10
+"""
+import argparse
+import asyncio
+import time
+from typing import Optional
+
+from enums.game_status import GAME_STATUS
+from models.answer import Answer
+from models.player import Player
+from models.question import Question
+from models.room import Room
+from repositories.implement.in_memory_repo_impl import (
+    InMemoryAnswerRepository,
+    InMemoryPlayerRepository,
+    InMemoryRoomRepository,
+)
+from services.room_actor import RoomActors
+from services.room_service import RoomService
+from services.room_state_store import RoomStateStore
+from services.write_behind_queue import WriteBehindQueue
+
+
+class Game:
+    def __init__(self, rooms: int, players: int, questions: int, actors: Optional[RoomActors] = None):
+        player_repo, answer_repo = InMemoryPlayerRepository(), InMemoryAnswerRepository()
+        room_repo = InMemoryRoomRepository(player_repo, answer_repo)
+        self.writer = WriteBehindQueue(room_repo, player_repo, answer_repo)
+        room_state = RoomStateStore(
+            room_repo, player_repo, answer_repo, self.writer, defer=actors.in_actor if actors else None,
+        )
+        if actors:
+            actors.on_drained.append(room_state.flush_deferred)
+        self.room_service = RoomService(room_repo, player_repo, answer_repo, room_state)
+        self.moving = set()
+        self.advances = 0
+
+        self.room_ids = []
+        for r in range(rooms):
+            room = Room.create(
+                status=GAME_STATUS.IN_PROGRESS,
+                total_questions=questions,
+                current_index=0,
+                current_questions=[
+                    Question(id=f"q{q}", content="?", options=["a", "b"], correct_answer="a", difficulty="medium")
+                    for q in range(questions)
+                ],
+                players=[Player(wallet_id=f"p{p}", room_id="", username=f"p{p}") for p in range(players)],
+            )
+            for player in room.players:
+                player.room_id = room.id
+            self.room_service.room_state.put(room)
+            self.room_ids.append(room.id)
+
+    async def submit(self, room_id: str, wallet_id: str, question_index: int):
+        room = await self.room_service.get_room(room_id)
+        question = room.current_question
+        if room.current_index != question_index:
+            return
+        tally = self.room_service.get_answer_tally(room)
+        if tally.record(question.id, wallet_id, True) is None:
+            return
+        await self.room_service.record_answer(Answer(
+            room_id=room_id, wallet_id=wallet_id, question_id=question.id,
+            answer="a", is_correct=True, score=100, response_time=1000,
+        ))
+        await self.room_service.save_room(room)
+        await asyncio.sleep(0)  # answer_submitted
+
+        if tally.all_answered(question.id) and room_id not in self.moving:
+            self.moving.add(room_id)
+            await asyncio.sleep(0)  # question_result
+            room.current_index += 1
+            await self.room_service.save_room(room)
+            self.moving.discard(room_id)
+            self.advances += 1
+
+
+async def play(mode: str, rooms: int, players: int, questions: int) -> dict:
+    actors = RoomActors()
+    game = Game(rooms, players, questions, actors if mode == "actor" else None)
+    game.writer.start()
+
+    async def player(room_id: str, wallet_id: str, question_index: int):
+        if mode == "actor":
+            await actors.run(room_id, lambda: game.submit(room_id, wallet_id, question_index))
+        else:
+            await game.submit(room_id, wallet_id, question_index)
+
+    started = time.perf_counter()
+    for question_index in range(questions):
+        await asyncio.gather(*(
+            player(room_id, f"p{p}", question_index)
+            for room_id in game.room_ids for p in range(players)
+        ))
+    elapsed = time.perf_counter() - started
+
+    await game.writer.stop()
+    events = rooms * players * questions
+    return {"mode": mode, "seconds": elapsed, "events_per_second": events / elapsed, "advances": game.advances}
+
+
+async def main(rooms: int, players: int, questions: int):
+    print(f"{rooms} rooms x {players} players x {questions} questions")
+    for mode in ("direct", "actor"):
+        result = await play(mode, rooms, players, questions)
+        print(
+            f"{mode:>7} | {result['seconds'] * 1e3:9.1f} ms | {result['events_per_second']:10.0f} submits/s "
+            f"| advances {result['advances']} (expected {rooms * questions})"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=1000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--questions", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.rooms, args.players, args.questions))
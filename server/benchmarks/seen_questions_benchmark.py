@@ -0,0 +1,65 @@
+"""
+Đo trần bộ nhớ của SeenQuestions và chi phí lấy câu hỏi có loại trừ câu đã gặp.
+
+  - Nạp `--questions` câu hỏi và cho `--users` wallet mỗi người chơi đủ số game để đầy ring buffer.
+  - Bộ nhớ được đo bằng tracemalloc (chỉ phần do SeenQuestions cấp phát).
+  - Sampling: mỗi phòng `--room-size` người, lấy `--k` câu, tránh các câu cả phòng đã gặp.
+
+    python -m benchmarks.seen_questions_benchmark --users 100000 --questions 100000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from services.seen_questions import SeenQuestions, sample_excluding
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--questions", type=int, default=100_000)
+    parser.add_argument("--per-wallet", type=int, default=64)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--room-size", type=int, default=8)
+    parser.add_argument("--rooms", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+    pool = [f"q{i:06d}" for i in range(args.questions)]
+    wallets = [f"0x{i:08x}" for i in range(args.users)]
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    seen = SeenQuestions(per_wallet=args.per_wallet, max_wallets=args.users)
+    games_to_fill = -(-args.per_wallet // args.k)
+    for wallet_id in wallets:
+        for _ in range(games_to_fill):
+            seen.mark_seen(wallet_id, rng.sample(pool, args.k))
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    used = after - before
+    print(f"wallets={len(seen):,} per_wallet={args.per_wallet} questions={args.questions:,}")
+    print(f"memory: {used / 2**20:.1f} MiB total, {used / len(seen):.0f} B/wallet, peak {(peak - before) / 2**20:.1f} MiB")
+
+    # Thêm wallet vượt max_wallets: bộ nhớ không tăng thêm vì wallet cũ bị bỏ (LRU)
+    for i in range(args.users // 10):
+        seen.mark_seen(f"extra{i}", rng.sample(pool, args.k))
+    assert len(seen) == args.users
+
+    start = time.perf_counter()
+    overlap = 0
+    for _ in range(args.rooms):
+        room = rng.sample(wallets, args.room_size)
+        exclude = seen.recently_seen(room)
+        picked = sample_excluding(pool, args.k, exclude, key=lambda q: q)
+        overlap += sum(1 for q in picked if q in exclude)
+    elapsed = time.perf_counter() - start
+    print(f"sampling: {args.rooms:,} rooms in {elapsed:.2f}s ({elapsed / args.rooms * 1e6:.0f} µs/room), overlap {overlap}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Đo thời gian khởi động lạnh của server (uvicorn main:app) với PostgREST giả (benchmarks.postgrest_standin):
+  - import main: thời gian import trong một process mới, và web3 / aptos_sdk có bị import theo không
+  - ready: từ lúc chạy uvicorn tới khi /metrics trả lời (import + lifespan)
+  - RSS của process server lúc vừa sẵn sàng
+
+Chạy với cấu hình chain thật (CHAIN_BACKEND mặc định), không có phòng nào trao thưởng, nên đây là
+chi phí một node không mint NFT phải trả. Server cần đủ cấu hình để import được main như benchmarks.loadtest.
+
+    python -m benchmarks.startup_benchmark --runs 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+import psutil
+
+from benchmarks.loadtest import SERVER_DIR, free_port, wait_ready
+
+IMPORT_PROBE = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    "import main\n"
+    "print(json.dumps({'seconds': time.perf_counter() - started,"
+    " 'web3': 'web3' in sys.modules, 'aptos_sdk': 'aptos_sdk' in sys.modules}))\n"
+)
+
+
+def measure_import(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=SERVER_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+async def measure_ready(env: dict) -> dict:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        await wait_ready(f"{url}/metrics", server)
+        ready = time.perf_counter() - started
+        rss = psutil.Process(server.pid).memory_info().rss / 2**20
+        async with httpx.AsyncClient(base_url=url) as client:
+            chain = [line for line in (await client.get("/metrics")).text.splitlines() if line.startswith("app_chain_")]
+        return {"seconds": ready, "rss_mb": rss, "chain": chain}
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+async def main(args):
+    standin_port = free_port()
+    standin_url = f"http://127.0.0.1:{standin_port}"
+    standin = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.postgrest_standin", "--port", str(standin_port)],
+        cwd=SERVER_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    env = {**os.environ, "SUPABASE_URL": standin_url, "SUPABASE_KEY": os.getenv("SUPABASE_KEY") or "standin"}
+    try:
+        await wait_ready(f"{standin_url}/__standin/stats", standin)
+        imports, readies = [], []
+        for _ in range(args.runs):
+            imports.append(measure_import(env))
+            readies.append(await measure_ready(env))
+    finally:
+        standin.terminate()
+        standin.wait(timeout=30)
+
+    median = lambda values: statistics.median(values) * 1000
+    print(f"{args.runs} runs (median)")
+    print(f"import main  {median([r['seconds'] for r in imports]):8.0f} ms | "
+          f"web3 imported {imports[-1]['web3']} | aptos_sdk imported {imports[-1]['aptos_sdk']}")
+    print(f"ready        {median([r['seconds'] for r in readies]):8.0f} ms | "
+          f"rss {statistics.median(r['rss_mb'] for r in readies):6.1f} MB")
+    for line in readies[-1]["chain"]:
+        print(f"             {line}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,86 @@
+"""
+So sánh chi phí giữ timer cho N phòng, mỗi phòng một timer hết giờ câu hỏi bị hủy và đặt lại liên tục:
+  - tasks: cách cũ, mỗi timer là một task `asyncio.sleep`, hủy bằng task.cancel()
+  - wheel: TimerWheel dùng chung, schedule/cancel theo (room_id, purpose)
+
+Sau phần đo schedule/cancel, cho các timer hết hạn thật để đo độ trễ của wheel.
+
+    python -m benchmarks.timer_wheel_benchmark --rooms 1000 10000 50000
+"""
+import argparse
+import asyncio
+import time
+
+from services.timer_wheel import TimerWheel
+
+ROUNDS = 3
+
+
+async def with_tasks(rooms: int, delay: float) -> float:
+    async def timeout():
+        await asyncio.sleep(delay)
+
+    started = time.perf_counter()
+    tasks = {}
+    for _ in range(ROUNDS):
+        for room in range(rooms):
+            task = tasks.get(room)
+            if task:
+                task.cancel()
+            tasks[room] = asyncio.create_task(timeout())
+        # Cho event loop chạy để các task kịp bắt đầu sleep / xử lý cancel như khi chạy thật
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+
+    for task in tasks.values():
+        task.cancel()
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+    return elapsed
+
+
+async def with_wheel(rooms: int, delay: float) -> float:
+    wheel = TimerWheel()
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        for room in range(rooms):
+            wheel.schedule(str(room), "question_timeout", delay, lambda: None)
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+    await wheel.stop()
+    return elapsed
+
+
+async def wheel_lag(rooms: int, spread: float) -> dict:
+    wheel = TimerWheel()
+    done = asyncio.Event()
+    fired = 0
+
+    def on_fire():
+        nonlocal fired
+        fired += 1
+        if fired == rooms:
+            done.set()
+
+    for room in range(rooms):
+        wheel.schedule(str(room), "question_timeout", spread * room / rooms, on_fire)
+    await done.wait()
+    stats = wheel.stats()
+    await wheel.stop()
+    return stats
+
+
+async def main(room_counts, spread: float):
+    print(f"{'rooms':>8} {'tasks (ms)':>12} {'wheel (ms)':>12} {'lag avg (ms)':>13} {'lag max (ms)':>13}")
+    for rooms in room_counts:
+        tasks_ms = await with_tasks(rooms, 60) * 1000
+        wheel_ms = await with_wheel(rooms, 60) * 1000
+        stats = await wheel_lag(rooms, spread)
+        print(f"{rooms:>8} {tasks_ms:>12.1f} {wheel_ms:>12.1f} {stats['lag_avg_ms']:>13.1f} {stats['lag_max_ms']:>13.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--spread", type=float, default=2.0, help="Các timer hết hạn rải đều trong khoảng này (giây)")
+    args = parser.parse_args()
+    asyncio.run(main(args.rooms, args.spread))
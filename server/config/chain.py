@@ -0,0 +1,126 @@
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar
+
+from dotenv import load_dotenv
+
+from config.fake_chain import FakeAptosService, FakeBlockchainService, get_fake_chain
+from config.logging_config import NFT, get_logger
+
+log = get_logger(NFT)
+
+load_dotenv()
+
+T = TypeVar("T")
+
+# "live" (mặc định) hoặc "fake": mint/transfer NFT ghi vào sổ cái trong bộ nhớ (config/fake_chain.py),
+# để chạy game tới lúc trao thưởng mà không cần RPC, khóa ví hay contract thật
+CHAIN_BACKEND = os.getenv("CHAIN_BACKEND") or "live"
+
+
+def init_blockchain_service():
+    """AsyncBlockchainService (Olym3 EVM) hoặc bản giả khi CHAIN_BACKEND=fake."""
+    if CHAIN_BACKEND == "fake":
+        return FakeBlockchainService(get_fake_chain())
+    # Import muộn: web3 nặng, chỉ node thật sự mint mới cần
+    from services.async_blockchain_service import AsyncBlockchainService
+    return AsyncBlockchainService()
+
+
+def init_aptos_service():
+    """AptosService hoặc bản giả khi CHAIN_BACKEND=fake."""
+    if CHAIN_BACKEND == "fake":
+        return FakeAptosService(get_fake_chain())
+    from services.aptos_service import AptosService
+    return AptosService()
+
+
+class LazyClient(Generic[T]):
+    """
+    Đứng thay cho một client chain: client thật (và thư viện của nó) chỉ được tạo ở lần dùng đầu tiên,
+    sau đó mọi lời gọi đi thẳng tới nó. Tạo lỗi (thiếu khóa ví...) thì ném lỗi cho người gọi
+    và lần sau thử tạo lại, nên node không mint không cần cấu hình chain.
+    Code async gọi `ready()` (hoặc `resolve(client)`) trước khi dùng: client được tạo trong thread riêng
+    (import web3 / aptos_sdk mất cỡ một giây) thay vì chặn event loop.
+    """
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self._name = name
+        self._factory = factory
+        self._instance: Optional[T] = None
+        self._create_ms = 0.0
+        self._lock = asyncio.Lock()
+
+    def _created(self) -> Optional[T]:
+        return self._instance
+
+    async def ready(self) -> T:
+        """Client thật, tạo trong thread riêng nếu chưa có; nhiều lời gọi cùng lúc chỉ tạo một lần."""
+        if self._instance is None:
+            async with self._lock:
+                if self._instance is None:
+                    started = time.perf_counter()
+                    instance = await asyncio.to_thread(self._factory)
+                    self._set(instance, started)
+        return self._instance
+
+    def _resolve(self) -> T:
+        if self._instance is None:
+            started = time.perf_counter()
+            self._set(self._factory(), started)
+        return self._instance
+
+    def _set(self, instance: T, started: float) -> None:
+        self._instance = instance
+        self._create_ms = (time.perf_counter() - started) * 1000
+        log.info("[CHAIN] %s client created in %.0f ms", self._name, self._create_ms)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._resolve(), attr)
+
+
+async def resolve(client: Any) -> Any:
+    """Client thật phía sau `client`: LazyClient được tạo ngoài event loop, client thường giữ nguyên."""
+    return await client.ready() if isinstance(client, LazyClient) else client
+
+
+class ChainClients:
+    """
+    Các client chain dùng chung cho cả process (RewardQueue, NFTController, AptosController):
+    mỗi loại một instance, tạo ở lần dùng đầu tiên thay vì lúc khởi động.
+    """
+    def __init__(self):
+        self.blockchain = LazyClient("evm", init_blockchain_service)
+        self.aptos = LazyClient("aptos", init_aptos_service)
+
+    def stats(self) -> Dict[str, float]:
+        result: Dict[str, float] = {}
+        for client in (self.blockchain, self.aptos):
+            result[f"{client._name}_created"] = int(client._created() is not None)
+            result[f"{client._name}_create_ms"] = round(client._create_ms, 1)
+        return result
+
+    def evm_stats(self) -> Dict[str, Any]:
+        service = self.blockchain._created()
+        return service.stats() if hasattr(service, "stats") else {}  # bản giả không có
+
+    def aptos_tx_stats(self) -> Dict[str, Any]:
+        service = self.aptos._created()
+        # bản giả (CHAIN_BACKEND=fake) không có pipeline
+        return service.pipeline.stats() if hasattr(service, "pipeline") else {}
+
+    async def close(self) -> None:
+        service = self.blockchain._created()
+        if hasattr(service, "close"):
+            await service.close()
+
+
+_clients: Optional[ChainClients] = None
+
+
+def get_chain_clients() -> ChainClients:
+    """Registry client chain cho cả process."""
+    global _clients
+    if _clients is None:
+        _clients = ChainClients()
+    return _clients
@@ -1,3 +1,6 @@
 GAME_TIMEOUT_IN_SECOND = 10
 NEXT_QUESTION_DELAY = 3
-SEND_ONLY_REAMIN_TIME_IN_SECONDS = 1
\ No newline at end of file
+SEND_ONLY_REAMIN_TIME_IN_SECONDS = 1
+WS_SEND_TIMEOUT_SECONDS = 5
+WS_OUTBOX_MAX_FRAMES = 256
+WS_OUTBOX_MAX_LAG_SECONDS = 10
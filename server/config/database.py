@@ -2,15 +2,24 @@ from supabase import AsyncClient, acreate_client, create_client, Client
 from dotenv import load_dotenv
 import os
 
+from config.fake_supabase import FakeClient, get_fake_client
+
 # Load environment variables from .env file
 load_dotenv()
 
+# "supabase" (mặc định) hoặc "fake": dữ liệu nằm trong bộ nhớ của process (config/fake_supabase.py),
+# dùng để benchmark theo số round trip / độ trễ mà không cần project Supabase thật
+SUPABASE_BACKEND = os.getenv("SUPABASE_BACKEND") or "supabase"
+
 
 def init_supabase() -> Client:
     """
     Initialize and return a Supabase client.
     Raises an exception if required environment variables are missing.
     """
+    if SUPABASE_BACKEND == "fake":
+        return FakeClient(get_fake_client())
+
     supabase_url = os.getenv("SUPABASE_URL")
     supabase_key = os.getenv("SUPABASE_KEY")
 
@@ -24,6 +33,9 @@ def init_supabase() -> Client:
         raise Exception(f"Failed to initialize Supabase client: {str(e)}")
 
 async def init_async_supabase() -> AsyncClient:
+    if SUPABASE_BACKEND == "fake":
+        return get_fake_client()
+
     supabase_url = os.getenv("SUPABASE_URL")
     supabase_key = os.getenv("SUPABASE_KEY")
 
@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import itertools
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Thời gian chờ receipt / xác nhận giả lập cho mỗi transaction
+FAKE_CHAIN_LATENCY_MS = float(os.getenv("FAKE_CHAIN_LATENCY_MS") or 200)
+# Tỉ lệ transaction thất bại tạm thời (RPC timeout, nonce conflict...) để thử đường retry
+FAKE_CHAIN_FAILURE_RATE = float(os.getenv("FAKE_CHAIN_FAILURE_RATE") or 0)
+
+
+class FakeChain:
+    """
+    Sổ cái trong bộ nhớ dùng chung cho các service chain giả (CHAIN_BACKEND=local), có cùng các ràng buộc
+    mà code gọi tới dựa vào: mỗi phòng chỉ mint được một NFT ("NFT already exists"), collection Aptos
+    tạo lần hai thì lỗi ECOLLECTION_ALREADY_EXISTS. Dùng lock để gọi được cả từ thread khác.
+    """
+    def __init__(self, latency_ms: float = FAKE_CHAIN_LATENCY_MS, failure_rate: float = FAKE_CHAIN_FAILURE_RATE):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.lock = threading.Lock()
+        self.block_number = itertools.count(1)
+        # room_id bytes16 -> (owner, metadata_uri)
+        self.room_nfts: Dict[bytes, Tuple[str, str]] = {}
+        self.collections: set = set()
+        # (collection, token_name) -> recipient được offer
+        self.tokens: Dict[Tuple[str, str], Optional[str]] = {}
+        self.transactions = 0
+
+    def transaction(self, label: str) -> Tuple[str, int]:
+        """Ghi nhận một transaction, trả về (hash, block); lỗi ngẫu nhiên theo `failure_rate`."""
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise ConnectionError(f"fake chain: transient failure sending {label}")
+        with self.lock:
+            self.transactions += 1
+            block = next(self.block_number)
+        tx_hash = "0x" + hashlib.sha256(f"{label}:{block}:{time.time_ns()}".encode()).hexdigest()
+        return tx_hash, block
+
+    def delay(self) -> float:
+        return self.latency_ms / 1000
+
+
+class FakeBlockchainService:
+    """
+    Thay cho services.async_blockchain_service.AsyncBlockchainService: cùng các method async và dạng kết quả,
+    mỗi transaction chờ `latency_ms` như chờ receipt.
+    """
+    ADDRESS = "0x" + "f" * 40
+
+    def __init__(self, chain: FakeChain):
+        self.chain = chain
+
+    def _convert_uuid_to_bytes16(self, room_id: str) -> bytes:
+        uuid_str = room_id.replace('-', '')
+        if len(uuid_str) != 32:
+            raise ValueError(f"Invalid UUID format: {room_id}.")
+        return bytes.fromhex(uuid_str)
+
+    async def _receipt(self, label: str) -> Dict[str, Any]:
+        tx_hash, block = self.chain.transaction(label)
+        await asyncio.sleep(self.chain.delay())
+        return {'transactionHash': tx_hash, 'blockNumber': block, 'gasUsed': 21000, 'status': 1}
+
+    async def mint_nft(self, room_id: str, metadata_uri: str) -> dict:
+        room_id_bytes = self._convert_uuid_to_bytes16(room_id)
+        with self.chain.lock:
+            if room_id_bytes in self.chain.room_nfts:
+                raise Exception("execution reverted: NFT already exists for this room")
+        receipt = await self._receipt(f"mintGameNFT:{room_id}")
+        with self.chain.lock:
+            # Hai mint cùng phòng chạy song song: cái vào block sau bị revert như trên chain thật
+            if room_id_bytes in self.chain.room_nfts:
+                raise Exception("execution reverted: NFT already exists for this room")
+            self.chain.room_nfts[room_id_bytes] = (self.ADDRESS, metadata_uri)
+        return {**receipt, 'room_id': room_id, 'metadata_uri': metadata_uri}
+
+    async def submit_game_result(self, room_id: str, winner_address: str, score: int, zk_proof: str) -> dict:
+        room_id_bytes = self._convert_uuid_to_bytes16(room_id)
+        with self.chain.lock:
+            nft = self.chain.room_nfts.get(room_id_bytes)
+        if nft is None:
+            raise Exception("execution reverted: NFT not minted for this room")
+        receipt = await self._receipt(f"submitGameResult:{room_id}")
+        with self.chain.lock:
+            self.chain.room_nfts[room_id_bytes] = (winner_address, nft[1])
+        return {**receipt, 'room_id': room_id, 'winner_address': winner_address, 'score': score}
+
+    async def get_nft_by_room(self, room_id: str):
+        with self.chain.lock:
+            owner, metadata_uri = self.chain.room_nfts.get(self._convert_uuid_to_bytes16(room_id), ("0x" + "0" * 40, ""))
+        return [owner, metadata_uri]
+
+
+class FakeAptosService:
+    """Thay cho services.aptos_service.AptosService: cùng các method async và dạng kết quả, không gọi mạng."""
+    def __init__(self, chain: FakeChain):
+        self.chain = chain
+        self.network = "local"
+        self.players: Dict[str, Dict[str, int]] = {}
+
+    def get_explorer_url(self, txn_hash: str) -> str:
+        return f"https://explorer.aptoslabs.com/txn/{txn_hash}?network={self.network}"
+
+    async def warm_collections(self, collection_names) -> None:
+        pass  # sổ cái giả biết ngay collection nào đã có
+
+    async def _submit(self, label: str) -> str:
+        tx_hash, _ = self.chain.transaction(label)
+        await asyncio.sleep(self.chain.delay())
+        return tx_hash
+
+    async def get_account_balance(self, address: str) -> Dict[str, Any]:
+        return {"success": True, "balance": 0, "balance_apt": 0, "address": address}
+
+    async def get_player_data(self, address: str) -> Dict[str, Any]:
+        data = self.players.get(address)
+        if data is None:
+            return {"success": True, "score": 0, "games_played": 0, "address": address, "initialized": False}
+        return {"success": True, **data, "address": address, "initialized": True}
+
+    async def call_init_player(self, player_private_key: str) -> Dict[str, Any]:
+        try:
+            txn_hash = await self._submit("init_player")
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        return {"success": True, "hash": txn_hash, "explorer_url": self.get_explorer_url(txn_hash)}
+
+    async def mint_nft_to_player(
+        self,
+        recipient_address: str,
+        collection_name: str,
+        token_name: str,
+        token_description: str,
+        token_uri: str,
+        exact_name: bool = False,
+        on_submitted: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    ) -> Dict[str, Any]:
+        try:
+            token_name_with_suffix = token_name if exact_name else f"{token_name} #{random.randint(1000, 9999)}"
+            key = (collection_name, token_name_with_suffix)
+            if collection_name not in self.chain.collections:
+                await self._submit(f"create_collection_script:{collection_name}")
+                self.chain.collections.add(collection_name)
+            # Token đã offer rồi thì không có gì để offer nữa; đã tạo mà chưa offer thì chỉ còn offer
+            if self.chain.tokens.get(key) is not None:
+                raise Exception("Move abort in 0x3::token: ETOKEN_DATA_ALREADY_EXISTS")
+            if key not in self.chain.tokens:
+                await self._submit(f"create_token_script:{token_name_with_suffix}")
+                self.chain.tokens[key] = None
+            offer_hash = await self._submit(f"offer_script:{token_name_with_suffix}")
+            if on_submitted:
+                await on_submitted({
+                    "transaction_hash": offer_hash, "expiration": int(time.time()) + 60, "creator": "0xfake",
+                    "collection_name": collection_name, "token_name": token_name_with_suffix,
+                    "recipient_address": recipient_address,
+                })
+            self.chain.tokens[key] = recipient_address
+            return {
+                "success": True,
+                "message": f"Successfully minted '{token_name_with_suffix}' and offered to {recipient_address}.",
+                "transaction_hash": offer_hash,
+                "explorer_url": self.get_explorer_url(offer_hash)
+            }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def creator_for(self, token_name: str) -> str:
+        return "0xfake"
+
+    async def find_mint(self, submitted: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if self.chain.tokens.get((submitted["collection_name"], submitted["token_name"])) != submitted["recipient_address"]:
+            return None
+        return {
+            "success": True,
+            "message": f"Successfully minted '{submitted['token_name']}' and offered to {submitted['recipient_address']}.",
+            "transaction_hash": submitted["transaction_hash"],
+            "explorer_url": self.get_explorer_url(submitted["transaction_hash"])
+        }
+
+    async def batch_mint_to_players(
+        self,
+        collection_name: str,
+        items: List[Dict[str, Any]],
+        on_submitted: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    ) -> Dict[str, Any]:
+        try:
+            token_names = [
+                item["token_name"] if item.get("exact_name") else f"{item['token_name']} #{random.randint(1000, 9999)}"
+                for item in items
+            ]
+            if any((collection_name, name) in self.chain.tokens for name in token_names):
+                return {"success": False, "error": "Move abort in 0x3::token: ETOKEN_DATA_ALREADY_EXISTS", "aborted": True}
+            if collection_name not in self.chain.collections:
+                await self._submit(f"create_collection_script:{collection_name}")
+                self.chain.collections.add(collection_name)
+            batch_hash = await self._submit(f"batch_mint_and_offer:{len(items)}")
+            if on_submitted:
+                await on_submitted({
+                    "transaction_hash": batch_hash, "expiration": int(time.time()) + 60, "creator": "0xfake",
+                    "token_names": token_names,
+                })
+            for item, name in zip(items, token_names):
+                self.chain.tokens[(collection_name, name)] = item["recipient_address"]
+            return {
+                "success": True,
+                "message": f"Successfully minted {len(items)} tokens in one transaction.",
+                "token_names": token_names,
+                "transaction_hash": batch_hash,
+                "explorer_url": self.get_explorer_url(batch_hash)
+            }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+
+_chain: Optional[FakeChain] = None
+
+
+def get_fake_chain() -> FakeChain:
+    """Một sổ cái giả cho cả process, để các controller/service cùng thấy một trạng thái chain."""
+    global _chain
+    if _chain is None:
+        _chain = FakeChain()
+    return _chain
@@ -0,0 +1,464 @@
+import asyncio
+import csv
+import json
+import os
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from postgrest.base_request_builder import APIResponse, SingleAPIResponse
+from postgrest.exceptions import APIError
+
+from enums.question_difficulty import QUESTION_DIFFICULTY
+
+# Độ trễ giả lập cho mỗi lần gọi (round trip tới Supabase), cộng thêm jitter ngẫu nhiên trong [0, JITTER]
+FAKE_SUPABASE_LATENCY_MS = float(os.getenv("FAKE_SUPABASE_LATENCY_MS") or 0)
+FAKE_SUPABASE_JITTER_MS = float(os.getenv("FAKE_SUPABASE_JITTER_MS") or 0)
+# Số câu hỏi mỗi độ khó được tạo sẵn để game chạy được ngay
+FAKE_SUPABASE_QUESTIONS = int(os.getenv("FAKE_SUPABASE_QUESTIONS") or 300)
+
+# (bảng cha, bảng con) -> (cột của bảng cha, cột của bảng con, nhiều dòng hay một dòng)
+RELATIONS = {
+    ("challenge_rooms", "room_players"): ("id", "room_id", True),
+    ("challenge_rooms", "answers"): ("id", "room_id", True),
+    ("user_stats", "users"): ("wallet_id", "wallet_id", False),
+}
+
+# Khóa mặc định của upsert khi không truyền on_conflict
+PRIMARY_KEYS = {
+    "room_players": ("room_id", "wallet_id"),
+    "user_stats": ("wallet_id",),
+    "users": ("wallet_id",),
+    "room_leases": ("room_id",),
+    "reward_jobs": ("room_id",),
+}
+
+
+class PostgrestError(Exception):
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+class Tables:
+    """
+    Các bảng của project Supabase giả, nằm trong bộ nhớ: mỗi bảng là một list các dòng (dict), bảng chưa có thì rỗng.
+    Filter dùng đúng cú pháp của PostgREST (`("room_id", "eq.abc")`, `("id", "in.(a,b)")`) để dùng chung
+    cho client giả trong process và PostgREST giả chạy qua HTTP (benchmarks.postgrest_standin).
+    """
+    def __init__(self):
+        self.rows: Dict[str, List[dict]] = defaultdict(list)
+
+    def select(self, table: str, columns: str, filters: List[Tuple[str, str]], order: Optional[str]) -> List[dict]:
+        rows = [row for row in self.rows[table] if matches(row, filters)]
+        if order:
+            rows = sort_rows(rows, order)
+        return [self._project(table, row, columns) for row in rows]
+
+    def insert(self, table: str, rows: List[dict], on_conflict: Optional[str], upsert: bool, ignore_duplicates: bool) -> List[dict]:
+        keys = tuple(on_conflict.split(",")) if on_conflict else PRIMARY_KEYS.get(table, ("id",))
+        index = {self._key(row, keys): row for row in self.rows[table]}
+        written = []
+        for row in rows:
+            row = dict(row)
+            if "id" not in row and keys == ("id",):
+                row["id"] = str(uuid.uuid4())
+            row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+
+            existing = index.get(self._key(row, keys))
+            if existing is None:
+                self.rows[table].append(row)
+                index[self._key(row, keys)] = row
+                written.append(row)
+            elif not upsert:
+                raise PostgrestError(409, "23505", f"duplicate key value violates unique constraint on {table} {keys}")
+            elif not ignore_duplicates:
+                existing.update(row)
+                written.append(existing)
+        return written
+
+    def update(self, table: str, values: dict, filters: List[Tuple[str, str]]) -> List[dict]:
+        updated = [row for row in self.rows[table] if matches(row, filters)]
+        for row in updated:
+            row.update(values)
+        return updated
+
+    def delete(self, table: str, filters: List[Tuple[str, str]]) -> List[dict]:
+        deleted = [row for row in self.rows[table] if matches(row, filters)]
+        if deleted:
+            self.rows[table] = [row for row in self.rows[table] if not matches(row, filters)]
+        return deleted
+
+    def seed_questions(self, per_difficulty: int) -> None:
+        for difficulty in QUESTION_DIFFICULTY:
+            for i in range(per_difficulty):
+                options = [f"{difficulty.value}-{i}-{o}" for o in "ABCD"]
+                self.rows["questions"].append({
+                    "id": str(uuid.uuid4()),
+                    "content": f"Câu hỏi {difficulty.value} #{i}",
+                    "difficulty": difficulty.value,
+                    "options": options,
+                    "correct_answer": random.choice(options),
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "updated_at": None,
+                })
+
+    # ==================================
+    # Helpers
+    # ==================================
+
+    def _project(self, table: str, row: dict, columns: str) -> dict:
+        result = {}
+        for column in _split_columns(columns or "*"):
+            if "(" in column:
+                child, child_columns = column[:-1].split("(", 1)
+                result[child] = self._embed(table, child, row, child_columns)
+            elif column == "*":
+                result.update(row)
+            else:
+                result[column] = row.get(column)
+        return result
+
+    def _embed(self, table: str, child: str, row: dict, columns: str) -> Any:
+        relation = RELATIONS.get((table, child))
+        if relation is None:
+            raise PostgrestError(400, "PGRST200", f"Could not find a relationship between '{table}' and '{child}'")
+        parent_column, child_column, many = relation
+        children = [
+            self._project(child, c, columns) for c in self.rows[child]
+            if str(c.get(child_column)) == str(row.get(parent_column))
+        ]
+        return children if many else (children[0] if children else None)
+
+    @staticmethod
+    def _key(row: dict, keys: Tuple[str, ...]) -> tuple:
+        return tuple(str(row.get(k)) for k in keys)
+
+
+# ==================================
+# Filter / order theo cú pháp query string của PostgREST
+# ==================================
+
+def matches(row: dict, filters: List[Tuple[str, str]]) -> bool:
+    for column, expression in filters:
+        negate = expression.startswith("not.")
+        if negate:
+            expression = expression[4:]
+        op, _, raw = expression.partition(".")
+        if op != "in" and len(raw) >= 2 and raw[0] == raw[-1] == '"':
+            raw = raw[1:-1]  # giá trị có ký tự đặc biệt (timestamp có ':') được client đặt trong dấu nháy
+        value = row.get(column)
+
+        if op == "is":
+            ok = value is None if raw.lower() == "null" else value is (raw.lower() == "true")
+        elif op == "in":
+            values = next(csv.reader([raw[1:-1]]), [])
+            ok = value is not None and str(value) in values
+        elif value is None:
+            ok = False
+        else:
+            left, right = _compare_value(value, raw)
+            if op == "eq":
+                ok = left == right
+            elif op == "neq":
+                ok = left != right
+            elif op == "gt":
+                ok = left > right
+            elif op == "gte":
+                ok = left >= right
+            elif op == "lt":
+                ok = left < right
+            elif op == "lte":
+                ok = left <= right
+            else:
+                raise PostgrestError(400, "PGRST100", f"Unsupported operator '{op}'")
+        if ok == negate:
+            return False
+    return True
+
+
+def sort_rows(rows: List[dict], order: str) -> List[dict]:
+    # Sắp xếp ổn định: áp dụng từ cột cuối lên cột đầu
+    for term in reversed(order.split(",")):
+        column, *modifiers = term.split(".")
+        desc = "desc" in modifiers
+        nulls_first = "nullsfirst" in modifiers or ("nullslast" not in modifiers and desc)
+        present = [r for r in rows if r.get(column) is not None]
+        missing = [r for r in rows if r.get(column) is None]
+        present.sort(key=lambda r: _compare_value(r[column], "")[0], reverse=desc)
+        rows = missing + present if nulls_first else present + missing
+    return rows
+
+
+def _split_columns(columns: str) -> List[str]:
+    parts, depth, current = [], 0, ""
+    for ch in columns:
+        if ch == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+            continue
+        depth += ch == "("
+        depth -= ch == ")"
+        current += ch
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def _compare_value(value: Any, raw: str) -> Tuple[Any, Any]:
+    if isinstance(value, bool):
+        return value, raw.lower() == "true"
+    if isinstance(value, (int, float)):
+        try:
+            return value, float(raw)
+        except ValueError:
+            return str(value), raw
+    return str(value), raw
+
+
+def _format(value: Any) -> str:
+    # Giống postgrest-py: giá trị filter được đưa vào query string bằng str()
+    text = str(value)
+    return f'"{text}"' if any(ch in text for ch in ",:()") else text
+
+
+# ==================================
+# Client
+# ==================================
+
+class FakeQuery:
+    """
+    Query builder có cùng các method mà repositories dùng với supabase-py
+    (select/insert/upsert/update/delete, eq/neq/gt/gte/lt/lte/in_/is_, order/limit/range/single).
+    Dữ liệu đi vào và đi ra đều được copy qua JSON như khi gửi qua HTTP.
+    """
+    def __init__(self, client: "FakeAsyncClient", table: str):
+        self.client = client
+        self.table = table
+        self.op = "select"
+        self.columns = "*"
+        self.body: Any = None
+        self.filters: List[Tuple[str, str]] = []
+        self.orders: List[str] = []
+        self.start = 0
+        self.limit_count: Optional[int] = None
+        self.count_method: Optional[str] = None
+        self.on_conflict: Optional[str] = None
+        self.ignore_duplicates = False
+        self.single_row: Optional[str] = None
+
+    # Thao tác
+    def select(self, *columns: str, count: Optional[str] = None) -> "FakeQuery":
+        self.columns = ",".join(columns) or "*"
+        self.count_method = count
+        return self
+
+    def insert(self, rows: Any, count: Optional[str] = None, **kwargs) -> "FakeQuery":
+        self.op, self.body, self.count_method = "insert", rows, count
+        return self
+
+    def upsert(self, rows: Any, on_conflict: str = "", ignore_duplicates: bool = False, count: Optional[str] = None, **kwargs) -> "FakeQuery":
+        self.op, self.body, self.count_method = "upsert", rows, count
+        self.on_conflict, self.ignore_duplicates = on_conflict or None, ignore_duplicates
+        return self
+
+    def update(self, values: dict, count: Optional[str] = None, **kwargs) -> "FakeQuery":
+        self.op, self.body, self.count_method = "update", values, count
+        return self
+
+    def delete(self, count: Optional[str] = None, **kwargs) -> "FakeQuery":
+        self.op, self.count_method = "delete", count
+        return self
+
+    # Filter
+    def filter(self, column: str, operator: str, criteria: str) -> "FakeQuery":
+        self.filters.append((column, f"{operator}.{criteria}"))
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "eq", _format(value))
+
+    def neq(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "neq", _format(value))
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "gt", _format(value))
+
+    def gte(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "gte", _format(value))
+
+    def lt(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "lt", _format(value))
+
+    def lte(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "lte", _format(value))
+
+    def in_(self, column: str, values) -> "FakeQuery":
+        return self.filter(column, "in", f"({','.join(_format(v) for v in values)})")
+
+    def is_(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "is", "null" if value is None else str(value))
+
+    # Sắp xếp / phân trang
+    def order(self, column: str, *, desc: bool = False, nullsfirst: Optional[bool] = None, **kwargs) -> "FakeQuery":
+        term = f"{column}.{'desc' if desc else 'asc'}"
+        if nullsfirst is not None:
+            term += ".nullsfirst" if nullsfirst else ".nullslast"
+        self.orders.append(term)
+        return self
+
+    def limit(self, size: int, **kwargs) -> "FakeQuery":
+        self.limit_count = size
+        return self
+
+    def range(self, start: int, end: int, **kwargs) -> "FakeQuery":
+        self.start, self.limit_count = start, end - start + 1
+        return self
+
+    def single(self) -> "FakeQuery":
+        self.single_row = "single"
+        return self
+
+    def maybe_single(self) -> "FakeQuery":
+        self.single_row = "maybe_single"
+        return self
+
+    async def execute(self):
+        await self.client.wait_latency()
+        return self.run()
+
+    def run(self):
+        self.client.calls[(self.op, self.table)] += 1
+        tables = self.client.tables
+        try:
+            total = None
+            if self.op == "select":
+                rows = tables.select(self.table, self.columns, self.filters, ",".join(self.orders) or None)
+                total = len(rows) if self.count_method else None
+                rows = rows[self.start:]
+                if self.limit_count is not None:
+                    rows = rows[:self.limit_count]
+            elif self.op in ("insert", "upsert"):
+                body = json.loads(json.dumps(self.body))
+                rows = tables.insert(
+                    self.table, body if isinstance(body, list) else [body],
+                    on_conflict=self.on_conflict, upsert=self.op == "upsert", ignore_duplicates=self.ignore_duplicates,
+                )
+            elif self.op == "update":
+                rows = tables.update(self.table, json.loads(json.dumps(self.body)), self.filters)
+            else:
+                rows = tables.delete(self.table, self.filters)
+
+            rows = json.loads(json.dumps(rows))
+            if self.single_row:
+                if len(rows) == 1:
+                    return SingleAPIResponse(data=rows[0], count=total)
+                if self.single_row == "maybe_single" and not rows:
+                    return None
+                raise PostgrestError(406, "PGRST116", f"JSON object requested, multiple (or no) rows returned ({len(rows)})")
+            return APIResponse(data=rows, count=total)
+        except PostgrestError as e:
+            self.client.errors[(self.op, self.table)] += 1
+            raise APIError({"code": e.code, "message": e.message, "details": None, "hint": None})
+
+
+class FakeRpc:
+    def __init__(self, client: "FakeAsyncClient", name: str, params: dict):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    async def execute(self):
+        await self.client.wait_latency()
+        return self.run()
+
+    def run(self):
+        self.client.calls[("rpc", self.name)] += 1
+        handler = self.client.rpcs.get(self.name)
+        if handler is None:
+            self.client.errors[("rpc", self.name)] += 1
+            # Giống PostgREST khi DB chưa có hàm: bên gọi tự chuyển sang cách dự phòng
+            raise APIError({"code": "PGRST202", "message": f"Could not find the function public.{self.name}", "details": None, "hint": None})
+        return APIResponse(data=json.loads(json.dumps(handler(self.client.tables, self.params))), count=None)
+
+
+class FakeAsyncClient:
+    """
+    Thay cho supabase AsyncClient khi SUPABASE_BACKEND=fake: cùng API `table(...)...execute()` / `rpc(...)`
+    nhưng dữ liệu nằm trong bộ nhớ của process.
+    - `latency_ms` / `jitter_ms`: độ trễ chèn vào mỗi lần execute, để đo hiệu năng theo số round trip.
+    - `calls` / `errors`: Counter theo (thao tác, bảng), ví dụ `("upsert", "room_players")`.
+    - `rpcs`: đăng ký hàm RPC `handler(tables, params)`; hàm chưa đăng ký trả lỗi PGRST202.
+    """
+    def __init__(self, tables: Optional[Tables] = None, latency_ms: float = 0, jitter_ms: float = 0):
+        self.tables = tables or Tables()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rpcs: Dict[str, Callable[[Tables, dict], Any]] = {}
+        self.calls: Counter = Counter()
+        self.errors: Counter = Counter()
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[dict] = None) -> FakeRpc:
+        return FakeRpc(self, name, params or {})
+
+    @property
+    def round_trips(self) -> int:
+        return sum(self.calls.values())
+
+    async def wait_latency(self) -> None:
+        delay = self.delay()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def delay(self) -> float:
+        return (self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000
+
+
+class FakeSyncQuery(FakeQuery):
+    def execute(self):
+        # Client đồng bộ chặn thread hiện tại trong lúc chờ, giống supabase Client thật
+        time.sleep(self.client.delay())
+        return self.run()
+
+
+class FakeSyncRpc(FakeRpc):
+    def execute(self):
+        time.sleep(self.client.delay())
+        return self.run()
+
+
+class FakeClient:
+    """Bản đồng bộ của FakeAsyncClient (cho `config.database.supabase`), dùng chung dữ liệu và bộ đếm."""
+    def __init__(self, client: FakeAsyncClient):
+        self.client = client
+
+    def table(self, name: str) -> FakeSyncQuery:
+        return FakeSyncQuery(self.client, name)
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[dict] = None) -> FakeSyncRpc:
+        return FakeSyncRpc(self.client, name, params or {})
+
+
+_fake_client: Optional[FakeAsyncClient] = None
+
+
+def get_fake_client() -> FakeAsyncClient:
+    """Một project giả cho cả process: client async và sync cùng thấy một dữ liệu."""
+    global _fake_client
+    if _fake_client is None:
+        tables = Tables()
+        tables.seed_questions(FAKE_SUPABASE_QUESTIONS)
+        _fake_client = FakeAsyncClient(tables, FAKE_SUPABASE_LATENCY_MS, FAKE_SUPABASE_JITTER_MS)
+    return _fake_client
@@ -0,0 +1,171 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from typing import Any, Dict, Optional
+
+# Các nhóm log, mỗi nhóm có level riêng: LOG_LEVEL_WS=DEBUG, LOG_LEVEL_GAME=WARNING...
+WS = "ws"
+DB = "db"
+NFT = "nft"
+GAME = "game"
+CATEGORIES = (WS, DB, NFT, GAME)
+
+LOG_LEVEL = os.getenv("LOG_LEVEL") or "INFO"
+# "text" (mặc định) hoặc "json" (mỗi dòng một object, cho log collector)
+LOG_FORMAT = os.getenv("LOG_FORMAT") or "text"
+# Log dưới WARNING của cùng một câu log (cùng template) chỉ được ghi 1 lần mỗi N lần; 1 = ghi hết.
+# Từng nhóm có thể đặt riêng: LOG_SAMPLE_EVERY_WS=100
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY") or 1)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE") or 10000)
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS") or 300)
+
+# Khóa không bao giờ được ghi ra log (đáp án, khóa ví, proof...)
+REDACTED_KEYS = {"correct_answer", "correctAnswer", "private_key", "privateKey", "proof", "signature", "token", "password"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional["_QueueHandler"] = None
+
+
+def get_logger(category: str) -> logging.Logger:
+    return logging.getLogger(f"app.{category}")
+
+
+def redact(value: Any, limit: int = LOG_PAYLOAD_MAX_CHARS) -> str:
+    """Payload (dict/list) -> chuỗi đã che các khóa nhạy cảm và cắt còn `limit` ký tự."""
+    def scrub(obj: Any) -> Any:
+        if isinstance(obj, dict):
+            return {k: "***" if k in REDACTED_KEYS else scrub(v) for k, v in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [scrub(v) for v in obj]
+        return obj
+
+    text = json.dumps(scrub(value), default=str, ensure_ascii=False)
+    return text if len(text) <= limit else f"{text[:limit]}...(+{len(text) - limit} chars)"
+
+
+class _SamplingFilter(logging.Filter):
+    """
+    Chỉ cho qua 1/N bản ghi dưới WARNING của mỗi template, N theo LOG_SAMPLE_EVERY_<CATEGORY> hoặc LOG_SAMPLE_EVERY.
+    Bản ghi được cho qua mang `sampled=N` để người đọc log biết mỗi dòng đại diện cho N sự kiện.
+    """
+    def __init__(self):
+        super().__init__()
+        self.every = {
+            f"app.{category}": int(os.getenv(f"LOG_SAMPLE_EVERY_{category.upper()}") or LOG_SAMPLE_EVERY)
+            for category in CATEGORIES
+        }
+        self.seen: Dict[tuple, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        every = self.every.get(record.name, LOG_SAMPLE_EVERY)
+        if every <= 1 or record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.msg)
+        n = self.seen.get(key, 0)
+        self.seen[key] = n + 1
+        if n % every:
+            return False
+        record.sampled = every
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Chỉ đưa bản ghi vào hàng đợi, việc format và ghi ra stdout do thread của QueueListener làm.
+    - Không format ở thread gọi (khác QueueHandler chuẩn): args được giữ nguyên, trừ payload dict/list
+      được redact ngay để không bị thay đổi trước khi thread ghi log kịp format.
+    - Hàng đợi đầy thì bỏ bản ghi thay vì chặn event loop; số bản ghi bị bỏ nằm ở `dropped`.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args and isinstance(record.args, tuple):
+            record.args = tuple(redact(a) if isinstance(a, (dict, list)) else a for a in record.args)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        category = record.name.rsplit(".", 1)[-1]
+        line = f"{self.formatTime(record)} {record.levelname:<7} [{category}] {record.getMessage()}"
+        if getattr(record, "sampled", None):
+            line += f" (1/{record.sampled})"
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+    def formatTime(self, record, datefmt=None) -> str:
+        return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z"
+
+
+class _JsonFormatter(_TextFormatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "category": record.name.rsplit(".", 1)[-1],
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "sampled", None):
+            entry["sampled"] = record.sampled
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(stream=None) -> None:
+    """
+    Cấu hình logger `app.<category>`: level theo LOG_LEVEL / LOG_LEVEL_<CATEGORY>, lấy mẫu theo LOG_SAMPLE_EVERY(_<CATEGORY>),
+    ghi ra `stream` (mặc định stdout) qua hàng đợi và một thread riêng, không chặn event loop.
+    Gọi lại nhiều lần thì chỉ lần đầu có tác dụng.
+    """
+    global _listener, _handler
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(_JsonFormatter() if LOG_FORMAT == "json" else _TextFormatter())
+
+    _handler = _QueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    _handler.addFilter(_SamplingFilter())
+
+    root = logging.getLogger("app")
+    root.setLevel(LOG_LEVEL.upper())
+    root.addHandler(_handler)
+    root.propagate = False
+    for category in CATEGORIES:
+        level = os.getenv(f"LOG_LEVEL_{category.upper()}")
+        if level:
+            get_logger(category).setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(_handler.queue, output)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Ghi nốt các bản ghi còn trong hàng đợi rồi dừng thread ghi log."""
+    global _listener, _handler
+    if _listener is None:
+        return
+    _listener.stop()
+    logging.getLogger("app").removeHandler(_handler)
+    _listener, _handler = None, None
+
+
+def dropped_records() -> int:
+    return _handler.dropped if _handler else 0
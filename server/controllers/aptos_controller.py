@@ -1,14 +1,19 @@
 from fastapi import HTTPException, Body
-from services.aptos_service import AptosService
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any
+
+from config.chain import resolve
+
+if TYPE_CHECKING:  # aptos_sdk chỉ được import khi client được tạo (config.chain)
+    from services.aptos_service import AptosService
 from fastapi import HTTPException, Body 
 class AptosController:
-    def __init__(self):
-        self.aptos_service = AptosService()
+    def __init__(self, aptos_service: "AptosService"):
+        self.aptos_service = aptos_service
 
     # --- THÊM LẠI ASYNC/AWAIT ---
     async def get_account_balance(self, address: str) -> Dict[str, Any]:
         try:
+            await resolve(self.aptos_service)
             result = await self.aptos_service.get_account_balance(address)
             print("[DEBUG] get_account_balance result:", result)
             if result["success"]:
@@ -22,6 +27,7 @@ class AptosController:
 
     async def get_player_data(self, address: str) -> Dict[str, Any]:
         try:
+            await resolve(self.aptos_service)
             result = await self.aptos_service.get_player_data(address)
             if result["success"]:
                 return {"success": True, "data": result}
@@ -32,6 +38,7 @@ class AptosController:
 
     async def init_player(self, player_key: str) -> Dict[str, Any]:
         try:
+            await resolve(self.aptos_service)
             result = await self.aptos_service.call_init_player(player_key)
             if result["success"]:
                 return {"success": True, "data": result}
@@ -42,6 +49,7 @@ class AptosController:
         
     async def mint_nft(self, body: dict = Body(...)) -> Dict[str, Any]:
         try:
+            await resolve(self.aptos_service)
             # Lấy các tham số cần thiết từ body của request
             recipient_address = body.get("recipient_address")
             collection_name = body.get("collection_name")
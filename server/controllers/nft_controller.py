@@ -1,17 +1,23 @@
 from fastapi import HTTPException
-from services.nft_service import BlockchainService
+from typing import TYPE_CHECKING
+
+from config.chain import resolve
+
+if TYPE_CHECKING:  # web3 chỉ được import khi client được tạo (config.chain)
+    from services.async_blockchain_service import AsyncBlockchainService
 
 class NFTController:
-    def __init__(self):
-        self.nft_service = BlockchainService()
+    def __init__(self, nft_service: "AsyncBlockchainService"):
+        self.nft_service = nft_service
 
     async def award_nft(self, action: str, room_id: str, metadata_uri: str = None, winner_address: str = None):
         try:
+            await resolve(self.nft_service)
             if action == "mint":
                 # Nếu không truyền metadata_uri thì tự sinh ra
                 if not metadata_uri:
                     metadata_uri = f"https://challengewave.com/nft/{room_id}"
-                return self.nft_service.mint_nft(room_id, metadata_uri)
+                return await self.nft_service.mint_nft(room_id, metadata_uri)
             elif action == "transfer":
                 if not winner_address:
                     raise HTTPException(status_code=400, detail="winner_address is required for transfer action")
@@ -23,7 +29,7 @@ class NFTController:
                 # Mint NFT trước (nếu chưa có), sau đó transfer cho winner
                 try:
                     # Thử mint NFT (có thể đã tồn tại)
-                    mint_result = self.nft_service.mint_nft(room_id, metadata_uri)
+                    mint_result = await self.nft_service.mint_nft(room_id, metadata_uri)
                 except Exception as mint_error:
                     # Nếu NFT đã tồn tại, bỏ qua lỗi và tiếp tục
                     if "NFT already exists" in str(mint_error):
@@ -34,7 +40,7 @@ class NFTController:
                 # Transfer NFT cho winner bằng cách submit game result
                 score = 100
                 zk_proof = "0x" + "00"*32
-                transfer_result = self.nft_service.submit_game_result(room_id, winner_address, score, zk_proof)
+                transfer_result = await self.nft_service.submit_game_result(room_id, winner_address, score, zk_proof)
                 
                 return {
                     "message": "NFT minted and transferred successfully",
@@ -49,6 +55,7 @@ class NFTController:
     async def get_nft_info(self, room_id: str):
         """Get NFT information by room ID"""
         try:
-            return self.nft_service.get_nft_by_room(room_id)
+            await resolve(self.nft_service)
+            return await self.nft_service.get_nft_by_room(room_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to get NFT info: {str(e)}") 
\ No newline at end of file
@@ -1,12 +1,16 @@
 from fastapi import HTTPException
 from enums.player_status import PLAYER_STATUS
+from services.cluster import Cluster
 from services.player_service import PlayerService
+from services.room_actor import RoomActors
 from services.websocket_manager import WebSocketManager
 
 class PlayerController:
-    def __init__(self, player_service: PlayerService, websocket_manager: WebSocketManager):
+    def __init__(self, player_service: PlayerService, websocket_manager: WebSocketManager, cluster: Cluster, actors: RoomActors):
         self.player_service = player_service
         self.websocket_manager = websocket_manager
+        self.cluster = cluster
+        cluster.register("player.status", actors.by_room(lambda payload: self._update_player_status(**payload)))
 
     async def get_players(self, room_id: str):
         players = await self.player_service.get_players_by_room(room_id)
@@ -20,6 +24,13 @@ class PlayerController:
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid status")
 
+        # Trạng thái người chơi thuộc về phòng nên được cập nhật ở worker sở hữu phòng
+        await self.cluster.call(room_id, "player.status", {
+            "room_id": room_id, "wallet_id": wallet_id, "status": status_enum.value
+        })
+
+    async def _update_player_status(self, room_id: str, wallet_id: str, status: str):
+        status_enum = PLAYER_STATUS(status)
         result = await self.player_service.update_player_status(room_id, wallet_id, status_enum)
         if not result or not result.get("success"):
             raise HTTPException(status_code=404, detail="Player not found")
@@ -8,8 +8,11 @@ from models.answer import Answer
 from models.update_settings import GameSettings
 from models.create_room_request import CreateRoomRequest
 from models.join_request import JoinRoomRequest
+from services.cluster import Cluster
+from services.metrics import with_origin
 from services.room_service import RoomService
 from services.player_service import PlayerService
+from services.room_actor import RoomActors
 from services.websocket_manager import WebSocketManager
 from services.game_service import GameService
 
@@ -19,12 +22,22 @@ class RoomController:
         room_service: RoomService,
         game_service: GameService,
         player_service: PlayerService,
-        websocket_manager: WebSocketManager
+        websocket_manager: WebSocketManager,
+        cluster: Cluster,
+        actors: RoomActors,
     ):
         self.room_service = room_service
         self.game_service = game_service
         self.player_service = player_service
         self.websocket_manager = websocket_manager
+        self.cluster = cluster
+        self.actors = actors
+
+        # Các thao tác làm thay đổi phòng luôn chạy ở worker sở hữu phòng, tuần tự trong actor của phòng
+        cluster.register("room.join", actors.by_room(lambda payload: self._join_room(JoinRoomRequest(**payload))))
+        cluster.register("room.leave", actors.by_room(lambda payload: self._leave_room(payload["wallet_id"], payload["room_id"])))
+        cluster.register("room.settings", actors.by_room(lambda payload: self._update_room_settings(payload["room_id"], GameSettings(**payload["settings"]))))
+        cluster.register("room.player_status", actors.by_room(self._set_player_status))
 
     async def get_rooms(self, status: str = None):
         return await self.room_service.get_rooms(status)
@@ -65,6 +78,7 @@ class RoomController:
             )
 
             room = Room.create(
+                room_id=self.cluster.new_room_id(),
                 players=[player],
                 total_questions=request.total_questions,
                 countdown_duration=request.countdown_duration
@@ -73,7 +87,6 @@ class RoomController:
 
             await self.room_service.save_room(room)
             self.websocket_manager.set_room_state(room.id, room.status)
-            await self.websocket_manager.broadcast_to_lobby({ "type": "room_update" })
 
             return room
         except Exception as e:
@@ -81,6 +94,18 @@ class RoomController:
             raise HTTPException(status_code=500, detail="Internal server error")
 
     async def join_room(self, request: JoinRoomRequest):
+        room_id = request.room_id
+        if request.room_code:
+            room = await self.room_service.get_room_by_code(request.room_code)
+            if not room:
+                raise HTTPException(status_code=404, detail="Room not found")
+            room_id = room.id
+        # Owner tìm phòng theo id đã được xác định ở đây
+        payload = request.model_dump(mode="json", exclude={"room_code"})
+        payload["room_id"] = room_id
+        return await self.cluster.call(room_id, "room.join", payload)
+
+    async def _join_room(self, request: JoinRoomRequest):
         room = None
         if request.room_code:
             room = await self.room_service.get_room_by_code(request.room_code)
@@ -122,6 +147,9 @@ class RoomController:
         return { "roomId": room.id, "walletId": player.wallet_id }
 
     async def leave_room(self, wallet_id: str, room_id: str):
+        return await self.cluster.call(room_id, "room.leave", {"wallet_id": wallet_id, "room_id": room_id})
+
+    async def _leave_room(self, wallet_id: str, room_id: str):
         result = await self.player_service.leave_room(wallet_id, room_id)
 
         is_closed = result.get("closed", False)
@@ -130,20 +158,13 @@ class RoomController:
 
         if is_closed:
             self.websocket_manager.disconnect_room_by_room_id(room_id)
+            self.room_service.release_room(room_id)
 
         if not player_data:
             return result
 
-        ws = await self.websocket_manager.get_player_socket(wallet_id)
-        if ws:
-            self.websocket_manager.disconnect_room(ws, room_id)
+        self.websocket_manager.detach_player(room_id, wallet_id)
 
-        await self.websocket_manager.broadcast_to_lobby({
-            "type": "room_update",
-            "action": "leave",
-            "roomId": room_id
-        })
-        
         await self.websocket_manager.broadcast_to_room(room_id, {
             "type": "player_left",
             "action": "leave",
@@ -177,7 +198,9 @@ class RoomController:
             return Response(status_code=404, content="No active room found")
         
         player_status = PLAYER_STATUS.WAITING if room.status == GAME_STATUS.WAITING else PLAYER_STATUS.ACTIVE 
-        await self.player_service.update_player_status(room.id, wallet_id, player_status)
+        await self.cluster.call(room.id, "room.player_status", {
+            "room_id": room.id, "wallet_id": wallet_id, "status": player_status.value
+        })
         
         return {
             "roomId": active_player.room_id,
@@ -286,6 +309,11 @@ class RoomController:
         return await self.room_service.get_room_settings(room_id)
 
     async def update_room_settings(self, room_id: str, settings: GameSettings) -> dict:
+        return await self.cluster.call(room_id, "room.settings", {
+            "room_id": room_id, "settings": settings.model_dump(mode="json")
+        })
+
+    async def _update_room_settings(self, room_id: str, settings: GameSettings) -> dict:
         is_updated = await self.room_service.update_game_settings(room_id, settings)
         await self.websocket_manager.broadcast_to_room(room_id, {
             "type": "room_config_update",
@@ -296,6 +324,9 @@ class RoomController:
     async def get_user_game_histories(self, wallet_id: str, status: Optional[str], limit: int, offset: int) -> List[Room]:
         return await self.room_service.get_user_game_histories(wallet_id, status, limit, offset)
 
+    async def _set_player_status(self, payload: dict) -> None:
+        await self.player_service.update_player_status(payload["room_id"], payload["wallet_id"], PLAYER_STATUS(payload["status"]))
+
     def make_timeout_callback(self, room_id: str):
         async def on_timeout():
             if self.websocket_manager.get_room_state(room_id) == GAME_STATUS.WAITING:
@@ -304,5 +335,7 @@ class RoomController:
                     "reason": "timeout"
                 })
                 self.websocket_manager.disconnect_room_by_room_id(room_id)
+                # Phòng chờ bị bỏ: giải phóng trạng thái trong bộ nhớ (DB vẫn giữ bản đầy đủ)
+                self.room_service.release_room(room_id)
                 print(f"[ROOM_TIMEOUT] Room {room_id} closed due to inactivity.")
-        return on_timeout
+        return lambda: self.actors.run(room_id, with_origin("timer:room_timeout", on_timeout))
@@ -1,12 +1,14 @@
 from enums.leaderboard_period import LEADERBOARD_PERIOD
 from repositories.implement.user_repo_impl import UserRepository, UserStatsRepository
 from models.leaderboard_entry import LeaderboardEntry
+from services.leaderboard_service import LeaderboardService
 from fastapi import APIRouter, HTTPException, Response
 
 class UserController:
-    def __init__(self, user_repo: UserRepository, user_stats_repo: UserStatsRepository):
+    def __init__(self, user_repo: UserRepository, user_stats_repo: UserStatsRepository, leaderboard_service: LeaderboardService):
         self.user_repo = user_repo
         self.user_stats_repo = user_stats_repo
+        self.leaderboard_service = leaderboard_service
 
     async def login_or_create(self, wallet_id: str, username: str = None):
         user = await self.user_repo.get_by_wallet(wallet_id)
@@ -28,5 +30,24 @@ class UserController:
         return await self.update_user(wallet_id, username=username)
 
     async def get_leaderboard(self, limit: int = 10, period=LEADERBOARD_PERIOD.ALL_TIME):
+        if self.leaderboard_service.ready:
+            return self.leaderboard_service.get_top(LEADERBOARD_PERIOD(period), limit)
+
+        # Leaderboard trong bộ nhớ chưa nạp xong (vừa khởi động)
         data = await self.user_stats_repo.get_leaderboard(limit, period)
         return [LeaderboardEntry(**item) for item in data]
+
+    async def get_leaderboard_rank(self, wallet_id: str, period=LEADERBOARD_PERIOD.ALL_TIME):
+        self._ensure_leaderboard_ready()
+        entry = self.leaderboard_service.get_rank(wallet_id, LEADERBOARD_PERIOD(period))
+        if not entry:
+            raise HTTPException(status_code=404, detail="User not ranked")
+        return entry
+
+    async def get_leaderboard_around(self, wallet_id: str, period=LEADERBOARD_PERIOD.ALL_TIME, radius: int = 5):
+        self._ensure_leaderboard_ready()
+        return self.leaderboard_service.get_around(wallet_id, LEADERBOARD_PERIOD(period), radius)
+
+    def _ensure_leaderboard_ready(self):
+        if not self.leaderboard_service.ready:
+            raise HTTPException(status_code=503, detail="Leaderboard is loading")
@@ -4,30 +4,57 @@ from fastapi import WebSocket, WebSocketDisconnect
 from config.question_config import QUESTION_CONFIG
 from enums.player_status import PLAYER_STATUS
 from enums.question_difficulty import QUESTION_DIFFICULTY
-from helpers.json_helper import send_json_safe
 from models.answer import Answer
 from models.chat_payload import ChatPayload
 from models.kick_player import KickPayload
 from models.player import Player
 from models.room import Room
 from config.constants import NEXT_QUESTION_DELAY, SEND_ONLY_REAMIN_TIME_IN_SECONDS
+from config.logging_config import GAME, NFT, WS, get_logger
 from models.question import Question
-from services.aptos_service import AptosService
+from models.reward_job import RewardJob
+from services.cluster import Cluster, RemoteSocket
 from services.answer_service import AnswerService
+from services.leaderboard_service import LeaderboardService
+from services.metrics import with_origin
+from services.lobby_state import LobbyState
 from services.player_service import PlayerService
 from services.question_service import QuestionService
+from services.rank_engine import RankEngine
+from services.reward_queue import RewardQueue
+from services.room_actor import RoomActors
+from services.room_ownership import RoomOwnership
 from services.room_service import RoomService
+from services.timer_wheel import TimerWheel
 from services.websocket_manager import WebSocketManager
 from pydantic import ValidationError
 from enums.game_status import GAME_STATUS
 from repositories.implement.user_repo_impl import UserRepository, UserStatsRepository
 import random, asyncio, pprint, time, uuid
-from services.nft_service import BlockchainService
 from typing import Dict, List, Optional, Any
 
+log = get_logger(GAME)
+ws_log = get_logger(WS)
+nft_log = get_logger(NFT)
+
+# Message nội bộ báo kết nối được mở/đóng ở worker giữ kết nối
+REMOTE_CONNECT = "__connect__"
+REMOTE_DISCONNECT = "__disconnect__"
+
+# Thời gian giữ phòng đã kết thúc trước khi dọn dẹp (giây)
+FINISHED_ROOM_CLEANUP_DELAY = 300
+
+# Purpose của các timer phòng trên TimerWheel
+FIRST_QUESTION = "first_question"
+QUESTION_TIMEOUT = "question_timeout"
+NEXT_QUESTION = "next_question"
+ROOM_CLEANUP = "cleanup"
+
 class WebSocketController:
     def __init__(self, manager: WebSocketManager, player_service: PlayerService, room_service: RoomService,
-                 question_service: QuestionService, answer_service: AnswerService, user_repo: UserRepository, user_stats_repo: UserStatsRepository):
+                 question_service: QuestionService, answer_service: AnswerService, user_repo: UserRepository, user_stats_repo: UserStatsRepository,
+                 rank_engine: RankEngine, leaderboard_service: LeaderboardService, lobby_state: LobbyState, cluster: Cluster,
+                 ownership: RoomOwnership, timers: TimerWheel, actors: RoomActors, rewards: RewardQueue):
         self.manager = manager
         self.player_service = player_service
         self.room_service = room_service
@@ -35,12 +62,30 @@ class WebSocketController:
         self.answer_service = answer_service
         self.user_repo = user_repo
         self.user_stats_repo = user_stats_repo
-        self.nft_service = BlockchainService()  # Thêm NFT service
-        self.aptos_service = AptosService()  # Thêm Aptos service
-        # Thêm tracking cho active tasks
-        self.active_tasks = {}
+        self.rank_engine = rank_engine
+        self.leaderboard_service = leaderboard_service
+        self.lobby_state = lobby_state
+        self.cluster = cluster
+        # Trao NFT cho người thắng chạy nền, kết quả quay về qua _on_reward_finished
+        self.rewards = rewards
+        rewards.listeners.append(self._on_reward_finished)
+        # Mọi timer của phòng (countdown, hết giờ câu hỏi, chuyển câu, dọn phòng) chạy trên một TimerWheel
+        self.timers = timers
+        # Mọi event của một phòng (message, timer, tiếp quản) chạy tuần tự trong actor của phòng
+        self.actors = actors
+        # Phòng mà câu hỏi hiện tại đã được chốt (đã hiện kết quả / đang chuyển câu)
         self.is_moving_to_next = set()
 
+        # {conn_id: asyncio.Queue} - message của các kết nối được worker khác chuyển tới (phòng thuộc worker này)
+        self.remote_sessions: Dict[str, asyncio.Queue] = {}
+        cluster.register("room.ws", self._on_remote_room_message)
+        cluster.register("game.force_end", actors.by_room(lambda payload: self._force_end_game(payload["room_id"])))
+
+        # Game loop của phòng chỉ chạy ở worker giữ lease; tiếp tục chạy khi tiếp quản phòng từ worker khác
+        self.ownership = ownership
+        ownership.on_acquired.append(lambda room_id: actors.run(room_id, with_origin("resume", lambda: self.resume_room(room_id))))
+        ownership.on_lost.append(self.suspend_room)
+
     async def _handle_disconnect_ws(self, websocket: WebSocket, room_id: str, wallet_id: str, data: dict):
         # Lấy ra kết nối HIỆN TẠI (có thể là một kết nối mới nếu người dùng đã reconnect)
         current_socket = await self.manager.get_player_socket(wallet_id)
@@ -48,8 +93,9 @@ class WebSocketController:
         is_truly_disconnected = not current_socket or current_socket == websocket
         
         if is_truly_disconnected:
-            print(f"[WS_DICONNECTED] User {wallet_id} is truly disconnected.")
-            current_player = await self.player_service.get_players_by_wallet_and_room_id(room_id=room_id, wallet_id=wallet_id)
+            ws_log.info("[WS_DISCONNECTED] User %s is truly disconnected.", wallet_id)
+            room = await self.room_service.get_room(room_id)
+            current_player = next((p for p in room.players if p.wallet_id == wallet_id), None) if room else None
             
             DISCONNECTABLE_STATUSES = {
                 PLAYER_STATUS.ACTIVE,
@@ -73,17 +119,16 @@ class WebSocketController:
             
             # 3. Kích hoạt lại việc kiểm tra logic game
             try:
-                room = await self.room_service.get_room(room_id)
                 if room and room.status == GAME_STATUS.IN_PROGRESS:
-                    print(f"[DISCONNECT_CHECK] Re-evaluating game state for room {room_id}.")
+                    log.debug("[DISCONNECT_CHECK] Re-evaluating game state for room %s.", room_id)
                     await self._check_and_show_question_result(room_id)
             except Exception as e:
-                print(f"[ERROR] Could not check game result after disconnect: {e}")
+                log.error("[ERROR] Could not check game result after disconnect: %s", e)
                 
         else:
             # Người dùng đã ngắt kết nối và kết nối lại ngay lập tức với một socket mới.
             # Chúng ta không cần chạy logic disconnect đầy đủ, vì họ đã quay trở lại.
-            print(f"[WS_RECONNECT] User {wallet_id} disconnected but reconnected instantly. Skipping full disconnect logic.")
+            ws_log.info("[WS_RECONNECT] User %s disconnected but reconnected instantly. Skipping full disconnect logic.", wallet_id)
 
         # Cuối cùng, luôn luôn dọn dẹp kết nối CŨ ra khỏi manager.
         self.manager.disconnect_room(websocket, room_id)    
@@ -100,21 +145,19 @@ class WebSocketController:
 
         host_wallet_id = await self.room_service.get_host_room_wallet(room_id)
         if not host_wallet_id or host_wallet_id != wallet_id:
-            await send_json_safe(websocket, {"type": "error", "message": "Only the host can kick players."})
+            self.manager.send_personal(websocket, {"type": "error", "message": "Only the host can kick players."})
             return
 
-        kicked_ws = await self.manager.get_player_socket(payload.wallet_id)
         if wallet_id == payload.wallet_id:
-            await send_json_safe(websocket, {"type": "error", "payload": {"message": "You cannot kick yourself"}})
+            self.manager.send_personal(websocket, {"type": "error", "payload": {"message": "You cannot kick yourself"}})
             return
 
         result = await self.player_service.leave_room(payload.wallet_id, payload.room_id)
 
-        if kicked_ws:
-            await send_json_safe(kicked_ws, {
-                "type": "kicked",
-                "payload": {"reason": "You were kicked from the room", "roomId": payload.room_id}
-            })
+        await self.manager.send_to_player(payload.wallet_id, {
+            "type": "kicked",
+            "payload": {"reason": "You were kicked from the room", "roomId": payload.room_id}
+        })
 
         kicked_player: Player = result["data"]
         username = getattr(kicked_player, "username", "Unknown")
@@ -136,19 +179,33 @@ class WebSocketController:
         })
 
     async def _handle_ping(self, websocket: WebSocket, data: dict):
-        await send_json_safe(websocket, {"type": "pong"})
+        self.manager.send_personal(websocket, {"type": "pong"})
 
     async def _handle_broadcast(self, websocket: WebSocket, data: dict):
         await self.manager.broadcast_to_lobby(data)
 
+    async def _handle_lobby_resume(self, websocket: WebSocket, data: dict):
+        self._send_lobby_changes(websocket, data.get("version"), data.get("epoch"))
+
+    def _send_lobby_changes(self, websocket: WebSocket, since: Optional[int], epoch: Optional[str] = None):
+        """Gửi các delta sau version `since` của client, hoặc snapshot nếu client chưa có/không nối tiếp được."""
+        if isinstance(since, int):
+            messages = self.lobby_state.changes_since(since, epoch)
+        else:
+            messages = [self.lobby_state.snapshot()]
+        for message in messages:
+            self.manager.send_personal(websocket, message)
+
     # ✅ Helper function để chuyển sang câu hỏi tiếp theo
     async def _move_to_next_question(self, room_id: str):
-        print(f"[MOVE_NEXT] Attempting to move to next question for room {room_id}.")
+        log.debug("[MOVE_NEXT] Attempting to move to next question for room %s.", room_id)
+        if not self._owns_game_loop(room_id):
+            return
         
         # Lấy lại trạng thái phòng mới nhất
         room = await self.room_service.get_room(room_id)
         if not room or room.status != GAME_STATUS.IN_PROGRESS:
-            print(f"[MOVE_NEXT] Aborting: Room not found or game not in progress.")
+            log.debug("[MOVE_NEXT] Aborting: Room not found or game not in progress.")
             self.is_moving_to_next.discard(room_id)
             return
 
@@ -160,7 +217,7 @@ class WebSocketController:
         
         # Kiểm tra xem game đã kết thúc chưa
         if new_index >= room.total_questions:
-            print(f"[MOVE_NEXT] Reached end of questions. Ending game.")
+            log.info("[MOVE_NEXT] Reached end of questions. Ending game for room %s.", room_id)
             await self._handle_game_end(room_id)
             return
 
@@ -173,7 +230,7 @@ class WebSocketController:
         # LƯU TRẠNG THÁI MỚI VÀO DB/CACHE
         # Toàn bộ object room với index mới và started_at=None được lưu lại
         await self.room_service.save_room(room)
-        print(f"[MOVE_NEXT] Room {room_id} state saved. New index: {new_index}, started_at is now None.")
+        log.debug("[MOVE_NEXT] Room %s state saved. New index: %s, started_at is now None.", room_id, new_index)
         
         # KÍCH HOẠT VIỆC GỬI CÂU HỎI TIẾP THEO
         # Hàm này bây giờ sẽ đọc được trạng thái phòng mới và sạch
@@ -196,9 +253,8 @@ class WebSocketController:
         all_players = room.players # Sử dụng tất cả người chơi
         
         for p in all_players:
-            answers = await self.answer_service.get_answers_by_wallet_id(room_id, p.wallet_id)
-            if answers is None:
-                answers = []
+            # Answers đã có sẵn trong trạng thái phòng (kể cả những answer chưa ghi xong xuống DB)
+            answers = p.answers or []
             
             valid_answers = []
             for a in answers:
@@ -278,14 +334,28 @@ class WebSocketController:
         }
 
         # Cập nhật DB cho TẤT CẢ người chơi đã tham gia
+        score_changes = {}
         for result in results:
-            await self.user_stats_repo.update_user_stats(
+            change = await self.user_stats_repo.update_user_stats(
                 wallet_id=result["wallet"],
                 score=result["score"],
                 is_winner=(result["wallet"] == winner_wallet)
             )
-        
-        await self.user_stats_repo.recalculate_ranks()
+            if change:
+                score_changes[result["wallet"]] = change
+
+        # Chỉ xếp hạng lại khoảng điểm bị ảnh hưởng bởi game này
+        await self.rank_engine.apply_score_changes(score_changes)
+        self.leaderboard_service.record_game(room_id, game_end_time, [
+            {
+                "wallet_id": result["wallet"],
+                "username": result["oath"],
+                "score": result["score"],
+                "is_winner": result["wallet"] == winner_wallet,
+                "total_score": score_changes[result["wallet"]][1] if result["wallet"] in score_changes else None,
+            }
+            for result in results
+        ])
         await self.room_service.save_room(room)
 
         # Broadcast game end với leaderboard chi tiết
@@ -306,32 +376,12 @@ class WebSocketController:
         })
 
         if winner_wallet:
+            # Mint/transfer NFT chạy nền (RewardQueue), kết quả được đẩy tới phòng bằng `nft_awarded` khi xong
             try:
-                print(f"[NFT] Starting NFT minting process for winner {winner_wallet} in room {room_id}")
-                
-                # 1. Mint NFT từ BlockchainService (code cũ)
-                blockchain_nft_result = await self._mint_and_transfer_nft(room_id, winner_wallet)
-                print(f"[BLOCKCHAIN_NFT] Result: {blockchain_nft_result}")
-                
-                # 2. Mint NFT từ AptosService (code mới)
-                aptos_nft_result = await self._mint_aptos_nft(room_id, winner_wallet)
-                print(f"[APTOS_NFT] Result: {aptos_nft_result}")
-                
-                # 3. Broadcast kết quả tổng hợp
-                await self.manager.broadcast_to_room(room_id, {
-                    "type": "nft_awarded",
-                    "payload": {
-                        "winner_wallet": winner_wallet,
-                        "room_id": room_id,
-                        "blockchain_nft": blockchain_nft_result,
-                        "aptos_nft": aptos_nft_result,
-                        "message": "🎉 Congratulations! You've won NFTs from both blockchain and Aptos!"
-                    }
-                })
-                
+                if await self.rewards.enqueue(room_id, winner_wallet):
+                    nft_log.info("[NFT] Queued reward for winner %s in room %s", winner_wallet, room_id)
             except Exception as e:
-                print(f"[NFT_ERROR] Exception during NFT minting: {str(e)}")
-                # Broadcast error to room
+                nft_log.error("[NFT_ERROR] Could not queue reward for room %s: %s", room_id, e)
                 await self.manager.broadcast_to_room(room_id, {
                     "type": "nft_error",
                     "payload": {
@@ -343,11 +393,15 @@ class WebSocketController:
                 })
 
         # Schedule room cleanup after some time
-        async def cleanup_room():
-            await asyncio.sleep(300)  # Wait 5 minutes before cleanup
-            await self._cleanup_finished_room(room_id)
-        
-        asyncio.create_task(cleanup_room())
+        self._schedule_cleanup(room_id, FINISHED_ROOM_CLEANUP_DELAY)
+
+    def _schedule_cleanup(self, room_id: str, delay: float):
+        self._schedule(room_id, ROOM_CLEANUP, delay, lambda: self._cleanup_finished_room(room_id))
+
+    def _schedule(self, room_id: str, purpose: str, delay: float, event):
+        # Timer hết hạn chỉ đưa event vào actor của phòng, event chạy xen kẽ đúng thứ tự với message của người chơi
+        event = with_origin(f"timer:{purpose}", event)
+        self.timers.schedule(room_id, purpose, delay, lambda: self.actors.post(room_id, event))
 
     # ✅ Update player statistics after game
     async def _update_player_statistics(self, room: Room, leaderboard: list):
@@ -393,7 +447,60 @@ class WebSocketController:
                 await self.user_stats_repo.update_user_stats(wallet_id, user_stats["total_score"], user_stats["total_wins"] > 0)
                 
         except Exception as e:
-            print(f"Error updating player statistics: {e}")
+            log.error("Error updating player statistics: %s", e)
+
+    # ==================================
+    # Lease của game loop
+    # ==================================
+
+    def _owns_game_loop(self, room_id: str) -> bool:
+        if self.ownership.holds(room_id):
+            return True
+        log.info("[ROOM_LEASE] Skipping game loop step for room %s: lease is not held by this worker.", room_id)
+        return False
+
+    async def resume_room(self, room_id: str):
+        """Chạy tiếp game loop của phòng vừa tiếp quản từ current_index và current_question_started_at đã lưu."""
+        room = await self.room_service.get_room(room_id)
+        if not room or room.status in (GAME_STATUS.FINISHED, GAME_STATUS.CANCELLED):
+            await self._cleanup_finished_room(room_id)
+            return
+        if room.status != GAME_STATUS.IN_PROGRESS:
+            # Phòng chờ không có game loop để chạy tiếp
+            await self.ownership.release(room_id)
+            return
+
+        current_question = room.current_question
+        if not current_question:
+            await self._handle_game_end(room_id)
+            return
+
+        # Đang countdown hoặc đang chờ chuyển câu: gửi câu hỏi hiện tại
+        if room.current_question_started_at is None:
+            await self._send_current_question(room_id)
+            return
+
+        started_at = room.current_question_started_at
+        if started_at.tzinfo is None:
+            started_at = started_at.replace(tzinfo=timezone.utc)
+        elapsed = (datetime.now(timezone.utc) - started_at).total_seconds()
+        remaining = self._get_time_for_question(room, current_question) - elapsed
+        log.info("[ROOM_LEASE] Resuming room %s at question %s (%.1fs remaining).", room_id, room.current_index, remaining)
+
+        if remaining > 0:
+            self._schedule_question_timeout(room_id, room.current_index, current_question, remaining + 5)
+            return
+
+        # Câu hỏi đã hết giờ trong lúc không có worker nào chạy phòng
+        self.is_moving_to_next.add(room_id)
+        await self._handle_unanswered_questions(room_id, current_question)
+        await self._show_question_result(room_id, handle_unanswered=False)
+
+    def suspend_room(self, room_id: str):
+        """Dừng mọi timer của phòng khi worker này không còn giữ lease; worker mới sẽ chạy tiếp."""
+        self.timers.cancel_room(room_id)
+        self.is_moving_to_next.discard(room_id)
+        self.room_service.release_room(room_id)
 
     # ✅ Cleanup finished room
     async def _cleanup_finished_room(self, room_id: str):
@@ -401,18 +508,24 @@ class WebSocketController:
         try:
             # Disconnect all remaining connections
             self.manager.disconnect_room_by_room_id(room_id)
+            self.timers.cancel_room(room_id)
+            self.is_moving_to_next.discard(room_id)
+
+            # Giải phóng trạng thái phòng khỏi bộ nhớ (DB vẫn giữ bản đầy đủ)
+            self.room_service.release_room(room_id)
+            await self.ownership.release(room_id)
             
             # Optionally remove room from cache/database
             # await self.room_service.delete_room(room_id)
             
         except Exception as e:
-            print(f"Error cleaning up room {room_id}: {e}")
+            log.error("Error cleaning up room %s: %s", room_id, e)
     
     async def _handle_start_game(self, websocket: WebSocket, room_id: str, wallet_id: str, data: dict):
         # ✅ 1. Chỉ host mới được bắt đầu game
         host_wallet_id = await self.room_service.get_host_room_wallet(room_id)
         if wallet_id != host_wallet_id:
-            await send_json_safe(websocket, {
+            self.manager.send_personal(websocket, {
                 "type": "error",
                 "message": "Only host can start the game."
             })
@@ -421,14 +534,14 @@ class WebSocketController:
         # ✅ 2. Kiểm tra xem game đã bắt đầu chưa
         room = await self.room_service.get_room(room_id)
         if not room:
-            await send_json_safe(websocket, {
+            self.manager.send_personal(websocket, {
                 "type": "error",
                 "message": "Room not found."
             })
             return
             
         if room.status == GAME_STATUS.IN_PROGRESS:
-            await send_json_safe(websocket, {
+            self.manager.send_personal(websocket, {
                 "type": "error",
                 "message": "Game is already in progress."
             })
@@ -438,30 +551,23 @@ class WebSocketController:
         medium_count = room.medium_questions if room.medium_questions is not None else QUESTION_CONFIG[QUESTION_DIFFICULTY.MEDIUM]["quantity"]
         hard_count = room.hard_questions if room.hard_questions is not None else QUESTION_CONFIG[QUESTION_DIFFICULTY.HARD]["quantity"]
 
-        # ✅ 4. Lấy danh sách câu hỏi và shuffle
-        easy_qs = await self.question_service.get_random_questions_by_difficulty(QUESTION_DIFFICULTY.EASY, easy_count)
-        medium_qs = await self.question_service.get_random_questions_by_difficulty(QUESTION_DIFFICULTY.MEDIUM, medium_count)
-        hard_qs = await self.question_service.get_random_questions_by_difficulty(QUESTION_DIFFICULTY.HARD, hard_count)
-
-        questions = [*easy_qs, *medium_qs, *hard_qs]
+        # ✅ 4. Lấy danh sách câu hỏi (tránh câu người chơi đã gặp gần đây) và shuffle
+        wallet_ids = [p.wallet_id for p in room.players]
+        questions = await self.question_service.sample_for_players({
+            QUESTION_DIFFICULTY.EASY: easy_count,
+            QUESTION_DIFFICULTY.MEDIUM: medium_count,
+            QUESTION_DIFFICULTY.HARD: hard_count,
+        }, wallet_ids)
         random.shuffle(questions)
 
         if not questions:
-            await send_json_safe(websocket, {"type": "error", "message": "No questions found."})
+            self.manager.send_personal(websocket, {"type": "error", "message": "No questions found."})
             return
-            
-        # Nếu không đủ câu hỏi, điều chỉnh total_questions
+
+        # Nếu không đủ câu hỏi, điều chỉnh total_questions thay vì lặp lại câu hỏi
         if len(questions) < (easy_count + medium_count + hard_count):
-            pass
-            
-        # Đảm bảo có đủ câu hỏi bằng cách lặp lại nếu cần
-        target_questions = easy_count + medium_count + hard_count
-        if len(questions) < target_questions:
-            # Lặp lại câu hỏi để đạt được số lượng mong muốn
-            repeated_questions = []
-            while len(repeated_questions) < target_questions:
-                repeated_questions.extend(questions[:target_questions - len(repeated_questions)])
-            questions = repeated_questions[:target_questions]
+            room.total_questions = len(questions)
+        self.question_service.mark_seen(wallet_ids, questions)
 
         # ✅ 5. Chuẩn bị dữ liệu câu hỏi cho client (loại bỏ đáp án đúng)
         def prepare_question_for_client(question):
@@ -487,6 +593,9 @@ class WebSocketController:
         room.current_index = 0
         room.started_at = datetime.now(timezone.utc)
 
+        if not await self.ownership.claim(room_id):
+            self.manager.send_personal(websocket, {"type": "error", "message": "Room is being handled by another server."})
+            return
         await self.room_service.save_room(room)
         self.manager.clear_room_timeout(room_id)
 
@@ -511,10 +620,10 @@ class WebSocketController:
 
         # ✅ 9. Gửi câu hỏi đầu tiên sau countdown
         async def send_first_question():
-            await asyncio.sleep(room.countdown_duration)
-            await self._send_current_question(room_id)
+            if self._owns_game_loop(room_id):
+                await self._send_current_question(room_id)
 
-        asyncio.create_task(send_first_question())
+        self._schedule(room_id, FIRST_QUESTION, room.countdown_duration, send_first_question)
 
     # ✅ Helper function để xử lý submit answer (IMPROVED)
     async def _handle_submit_answer(self, websocket: WebSocket, room_id: str, wallet_id: str, data: dict):
@@ -525,7 +634,7 @@ class WebSocketController:
         
         room = await self.room_service.get_room(room_id)
         if not room or room.status != GAME_STATUS.IN_PROGRESS:
-            await send_json_safe(websocket, {"type": "error", "message": "Game is not in progress."})
+            self.manager.send_personal(websocket, {"type": "error", "message": "Game is not in progress."})
             return
 
         current_question = room.current_question
@@ -533,20 +642,20 @@ class WebSocketController:
             return
         
         # Thêm kiểm tra: nếu người chơi đã trả lời rồi thì không xử lý nữa
-        # Điều này cần một cơ chế kiểm tra trong answer_service
-        existing_answer = await self.answer_service.get_answer_by_question_and_wallet(room_id, current_question.id, wallet_id)
-        if existing_answer:
-            await send_json_safe(websocket, {"type": "error", "message": "You have already answered this question."})
+        player = next((p for p in room.players if p.wallet_id == wallet_id), None)
+        tally = self.room_service.get_answer_tally(room)
+        if tally.has_answered(current_question.id, wallet_id):
+            self.manager.send_personal(websocket, {"type": "error", "message": "You have already answered this question."})
             return
             
         if not current_question:
-            await send_json_safe(websocket, {"type": "error", "message": "No current question available."})
+            self.manager.send_personal(websocket, {"type": "error", "message": "No current question available."})
             return
 
         # 1. LẤY "NGUỒN CHÂN LÝ" VỀ THỜI GIAN TỪ SERVER
         if not room.current_question_started_at:
-            print(f"[ERROR] Cannot process answer for room {room_id}: current_question_started_at is not set!")
-            await send_json_safe(websocket, {"type": "error", "message": "Server error: Cannot determine question start time."})
+            log.error("[ERROR] Cannot process answer for room %s: current_question_started_at is not set!", room_id)
+            self.manager.send_personal(websocket, {"type": "error", "message": "Server error: Cannot determine question start time."})
             return
         question_start_at = int(room.current_question_started_at.timestamp() * 1000)
 
@@ -558,6 +667,12 @@ class WebSocketController:
         submit_time = int(time.time() * 1000)
         is_correct = player_answer == current_question.correct_answer
 
+        # Giữ chỗ trong tally ngay (chưa có await nào từ lúc đọc room) để thứ tự trả lời đúng là duy nhất
+        correct_answer_count = tally.record(current_question.id, wallet_id, is_correct)
+        if correct_answer_count is None:
+            self.manager.send_personal(websocket, {"type": "error", "message": "You have already answered this question."})
+            return
+
         # 4. TÍNH ĐIỂM
         points = 0
         speed_bonus = 0
@@ -586,24 +701,17 @@ class WebSocketController:
                     time_bonus = int(max_bonus * 0.5 * (1.0 - time_percentage))
                     points += time_bonus
                     
-                    # Order bonus (tính toán dựa trên các câu trả lời đúng đã có)
-                    try:
-                        correct_answers = await self.answer_service.get_correct_answers_by_question_id(room_id, current_question.id)
-                        correct_answer_count = len(correct_answers) if correct_answers else 0
-                        
-                        if correct_answer_count == 0:
-                            order_bonus = int(max_bonus * 0.3)
-                        elif correct_answer_count == 1:
-                            order_bonus = int(max_bonus * 0.15)
-                        elif correct_answer_count == 2:
-                            order_bonus = int(max_bonus * 0.05)
-                        points += order_bonus
-                    except Exception as e:
-                        print(f"Error calculating order bonus: {e}")
+                    # Order bonus (dựa trên số người đã trả lời đúng trước đó)
+                    if correct_answer_count == 0:
+                        order_bonus = int(max_bonus * 0.3)
+                    elif correct_answer_count == 1:
+                        order_bonus = int(max_bonus * 0.15)
+                    elif correct_answer_count == 2:
+                        order_bonus = int(max_bonus * 0.05)
+                    points += order_bonus
 
         # 5. CẬP NHẬT TRẠNG THÁI VÀ LƯU DỮ LIỆU
         # Cập nhật điểm player trong object room
-        player = next((p for p in room.players if p.wallet_id == wallet_id), None)
         if player:
             player.score += points
 
@@ -623,15 +731,15 @@ class WebSocketController:
                 response_time=response_time if not is_no_answer else 0,
                 submitted_at=datetime.fromtimestamp(submit_time / 1000, tz=timezone.utc)
             )
-            await self.answer_service.save_answer(answer_record)
+            await self.room_service.record_answer(answer_record)
         except Exception as e:
-            print(f"Error saving answer: {e}")
+            log.error("Error saving answer: %s", e)
             
         # Lưu lại room object đã cập nhật điểm
         await self.room_service.save_room(room)
 
         # 6. GỬI PHẢN HỒI CHO CLIENT
-        await send_json_safe(websocket, {
+        self.manager.send_personal(websocket, {
             "type": "answer_submitted",
             "payload": {
                 "isCorrect": is_correct,
@@ -653,7 +761,7 @@ class WebSocketController:
         try:
             await self._check_and_show_question_result(room_id)
         except Exception as e:
-            print(f"Error in _check_and_show_question_result from _handle_submit_answer: {e}")
+            log.error("Error in _check_and_show_question_result from _handle_submit_answer: %s", e)
     
     # ✅ Helper function để show kết quả câu hỏi (IMPROVED)
     async def _show_question_result(self, room_id: str, handle_unanswered: bool = True):
@@ -678,9 +786,9 @@ class WebSocketController:
         # Add "No Answer" option to stats
         answer_stats["No Answer"] = 0
         
-        # Lấy thống kê từ database
+        # Lấy thống kê từ trạng thái phòng
         try:
-            current_question_answers = await self.answer_service.get_answers_by_room_and_question_id(room_id, current_question.id)
+            current_question_answers = self.room_service.get_question_answers(room, current_question.id)
             if current_question_answers:
                 for answer in current_question_answers:
                     if answer.answer and answer.answer in answer_stats:
@@ -688,7 +796,7 @@ class WebSocketController:
                     elif not answer.answer or answer.answer == "":
                         answer_stats["No Answer"] += 1
         except Exception as e:
-            print(f"Error getting answer stats: {e}")
+            log.error("Error getting answer stats: %s", e)
         
         # Calculate total responses (excluding "No Answer" for percentage calculations)
         total_responses = sum(count for option, count in answer_stats.items() if option != "No Answer")
@@ -718,25 +826,19 @@ class WebSocketController:
             }
         })
 
-        if room_id not in self.active_tasks:
+        if not self.timers.is_scheduled(room_id, NEXT_QUESTION):
             async def next_question_delay():
                 try:
-                    print(f"[NEXT_QUESTION] Room {room_id} - Waiting 3 seconds before moving to next question")
-                    # Wait 3 seconds to show result, then move to next question
-                    await asyncio.sleep(NEXT_QUESTION_DELAY)
-                    print(f"[NEXT_QUESTION] Room {room_id} - Moving to next question now")
+                    log.debug("[NEXT_QUESTION] Room %s - Moving to next question now", room_id)
                     await self._move_to_next_question(room_id)
                 except Exception as e:
-                    print(f"[ERROR] Error in next_question_delay for room {room_id}: {e}")
-                finally:
-                    # Xóa task khỏi tracking khi hoàn thành
-                    self.active_tasks.pop(room_id, None)
-                    print(f"[NEXT_QUESTION] Room {room_id} - Next question delay task completed")
-            
-            task = asyncio.create_task(next_question_delay())
-            self.active_tasks[room_id] = task
+                    log.error("[ERROR] Error in next_question_delay for room %s: %s", room_id, e)
+
+            # Giữ kết quả trên màn hình NEXT_QUESTION_DELAY giây rồi mới chuyển câu
+            log.debug("[NEXT_QUESTION] Room %s - Waiting %s seconds before moving to next question", room_id, NEXT_QUESTION_DELAY)
+            self._schedule(room_id, NEXT_QUESTION, NEXT_QUESTION_DELAY, next_question_delay)
         else:
-            print(f"[NEXT_QUESTION] Room {room_id} - Skipping next question delay task (already exists)")
+            log.debug("[NEXT_QUESTION] Room %s - Skipping next question delay task (already exists)", room_id)
 
     # Trong lớp WebSocketController
 
@@ -745,18 +847,20 @@ class WebSocketController:
         # Luôn lấy lại room object để đảm bảo có trạng thái chính xác nhất
         room = await self.room_service.get_room(room_id)
         if not room or room.status != GAME_STATUS.IN_PROGRESS:
-            print(f"[SEND_Q] Aborting, room {room_id} not found or game not in progress.")
+            log.debug("[SEND_Q] Aborting, room %s not found or game not in progress.", room_id)
+            return
+        if not self._owns_game_loop(room_id):
             return
         
         # Lớp bảo vệ chống race condition:
         # Nếu một tiến trình khác đã gửi câu hỏi này, `started_at` sẽ không còn là None.
         if not force and room.current_question_started_at is not None:
-            print(f"[SEND_Q] Aborting, question {room.current_index} for room {room_id} seems to be already sent.")
+            log.debug("[SEND_Q] Aborting, question %s for room %s seems to be already sent.", room.current_index, room_id)
             return
 
         current_question = room.current_question
         if not current_question:
-            print(f"[SEND_Q_ERROR] No question found at index {room.current_index} for room {room_id}.")
+            log.error("[SEND_Q_ERROR] No question found at index %s for room %s.", room.current_index, room_id)
             await self._handle_game_end(room_id)
             return
 
@@ -784,7 +888,7 @@ class WebSocketController:
         
         # LƯU TRẠNG THÁI MỚI VÀO DB/CACHE MỘT LẦN DUY NHẤT
         await self.room_service.save_room(room)
-        print(f"[SEND_Q] Saved room {room.id} with new question {room.current_index} and started_at timestamp.")
+        log.debug("[SEND_Q] Saved room %s with new question %s and started_at timestamp.", room.id, room.current_index)
 
         # 5. GỬI BROADCAST VỚI "NGUỒN CHÂN LÝ"
         await self.manager.broadcast_to_room(room_id, {
@@ -806,40 +910,36 @@ class WebSocketController:
         })
         
         # 6. TẠO FALLBACK TIMER AN TOÀN
-        # Hủy timer cũ nếu còn tồn tại để tránh xung đột
-        if room_id in self.active_tasks:
-            self.active_tasks[room_id].cancel()
-        
+        # Buffer thời gian chờ có thể là 5 giây
+        self._schedule_question_timeout(room_id, room.current_index, current_question, time_per_question + 5)
+
+    def _schedule_question_timeout(self, room_id: str, question_index: int, current_question: Question, delay: float):
+        # Câu hỏi mới: bỏ trạng thái đã chốt của câu trước
+        self.is_moving_to_next.discard(room_id)
+
+        # schedule() thay luôn timer cũ của phòng nếu còn tồn tại
         async def fallback_auto_next_question():
             try:
-                # Buffer thời gian chờ có thể là 5 giây
-                await asyncio.sleep(time_per_question + 5)
-                
-                # Kiểm tra khóa "is_moving_to_next" để tránh race condition
-                if room_id in self.is_moving_to_next:
+                # Mọi người đã trả lời và câu hỏi đã được chốt trước khi timer hết hạn
+                if room_id in self.is_moving_to_next or not self._owns_game_loop(room_id):
                     return
 
                 current_room_state = await self.room_service.get_room(room_id)
                 if (current_room_state and
                     current_room_state.status == GAME_STATUS.IN_PROGRESS and
-                    current_room_state.current_index == room.current_index):
+                    current_room_state.current_index == question_index):
                     
-                    # Giành lấy khóa để chỉ tiến trình này được phép chuyển câu hỏi
+                    # Chốt câu hỏi để lần submit / disconnect sau đó không hiện kết quả lần nữa
                     self.is_moving_to_next.add(room_id)
-                    print(f"[FALLBACK] Timer expired for question {room.current_index}. Forcing next step.")
+                    log.info("[FALLBACK] Timer expired for question %s. Forcing next step.", question_index)
                     
                     await self._handle_unanswered_questions(room_id, current_question)
                     await self._show_question_result(room_id, handle_unanswered=False)
 
-            except asyncio.CancelledError:
-                print(f"[FALLBACK] Timer for room {room_id} was cancelled, likely because all players answered.")
             except Exception as e:
-                print(f"[FALLBACK_ERROR] An error occurred in fallback timer for room {room_id}: {e}")
-            finally:
-                self.active_tasks.pop(room_id, None)
+                log.error("[FALLBACK_ERROR] An error occurred in fallback timer for room %s: %s", room_id, e)
 
-        task = asyncio.create_task(fallback_auto_next_question())
-        self.active_tasks[room_id] = task
+        self._schedule(room_id, QUESTION_TIMEOUT, delay, fallback_auto_next_question)
 
     # ✅ NEW: Handle unanswered questions
     async def _handle_unanswered_questions(self, room_id: str, current_question: Question):
@@ -849,21 +949,10 @@ class WebSocketController:
             return
 
         try:
-            # Get all answers for current question
-            current_question_answers = await self.answer_service.get_answers_by_room_and_question_id(room_id, current_question.id)
+            # Active players who didn't answer (exclude disconnected players)
+            unanswered_active_players = self.room_service.get_answer_tally(room).unanswered(current_question.id)
             
-            # Get list of players who answered
-            answered_players = set()
-            if current_question_answers:
-                for answer in current_question_answers:
-                    if answer.wallet_id:
-                        answered_players.add(answer.wallet_id)
-            
-            # Find active players who didn't answer (exclude disconnected players)
-            active_players = set(p.wallet_id for p in room.players if p.player_status != PLAYER_STATUS.DISCONNECTED)
-            unanswered_active_players = active_players - answered_players
-            
-            print(f"[UNANSWERED] Room {room_id} - Question {room.current_index + 1}: {len(unanswered_active_players)} active players didn't answer")
+            log.debug("[UNANSWERED] Room %s - Question %s: %s active players didn't answer", room_id, room.current_index + 1, len(unanswered_active_players))
             
             # Submit "no answer" for each active player who didn't respond
             for wallet_id in unanswered_active_players:
@@ -884,123 +973,51 @@ class WebSocketController:
                         submitted_at=datetime.now(timezone.utc)
                     )
                     
-                    await self.answer_service.save_answer(answer_record)
-                    print(f"[UNANSWERED] Auto-submitted no answer for active player {wallet_id}")
+                    await self.room_service.record_answer(answer_record)
+                    log.debug("[UNANSWERED] Auto-submitted no answer for active player %s", wallet_id)
                     
                 except Exception as e:
-                    print(f"Error auto-submitting no answer for player {wallet_id}: {e}")
+                    log.error("Error auto-submitting no answer for player %s: %s", wallet_id, e)
                     
         except Exception as e:
-            print(f"Error handling unanswered questions: {e}")
-
-    # Sửa hàm _mint_and_transfer_nft để có logic trực tiếp từ controller
-    async def _mint_and_transfer_nft(self, room_id: str, winner_wallet: str) -> dict:
-        """Mint NFT cho deployer và transfer cho winner"""
-        try:
-            # Generate default metadata_uri
-            metadata_uri = f"https://challengewave.com/nft/{room_id}"
-            
-            # Mint NFT trước (nếu chưa có), sau đó transfer cho winner
-            try:
-                # Thử mint NFT (có thể đã tồn tại)
-                mint_result = self.nft_service.mint_nft(room_id, metadata_uri)
-                # print(f"[NFT] Mint NFT result: {mint_result}")
-            except Exception as mint_error:
-                # Nếu NFT đã tồn tại, bỏ qua lỗi và tiếp tục
-                if "NFT already exists" in str(mint_error):
-                    # print(f"[NFT] NFT already exists for room {room_id}, continuing with transfer...")
-                    mint_result = "NFT already existed"
-                else:
-                    raise mint_error
-            
-            # Transfer NFT cho winner bằng cách submit game result
-            score = 100
-            zk_proof = "0x" + "00"*32
-            transfer_result = self.nft_service.submit_game_result(room_id, winner_wallet, score, zk_proof)
-            
-            return {
-                "message": "NFT minted and transferred successfully",
-                "mint_result": mint_result,
-                "transfer_result": transfer_result,
-                "winner_wallet": winner_wallet
-            }
-            
-        except Exception as e:
-            print(f"[NFT_ERROR] Error in _mint_and_transfer_nft: {str(e)}")
-            raise e
-
-    # ✅ NEW: Mint NFT using AptosService
-    async def _mint_aptos_nft(self, room_id: str, winner_wallet: str) -> dict:
-        """Mint NFT cho winner sử dụng AptosService"""
-        try:
-            # Lấy thông tin user để có aptos_wallet
-            user = await self.user_repo.get_by_wallet(winner_wallet)
-            if not user or not user.aptos_wallet:
-                return {
-                    "success": False,
-                    "message": "Winner does not have an Aptos wallet connected",
-                    "error": "No aptos_wallet found for winner",
-                    "winner_wallet": winner_wallet
-                }
-            
-            aptos_wallet_address = user.aptos_wallet
-            
-            # Tạo metadata cho NFT
-            collection_name = "ChallengeWave Winners"
-            token_name = f"Winner Trophy - Room {room_id}"
-            token_description = f"Winner NFT for ChallengeWave game room {room_id}"
-            token_uri = f"https://challengewave.com/nft/{room_id}/metadata.json"
-            
-            print(f"[APTOS_NFT] Minting NFT for winner {winner_wallet} (Aptos: {aptos_wallet_address}) in room {room_id}")
-            
-            # Sử dụng AptosService để mint NFT với aptos_wallet
-            mint_result = await self.aptos_service.mint_nft_to_player(
-                recipient_address=aptos_wallet_address,
-                collection_name=collection_name,
-                token_name=token_name,
-                token_description=token_description,
-                token_uri=token_uri
-            )
-            
-            if mint_result.get("success"):
-                print(f"[APTOS_NFT] Successfully minted NFT for winner {winner_wallet} to Aptos wallet {aptos_wallet_address}")
-                return {
-                    "success": True,
-                    "message": "Aptos NFT minted and transferred successfully",
-                    "transaction_hash": mint_result.get("transaction_hash"),
-                    "explorer_url": mint_result.get("explorer_url"),
-                    "winner_wallet": winner_wallet,
-                    "aptos_wallet": aptos_wallet_address,
-                    "token_name": token_name
+            log.error("Error handling unanswered questions: %s", e)
+
+    async def _on_reward_finished(self, job: RewardJob):
+        """RewardQueue xử lý xong (hoặc bỏ hẳn) job trao thưởng của phòng: báo kết quả tới những người còn trong phòng."""
+        if job.status == "done":
+            await self.manager.broadcast_to_room(job.room_id, {
+                "type": "nft_awarded",
+                "payload": {
+                    "winner_wallet": job.winner_wallet,
+                    "room_id": job.room_id,
+                    "blockchain_nft": job.result.get("blockchain_nft"),
+                    "aptos_nft": job.result.get("aptos_nft"),
+                    "message": "🎉 Congratulations! You've won NFTs from both blockchain and Aptos!"
                 }
-            else:
-                print(f"[APTOS_NFT_ERROR] Failed to mint NFT: {mint_result.get('error')}")
-                return {
-                    "success": False,
-                    "message": "Failed to mint Aptos NFT",
-                    "error": mint_result.get("error"),
-                    "winner_wallet": winner_wallet,
-                    "aptos_wallet": aptos_wallet_address
+            })
+        else:
+            await self.manager.broadcast_to_room(job.room_id, {
+                "type": "nft_error",
+                "payload": {
+                    "winner_wallet": job.winner_wallet,
+                    "error": job.last_error,
+                    "room_id": job.room_id,
+                    "message": "Sorry, there was an error minting your NFTs."
                 }
-            
-        except Exception as e:
-            print(f"[APTOS_NFT_ERROR] Error in _mint_aptos_nft: {str(e)}")
-            return {
-                "success": False,
-                "message": "Error minting Aptos NFT",
-                "error": str(e),
-                "winner_wallet": winner_wallet
-            }
+            })
 
     async def force_end_game_for_test(self, room_id: str):
         """Force kết thúc game cho mục đích test NFT"""
+        return await self.cluster.call(room_id, "game.force_end", {"room_id": room_id})
+
+    async def _force_end_game(self, room_id: str):
         # print(f"[TEST] Force ending game for room {room_id}")
         await self._handle_game_end(room_id)
         return {"message": f"Game force ended for room {room_id}"}
 
     async def test_aptos_nft_mint(self, room_id: str, winner_wallet: str):
         """Test Aptos NFT minting cho mục đích test"""
-        print(f"[TEST] Testing Aptos NFT mint for room {room_id}, winner {winner_wallet}")
+        nft_log.info("[TEST] Testing Aptos NFT mint for room %s, winner %s", room_id, winner_wallet)
         
         # Lấy thông tin user để có aptos_wallet
         user = await self.user_repo.get_by_wallet(winner_wallet)
@@ -1012,12 +1029,20 @@ class WebSocketController:
                 "winner_wallet": winner_wallet
             }
         
-        print(f"[TEST] User {winner_wallet} has Aptos wallet: {user.aptos_wallet}")
-        result = await self._mint_aptos_nft(room_id, winner_wallet)
-        return result
+        nft_log.info("[TEST] User %s has Aptos wallet: %s", winner_wallet, user.aptos_wallet)
+        try:
+            return await self.rewards.mint_aptos(room_id, winner_wallet)
+        except Exception as e:
+            return {
+                "success": False,
+                "message": "Error minting Aptos NFT",
+                "error": str(e),
+                "winner_wallet": winner_wallet
+            }
 
-    async def handle_lobby_socket(self, websocket: WebSocket):
+    async def handle_lobby_socket(self, websocket: WebSocket, since: Optional[int] = None, epoch: Optional[str] = None):
         await self.manager.connect_lobby(websocket)
+        self._send_lobby_changes(websocket, since, epoch)
         try:
             while True:
                 try:
@@ -1026,7 +1051,11 @@ class WebSocketController:
                     break
 
                 msg_type = data.get("type")
-                handler = {"ping": self._handle_ping, "broadcast": self._handle_broadcast}.get(msg_type)
+                handler = {
+                    "ping": self._handle_ping,
+                    "broadcast": self._handle_broadcast,
+                    "lobby_resume": self._handle_lobby_resume,
+                }.get(msg_type)
                 if handler:
                     await handler(websocket, data)
         finally:
@@ -1047,6 +1076,39 @@ class WebSocketController:
 
         # Bước 2: Kết nối người chơi vào WebSocketManager
         await self.manager.connect_room(websocket, room_id, wallet_id)
+        # conn_id để worker sở hữu phòng (nếu là worker khác) gửi message riêng về kết nối này
+        conn_id = self.manager.register_proxy(websocket)
+
+        # Owner được kiểm tra lại ở mỗi message: phòng có thể được worker khác tiếp quản giữa chừng
+        if self.cluster.is_owner(room_id):
+            await self.actors.run(room_id, with_origin("connect", lambda: self._on_room_socket_connected(websocket, room, player)))
+        else:
+            self._forward_room_message(conn_id, room_id, wallet_id, {"type": REMOTE_CONNECT})
+
+        # Bước 4: Vòng lặp xử lý tin nhắn
+        try:
+            while True:
+                data = await websocket.receive_json()
+                if self.cluster.is_owner(room_id):
+                    await self._dispatch_room_message(websocket, room_id, wallet_id, data)
+                    continue
+                self._forward_room_message(conn_id, room_id, wallet_id, data)
+                if data.get("type") == "leave_room":
+                    self.manager.disconnect_room(websocket, room_id)
+        except (WebSocketDisconnect, RuntimeError):
+            if self.cluster.is_owner(room_id):
+                await self.actors.run(room_id, with_origin("disconnect", lambda: self._handle_disconnect_ws(websocket, room_id, wallet_id, {})))
+            else:
+                # Chỉ coi là mất kết nối hẳn khi người chơi không còn kết nối nào khác ở worker này
+                others = self.manager.player_connections.get(wallet_id, set()) - {websocket}
+                self._forward_room_message(conn_id, room_id, wallet_id, {"type": REMOTE_DISCONNECT, "last": not others})
+        finally:
+            # Luôn đảm bảo ngắt kết nối khỏi manager khi coroutine kết thúc
+            self.manager.unregister_proxy(conn_id)
+            self.manager.disconnect_room(websocket, room_id)
+
+    async def _on_room_socket_connected(self, websocket: WebSocket, room: Room, player: Player):
+        room_id, wallet_id = room.id, player.wallet_id
 
         # Bước 3: Xử lý các kịch bản kết nối
         is_reconnecting = player.player_status == PLAYER_STATUS.DISCONNECTED
@@ -1067,7 +1129,7 @@ class WebSocketController:
 
         # Kịch bản 1: Phục hồi game bị "cũ" (quan trọng nhất)
         if is_reconnecting and is_game_in_progress_and_stale:
-            print(f"[RECOVERY] Player {wallet_id} reconnected to a stale game in room {room_id}. Recovering state.")
+            log.info("[RECOVERY] Player %s reconnected to a stale game in room %s. Recovering state.", wallet_id, room_id)
             
             # 1a. Cập nhật trạng thái người chơi
             player.player_status = PLAYER_STATUS.ACTIVE
@@ -1082,12 +1144,12 @@ class WebSocketController:
             # 1c. "Làm mới" câu hỏi hiện tại bằng cách gửi lại nó với một timestamp mới.
             # Đây là hành động cốt lõi để sửa lỗi time_remaining_ms.
             # Thao tác này sẽ broadcast 'next_question' cho TẤT CẢ mọi người trong phòng.
-            print(f"[RECOVERY] Re-sending current question {room.current_index} to refresh timers.")
+            log.info("[RECOVERY] Re-sending current question %s to refresh timers.", room.current_index)
             await self._send_current_question(room_id, force=True)
             
         # Kịch bản 2: Người chơi reconnect vào một game đang chạy bình thường hoặc ở phòng chờ
         elif is_reconnecting:
-            print(f"[RECONNECT] Player {wallet_id} reconnected to room {room_id}.")
+            ws_log.info("[RECONNECT] Player %s reconnected to room %s.", wallet_id, room_id)
             
             # Cập nhật trạng thái người chơi về lại trạng thái phù hợp
             player_status_before_disconnect = PLAYER_STATUS.ACTIVE if room.status == GAME_STATUS.IN_PROGRESS else PLAYER_STATUS.READY if player.is_ready or player.is_host else PLAYER_STATUS.WAITING
@@ -1105,12 +1167,11 @@ class WebSocketController:
             
         # Kịch bản 3: Kết nối mới (ví dụ: mở tab khác)
         else:
-            print(f"[CONNECT] Player {wallet_id} established a new connection to room {room_id}.")
+            ws_log.info("[CONNECT] Player %s established a new connection to room %s.", wallet_id, room_id)
             # Chỉ cần gửi gói tin đồng bộ hóa, không cần broadcast.
             await self._send_game_sync_payload(websocket, room_id)
-        
-        
-        # Bước 4: Vòng lặp xử lý tin nhắn (giữ nguyên)
+
+    async def _dispatch_room_message(self, websocket: WebSocket, room_id: str, wallet_id: str, data: dict):
         room_handlers = {
             "chat": self._handle_chat,
             "kick_player": self._handle_kick_player,
@@ -1119,20 +1180,61 @@ class WebSocketController:
             "leave_room": self._handle_leave_room,
             # player_disconnected được xử lý qua disconnect event, không cần handler ở đây
         }
+        msg_type = data.get("type")
+        handler = room_handlers.get(msg_type)
+        if handler:
+            await self.actors.run(room_id, with_origin(msg_type, lambda: handler(websocket, room_id, wallet_id, data)))
+        else:
+            ws_log.warning("[WS] No handler found for message type: %s", msg_type)
+
+    # ==================================
+    # Phòng thuộc worker khác
+    # ==================================
+
+    def _forward_room_message(self, conn_id: str, room_id: str, wallet_id: str, data: dict):
+        """
+        Phòng thuộc worker khác: worker này chỉ giữ kết nối, message của client được chuyển nguyên vẹn
+        tới owner; message riêng đi ngược lại qua conn_id, broadcast của phòng tới qua bus.
+        """
+        self.cluster.send(self.cluster.owner_of(room_id), "room.ws", {
+            "origin": self.cluster.worker_id, "conn": conn_id,
+            "room_id": room_id, "wallet_id": wallet_id, "data": data,
+        })
+
+    def _on_remote_room_message(self, payload: dict):
+        # Mỗi kết nối có một hàng đợi riêng để message được xử lý tuần tự như với kết nối trực tiếp
+        conn_id = payload["conn"]
+        queue = self.remote_sessions.get(conn_id)
+        if queue is None:
+            queue = self.remote_sessions[conn_id] = asyncio.Queue()
+            asyncio.create_task(self._run_remote_session(payload, queue))
+        queue.put_nowait(payload["data"])
+
+    async def _run_remote_session(self, session: dict, queue: asyncio.Queue):
+        room_id, wallet_id = session["room_id"], session["wallet_id"]
+        websocket = RemoteSocket(self.cluster, session["origin"], session["conn"])
         try:
             while True:
-                data = await websocket.receive_json()
+                data = await queue.get()
                 msg_type = data.get("type")
-                handler = room_handlers.get(msg_type)
-                if handler:
-                    await handler(websocket, room_id, wallet_id, data)
-                else:
-                    print(f"[DEBUG] No handler found for message type: {msg_type}")
-        except (WebSocketDisconnect, RuntimeError):
-            await self._handle_disconnect_ws(websocket, room_id, wallet_id, {})
+                try:
+                    if msg_type == REMOTE_CONNECT:
+                        room = await self.room_service.get_room(room_id)
+                        player = next((p for p in room.players if p.wallet_id == wallet_id), None) if room else None
+                        if not player:
+                            await websocket.close(code=1008, reason="Player not found in this room")
+                            return
+                        await self.actors.run(room_id, with_origin("connect", lambda: self._on_room_socket_connected(websocket, room, player)))
+                    elif msg_type == REMOTE_DISCONNECT:
+                        if data.get("last"):
+                            await self.actors.run(room_id, with_origin("disconnect", lambda: self._handle_disconnect_ws(websocket, room_id, wallet_id, {})))
+                        return
+                    else:
+                        await self._dispatch_room_message(websocket, room_id, wallet_id, data)
+                except Exception as e:
+                    log.error("[CLUSTER] Failed to handle %s from remote connection in room %s: %s", msg_type, room_id, e)
         finally:
-            # Luôn đảm bảo ngắt kết nối khỏi manager khi coroutine kết thúc
-            self.manager.disconnect_room(websocket, room_id)
+            self.remote_sessions.pop(session["conn"], None)
     
     async def _check_and_show_question_result(self, room_id: str):
         room = await self.room_service.get_room(room_id)
@@ -1140,40 +1242,35 @@ class WebSocketController:
         if not room or not room.current_question:
             return
 
-        # 1. Lấy tập hợp wallet của những người đã trả lời
-        current_question_answers = await self.answer_service.get_answers_by_room_and_question_id(room.id, room.current_question.id)
-        answered_wallets = {a.wallet_id for a in current_question_answers}
+        # 1. Tally của câu hiện tại: bitset người active và người đã trả lời, không quét answers
+        tally = self.room_service.get_answer_tally(room)
+        question_id = room.current_question.id
 
-        # 2. Lấy tập hợp wallet của những người đang active
-        active_players = [p for p in room.players if p.player_status != PLAYER_STATUS.DISCONNECTED]
-        active_wallets = {p.wallet_id for p in active_players}
-        
         # In logs để debug
-        print(f"[CHECK_RESULT] Room {room.id} - Active Wallets: {active_wallets}")
-        print(f"[CHECK_RESULT] Room {room.id} - Answered Wallets: {answered_wallets}")
-
-        # 3. ĐIỀU KIỆN ĐÚNG: Kiểm tra xem tập hợp người active có phải là TẬP CON của tập hợp người đã trả lời không
-        # Điều này đảm bảo MỌI người đang active đều phải có trong danh sách đã trả lời.
-        # Thêm `and active_wallets` để đảm bảo không chạy khi không có người chơi active nào.
-        if active_wallets and active_wallets.issubset(answered_wallets):
-            print(f"[CHECK_RESULT] Condition met: All active players have answered. Proceeding to show result.")
+        answered_count, active_count = tally.counts(question_id)
+        log.debug("[CHECK_RESULT] Room %s - Answered: %s/%s active players", room.id, answered_count, active_count)
+
+        # 2. ĐIỀU KIỆN ĐÚNG: MỌI người đang active đều đã trả lời,
+        # và có ít nhất một người chơi active.
+        if tally.all_answered(question_id):
+            log.debug("[CHECK_RESULT] Condition met: All active players have answered. Proceeding to show result.")
             
-            # Hủy task fallback nếu có
-            if room.id in self.active_tasks:
-                try:
-                    self.active_tasks[room.id].cancel()
-                except asyncio.CancelledError:
-                    pass # Bỏ qua lỗi nếu task đã bị hủy rồi
-                self.active_tasks.pop(room.id, None)
+            # Timer fallback đã chốt câu này trước đó thì không hiện kết quả lần nữa
+            if room.id in self.is_moving_to_next:
+                return
+            self.is_moving_to_next.add(room.id)
+
+            # Hủy timer fallback nếu có
+            self.timers.cancel(room.id, QUESTION_TIMEOUT)
 
             await self._show_question_result(room.id)
         else:
-            print(f"[CHECK_RESULT] Condition NOT met. Waiting for more answers from: {active_wallets - answered_wallets}")
+            log.debug("[CHECK_RESULT] Condition NOT met. Waiting for more answers from: %s", tally.unanswered(question_id))
             
     async def _send_game_sync_payload(self, websocket: WebSocket, room_id: str):
         room = await self.room_service.get_room(room_id)
         if not room:
-            print(f"[SYNC_ERROR] Room {room_id} not found.")
+            log.warning("[SYNC_ERROR] Room %s not found.", room_id)
             return
 
         current_question_payload = None
@@ -1196,7 +1293,7 @@ class WebSocketController:
                 now_utc = datetime.now(timezone.utc)
                 time_remaining_ms = question_end_time - int(now_utc.timestamp() * 1000)
 
-                print(f"[SYNC_CALC] Start: {started_at_aware.isoformat()}, Now: {now_utc.isoformat()}, Remaining (ms): {time_remaining_ms}")
+                log.debug("[SYNC_CALC] Start: %s, Now: %s, Remaining (ms): %s", started_at_aware, now_utc, time_remaining_ms)
 
                 if time_remaining_ms > (SEND_ONLY_REAMIN_TIME_IN_SECONDS * 1000):
                     question_config = QUESTION_CONFIG.get(current_question.difficulty, {})
@@ -1211,11 +1308,11 @@ class WebSocketController:
                         },
                         "config": question_config,
                     }
-                    print("[SYNC_RESULT] Time condition MET. Payload CREATED.")
+                    log.debug("[SYNC_RESULT] Time condition MET. Payload CREATED.")
                 else:
-                    print("[SYNC_RESULT] Time condition NOT MET. Payload is null.")
+                    log.debug("[SYNC_RESULT] Time condition NOT MET. Payload is null.")
             else:
-                print(f"[SYNC_RESULT] Pre-condition NOT MET. Index: {is_valid_index}, StartTime: {has_started_time}, QuestionObj: {current_question is not None}. Payload is null.")
+                log.debug("[SYNC_RESULT] Pre-condition NOT MET. Index: %s, StartTime: %s, QuestionObj: %s. Payload is null.", is_valid_index, has_started_time, current_question is not None)
         
         # Tạo payload cuối cùng
         sync_payload = {
@@ -1238,7 +1335,7 @@ class WebSocketController:
             "serverTime": int(time.time() * 1000),
         }
         
-        await send_json_safe(websocket, {
+        self.manager.send_personal(websocket, {
             "type": "game_sync",
             "payload": sync_payload
         })
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime
 from decimal import Decimal
 import json
@@ -10,6 +11,16 @@ import re
 from fastapi.encoders import jsonable_encoder
 from fastapi.websockets import WebSocketState
 
+from config.constants import WS_SEND_TIMEOUT_SECONDS
+from config.logging_config import WS, get_logger
+
+log = get_logger(WS)
+
+try:
+    import orjson
+except ImportError:  # orjson là tùy chọn, không có thì dùng json chuẩn
+    orjson = None
+
 def snake_to_camel(s: str) -> str:
     return re.sub(r'_([a-z])', lambda m: m.group(1).upper(), s)
 
@@ -51,16 +62,30 @@ def json_safe(obj: Any, exclude: Set[str] = None):
 
     raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
 
-async def send_json_safe(websocket: WebSocket | None, data: dict):
-    if websocket:
-        if websocket.client_state != WebSocketState.CONNECTED:
-            print("⚠️ WebSocket already closed, cannot send message.")
-            return
-
-        try:
-            print(f"[SEND_JSON]: {data}")
-            await websocket.send_json(jsonable_encoder(data))
-        except Exception as e:
-            print(f"❌ Failed to send safe camelCase WS message: {e}")
-    else:
-        print("⚠️ No websocket to send message to.")
+def encode_frame(data: Any) -> str:
+    """Encode một message WebSocket thành text frame (dùng orjson nếu có)."""
+    encoded = jsonable_encoder(data)
+    if orjson is not None:
+        return orjson.dumps(encoded).decode()
+    return json.dumps(encoded, separators=(",", ":"), ensure_ascii=False)
+
+async def send_text_safe(websocket: WebSocket | None, frame: str, timeout: float = WS_SEND_TIMEOUT_SECONDS) -> bool:
+    """Gửi một frame đã encode sẵn. Trả về False nếu socket đã đóng, lỗi hoặc gửi quá `timeout` giây."""
+    if not websocket or websocket.client_state != WebSocketState.CONNECTED:
+        return False
+
+    try:
+        await asyncio.wait_for(websocket.send_text(frame), timeout=timeout)
+        return True
+    except asyncio.TimeoutError:
+        log.warning("WS send timed out after %ss", timeout)
+        return False
+    except Exception as e:
+        log.warning("Failed to send WS message: %s", e)
+        return False
+
+async def send_json_safe(websocket: WebSocket | None, data: dict) -> bool:
+    if not websocket:
+        log.debug("No websocket to send message to.")
+        return False
+    return await send_text_safe(websocket, encode_frame(data))
@@ -0,0 +1,14 @@
+from postgrest.exceptions import APIError
+
+# Lỗi PostgREST cho biết schema không hỗ trợ truy vấn (khác với lỗi tạm thời của một lần gọi)
+SCHEMA_ERROR_CODES = {
+    "PGRST200",  # không có khóa ngoại để embed bảng con
+    "PGRST201",  # nhiều quan hệ, embed không rõ ràng
+    "PGRST202",  # không tìm thấy hàm RPC
+    "42883",     # Postgres: hàm không tồn tại
+}
+
+
+def is_schema_error(e: Exception) -> bool:
+    """True nếu lỗi là do schema (thiếu quan hệ, thiếu hàm), không phải do mạng hay DB quá tải."""
+    return isinstance(e, APIError) and e.code in SCHEMA_ERROR_CODES
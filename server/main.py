@@ -3,7 +3,9 @@ from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
+from config.chain import get_chain_clients
 from config.database import init_async_supabase
+from config.logging_config import dropped_records, setup_logging, shutdown_logging
 from routers.websocket_router import create_ws_router
 from routers.room_router import create_room_router
 from routers.player_router import create_player_router
@@ -14,6 +16,7 @@ from routers.user_router import create_user_router
 from routers.nft_router import create_nft_router
 from routers.aptos_router import create_aptos_router
 from routers.user_post_router import create_user_post_router
+from routers.metrics_router import create_metrics_router
 
 from controllers.websocket_controller import WebSocketController
 from controllers.room_controller import RoomController
@@ -26,7 +29,13 @@ from controllers.nft_controller import NFTController
 from controllers.aptos_controller import AptosController
 from controllers.user_post_controller import UserPostController
 
+from services.metrics import OriginMiddleware, instrument, instrument_supabase, metrics
+from services.room_actor import RoomActors
+from services.timer_wheel import TimerWheel
 from services.websocket_manager import WebSocketManager
+from services.broadcast_bus import create_broadcast_bus
+from services.cluster import Cluster
+from services.room_ownership import RoomOwnership
 from repositories.implement.zkproof_repo_impl import ZkProofRepository
 from services.zkproof_service import ZkProofService
 from services.game_service import GameService
@@ -38,10 +47,21 @@ from repositories.implement.question_repo_impl import QuestionRepository
 from repositories.implement.answer_repo_impl import AnswerRepository
 from repositories.implement.user_repo_impl import UserRepository, UserStatsRepository
 from repositories.implement.user_post_repo_impl import UserPostRepository
+from repositories.implement.room_lease_repo_impl import RoomLeaseRepository
+from repositories.implement.in_memory_repo_impl import InMemoryRoomLeaseRepository
+from repositories.implement.reward_job_repo_impl import RewardJobRepository
 
 from services.room_service import RoomService
+from services.rank_engine import RankEngine
+from services.reward_queue import REWARD_WORKERS, RewardQueue
+from services.batch_reward_minter import APTOS_BATCH_SIZE, BatchRewardMinter
+from services.leaderboard_service import LeaderboardService
+from services.lobby_state import LobbyState
+from services.room_state_store import RoomStateStore
+from services.write_behind_queue import WriteBehindQueue
 from services.player_service import PlayerService
 from services.question_service import QuestionService
+from services.question_bank import QuestionBank
 from services.answer_service import AnswerService
 from services.user_post_service import UserPostService
 
@@ -58,42 +78,89 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Gắn origin `http` cho các lời gọi repository/PostgREST phát sinh từ REST API (xem /metrics)
+app.add_middleware(OriginMiddleware)
 
 # -------------------- Lifespan --------------------
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Log của các nhóm ws/db/nft/game đi qua hàng đợi, ghi ra stdout ở thread riêng
+    setup_logging()
     supabase = await init_async_supabase()
     app.state.async_supabase = supabase
+    instrument_supabase(supabase)
 
-    # Repositories
-    player_repo = PlayerRepository(supabase=supabase)
-    room_repo = RoomRepository(player_repo=player_repo, supabase=supabase)
-    question_repo = QuestionRepository(supabase=supabase)
-    user_repo = UserRepository(supabase=supabase)
-    answer_repo = AnswerRepository(supabase=supabase)
-    user_stats_repo = UserStatsRepository(supabase=supabase)
-    user_post_repo = UserPostRepository(supabase=supabase)
+    # Repositories (mỗi method được đo số lần gọi / độ trễ / lỗi, xuất ở /metrics)
+    player_repo = instrument(PlayerRepository(supabase=supabase))
+    room_repo = instrument(RoomRepository(player_repo=player_repo, supabase=supabase))
+    question_repo = instrument(QuestionRepository(supabase=supabase))
+    user_repo = instrument(UserRepository(supabase=supabase))
+    answer_repo = instrument(AnswerRepository(supabase=supabase))
+    user_stats_repo = instrument(UserStatsRepository(supabase=supabase))
+    user_post_repo = instrument(UserPostRepository(supabase=supabase))
 
     # Services
-    room_service = RoomService(room_repo, player_repo, answer_repo)
-    player_service = PlayerService(player_repo, room_repo)
-    question_service = QuestionService(question_repo)
+    # Mỗi process là một worker của cluster (WORKER_ID, CLUSTER_WORKERS), nói chuyện với nhau qua bus
+    cluster = Cluster(create_broadcast_bus())
+    await cluster.start()
+    write_behind = WriteBehindQueue(room_repo, player_repo, answer_repo)
+    write_behind.start()
+    actors = RoomActors()
+    room_state = RoomStateStore(room_repo, player_repo, answer_repo, write_behind, owns=cluster.is_owner, defer=actors.in_actor)
+    actors.on_drained.append(room_state.flush_deferred)
+    # Một worker thì lease chỉ cần nằm trong bộ nhớ; nhiều worker thì dùng chung bảng room_leases
+    room_lease_repo = InMemoryRoomLeaseRepository() if cluster.single else instrument(RoomLeaseRepository(supabase=supabase))
+    ownership = RoomOwnership(room_lease_repo, room_repo, cluster)
+    room_service = RoomService(room_repo, player_repo, answer_repo, room_state)
+    player_service = PlayerService(player_repo, room_repo, room_state)
+    question_bank = QuestionBank(question_repo)
+    question_bank.start()
+    question_service = QuestionService(question_repo, question_bank)
     answer_service = AnswerService(answer_repo, user_repo)
     zkproof_service = ZkProofService(ZkProofRepository())
     game_service = GameService(room_service, question_service, zkproof_service, answer_service)
-    websocket_manager = WebSocketManager()
+    timers = TimerWheel()
+    websocket_manager = WebSocketManager(cluster, timers)
+    metrics.gauges["timer_wheel"] = timers.stats
+    metrics.gauges["room_actors"] = actors.stats
+    metrics.gauges["log"] = lambda: {"dropped_records": dropped_records()}
+    lobby_state = LobbyState(websocket_manager, room_repo, cluster)
+    await lobby_state.load()
+    room_state.listeners.append(lobby_state.on_room_changed)
+    rank_engine = RankEngine(supabase)
+    leaderboard_service = LeaderboardService(user_stats_repo)
+    leaderboard_service.start()
     user_post_service = UserPostService(user_post_repo)
+    # Trao NFT chạy nền; job nằm ở bảng reward_jobs nên job dở dang được chạy tiếp sau khi khởi động lại
+    # Client web3 / Aptos được tạo ở lần dùng đầu tiên: node không mint không phải trả chi phí khởi tạo
+    chain = get_chain_clients()
+    blockchain_service, aptos_service = chain.blockchain, chain.aptos
+    aptos_minter = None
+    reward_workers = REWARD_WORKERS
+    if APTOS_BATCH_SIZE > 1:
+        aptos_minter = BatchRewardMinter(aptos_service)
+        metrics.gauges["aptos_batch"] = aptos_minter.stats
+        # Mỗi job chờ lô của nó nên cần đủ job chạy cùng lúc để lấp đầy một lô
+        reward_workers = max(REWARD_WORKERS, APTOS_BATCH_SIZE)
+    rewards = RewardQueue(
+        instrument(RewardJobRepository(supabase=supabase)), blockchain_service, aptos_service, user_repo, cluster.worker_id,
+        workers=reward_workers, aptos_minter=aptos_minter,
+    )
+    metrics.gauges["rewards"] = rewards.stats
+    metrics.gauges["chain"] = chain.stats
+    metrics.gauges["evm"] = chain.evm_stats
+    metrics.gauges["aptos_tx"] = chain.aptos_tx_stats
 
     # Controllers
-    app.state.room_controller = RoomController(room_service, game_service, player_service, websocket_manager)
-    app.state.player_controller = PlayerController(player_service, websocket_manager)
+    app.state.room_controller = RoomController(room_service, game_service, player_service, websocket_manager, cluster, actors)
+    app.state.player_controller = PlayerController(player_service, websocket_manager, cluster, actors)
     app.state.question_controller = QuestionController(question_service)
     app.state.answer_controller = AnswerController(answer_service, room_service, game_service)
-    app.state.user_controller = UserController(user_repo, user_stats_repo)
+    app.state.user_controller = UserController(user_repo, user_stats_repo, leaderboard_service)
     app.state.zkproof_controller = ZkProofController(zkproof_service)
-    app.state.websocket_controller = WebSocketController(websocket_manager, player_service, room_service, question_service, answer_service, user_repo, user_stats_repo)
-    app.state.nft_controller = NFTController()
-    app.state.aptos_controller = AptosController()
+    app.state.websocket_controller = WebSocketController(websocket_manager, player_service, room_service, question_service, answer_service, user_repo, user_stats_repo, rank_engine, leaderboard_service, lobby_state, cluster, ownership, timers, actors, rewards)
+    app.state.nft_controller = NFTController(blockchain_service)
+    app.state.aptos_controller = AptosController(aptos_service)
     app.state.user_post_controller = UserPostController(user_post_service)
 
     # Router Setup
@@ -111,9 +178,28 @@ async def lifespan(app: FastAPI):
     ws_router = create_ws_router(app.state.websocket_controller)
     app.include_router(ws_router, prefix="/ws")
     app.include_router(api_router)
+    app.include_router(create_metrics_router(metrics))
+
+    # Tiếp quản các game đang chạy dở sau khi controller đã sẵn sàng
+    await ownership.start()
+    rewards.start()
 
     yield
 
+    # Ghi nốt các thay đổi còn trong hàng đợi xuống DB trước khi tắt
+    await ownership.stop()
+    await rewards.stop()
+    if aptos_minter:
+        await aptos_minter.stop()
+    await chain.close()
+    await timers.stop()
+    await actors.stop()
+    await question_bank.stop()
+    await leaderboard_service.stop()
+    await write_behind.stop()
+    await cluster.stop()
+    shutdown_logging()
+
 app.router.lifespan_context = lifespan
 
 # -------------------- Uvicorn Runner --------------------
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from models.base import CamelModel
+
+
+# Việc trao NFT cho người thắng của một phòng; room_id là khóa nên mỗi phòng chỉ có một job dù được enqueue nhiều lần
+class RewardJob(CamelModel):
+    room_id: str
+    winner_wallet: str
+    status: str = "pending"  # pending | running | done | failed
+    attempts: int = 0
+    # Kết quả của từng bước đã xong (blockchain_mint, blockchain_nft, aptos_nft): lần thử lại bỏ qua các bước này
+    result: Dict[str, Any] = {}
+    last_error: Optional[str] = None
+    run_at: datetime
+    locked_by: Optional[str] = None
+    locked_until: Optional[datetime] = None
+    created_at: Optional[datetime] = None
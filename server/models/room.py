@@ -50,8 +50,8 @@ class Room(CamelModel):
         return data
 
     @classmethod
-    def create(cls, **kwargs) -> "Room":
-        generated_id = str(uuid.uuid4())
+    def create(cls, room_id: Optional[str] = None, **kwargs) -> "Room":
+        generated_id = room_id or str(uuid.uuid4())
         room_code = generated_id[-4:]
         return cls(id=generated_id, room_code=room_code, **kwargs)
     
@@ -0,0 +1,10 @@
+from datetime import datetime
+
+from models.base import CamelModel
+
+
+# Quyền điều khiển game loop của một phòng: chỉ worker đang giữ lease còn hạn mới được chạy timer của phòng
+class RoomLease(CamelModel):
+    room_id: str
+    holder: str
+    expires_at: datetime
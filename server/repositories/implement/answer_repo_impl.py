@@ -1,43 +1,61 @@
 from typing import List, Optional
 
 from supabase import AsyncClient
+from config.logging_config import DB, get_logger
 from models.answer import Answer
 from repositories.interfaces.answer_repo import IAnswerRepository
+
+log = get_logger(DB)
+
+
 class AnswerRepository(IAnswerRepository):
     def __init__(self, supabase: AsyncClient):
         self.supabase = supabase
         self.table = "answers"
 
+    def _to_row(self, answer: Answer) -> dict:
+        data = answer.model_dump()
+        # Convert datetime fields to ISO format strings
+        if data.get("created_at"):
+            data["created_at"] = data["created_at"].isoformat()
+        if data.get("submitted_at"):
+            data["submitted_at"] = data["submitted_at"].isoformat()
+        
+        # Only save fields that exist in the database schema
+        db_fields = {
+            "id": data.get("id"),
+            "question_id": data.get("question_id"),
+            "wallet_id": data.get("wallet_id"),
+            "room_id": data.get("room_id"),
+            "answer": data.get("answer"),
+            "is_correct": data.get("is_correct"),
+            "score": data.get("score"),
+            "response_time": data.get("response_time"),
+            "created_at": data.get("created_at"),
+            "answer_type": data.get("answer_type", "regular"),
+            "tie_break_round": data.get("tie_break_round")
+        }
+        
+        # Remove None values
+        return {k: v for k, v in db_fields.items() if v is not None}
+
     async def save(self, answer: Answer) -> None:
         try:
-            data = answer.model_dump()
-            # Convert datetime fields to ISO format strings
-            if data.get("created_at"):
-                data["created_at"] = data["created_at"].isoformat()
-            if data.get("submitted_at"):
-                data["submitted_at"] = data["submitted_at"].isoformat()
-            
-            # Only save fields that exist in the database schema
-            db_fields = {
-                "id": data.get("id"),
-                "question_id": data.get("question_id"),
-                "wallet_id": data.get("wallet_id"),
-                "room_id": data.get("room_id"),
-                "answer": data.get("answer"),
-                "is_correct": data.get("is_correct"),
-                "score": data.get("score"),
-                "response_time": data.get("response_time"),
-                "created_at": data.get("created_at"),
-                "answer_type": data.get("answer_type", "regular"),
-                "tie_break_round": data.get("tie_break_round")
-            }
-            
-            # Remove None values
-            db_fields = {k: v for k, v in db_fields.items() if v is not None}
-            
-            await self.supabase.table(self.table).insert(db_fields).execute()
+            await self.supabase.table(self.table).insert(self._to_row(answer)).execute()
+        except Exception as e:
+            log.error("Error saving answer: %s", e)
+
+    async def save_many(self, answers: List[Answer]) -> bool:
+        if not answers:
+            return True
+        try:
+            rows = [self._to_row(a) for a in answers]
+            # Upsert theo id để việc retry một batch không tạo bản ghi trùng
+            await self.supabase.table(self.table).upsert(rows, on_conflict="id", ignore_duplicates=True).execute()
+            return True
         except Exception as e:
-            print(f"Error saving answer: {e}")
+            log.error("Error bulk saving %s answers: %s", len(answers), e)
+            return False
 
     async def get_answers_by_room(self, room_id: str) -> List[Answer]:
         try:
@@ -49,7 +67,7 @@ class AnswerRepository(IAnswerRepository):
             )
             return [Answer(**item) for item in (response.data or [])]
         except Exception as e:
-            print(f"Error fetching answers for room {room_id}: {e}")
+            log.error("Error fetching answers for room %s: %s", room_id, e)
             return []
 
     async def get_answers_by_wallet_id(self, room_id: str, wallet_id: str) -> List[Answer]:
@@ -63,7 +81,7 @@ class AnswerRepository(IAnswerRepository):
             )
             return [Answer(**item) for item in (response.data or [])]
         except Exception as e:
-            print(f"Error fetching answers for wallet {wallet_id} in room {room_id}: {e}")
+            log.error("Error fetching answers for wallet %s in room %s: %s", wallet_id, room_id, e)
             return []
 
     async def get_answers_by_room_and_question(self, room_id: str, question_index: int) -> List[Answer]:
@@ -79,7 +97,7 @@ class AnswerRepository(IAnswerRepository):
             )
             return [Answer(**item) for item in (response.data or [])]
         except Exception as e:
-            print(f"Error fetching answers for question {question_index} in room {room_id}: {e}")
+            log.error("Error fetching answers for question %s in room %s: %s", question_index, room_id, e)
             return []
 
     async def get_answers_by_room_and_question_id(self, room_id: str, question_id: str) -> List[Answer]:
@@ -94,7 +112,7 @@ class AnswerRepository(IAnswerRepository):
             )
             return [Answer(**item) for item in (response.data or [])]
         except Exception as e:
-            print(f"Error fetching answers for question_id {question_id} in room {room_id}: {e}")
+            log.error("Error fetching answers for question_id %s in room %s: %s", question_id, room_id, e)
             return []
 
     async def get_score_by_user(self, room_id: str, wallet_id: str) -> float:
@@ -114,7 +132,7 @@ class AnswerRepository(IAnswerRepository):
                     total_score += 1 + bonus
             return total_score
         except Exception as e:
-            print(f"Error calculating score for user {wallet_id} in room {room_id}: {e}")
+            log.error("Error calculating score for user %s in room %s: %s", wallet_id, room_id, e)
             return 0.0
 
     async def get_answer_by_question_and_wallet(
@@ -0,0 +1,241 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from enums.game_status import GAME_STATUS
+from models.answer import Answer
+from models.player import Player
+from models.room import Room
+from models.room_lease import RoomLease
+from repositories.interfaces.answer_repo import IAnswerRepository
+from repositories.interfaces.player_repo import IPlayerRepository
+from repositories.interfaces.room_lease_repo import IRoomLeaseRepository
+from repositories.interfaces.room_repo import IRoomRepository
+
+
+# Repositories lưu trong bộ nhớ, dùng thay Supabase khi chạy local/test.
+# Mỗi repository đếm số lần gọi theo method (`calls`) và ghi lại kích thước
+# của từng lần ghi theo lô (`batches`) để kiểm tra hành vi gom lô.
+
+class InMemoryPlayerRepository(IPlayerRepository):
+    def __init__(self):
+        self.rows: Dict[Tuple[str, str], Player] = {}
+        self.calls: Counter = Counter()
+        self.batches: List[int] = []
+
+    async def save_all(self, room_id: str, players: List[Player]) -> None:
+        self.calls["save_all"] += 1
+        self.batches.append(len(players))
+        for p in players:
+            self.rows[(room_id, p.wallet_id)] = p.model_copy(update={"room_id": room_id, "answers": []})
+
+    async def save_many(self, players: List[Player]) -> bool:
+        self.calls["save_many"] += 1
+        self.batches.append(len(players))
+        for p in players:
+            self.rows[(p.room_id, p.wallet_id)] = p.model_copy(update={"answers": []})
+        return True
+
+    async def get_by_room(self, room_id: str) -> List[Player]:
+        self.calls["get_by_room"] += 1
+        return [p.model_copy() for (r, _), p in self.rows.items() if r == room_id]
+
+    async def get_by_wallet_id(self, wallet_id: str) -> List[Player]:
+        self.calls["get_by_wallet_id"] += 1
+        return [p.model_copy() for (_, w), p in self.rows.items() if w == wallet_id]
+
+    async def get_player_by_wallet_and_room_id(self, room_id: str, wallet_id: str) -> Optional[Player]:
+        self.calls["get_player_by_wallet_and_room_id"] += 1
+        p = self.rows.get((room_id, wallet_id))
+        return p.model_copy() if p else None
+
+    async def delete_player_by_room(self, wallet_id: str, room_id: str) -> bool:
+        self.calls["delete_player_by_room"] += 1
+        self.rows.pop((room_id, wallet_id), None)
+        return True
+
+    async def update_player(self, wallet_id: str, updates: dict, room_id: Optional[str] = None) -> bool:
+        self.calls["update_player"] += 1
+        for (r, w), p in list(self.rows.items()):
+            if w == wallet_id and (room_id is None or r == room_id):
+                self.rows[(r, w)] = p.model_copy(update=updates)
+        return True
+
+
+class InMemoryRoomRepository(IRoomRepository):
+    def __init__(
+        self,
+        player_repo: Optional[InMemoryPlayerRepository] = None,
+        answer_repo: Optional["InMemoryAnswerRepository"] = None,
+    ):
+        self.player_repo = player_repo
+        self.answer_repo = answer_repo
+        self.rows: Dict[str, Room] = {}
+        self.calls: Counter = Counter()
+        self.batches: List[int] = []
+
+    def _copy(self, room: Room) -> Room:
+        return room.model_copy(update={"players": []})
+
+    async def get_all(self, status: str = GAME_STATUS.WAITING) -> List[Room]:
+        self.calls["get_all"] += 1
+        room_ids = [r.id for r in self.rows.values() if not status or r.status == status]
+        rooms = await self.get_many(room_ids)
+        if self.player_repo:
+            rooms = [room for room in rooms if room.players]
+        return rooms
+
+    async def get(self, room_id: str) -> Optional[Room]:
+        self.calls["get"] += 1
+        room = self.rows.get(room_id)
+        return self._copy(room) if room else None
+
+    async def get_hydrated(self, room_id: str) -> Optional[Room]:
+        rooms = await self.get_many([room_id], with_answers=True)
+        return rooms[0] if rooms else None
+
+    async def get_many(self, room_ids: List[str], with_answers: bool = False) -> List[Room]:
+        self.calls["get_many"] += 1
+        rooms = [self._copy(self.rows[r]) for r in dict.fromkeys(room_ids) if r in self.rows]
+        for room in rooms:
+            if self.player_repo:
+                room.players = [p.model_copy() for (r, _), p in self.player_repo.rows.items() if r == room.id]
+            if with_answers and self.answer_repo:
+                for p in room.players:
+                    p.answers = self.answer_repo._filter(room_id=room.id, wallet_id=p.wallet_id)
+        return rooms
+
+    async def get_by_code(self, room_code: str) -> Optional[Room]:
+        self.calls["get_by_code"] += 1
+        room = next((r for r in self.rows.values() if r.room_code == room_code), None)
+        return self._copy(room) if room else None
+
+    async def save(self, room: Room) -> bool:
+        self.calls["save"] += 1
+        self.rows[room.id] = self._copy(room)
+        return True
+
+    async def save_many(self, rooms: List[Room]) -> bool:
+        self.calls["save_many"] += 1
+        self.batches.append(len(rooms))
+        for room in rooms:
+            self.rows[room.id] = self._copy(room)
+        return True
+
+    async def delete_room(self, room_id: str) -> None:
+        self.calls["delete_room"] += 1
+        self.rows.pop(room_id, None)
+        if self.player_repo:
+            for key in [k for k in self.player_repo.rows if k[0] == room_id]:
+                self.player_repo.rows.pop(key, None)
+        return True
+
+    async def delete_old_rooms(self, hours_old: int = 24) -> bool:
+        self.calls["delete_old_rooms"] += 1
+        return True
+
+    async def get_user_game_histories(self, wallet_id: str, status: Optional[str] = None, limit: int = 20, offset: int = 0) -> List[Room]:
+        self.calls["get_user_game_histories"] += 1
+        if not self.player_repo:
+            return []
+        room_ids = {r for (r, w) in self.player_repo.rows if w == wallet_id}
+        rooms = [self._copy(self.rows[r]) for r in room_ids if r in self.rows]
+        if status:
+            rooms = [r for r in rooms if r.status == status]
+        rooms.sort(key=lambda r: r.ended_at or r.created_at, reverse=True)
+        rooms = rooms[offset:offset + limit]
+        for room in rooms:
+            room.players = await self.player_repo.get_by_room(room.id)
+        return rooms
+
+
+class InMemoryAnswerRepository(IAnswerRepository):
+    def __init__(self):
+        self.rows: Dict[str, Answer] = {}
+        self.calls: Counter = Counter()
+        self.batches: List[int] = []
+
+    async def save(self, answer: Answer) -> None:
+        self.calls["save"] += 1
+        self.rows[str(answer.id)] = answer.model_copy()
+
+    async def save_many(self, answers: List[Answer]) -> bool:
+        self.calls["save_many"] += 1
+        self.batches.append(len(answers))
+        for answer in answers:
+            self.rows.setdefault(str(answer.id), answer.model_copy())
+        return True
+
+    def _filter(self, **conditions) -> List[Answer]:
+        return [
+            a.model_copy() for a in self.rows.values()
+            if all(str(getattr(a, k)) == str(v) for k, v in conditions.items())
+        ]
+
+    async def get_answers_by_room(self, room_id: str) -> List[Answer]:
+        self.calls["get_answers_by_room"] += 1
+        return self._filter(room_id=room_id)
+
+    async def get_answers_by_wallet_id(self, room_id: str, wallet_id: str) -> List[Answer]:
+        self.calls["get_answers_by_wallet_id"] += 1
+        return self._filter(room_id=room_id, wallet_id=wallet_id)
+
+    async def get_answers_by_room_and_question(self, room_id: str, question_index: int) -> List[Answer]:
+        self.calls["get_answers_by_room_and_question"] += 1
+        return self._filter(room_id=room_id)
+
+    async def get_answers_by_room_and_question_id(self, room_id: str, question_id: str) -> List[Answer]:
+        self.calls["get_answers_by_room_and_question_id"] += 1
+        return self._filter(room_id=room_id, question_id=question_id)
+
+    async def get_score_by_user(self, room_id: str, wallet_id: str) -> float:
+        self.calls["get_score_by_user"] += 1
+        return float(sum(a.score for a in self._filter(room_id=room_id, wallet_id=wallet_id)))
+
+    async def get_answer_by_question_and_wallet(self, room_id: str, question_id: str, wallet_id: str) -> Optional[Answer]:
+        self.calls["get_answer_by_question_and_wallet"] += 1
+        answers = self._filter(room_id=room_id, question_id=question_id, wallet_id=wallet_id)
+        return answers[0] if answers else None
+
+
+class InMemoryRoomLeaseRepository(IRoomLeaseRepository):
+    # Dùng chung một instance cho nhiều Cluster trong cùng process để giả lập nhiều worker
+    def __init__(self):
+        self.rows: Dict[str, RoomLease] = {}
+        self.calls: Counter = Counter()
+
+    async def acquire(self, room_id: str, holder: str, ttl_seconds: int) -> Optional[datetime]:
+        self.calls["acquire"] += 1
+        now = datetime.now(timezone.utc)
+        lease = self.rows.get(room_id)
+        if lease and lease.holder != holder and lease.expires_at >= now:
+            return None
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        self.rows[room_id] = RoomLease(room_id=room_id, holder=holder, expires_at=expires_at)
+        return expires_at
+
+    async def renew(self, holder: str, room_ids: List[str], ttl_seconds: int) -> List[str]:
+        self.calls["renew"] += 1
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+        renewed = []
+        for room_id in room_ids:
+            lease = self.rows.get(room_id)
+            if lease and lease.holder == holder:
+                lease.expires_at = expires_at
+                renewed.append(room_id)
+        return renewed
+
+    async def release(self, room_id: str, holder: str) -> None:
+        self.calls["release"] += 1
+        lease = self.rows.get(room_id)
+        if lease and lease.holder == holder:
+            del self.rows[room_id]
+
+    async def get_all(self) -> List[RoomLease]:
+        self.calls["get_all"] += 1
+        return [lease.model_copy() for lease in self.rows.values()]
+
+    async def get_expired(self) -> List[RoomLease]:
+        self.calls["get_expired"] += 1
+        now = datetime.now(timezone.utc)
+        return [lease.model_copy() for lease in self.rows.values() if lease.expires_at < now]
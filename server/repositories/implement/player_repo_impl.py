@@ -4,49 +4,62 @@ from typing import List, Optional
 
 from supabase import AsyncClient
 
+from config.logging_config import DB, get_logger
 from helpers.json_helper import json_safe
 from repositories.interfaces.player_repo import IPlayerRepository
 from models.player import Player
+
+log = get_logger(DB)
+
+
 class PlayerRepository(IPlayerRepository):
     def __init__(self, supabase: AsyncClient):
         self.supabase = supabase
         self.table = "room_players"
 
+    def _to_row(self, room_id: str, p: Player) -> dict:
+        return {
+            "room_id": room_id,
+            "wallet_id": p.wallet_id,
+            "username": p.username,
+            "score": p.score,
+            "joined_at": p.joined_at.isoformat() if p.joined_at else None,
+            "is_host": p.is_host,
+            "is_winner": p.is_winner,
+            "player_status": p.player_status,
+            "is_ready": p.is_ready,
+        }
+
     async def save_all(self, room_id: str, players: List[Player]) -> None:
         try:
-            # Instead of delete + insert, use upsert to handle duplicates
-            data = []
-            for p in players:
-                data.append({
-                    "room_id": room_id,
-                    "wallet_id": p.wallet_id,
-                    "username": p.username,
-                    "score": p.score,
-                    "joined_at": p.joined_at.isoformat() if p.joined_at else None,
-                    "is_host": p.is_host,
-                    "is_winner": p.is_winner,
-                    "player_status": p.player_status,
-                    "is_ready": p.is_ready,
-                })
-
-            if data:
-                # Remove duplicates based on room_id and wallet_id
-                unique_data = list({
-                    (d["room_id"], d["wallet_id"]): d for d in data
-                }.values())
-
-                # Use upsert to handle existing records
-                for player_data in unique_data:
-                    try:
-                        await self.supabase.table(self.table).upsert(
-                            player_data,
-                            on_conflict="room_id,wallet_id"
-                        ).execute()
-                    except Exception as e:
-                        print(f"Error upserting player {player_data['wallet_id']} in room {room_id}: {e}")
+            data = [self._to_row(room_id, p) for p in players]
+            await self._upsert_rows(data)
+        except Exception as e:
+            log.error("Error in save_all for room %s: %s", room_id, e)
 
+    async def save_many(self, players: List[Player]) -> bool:
+        try:
+            data = [self._to_row(p.room_id, p) for p in players]
+            await self._upsert_rows(data)
+            return True
         except Exception as e:
-            print(f"Error in save_all for room {room_id}: {e}")
+            log.error("Error bulk saving %s players: %s", len(players), e)
+            return False
+
+    async def _upsert_rows(self, data: List[dict]) -> None:
+        if not data:
+            return
+
+        # Remove duplicates based on room_id and wallet_id
+        unique_data = list({
+            (d["room_id"], d["wallet_id"]): d for d in data
+        }.values())
+
+        # Một lệnh upsert cho toàn bộ danh sách thay vì một lệnh cho mỗi player
+        await self.supabase.table(self.table).upsert(
+            unique_data,
+            on_conflict="room_id,wallet_id"
+        ).execute()
 
     async def get_by_room(self, room_id: str) -> List[Player]:
         try:
@@ -73,7 +86,7 @@ class PlayerRepository(IPlayerRepository):
             return players
 
         except Exception as e:
-            print(f"Error fetching players for room {room_id}: {e}")
+            log.error("Error fetching players for room %s: %s", room_id, e)
             return []
 
     async def get_player_by_wallet_and_room_id(self, room_id: str, wallet_id: str) -> Optional[Player]:
@@ -92,7 +105,7 @@ class PlayerRepository(IPlayerRepository):
             
             return Player(**res.data[0])
         except Exception as e:
-            print(f"{room_id} - Fetch player {wallet_id} failed: {e}")
+            log.error("%s - Fetch player %s failed: %s", room_id, wallet_id, e)
             return None
 
     async def get_by_wallet_id(self, wallet_id: str) -> List[Player]:
@@ -105,10 +118,10 @@ class PlayerRepository(IPlayerRepository):
             )
             return [Player(**item) for item in res.data]
         except Exception as e:
-            print(f"Fetch player by wallet {wallet_id} failed: {e}")
+            log.error("Fetch player by wallet %s failed: %s", wallet_id, e)
             return []
 
-    async def delete_player_by_room(self, wallet_id: str, room_id: str) -> None:
+    async def delete_player_by_room(self, wallet_id: str, room_id: str) -> bool:
         try:
             await (
                 self.supabase.table(self.table)
@@ -117,15 +130,19 @@ class PlayerRepository(IPlayerRepository):
                 .eq("room_id", room_id)
                 .execute()
             )
+            return True
         except Exception as e:
-            print(f"Delete player {wallet_id} in room {room_id} failed: {e}")
+            log.error("Delete player %s in room %s failed: %s", wallet_id, room_id, e)
+            return False
 
-    async def update_player(self, wallet_id: str, updates: dict, room_id: Optional[str] = None) -> None:
+    async def update_player(self, wallet_id: str, updates: dict, room_id: Optional[str] = None) -> bool:
         try:
             safe_updates = json.loads(json.dumps(updates, default=json_safe))
             query = self.supabase.table(self.table).update(safe_updates).eq("wallet_id", wallet_id)
             if room_id:
                 query = query.eq("room_id", room_id)
             await query.execute()
+            return True
         except Exception as e:
-            print(f"Failed to update player {wallet_id}: {e}")
+            log.error("Failed to update player %s: %s", wallet_id, e)
+            return False
@@ -1,5 +1,5 @@
 import random
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from supabase import AsyncClient
 from enums.question_difficulty import QUESTION_DIFFICULTY
 from models.question import Question
@@ -9,6 +9,39 @@ class QuestionRepository(IQuestionRepository):
     def __init__(self, supabase: AsyncClient):
         self.supabase = supabase
         self.table = "questions"
+        self.page_size = 1000
+
+    async def get_all(self) -> List[Question]:
+        """Toàn bộ câu hỏi, đọc theo trang để không bị giới hạn số dòng của PostgREST."""
+        questions = []
+        start = 0
+        while True:
+            res = await (
+                self.supabase
+                .table(self.table)
+                .select("*")
+                .order("id")
+                .range(start, start + self.page_size - 1)
+                .execute()
+            )
+            page = res.data or []
+            questions.extend(Question(**q) for q in page)
+            if len(page) < self.page_size:
+                return questions
+            start += self.page_size
+
+    async def get_fingerprint(self) -> Tuple[int, Optional[str]]:
+        """(số câu hỏi, updated_at mới nhất) - đủ rẻ để kiểm tra ngân hàng câu hỏi có thay đổi không."""
+        res = await (
+            self.supabase
+            .table(self.table)
+            .select("id, updated_at", count="exact")
+            .order("updated_at", desc=True, nullsfirst=False)
+            .limit(1)
+            .execute()
+        )
+        latest = res.data[0].get("updated_at") if res.data else None
+        return res.count or 0, latest
 
     async def get_random(self) -> Optional[Question]:
         try:
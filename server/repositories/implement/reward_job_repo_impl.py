@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from supabase import AsyncClient
+from config.logging_config import DB, get_logger
+from models.reward_job import RewardJob
+from repositories.interfaces.reward_job_repo import IRewardJobRepository
+
+log = get_logger(DB)
+
+
+class RewardJobRepository(IRewardJobRepository):
+    """
+    Job lưu ở bảng `reward_jobs` (sql/reward_jobs.sql). Việc giành job là một update có điều kiện
+    trên (status, attempts) đọc được trước đó: nếu worker khác đã giành trước thì update không khớp dòng nào.
+    """
+    def __init__(self, supabase: AsyncClient):
+        self.supabase = supabase
+        self.table = "reward_jobs"
+
+    async def enqueue(self, job: RewardJob) -> bool:
+        try:
+            data = job.model_dump(mode="json", exclude_none=True)
+            res = await (
+                self.supabase.table(self.table)
+                .upsert(data, on_conflict="room_id", ignore_duplicates=True)
+                .execute()
+            )
+            return bool(res.data)
+        except Exception as e:
+            log.error("[REWARD_JOB] Error enqueueing job for room %s: %s", job.room_id, e)
+            raise
+
+    async def claim(self, worker_id: str, limit: int, lease_seconds: int) -> List[RewardJob]:
+        now = datetime.now(timezone.utc)
+        due = await (
+            self.supabase.table(self.table)
+            .select("*")
+            .eq("status", "pending")
+            .lte("run_at", now.isoformat())
+            .order("run_at")
+            .limit(limit)
+            .execute()
+        )
+        stale = await (
+            self.supabase.table(self.table)
+            .select("*")
+            .eq("status", "running")
+            .lt("locked_until", now.isoformat())
+            .limit(limit)
+            .execute()
+        )
+
+        claimed = []
+        for row in (due.data or []) + (stale.data or []):
+            if len(claimed) >= limit:
+                break
+            res = await (
+                self.supabase.table(self.table)
+                .update({
+                    "status": "running",
+                    "attempts": row["attempts"] + 1,
+                    "locked_by": worker_id,
+                    "locked_until": (now + timedelta(seconds=lease_seconds)).isoformat(),
+                })
+                .eq("room_id", row["room_id"])
+                .eq("status", row["status"])
+                .eq("attempts", row["attempts"])
+                .execute()
+            )
+            if res.data:
+                claimed.append(RewardJob(**res.data[0]))
+        return claimed
+
+    async def _update(self, job: RewardJob, worker_id: str, values: dict) -> bool:
+        # Lượt giành job được xác định bởi (locked_by, attempts): claim lại job hết lease luôn tăng attempts,
+        # kể cả khi chính worker này (cùng WORKER_ID sau khi khởi động lại) giành lại
+        res = await (
+            self.supabase.table(self.table)
+            .update(values)
+            .eq("room_id", job.room_id)
+            .eq("status", "running")
+            .eq("locked_by", worker_id)
+            .eq("attempts", job.attempts)
+            .execute()
+        )
+        return bool(res.data)
+
+    async def save_progress(self, job: RewardJob, worker_id: str, result: Dict[str, Any], lease_seconds: int) -> bool:
+        locked_until = datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)
+        return await self._update(job, worker_id, {"result": result, "locked_until": locked_until.isoformat()})
+
+    async def complete(self, job: RewardJob, worker_id: str, result: Dict[str, Any]) -> bool:
+        return await self._update(job, worker_id, {"status": "done", "result": result, "last_error": None, "locked_by": None, "locked_until": None})
+
+    async def retry(self, job: RewardJob, worker_id: str, error: str, run_at: datetime) -> bool:
+        return await self._update(job, worker_id, {"status": "pending", "last_error": error, "run_at": run_at.isoformat(), "locked_by": None, "locked_until": None})
+
+    async def fail(self, job: RewardJob, worker_id: str, error: str) -> bool:
+        return await self._update(job, worker_id, {"status": "failed", "last_error": error, "locked_by": None, "locked_until": None})
+
+    async def get(self, room_id: str) -> Optional[RewardJob]:
+        try:
+            res = await self.supabase.table(self.table).select("*").eq("room_id", room_id).limit(1).execute()
+            return RewardJob(**res.data[0]) if res.data else None
+        except Exception as e:
+            log.error("[REWARD_JOB] Error fetching job for room %s: %s", room_id, e)
+            return None
@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from supabase import AsyncClient
+from config.logging_config import DB, get_logger
+from models.room_lease import RoomLease
+from repositories.interfaces.room_lease_repo import IRoomLeaseRepository
+
+log = get_logger(DB)
+
+
+class RoomLeaseRepository(IRoomLeaseRepository):
+    """
+    Lease lưu ở bảng `room_leases`. Giành và gia hạn dùng các hàm SQL trong sql/room_leases.sql
+    để kiểm tra điều kiện và ghi trong cùng một câu lệnh (không có race giữa các worker).
+    """
+    def __init__(self, supabase: AsyncClient):
+        self.supabase = supabase
+        self.table = "room_leases"
+
+    async def acquire(self, room_id: str, holder: str, ttl_seconds: int) -> Optional[datetime]:
+        try:
+            res = await self.supabase.rpc("acquire_room_lease", {
+                "p_room_id": room_id, "p_holder": holder, "p_ttl_seconds": ttl_seconds,
+            }).execute()
+            return datetime.fromisoformat(res.data) if res.data else None
+        except Exception as e:
+            log.error("[ROOM_LEASE] Error acquiring lease for room %s: %s", room_id, e)
+            return None
+
+    async def renew(self, holder: str, room_ids: List[str], ttl_seconds: int) -> List[str]:
+        if not room_ids:
+            return []
+        try:
+            res = await self.supabase.rpc("renew_room_leases", {
+                "p_holder": holder, "p_room_ids": room_ids, "p_ttl_seconds": ttl_seconds,
+            }).execute()
+            return [row if isinstance(row, str) else row["renew_room_leases"] for row in res.data or []]
+        except Exception as e:
+            # Ném lại lỗi: bên gọi cần phân biệt DB lỗi tạm thời với lease đã bị worker khác lấy
+            log.error("[ROOM_LEASE] Error renewing %s leases: %s", len(room_ids), e)
+            raise
+
+    async def release(self, room_id: str, holder: str) -> None:
+        try:
+            await (
+                self.supabase.table(self.table)
+                .delete()
+                .eq("room_id", room_id)
+                .eq("holder", holder)
+                .execute()
+            )
+        except Exception as e:
+            log.error("[ROOM_LEASE] Error releasing lease for room %s: %s", room_id, e)
+
+    async def get_all(self) -> List[RoomLease]:
+        try:
+            res = await self.supabase.table(self.table).select("*").execute()
+            return [RoomLease(**row) for row in res.data or []]
+        except Exception as e:
+            log.error("[ROOM_LEASE] Error fetching leases: %s", e)
+            return []
+
+    async def get_expired(self) -> List[RoomLease]:
+        try:
+            res = await (
+                self.supabase.table(self.table)
+                .select("*")
+                .lt("expires_at", datetime.now(timezone.utc).isoformat())
+                .execute()
+            )
+            return [RoomLease(**row) for row in res.data or []]
+        except Exception as e:
+            log.error("[ROOM_LEASE] Error fetching expired leases: %s", e)
+            return []
@@ -1,19 +1,30 @@
 from collections import defaultdict
 from supabase import AsyncClient
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional
 
+from config.logging_config import DB, get_logger
 from helpers.json_helper import json_safe
+from helpers.postgrest_helper import is_schema_error
+from models.answer import Answer
 from models.room import Room
 from repositories.interfaces.player_repo import IPlayerRepository
 from repositories.interfaces.room_repo import IRoomRepository
 from enums.game_status import GAME_STATUS
 from models.player import Player
+
+log = get_logger(DB)
+
+
 class RoomRepository(IRoomRepository):
     def __init__(self, player_repo: IPlayerRepository, supabase: AsyncClient):
         self.table = "challenge_rooms"
         self.supabase = supabase
         self.player_repo = player_repo
+        self.players_table = "room_players"
+        self.answers_table = "answers"
+        # Tắt embedded select nếu schema không có khóa ngoại để PostgREST tự join
+        self._embed_supported = True
 
     async def get_all(self, status: str = GAME_STATUS.WAITING) -> List[Room]:
         try:
@@ -21,20 +32,115 @@ class RoomRepository(IRoomRepository):
             if status:
                 query = query.eq("status", status)
             response = await query.execute()
-            data = response.data
+            room_rows = response.data or []
+            if not self.player_repo:
+                return [Room(**item) for item in room_rows]
+
+            # Lấy players của tất cả các phòng trong một query thay vì một query mỗi phòng
+            players_by_room = await self._fetch_players([item["id"] for item in room_rows])
             rooms = []
-            for item in data:
-                room = Room(**item)
-                if self.player_repo:
-                    room.players = await self.player_repo.get_by_room(room.id)
-                    if not room.players:
-                        continue
-                rooms.append(room)
+            for item in room_rows:
+                item["players"] = players_by_room.get(item["id"], [])
+                if not item["players"]:
+                    continue
+                rooms.append(Room(**item))
             return rooms
         except Exception as e:
-            print(f"Error fetching rooms: {e}")
+            log.error("Error fetching rooms: %s", e)
             return []
 
+    async def get_hydrated(self, room_id: str) -> Optional[Room]:
+        """Lấy room kèm players và answers của từng player."""
+        rooms = await self.get_many([room_id], with_answers=True)
+        return rooms[0] if rooms else None
+
+    async def get_many(self, room_ids: List[str], with_answers: bool = False) -> List[Room]:
+        """
+        Lấy nhiều room kèm players (và answers nếu cần).
+        Dùng một embedded select của PostgREST; nếu không được thì tối đa một query mỗi bảng.
+        """
+        room_ids = list(dict.fromkeys(room_ids))
+        if not room_ids:
+            return []
+
+        if self._embed_supported:
+            try:
+                return await self._get_many_embedded(room_ids, with_answers)
+            except Exception as e:
+                # Chỉ tắt hẳn khi schema không hỗ trợ; lỗi khác chỉ làm lần gọi này dùng các query riêng
+                if is_schema_error(e):
+                    log.warning("Embedded room select unavailable, falling back to per-table queries: %s", e)
+                    self._embed_supported = False
+                else:
+                    log.warning("Embedded room select failed, retrying with per-table queries: %s", e)
+
+        try:
+            res = await self.supabase.table(self.table).select("*").in_("id", room_ids).execute()
+            room_rows = res.data or []
+            if not room_rows:
+                return []
+
+            found_ids = [item["id"] for item in room_rows]
+            players_by_room = await self._fetch_players(found_ids)
+            answers_by_player = await self._fetch_answers(found_ids) if with_answers else {}
+            return self._build_rooms(room_rows, players_by_room, answers_by_player)
+        except Exception as e:
+            log.error("Error fetching rooms %s from Supabase: %s", room_ids, e)
+            return []
+
+    async def _get_many_embedded(self, room_ids: List[str], with_answers: bool) -> List[Room]:
+        select = f"*, {self.players_table}(*)"
+        if with_answers:
+            select += f", {self.answers_table}(*)"
+        res = await self.supabase.table(self.table).select(select).in_("id", room_ids).execute()
+
+        room_rows = []
+        players_by_room: Dict[str, List[Player]] = defaultdict(list)
+        answers_by_player: Dict[tuple, List[Answer]] = defaultdict(list)
+        for item in res.data or []:
+            for p_data in item.pop(self.players_table, None) or []:
+                players_by_room[item["id"]].append(Player(**p_data))
+            for a_data in item.pop(self.answers_table, None) or []:
+                answers_by_player[(item["id"], a_data["wallet_id"])].append(Answer(**a_data))
+            room_rows.append(item)
+        return self._build_rooms(room_rows, players_by_room, answers_by_player)
+
+    async def _fetch_players(self, room_ids: List[str]) -> Dict[str, List[Player]]:
+        players_by_room: Dict[str, List[Player]] = defaultdict(list)
+        if not room_ids:
+            return players_by_room
+        res = await self.supabase.table(self.players_table).select("*").in_("room_id", room_ids).execute()
+        for p_data in res.data or []:
+            try:
+                players_by_room[p_data["room_id"]].append(Player(**p_data))
+            except Exception as e:
+                log.error("Error parsing player data: %s. Error: %s", p_data, e)
+        return players_by_room
+
+    async def _fetch_answers(self, room_ids: List[str]) -> Dict[tuple, List[Answer]]:
+        answers_by_player: Dict[tuple, List[Answer]] = defaultdict(list)
+        res = await self.supabase.table(self.answers_table).select("*").in_("room_id", room_ids).execute()
+        for a_data in res.data or []:
+            try:
+                answers_by_player[(str(a_data["room_id"]), a_data["wallet_id"])].append(Answer(**a_data))
+            except Exception as e:
+                log.error("Error parsing answer data: %s. Error: %s", a_data, e)
+        return answers_by_player
+
+    @staticmethod
+    def _build_rooms(room_rows: List[dict], players_by_room: dict, answers_by_player: dict) -> List[Room]:
+        rooms = []
+        for room_data in room_rows:
+            try:
+                room = Room(**room_data)
+                room.players = players_by_room.get(room.id, [])
+                for p in room.players:
+                    p.answers = answers_by_player.get((room.id, p.wallet_id), [])
+                rooms.append(room)
+            except Exception as e:
+                log.error("Error parsing room data: %s. Error: %s", room_data, e)
+        return rooms
+
     def question_to_dict_safe(self, q):
         d = q.dict() if hasattr(q, 'dict') else dict(q)
         for k, v in d.items():
@@ -42,13 +148,27 @@ class RoomRepository(IRoomRepository):
                 d[k] = v.isoformat()
         return d
 
+    def _to_row(self, room: Room) -> dict:
+        return json_safe(room, exclude={"players", "proof", "question_configs", "tie_break_winners"})
+
     async def save(self, room: Room) -> bool:
         try:
-            data = json_safe(room, exclude={"players", "proof", "question_configs", "tie_break_winners"})
+            data = self._to_row(room)
             await self.supabase.table(self.table).upsert(data).execute()
             return True
         except Exception as e:
-            print(f"Error saving room {room.id} to self.Supabase: {str(e)}")
+            log.error("Error saving room %s to Supabase: %s", room.id, e)
+            return False
+
+    async def save_many(self, rooms: List[Room]) -> bool:
+        if not rooms:
+            return True
+        try:
+            data = [self._to_row(room) for room in rooms]
+            await self.supabase.table(self.table).upsert(data).execute()
+            return True
+        except Exception as e:
+            log.error("Error bulk saving %s rooms to Supabase: %s", len(rooms), e)
             return False
 
     async def get(self, room_id: str) -> Optional[Room]:
@@ -64,7 +184,7 @@ class RoomRepository(IRoomRepository):
                 return Room(**res.data[0])
             return None
         except Exception as e:
-            print(f"Error fetching room {room_id} from self.Supabase: {str(e)}")
+            log.error("Error fetching room %s from Supabase: %s", room_id, e)
             return None
 
     async def get_by_code(self, room_code: str) -> Optional[Room]:
@@ -80,15 +200,17 @@ class RoomRepository(IRoomRepository):
                 return Room(**res.data[0])
             return None
         except Exception as e:
-            print(f"Error fetching room {room_code} from self.Supabase: {str(e)}")
+            log.error("Error fetching room %s from Supabase: %s", room_code, e)
             return None
 
-    async def delete_room(self, room_id: str) -> None:
+    async def delete_room(self, room_id: str) -> bool:
         try:
             await self.supabase.table("room_players").delete().eq("room_id", room_id).execute()
             await self.supabase.table(self.table).delete().eq("id", room_id).execute()
+            return True
         except Exception as e:
-            print(f"Error deleting room {room_id}: {e}")
+            log.error("Error deleting room %s: %s", room_id, e)
+            return False
 
     async def delete_old_rooms(self, hours_old=24) -> bool:
         try:
@@ -98,7 +220,7 @@ class RoomRepository(IRoomRepository):
             ).execute()
             return True
         except Exception as e:
-            print(f"Error deleting old rooms from self.Supabase: {str(e)}")
+            log.error("Error deleting old rooms from Supabase: %s", e)
             return False
         
     async def get_user_game_histories(
@@ -156,7 +278,7 @@ class RoomRepository(IRoomRepository):
                 # Chuyển đổi thành đối tượng Player ngay tại đây
                 players_by_room_id[p_data["room_id"]].append(Player(**p_data))
             except Exception as e:
-                print(f"Error parsing player data: {p_data}. Error: {e}")
+                log.error("Error parsing player data: %s. Error: %s", p_data, e)
                 continue
 
         # --- BƯỚC 5: Xây dựng danh sách Room cuối cùng (không có truy vấn DB nào nữa) ---
@@ -168,7 +290,7 @@ class RoomRepository(IRoomRepository):
                 room_data["players"] = players_by_room_id.get(room_id, [])
                 final_rooms.append(Room(**room_data))
             except Exception as e:
-                print(f"Error parsing room data: {room_data}. Error: {e}")
+                log.error("Error parsing room data: %s. Error: %s", room_data, e)
                 continue
 
         return final_rooms
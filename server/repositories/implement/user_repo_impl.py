@@ -1,4 +1,7 @@
+from collections import defaultdict
 from datetime import datetime, timezone, timedelta
+from typing import List
+from enums.game_status import GAME_STATUS
 from enums.leaderboard_period import LEADERBOARD_PERIOD
 from models.user import User
 from supabase import AsyncClient
@@ -74,11 +77,13 @@ class UserRepository:
 
 class UserStatsRepository:
     table = "user_stats"
+    page_size = 1000
 
     def __init__(self, supabase: AsyncClient):
         self.supabase = supabase
 
     async def update_user_stats(self, wallet_id: str, score: int, is_winner: bool):
+        """Cộng điểm cho user. Trả về (điểm cũ hoặc None nếu user mới, điểm mới) để tính lại rank."""
         res = await self.supabase.table(self.table).select("*").eq("wallet_id", wallet_id).execute()
         stats = res.data or []
         if stats and len(stats) == 1:
@@ -89,6 +94,7 @@ class UserStatsRepository:
                 "total_score": new_score,
                 "games_won": new_wins
             }).eq("wallet_id", wallet_id).execute()
+            return stat["total_score"], new_score
         elif not stats:
             await self.supabase.table(self.table).insert({
                 "wallet_id": wallet_id,
@@ -96,8 +102,10 @@ class UserStatsRepository:
                 "games_won": 1 if is_winner else 0,
                 "rank": 0  # Sửa từ "Unrank" thành 0
             }).execute()
+            return None, score
         else:
             print(f"[ERROR] Multiple user_stats found with wallet_id={wallet_id}, cannot update stats.")
+            return None
 
     async def get_leaderboard(self, limit=10, period=LEADERBOARD_PERIOD.ALL_TIME):
         now = datetime.now(timezone.utc)
@@ -122,22 +130,67 @@ class UserStatsRepository:
             row["username"] = row.get("users", {}).get("username", "") if row.get("users") else ""
         return data
 
-    async def recalculate_ranks(self):
-        # 1. Lấy tất cả user stats có total_score
-        res = await self.supabase.table(self.table).select("wallet_id, total_score").order("total_score", desc=True).execute()
-        stats = res.data or []
-
-        # 2. Sắp xếp và gán thứ hạng
-        for idx, stat in enumerate(stats):
-            wallet_id = stat["wallet_id"]
-            rank = idx + 1  # Rank bắt đầu từ 1
-
-            # 3. Cập nhật rank cho từng user
-            await self.supabase.table(self.table).update({
-                "rank": rank
-            }).eq("wallet_id", wallet_id).execute()
-
     async def get_user_stats(self, wallet_id: str):
         res = await self.supabase.table(self.table).select("*").eq("wallet_id", wallet_id).execute()
         stats = res.data or []
-        return stats[0] if stats else None
\ No newline at end of file
+        return stats[0] if stats else None
+
+    async def get_all_stats(self) -> List[dict]:
+        """Toàn bộ user_stats kèm username, đọc theo trang (dùng để dựng leaderboard trong bộ nhớ)."""
+        rows = await self._fetch_pages(
+            lambda: self.supabase.table(self.table)
+            .select("wallet_id, total_score, games_won, games_played, tier, users(username)")
+            .order("wallet_id")
+        )
+        for row in rows:
+            row["username"] = row.get("users", {}).get("username", "") if row.get("users") else ""
+        return rows
+
+    async def get_game_events_since(self, since: datetime) -> List[dict]:
+        """
+        Kết quả từng game của từng người chơi kể từ `since`:
+        [{room_id, wallet_id, score, is_winner, ended_at}], điểm lấy từ bảng answers.
+        """
+        rooms = await self._fetch_pages(
+            lambda: self.supabase.table("challenge_rooms")
+            .select("id, winner_wallet_id, ended_at")
+            .eq("status", GAME_STATUS.FINISHED)
+            .gte("ended_at", since.isoformat())
+            .order("id")
+        )
+        rooms_by_id = {r["id"]: r for r in rooms}
+        if not rooms_by_id:
+            return []
+
+        answers = await self._fetch_pages(
+            lambda: self.supabase.table("answers")
+            .select("id, room_id, wallet_id, score")
+            .gte("created_at", since.isoformat())
+            .order("id")
+        )
+        scores = defaultdict(int)
+        for a in answers:
+            if a["room_id"] in rooms_by_id:
+                scores[(a["room_id"], a["wallet_id"])] += a.get("score") or 0
+
+        return [
+            {
+                "room_id": room_id,
+                "wallet_id": wallet_id,
+                "score": score,
+                "is_winner": rooms_by_id[room_id].get("winner_wallet_id") == wallet_id,
+                "ended_at": datetime.fromisoformat(rooms_by_id[room_id]["ended_at"]),
+            }
+            for (room_id, wallet_id), score in scores.items()
+        ]
+
+    async def _fetch_pages(self, make_query) -> List[dict]:
+        rows = []
+        start = 0
+        while True:
+            res = await make_query().range(start, start + self.page_size - 1).execute()
+            page = res.data or []
+            rows.extend(page)
+            if len(page) < self.page_size:
+                return rows
+            start += self.page_size
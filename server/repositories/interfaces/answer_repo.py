@@ -11,6 +11,11 @@ class IAnswerRepository(ABC):
         """Lưu 1 câu trả lời của người chơi"""
         pass
 
+    @abstractmethod
+    async def save_many(self, answers: List[Answer]) -> bool:
+        """Lưu nhiều câu trả lời trong một lệnh"""
+        pass
+
     @abstractmethod
     async def get_answers_by_room(self, room_id: str) -> List[Answer]:
         """Truy xuất tất cả câu trả lời trong 1 phòng"""
@@ -7,6 +7,10 @@ class IPlayerRepository(ABC):
     async def save_all(self, room_id: str, players: List[Player]) -> None:
         pass
 
+    @abstractmethod
+    async def save_many(self, players: List[Player]) -> bool:
+        pass
+
     @abstractmethod
     async def get_by_room(self, room_id: str) -> List[Player]:
         pass
@@ -20,9 +24,9 @@ class IPlayerRepository(ABC):
         pass
 
     @abstractmethod
-    async def delete_player_by_room(self, player_id, room_id) -> None:
+    async def delete_player_by_room(self, player_id, room_id) -> bool:
         pass
 
     @abstractmethod
-    async def update_player(self, player_id: str, updates: dict, room_id: str) -> None:
+    async def update_player(self, player_id: str, updates: dict, room_id: str) -> bool:
         pass
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Optional, Tuple
 from enums.question_difficulty import QUESTION_DIFFICULTY
 from models.question import Question
 class IQuestionRepository(ABC):
@@ -8,4 +9,12 @@ class IQuestionRepository(ABC):
 
     @abstractmethod
     async def get_random_by_difficulty(self, difficulty: QUESTION_DIFFICULTY, limit: int = 10) -> list[Question]:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    async def get_all(self) -> list[Question]:
+        pass
+
+    @abstractmethod
+    async def get_fingerprint(self) -> Tuple[int, Optional[str]]:
+        pass
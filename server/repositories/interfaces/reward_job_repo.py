@@ -0,0 +1,43 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from models.reward_job import RewardJob
+
+
+class IRewardJobRepository(ABC):
+    @abstractmethod
+    async def enqueue(self, job: RewardJob) -> bool:
+        """Thêm job nếu phòng chưa có job nào. Trả về False nếu đã có (không ghi đè)"""
+        pass
+
+    @abstractmethod
+    async def claim(self, worker_id: str, limit: int, lease_seconds: int) -> List[RewardJob]:
+        """Giành tối đa `limit` job đến hạn (hoặc `running` đã hết lease), tăng attempts; mỗi job chỉ một worker giành được"""
+        pass
+
+    # Các lệnh ghi dưới đây chỉ có tác dụng khi `worker_id` còn giữ đúng lượt giành `job` (locked_by, attempts).
+    # Trả về False nếu job đã bị worker khác giành lại sau khi hết lease: worker này phải bỏ job.
+
+    @abstractmethod
+    async def save_progress(self, job: RewardJob, worker_id: str, result: Dict[str, Any], lease_seconds: int) -> bool:
+        """Lưu kết quả các bước đã xong của job đang chạy và gia hạn lease thêm `lease_seconds`"""
+        pass
+
+    @abstractmethod
+    async def complete(self, job: RewardJob, worker_id: str, result: Dict[str, Any]) -> bool:
+        pass
+
+    @abstractmethod
+    async def retry(self, job: RewardJob, worker_id: str, error: str, run_at: datetime) -> bool:
+        """Trả job về pending để chạy lại từ `run_at`"""
+        pass
+
+    @abstractmethod
+    async def fail(self, job: RewardJob, worker_id: str, error: str) -> bool:
+        """Bỏ job sau khi đã thử hết số lần cho phép"""
+        pass
+
+    @abstractmethod
+    async def get(self, room_id: str) -> Optional[RewardJob]:
+        pass
@@ -0,0 +1,31 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+
+from models.room_lease import RoomLease
+
+
+class IRoomLeaseRepository(ABC):
+    @abstractmethod
+    async def acquire(self, room_id: str, holder: str, ttl_seconds: int) -> Optional[datetime]:
+        """Giành lease nếu chưa ai giữ, đã hết hạn hoặc chính holder đang giữ. Trả về thời điểm hết hạn, None nếu thất bại"""
+        pass
+
+    @abstractmethod
+    async def renew(self, holder: str, room_ids: List[str], ttl_seconds: int) -> List[str]:
+        """Gia hạn các lease holder đang giữ, trả về danh sách room_id gia hạn thành công"""
+        pass
+
+    @abstractmethod
+    async def release(self, room_id: str, holder: str) -> None:
+        """Trả lease (chỉ khi holder đang giữ)"""
+        pass
+
+    @abstractmethod
+    async def get_all(self) -> List[RoomLease]:
+        pass
+
+    @abstractmethod
+    async def get_expired(self) -> List[RoomLease]:
+        """Các lease đã hết hạn mà chưa được trả: worker giữ chúng có thể đã chết"""
+        pass
@@ -12,6 +12,14 @@ class IRoomRepository(ABC):
     async def get(self, room_id: str) -> Room | None:
         pass
     
+    @abstractmethod
+    async def get_hydrated(self, room_id: str) -> Room | None:
+        pass
+
+    @abstractmethod
+    async def get_many(self, room_ids: List[str], with_answers: bool = False) -> List[Room]:
+        pass
+
     @abstractmethod
     async def get_by_code(self, room_code) -> Room | None:
         pass
@@ -21,7 +29,11 @@ class IRoomRepository(ABC):
         pass
 
     @abstractmethod
-    async def delete_room(self, room_id: str) -> None:
+    async def save_many(self, rooms: List[Room]) -> bool:
+        pass
+
+    @abstractmethod
+    async def delete_room(self, room_id: str) -> bool:
         pass
 
     @abstractmethod
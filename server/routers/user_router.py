@@ -27,4 +27,12 @@ def create_user_router(controller: UserController):
     async def leaderboard(limit: int = 10, period = LEADERBOARD_PERIOD.ALL_TIME):
         return await controller.get_leaderboard(limit, period)
 
+    @router.get("/leaderboard/rank/{wallet_id}", response_model=LeaderboardEntry)
+    async def leaderboard_rank(wallet_id: str, period = LEADERBOARD_PERIOD.ALL_TIME):
+        return await controller.get_leaderboard_rank(wallet_id, period)
+
+    @router.get("/leaderboard/around/{wallet_id}", response_model=list[LeaderboardEntry])
+    async def leaderboard_around(wallet_id: str, period = LEADERBOARD_PERIOD.ALL_TIME, radius: int = 5):
+        return await controller.get_leaderboard_around(wallet_id, period, radius)
+
     return router
@@ -9,8 +9,8 @@ def create_ws_router(controller: WebSocketController):
         await websocket.close(code=1008) 
     
     @router.websocket("/lobby")
-    async def websocket_lobby(websocket: WebSocket):
-        await controller.handle_lobby_socket(websocket)
+    async def websocket_lobby(websocket: WebSocket, since: int = Query(None), epoch: str = Query(None)):
+        await controller.handle_lobby_socket(websocket, since, epoch)
 
     @router.websocket("/feed")
     async def websocket_feed(websocket: WebSocket):
@@ -0,0 +1,119 @@
+from typing import Dict, List, Optional, Tuple
+
+from enums.player_status import PLAYER_STATUS
+from models.player import Player
+from models.room import Room
+
+
+class AnswerTally:
+    """
+    Đếm câu trả lời cho câu hỏi hiện tại của một phòng, thay cho việc quét answers của mọi player sau mỗi lần submit.
+    - Mỗi player giữ một bit cố định; `active` và `answered` là bitset trên các bit đó.
+    - `correct` là danh sách wallet trả lời đúng theo thứ tự submit, dùng cho order bonus.
+    - Chuyển sang câu hỏi khác thì `answered` / `correct` tự reset.
+    Mọi thao tác là đồng bộ, nên gọi `record` trước `await` đầu tiên là đủ nguyên tử trong event loop.
+    """
+    def __init__(self):
+        # {wallet_id: vị trí bit}
+        self.bits: Dict[str, int] = {}
+        self.active = 0
+        # Danh sách players đã dùng để tính `active`, để biết khi nào room.players bị thay hoặc thêm người
+        self.roster: List[Player] = []
+        self.roster_size = 0
+
+        self.question_id: Optional[str] = None
+        self.answered = 0
+        self.correct: List[str] = []
+
+    @classmethod
+    def from_room(cls, room: Room) -> "AnswerTally":
+        tally = cls()
+        tally.sync_players(room.players)
+
+        # Phòng được nạp lại giữa chừng (restart, tiếp quản): dựng lại từ answers đã lưu
+        question = room.current_question
+        if question:
+            tally._switch(question.id)
+            answers = [a for p in room.players for a in p.answers if str(a.question_id) == str(question.id)]
+            for answer in sorted(answers, key=lambda a: a.submitted_at or a.created_at):
+                tally.record(question.id, answer.wallet_id, answer.is_correct)
+        return tally
+
+    # ==================================
+    # Người chơi
+    # ==================================
+
+    def sync_players(self, players: List[Player]) -> None:
+        self.roster = players
+        self.roster_size = len(players)
+        active = 0
+        for player in players:
+            if player.player_status != PLAYER_STATUS.DISCONNECTED:
+                active |= 1 << self._bit(player.wallet_id)
+        self.active = active
+
+    def set_active(self, wallet_id: str, is_active: bool) -> None:
+        mask = 1 << self._bit(wallet_id)
+        self.active = self.active | mask if is_active else self.active & ~mask
+
+    def remove_player(self, wallet_id: str) -> None:
+        bit = self.bits.get(wallet_id)
+        if bit is not None:
+            self.active &= ~(1 << bit)
+
+    # ==================================
+    # Câu trả lời
+    # ==================================
+
+    def record(self, question_id: str, wallet_id: str, is_correct: bool) -> Optional[int]:
+        """
+        Ghi nhận câu trả lời. Trả về số người đã trả lời đúng trước đó (thứ tự cho order bonus),
+        hoặc None nếu player đã trả lời câu này rồi.
+        """
+        self._switch(question_id)
+        mask = 1 << self._bit(wallet_id)
+        if self.answered & mask:
+            return None
+        self.answered |= mask
+
+        correct_before = len(self.correct)
+        if is_correct:
+            self.correct.append(wallet_id)
+        return correct_before
+
+    def has_answered(self, question_id: str, wallet_id: str) -> bool:
+        bit = self.bits.get(wallet_id)
+        return bit is not None and bool(self._answered_for(question_id) >> bit & 1)
+
+    def all_answered(self, question_id: str) -> bool:
+        """Mọi player đang active đã trả lời (và có ít nhất một player active)."""
+        return bool(self.active) and not (self.active & ~self._answered_for(question_id))
+
+    def unanswered(self, question_id: str) -> List[str]:
+        pending = self.active & ~self._answered_for(question_id)
+        return [wallet_id for wallet_id, bit in self.bits.items() if pending >> bit & 1]
+
+    def counts(self, question_id: str) -> Tuple[int, int]:
+        """(số player active đã trả lời, số player active) - để log."""
+        return bin(self._answered_for(question_id) & self.active).count("1"), bin(self.active).count("1")
+
+    # ==================================
+    # Helpers
+    # ==================================
+
+    def _bit(self, wallet_id: str) -> int:
+        bit = self.bits.get(wallet_id)
+        if bit is None:
+            bit = self.bits[wallet_id] = len(self.bits)
+        return bit
+
+    def _answered_for(self, question_id: str) -> int:
+        # Tally đang ở câu khác thì câu được hỏi chưa có ai trả lời
+        return self.answered if str(question_id) == self.question_id else 0
+
+    def _switch(self, question_id: str) -> None:
+        question_id = str(question_id)
+        if question_id != self.question_id:
+            self.question_id = question_id
+            self.answered = 0
+            self.correct = []
@@ -0,0 +1,93 @@
+import json
+import os
+from typing import Dict, Iterable, Set
+
+from aptos_sdk.account_address import AccountAddress
+from aptos_sdk.async_client import ApiError, ResourceNotFound, RestClient
+
+from config.logging_config import NFT, get_logger
+
+log = get_logger(NFT)
+
+# File ghi các collection (token v1) đã biết là có trên chain, theo tài khoản tạo; giữ qua các lần khởi động lại
+APTOS_COLLECTION_REGISTRY_PATH = os.getenv("APTOS_COLLECTION_REGISTRY_PATH") or "aptos_collections.json"
+
+
+class CollectionRegistry:
+    """
+    Các collection đã có trên chain của từng tài khoản admin, để mint bỏ qua create_collection_script
+    (mỗi lần gửi thừa tốn một transaction có phí rồi thất bại với ECOLLECTION_ALREADY_EXISTS).
+    - Đọc từ file lúc khởi tạo; `add`/`discard` ghi lại file ngay (chỉ xảy ra khi tạo collection mới, rất hiếm).
+    - `warm` hỏi chain cho những (tài khoản, collection) chưa biết: resource 0x3::token::Collections
+      của tài khoản rồi bảng collection_data trong đó.
+    Collection không bao giờ bị xóa trên chain nên bản ghi cũ chỉ sai khi đổi mạng (devnet bị reset):
+    lúc đó create_token_script lỗi ECOLLECTION_NOT_PUBLISHED và `discard` bỏ bản ghi để lần sau tạo lại.
+    """
+    def __init__(self, path: str = APTOS_COLLECTION_REGISTRY_PATH):
+        self.path = path
+        self.known: Dict[str, Set[str]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.known = {address: set(names) for address, names in data.items()}
+        except Exception as e:
+            log.warning("[APTOS_COLLECTIONS] Could not read %s, starting empty: %s", self.path, e)
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({address: sorted(names) for address, names in self.known.items()}, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            log.warning("[APTOS_COLLECTIONS] Could not write %s: %s", self.path, e)
+
+    def has(self, address: AccountAddress, name: str) -> bool:
+        return name in self.known.get(str(address), ())
+
+    def add(self, address: AccountAddress, name: str) -> None:
+        names = self.known.setdefault(str(address), set())
+        if name not in names:
+            names.add(name)
+            self._save()
+
+    def discard(self, address: AccountAddress, name: str) -> None:
+        names = self.known.get(str(address))
+        if names and name in names:
+            names.discard(name)
+            self._save()
+
+    async def warm(self, client: RestClient, addresses: Iterable[AccountAddress], names: Iterable[str]) -> int:
+        """Hỏi chain các collection chưa có trong registry; trả về số collection mới ghi nhận."""
+        names = list(names)
+        found = 0
+        for address in addresses:
+            missing = [name for name in names if not self.has(address, name)]
+            if not missing:
+                continue
+            try:
+                resource = await client.account_resource(address, "0x3::token::Collections")
+            except ResourceNotFound:
+                continue  # tài khoản chưa tạo collection nào
+            except Exception as e:
+                log.warning("[APTOS_COLLECTIONS] Could not read collections of %s: %s", address, e)
+                continue
+            handle = resource["data"]["collection_data"]["handle"]
+            for name in missing:
+                try:
+                    await client.get_table_item(handle, "0x1::string::String", "0x3::token::CollectionData", name)
+                except Exception as e:
+                    if not (isinstance(e, ApiError) and e.status_code == 404):  # 404: chưa có collection này
+                        log.warning("[APTOS_COLLECTIONS] Could not look up collection %s of %s: %s", name, address, e)
+                    continue
+                self.add(address, name)
+                found += 1
+        log.info("[APTOS_COLLECTIONS] Warmed registry: %s collection(s) found on chain", found)
+        return found
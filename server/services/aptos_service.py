@@ -1,8 +1,8 @@
+import asyncio
 import os
 import random
-from typing import Dict, Any
+from typing import Awaitable, Callable, Dict, Any, List, Optional
 from dotenv import load_dotenv
-import hashlib
 
 from aptos_sdk.account import Account
 from aptos_sdk.async_client import RestClient
@@ -10,17 +10,18 @@ from aptos_sdk.transactions import (
     EntryFunction,
     TransactionPayload,
     TransactionArgument,
-    RawTransaction,
-    SignedTransaction,
-    Authenticator,
-    AccountAuthenticator,
-    Ed25519Authenticator,
 )
-from aptos_sdk.authenticator import Authenticator, Ed25519Authenticator
 from aptos_sdk.bcs import Serializer
 from aptos_sdk.account_address import AccountAddress
 # from aptos_sdk.ed25519 import Ed25519PublicKey
 
+from config.logging_config import NFT, get_logger
+from services.aptos_collection_registry import CollectionRegistry
+from services.aptos_tx_pipeline import AptosTxPipeline, Lane, PendingTransaction, TransactionFailed, ensure_success
+from services.metrics import instrument_httpx, route_label
+
+log = get_logger(NFT)
+
 load_dotenv()
 
 NODE_URL = os.getenv("APTOS_NODE_URL", "https://fullnode.devnet.aptoslabs.com/v1")
@@ -29,15 +30,44 @@ class AptosService:
     def __init__(self):
         self.network = os.getenv("APTOS_NETWORK", "devnet")
         self.client = RestClient(NODE_URL)
+        instrument_httpx(self.client.client, "aptos", route_label)
 
         self.admin_private_key = os.getenv("APTOS_ADMIN_PRIVATE_KEY")
+        if not self.admin_private_key:
+            raise ValueError("APTOS_ADMIN_PRIVATE_KEY is not set")
         if not self.admin_private_key.startswith("0x"):
             self.admin_private_key = "0x" + self.admin_private_key
 
         self.admin_account = Account.load_key(self.admin_private_key)
         self.admin_address = self.admin_account.address()
+        # Các tài khoản mint NFT: APTOS_ADMIN_PRIVATE_KEYS (phân cách bằng dấu phẩy) để chia tải, mặc định chỉ admin.
+        # Mỗi tài khoản tự tạo collection của mình, token mang creator là tài khoản mint ra nó
+        mint_keys = [k.strip() for k in (os.getenv("APTOS_ADMIN_PRIVATE_KEYS") or "").split(",") if k.strip()]
+        mint_accounts = [Account.load_key(k if k.startswith("0x") else "0x" + k) for k in mint_keys] or [self.admin_account]
+        self.pipeline = AptosTxPipeline(self.client, mint_accounts)
+        self.collections = CollectionRegistry()
+        # Collection đã được đối chiếu với chain (warm_collections) trong process này
+        self._warmed_collections: set = set()
+        self._warm_lock = asyncio.Lock()
         self.game_module_address = os.getenv("APTOS_GAME_MODULE_ADDRESS")
 
+    async def warm_collections(self, collection_names: List[str]) -> None:
+        """Ghi nhận các collection đã có trên chain của các tài khoản mint."""
+        await self.collections.warm(self.client, [lane.address for lane in self.pipeline.lanes], collection_names)
+
+    async def _warm_once(self, collection_name: str) -> None:
+        """Lần mint đầu tiên vào một collection đối chiếu registry với chain trước, để không gửi create_collection thừa."""
+        if collection_name in self._warmed_collections:
+            return
+        async with self._warm_lock:
+            if collection_name in self._warmed_collections:
+                return
+            try:
+                await self.warm_collections([collection_name])
+            except Exception as e:
+                log.warning("[APTOS] Could not warm collection registry for %s: %s", collection_name, e)
+            self._warmed_collections.add(collection_name)
+
     def get_explorer_url(self, txn_hash: str) -> str:
         return f"https://explorer.aptoslabs.com/txn/{txn_hash}?network={self.network}"
 
@@ -67,24 +97,9 @@ class AptosService:
             return {"success": False, "error": str(e), "address": address}
 
     async def _submit_transaction(self, sender: Account, payload: TransactionPayload) -> str:
-        raw_txn = await self.client.create_bcs_transaction(sender, payload)
-
-        prefix = hashlib.sha3_256(b"APTOS::RawTransaction").digest()
-        serializer = Serializer()
-        raw_txn.serialize(serializer)
-        body = serializer.output()
-        message_to_sign = prefix + body
-
-        signature = sender.sign(message_to_sign)
-        authenticator = Authenticator(Ed25519Authenticator(sender.public_key(), signature))
-        signed_txn = SignedTransaction(raw_txn, authenticator)
-        txn_hash = await self.client.submit_bcs_transaction(signed_txn)
-
-        txn_result = await self.client.transaction_by_hash(txn_hash)
-        if not txn_result.get("success", False):
-            raise Exception(f"Transaction failed: {txn_result['vm_status']}")
-
-        return txn_hash
+        """Gửi và chờ transaction được xác nhận; thực thi lỗi thì ném TransactionFailed (kèm vm_status)."""
+        txn = await self.pipeline.submit_as(sender, payload)
+        return txn["hash"]
 
     async def call_game_function(self, signer_key: str, function_name: str, args: list = []) -> Dict[str, Any]:
         try:
@@ -154,17 +169,103 @@ class AptosService:
             out.extend(tmp.output())
         return bytes(out)
     
+    async def _submit_collection_if_missing(self, lane: Lane, collection_name: str, uri: str) -> Optional[PendingTransaction]:
+        """Gửi create_collection_script nếu registry chưa biết collection của tài khoản này (không chờ xác nhận)."""
+        creator_address = lane.address
+        await self._warm_once(collection_name)
+        if self.collections.has(creator_address, collection_name):
+            return None
+        collection_payload = EntryFunction.natural(
+            "0x3::token", "create_collection_script", [], [
+                TransactionArgument(collection_name, Serializer.str),
+                TransactionArgument("Collection for " + collection_name, Serializer.str),
+                TransactionArgument(uri, Serializer.str),
+                TransactionArgument(1000000, Serializer.u64),
+                TransactionArgument(self.serialize_bool_vector([True, True, True]), Serializer.fixed_bytes),
+            ]
+        )
+        # Các mint sau trên cùng tài khoản chạy sau transaction này nên không cần gửi lại; lỗi thì bỏ đánh dấu
+        self.collections.add(creator_address, collection_name)
+        try:
+            return await self.pipeline.submit(TransactionPayload(collection_payload), lane)
+        except Exception:
+            self.collections.discard(creator_address, collection_name)
+            raise
+
+    async def _wait_minted(
+        self,
+        creator_address: AccountAddress,
+        collection_name: str,
+        collection: Optional[PendingTransaction],
+        pending: List[PendingTransaction],
+        existing_token_ok: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Chờ transaction tạo collection (nếu có) và các transaction mint; ném TransactionFailed nếu có cái thất bại.
+        `existing_token_ok`: token đã được tạo ở lần mint trước (cùng tên, cùng creator) thì không tính là lỗi,
+        transaction offer phía sau quyết định kết quả.
+        """
+        txns = await self.pipeline.wait(([collection] if collection else []) + pending)
+        if collection:
+            collection_txn = txns.pop(0)
+            try:
+                ensure_success(collection_txn)
+            except TransactionFailed as e:
+                if "ECOLLECTION_ALREADY_EXISTS" not in e.vm_status.upper():
+                    self.collections.discard(creator_address, collection_name)
+                    raise
+                log.debug("Collection %s already exists. Skipping.", collection_name)
+        for txn in txns:
+            try:
+                ensure_success(txn)
+            except TransactionFailed as e:
+                if existing_token_ok and "ETOKEN_DATA_ALREADY_EXISTS" in e.vm_status.upper():
+                    continue
+                # Registry ghi collection mà chain không có (mạng bị reset): bỏ bản ghi để lần thử lại tạo collection
+                if "ECOLLECTION_NOT_PUBLISHED" in e.vm_status.upper():
+                    self.collections.discard(creator_address, collection_name)
+                raise
+        return txns
+
+    def creator_for(self, token_name: str) -> str:
+        """Tài khoản mint token `exact_name` có tên này."""
+        return str(self.pipeline.lane_for(token_name).address)
+
+    async def find_mint(self, submitted: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Kết quả của một lần mint đã gửi trước đó (bản ghi mà `on_submitted` nhận được), chờ nếu nó còn trong mempool.
+        None nếu transaction đã hết hạn mà chưa thực thi hoặc thực thi lỗi: chưa có gì được offer, mint lại được.
+        """
+        txn = await self.pipeline.lookup(submitted["transaction_hash"], submitted["expiration"])
+        if txn is None or not txn.get("success"):
+            return None
+        return {
+            "success": True,
+            "message": f"Successfully minted '{submitted['token_name']}' and offered to {submitted['recipient_address']}.",
+            "transaction_hash": submitted["transaction_hash"],
+            "explorer_url": self.get_explorer_url(submitted["transaction_hash"])
+        }
+
     async def mint_nft_to_player(
         self,
         recipient_address: str,
         collection_name: str,
         token_name: str,
         token_description: str,
-        token_uri: str
+        token_uri: str,
+        exact_name: bool = False,
+        on_submitted: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
     ) -> Dict[str, Any]:
+        """
+        Tạo token và offer cho người chơi. Mặc định tên token có thêm hậu tố ngẫu nhiên "#NNNN".
+        - `exact_name`: giữ nguyên tên (caller đã làm nó duy nhất, vd. theo phòng) và luôn mint từ cùng một tài khoản
+          cho tên đó, nên mint lặp lại không tạo ra token thứ hai: chain từ chối ETOKEN_DATA_ALREADY_EXISTS.
+        - `on_submitted(record)`: được gọi khi các transaction đã vào mempool, trước khi chờ xác nhận, để caller lưu lại;
+          lần thử sau đưa record vào `find_mint` thay vì mint lại.
+        """
         try:
-            token_name_with_suffix = f"{token_name} #{random.randint(1000, 9999)}"
-            print("DEBUG mint_nft_to_player args:", {
+            token_name_with_suffix = token_name if exact_name else f"{token_name} #{random.randint(1000, 9999)}"
+            log.debug("mint_nft_to_player args: %s", {
                 "admin_address": str(self.admin_address),
                 "collection_name": collection_name,
                 "token_name": token_name_with_suffix,
@@ -175,7 +276,9 @@ class AptosService:
             })
 
             recipient_bytes = AccountAddress.from_str(recipient_address).address
-            print("DEBUG recipient_bytes:", recipient_bytes.hex(), len(recipient_bytes))
+            # Cả ba transaction đi cùng một tài khoản với sequence liên tiếp: gửi liền nhau, chờ xác nhận một lần
+            lane = self.pipeline.lane_for(token_name_with_suffix) if exact_name else self.pipeline.lane()
+            creator_address = lane.address
 
             # Royalty cấu hình
             ROYALTY_NUMERATOR = 0  # Không thu phí
@@ -184,27 +287,9 @@ class AptosService:
                 royalty_address = AccountAddress.from_str("0x" + "0" * 64).address
             else:
                 ROYALTY_DENOMINATOR = 10000
-                royalty_address = self.admin_address.address
+                royalty_address = creator_address.address
 
-            print("DEBUG Royalty:", ROYALTY_NUMERATOR, "/", ROYALTY_DENOMINATOR)
-            print("DEBUG Royalty Address:", royalty_address.hex())
-
-            try:
-                collection_payload = EntryFunction.natural(
-                    "0x3::token", "create_collection_script", [], [
-                        TransactionArgument(collection_name, Serializer.str),
-                        TransactionArgument("Collection for " + collection_name, Serializer.str),
-                        TransactionArgument(token_uri, Serializer.str),
-                        TransactionArgument(1000000, Serializer.u64),
-                        TransactionArgument(self.serialize_bool_vector([True, True, True]), Serializer.fixed_bytes),
-                    ]
-                )
-                await self._submit_transaction(self.admin_account, TransactionPayload(collection_payload))
-            except Exception as e:
-                if "ECOLLECTION_ALREADY_EXISTS" in str(e).upper():
-                    print("DEBUG: Collection already exists. Skipping.")
-                else:
-                    raise e
+            collection = await self._submit_collection_if_missing(lane, collection_name, token_uri)
 
             # Tạo token (NFT)
             token_payload = EntryFunction.natural(
@@ -224,21 +309,28 @@ class AptosService:
                     TransactionArgument(self.encode_vector_str([]), Serializer.fixed_bytes),
                 ]
             )
-
-            await self._submit_transaction(self.admin_account, TransactionPayload(token_payload))
+            token = await self.pipeline.submit(TransactionPayload(token_payload), lane)
 
             offer_payload = EntryFunction.natural(
                 "0x3::token_transfers", "offer_script", [], [
                     TransactionArgument(recipient_bytes, Serializer.fixed_bytes),
-                    TransactionArgument(self.admin_address.address, Serializer.fixed_bytes),
+                    TransactionArgument(creator_address.address, Serializer.fixed_bytes),
                     TransactionArgument(collection_name, Serializer.str),
                     TransactionArgument(token_name_with_suffix, Serializer.str),
                     TransactionArgument(0, Serializer.u64),  # property version
                     TransactionArgument(1, Serializer.u64),  # amount
                 ]
             )
+            offer = await self.pipeline.submit(TransactionPayload(offer_payload), lane)
+            if on_submitted:
+                await on_submitted({
+                    "transaction_hash": offer.hash, "expiration": offer.expiration, "creator": str(creator_address),
+                    "collection_name": collection_name, "token_name": token_name_with_suffix,
+                    "recipient_address": recipient_address,
+                })
 
-            offer_hash = await self._submit_transaction(self.admin_account, TransactionPayload(offer_payload))
+            txns = await self._wait_minted(creator_address, collection_name, collection, [token, offer], existing_token_ok=exact_name)
+            offer_hash = txns[-1]["hash"]
 
             return {
                 "success": True,
@@ -251,3 +343,58 @@ class AptosService:
             import traceback
             traceback.print_exc()
             return {"success": False, "error": str(e)}
+
+    async def batch_mint_to_players(
+        self,
+        collection_name: str,
+        items: List[Dict[str, Any]],
+        on_submitted: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Mint và offer token cho nhiều người thắng trong một transaction (game_module::batch_mint_and_offer).
+        Mỗi phần tử của `items` có recipient_address, token_name, token_description, token_uri và có thể có
+        exact_name (như mint_nft_to_player). Cả lô thành công hoặc thất bại cùng nhau.
+        `on_submitted` nhận transaction_hash, expiration, creator và token_names khi lô đã vào mempool.
+        """
+        try:
+            token_names = [
+                item["token_name"] if item.get("exact_name") else f"{item['token_name']} #{random.randint(1000, 9999)}"
+                for item in items
+            ]
+            # Token exact_name phải đi từ tài khoản cố định của tên (BatchRewardMinter gom lô theo creator_for)
+            lane = self.pipeline.lane_for(token_names[0]) if items[0].get("exact_name") else self.pipeline.lane()
+            creator_address = lane.address
+            collection = await self._submit_collection_if_missing(lane, collection_name, items[0]["token_uri"])
+
+            batch_payload = EntryFunction.natural(
+                f"{self.game_module_address}::game_module", "batch_mint_and_offer", [], [
+                    TransactionArgument(collection_name, Serializer.str),
+                    TransactionArgument(token_names, Serializer.sequence_serializer(Serializer.str)),
+                    TransactionArgument([item["token_description"] for item in items], Serializer.sequence_serializer(Serializer.str)),
+                    TransactionArgument([item["token_uri"] for item in items], Serializer.sequence_serializer(Serializer.str)),
+                    TransactionArgument(
+                        [AccountAddress.from_str(item["recipient_address"]) for item in items],
+                        Serializer.sequence_serializer(Serializer.struct),
+                    ),
+                ]
+            )
+            batch = await self.pipeline.submit(TransactionPayload(batch_payload), lane)
+            if on_submitted:
+                await on_submitted({
+                    "transaction_hash": batch.hash, "expiration": batch.expiration, "creator": str(creator_address),
+                    "token_names": token_names,
+                })
+            txns = await self._wait_minted(creator_address, collection_name, collection, [batch])
+            batch_hash = txns[-1]["hash"]
+            return {
+                "success": True,
+                "message": f"Successfully minted {len(items)} tokens in one transaction.",
+                "token_names": token_names,
+                "transaction_hash": batch_hash,
+                "explorer_url": self.get_explorer_url(batch_hash)
+            }
+        except Exception as e:
+            log.error("[APTOS_NFT] Batch mint of %s tokens failed: %s", len(items), e)
+            # aborted: chain đã thực thi và hủy transaction (Move abort), chắc chắn không token nào được tạo.
+            # Lỗi khác (hết hạn chờ, lỗi mạng) thì lô có thể vẫn được thực thi
+            return {"success": False, "error": str(e), "aborted": isinstance(e, TransactionFailed)}
@@ -0,0 +1,272 @@
+import asyncio
+import hashlib
+import os
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from aptos_sdk.account import Account
+from aptos_sdk.account_address import AccountAddress
+from aptos_sdk.async_client import ApiError, RestClient
+from aptos_sdk.authenticator import Authenticator, Ed25519Authenticator
+from aptos_sdk.bcs import Serializer
+from aptos_sdk.transactions import RawTransaction, SignedTransaction, TransactionPayload
+
+from config.logging_config import NFT, get_logger
+
+log = get_logger(NFT)
+
+# Số transaction của một tài khoản đã gửi mà chưa xác nhận được tối đa (mempool Aptos nhận tới 100)
+APTOS_MAX_INFLIGHT = int(os.getenv("APTOS_MAX_INFLIGHT") or 16)
+# Transaction chưa xác nhận chỉ bị coi là rớt khi đã quá expiration_timestamp của nó thêm chừng này giây
+# (bù lệch đồng hồ với chain): trước đó nó vẫn có thể được thực thi
+APTOS_EXPIRY_MARGIN_SECONDS = float(os.getenv("APTOS_EXPIRY_MARGIN_SECONDS") or 10)
+# Chu kỳ hỏi trạng thái: bắt đầu từ MIN, nhân 1.5 mỗi lần chưa có gì xác nhận, tối đa MAX
+APTOS_POLL_MIN_SECONDS = float(os.getenv("APTOS_POLL_MIN_SECONDS") or 0.2)
+APTOS_POLL_MAX_SECONDS = float(os.getenv("APTOS_POLL_MAX_SECONDS") or 2)
+# Hạn của transaction tính từ lúc ký: đủ để đi hết hàng đợi, đủ ngắn để transaction rớt không treo sequence lâu
+APTOS_TXN_TTL_SECONDS = int(os.getenv("APTOS_TXN_TTL_SECONDS") or 60)
+
+
+class TransactionFailed(Exception):
+    def __init__(self, txn_hash: str, vm_status: str):
+        super().__init__(f"Transaction {txn_hash} failed: {vm_status}")
+        self.txn_hash = txn_hash
+        self.vm_status = vm_status
+
+
+class Lane:
+    """Một tài khoản gửi transaction: sequence number giữ ở local, giới hạn số transaction đang bay."""
+    def __init__(self, account: Account, max_inflight: int):
+        self.account = account
+        self.address: AccountAddress = account.address()
+        self.next_sequence: Optional[int] = None
+        self.lock = asyncio.Lock()
+        self.slots = asyncio.Semaphore(max_inflight)
+        self.inflight = 0
+
+
+class PendingTransaction:
+    """
+    Transaction đã vào mempool; `future` nhận transaction đã thực thi (hoặc TimeoutError khi đã hết hạn mà chưa thực thi).
+    `expiration` là expiration_timestamp (giây unix) đã ký trong transaction.
+    """
+    __slots__ = ("hash", "lane", "future", "expiration")
+
+    def __init__(self, txn_hash: str, lane: Lane, future: asyncio.Future, expiration: int):
+        self.hash = txn_hash
+        self.lane = lane
+        self.future = future
+        self.expiration = expiration
+
+
+class AptosTxPipeline:
+    """
+    Gửi transaction Aptos song song từ một hoặc nhiều tài khoản admin:
+    - Sequence number được cấp ở local (đọc từ chain một lần), nên nhiều transaction của cùng tài khoản được gửi
+      liên tiếp mà không chờ nhau; chain thực thi chúng theo thứ tự sequence. Lỗi SEQUENCE_NUMBER_* hoặc
+      transaction bị rớt thì đọc lại sequence từ chain.
+    - Việc gửi của một tài khoản đi tuần tự (giữ thứ tự tới mempool), còn việc chờ xác nhận thì chồng lên nhau:
+      một task hỏi trạng thái mọi transaction đang chờ trong cùng một lượt, giãn dần chu kỳ khi chưa có gì xong.
+    - Nhiều tài khoản (APTOS_ADMIN_PRIVATE_KEYS) thì `lane()` chọn tài khoản đang ít transaction chờ nhất.
+    """
+    def __init__(
+        self,
+        client: RestClient,
+        accounts: List[Account],
+        max_inflight: int = APTOS_MAX_INFLIGHT,
+        expiry_margin: float = APTOS_EXPIRY_MARGIN_SECONDS,
+        poll_min: float = APTOS_POLL_MIN_SECONDS,
+        poll_max: float = APTOS_POLL_MAX_SECONDS,
+        ttl_seconds: int = APTOS_TXN_TTL_SECONDS,
+    ):
+        self.client = client
+        self.max_inflight = max_inflight
+        self.lanes = [Lane(account, max_inflight) for account in accounts]
+        self.expiry_margin = expiry_margin
+        self.poll_min = poll_min
+        self.poll_max = poll_max
+        self.ttl_seconds = ttl_seconds
+
+        self._pending: Dict[str, PendingTransaction] = {}
+        self._wake = asyncio.Event()
+        self._poller: Optional[asyncio.Task] = None
+        self.submitted = 0
+        self.resyncs = 0
+        self.timeouts = 0
+
+    def lane(self) -> Lane:
+        return min(self.lanes, key=lambda lane: lane.inflight)
+
+    def lane_for(self, key: str) -> Lane:
+        """Lane cố định theo `key`: cùng một việc (mint cho một phòng) luôn đi từ cùng một tài khoản."""
+        return self.lanes[zlib.crc32(key.encode()) % len(self.lanes)]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending), "submitted": self.submitted,
+            "resyncs": self.resyncs, "timeouts": self.timeouts,
+        }
+
+    async def close(self) -> None:
+        if self._poller:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+            self._poller = None
+
+    # ==================================
+    # Gửi
+    # ==================================
+
+    async def submit(self, payload: TransactionPayload, lane: Optional[Lane] = None) -> PendingTransaction:
+        """Ký và gửi vào mempool, không chờ thực thi. Chỗ trong `max_inflight` được giữ tới khi transaction được xác nhận."""
+        lane = lane or self.lane()
+        await lane.slots.acquire()
+        lane.inflight += 1
+        try:
+            async with lane.lock:
+                txn_hash, expiration = await self._submit_locked(lane, payload)
+        except BaseException:
+            lane.inflight -= 1
+            lane.slots.release()
+            raise
+
+        self.submitted += 1
+        pending = PendingTransaction(txn_hash, lane, asyncio.get_running_loop().create_future(), expiration)
+        self._pending[txn_hash] = pending
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_loop())
+        self._wake.set()
+        return pending
+
+    async def _submit_locked(self, lane: Lane, payload: TransactionPayload) -> Tuple[str, int]:
+        for attempt in range(2):
+            if lane.next_sequence is None:
+                lane.next_sequence = await self.client.account_sequence_number(lane.address)
+            expiration = int(time.time()) + self.ttl_seconds
+            raw_txn = RawTransaction(
+                lane.address,
+                lane.next_sequence,
+                payload,
+                self.client.client_config.max_gas_amount,
+                self.client.client_config.gas_unit_price,
+                expiration,
+                await self.client.chain_id(),
+            )
+            try:
+                txn_hash = await self.client.submit_bcs_transaction(_sign(lane.account, raw_txn))
+            except ApiError as e:
+                # Sequence ở local lệch với chain (transaction trước bị rớt, tài khoản được dùng ở nơi khác): đọc lại rồi thử một lần
+                if "SEQUENCE_NUMBER" in str(e) and attempt == 0:
+                    log.warning("[APTOS_TX] Sequence %s of %s rejected, resyncing: %s", lane.next_sequence, lane.address, e)
+                    lane.next_sequence = None
+                    self.resyncs += 1
+                    continue
+                raise
+            lane.next_sequence += 1
+            return txn_hash, expiration
+        raise RuntimeError("unreachable")
+
+    async def submit_and_wait(self, payload: TransactionPayload, lane: Optional[Lane] = None) -> Dict[str, Any]:
+        """Gửi rồi chờ xác nhận; transaction thực thi lỗi thì ném TransactionFailed."""
+        txn = (await self.wait([await self.submit(payload, lane)]))[0]
+        ensure_success(txn)
+        return txn
+
+    async def submit_as(self, account: Account, payload: TransactionPayload) -> Dict[str, Any]:
+        """
+        Gửi bằng một tài khoản bất kỳ và chờ xác nhận. Tài khoản trong pool thì đi chung lane (không tranh sequence
+        với các transaction đang bay); tài khoản ngoài pool (ví người chơi) thì sequence đọc từ chain mỗi lần.
+        """
+        address = account.address()
+        lane = next((lane for lane in self.lanes if lane.address == address), None)
+        return await self.submit_and_wait(payload, lane or Lane(account, 1))
+
+    # ==================================
+    # Chờ xác nhận
+    # ==================================
+
+    async def wait(self, pending: List[PendingTransaction]) -> List[Dict[str, Any]]:
+        """Chờ các transaction được xác nhận, trả về transaction (kể cả thực thi lỗi) theo đúng thứ tự truyền vào."""
+        return list(await asyncio.gather(*(asyncio.shield(p.future) for p in pending)))
+
+    async def lookup(self, txn_hash: str, expiration: int) -> Optional[Dict[str, Any]]:
+        """
+        Trạng thái của một transaction đã gửi từ trước (lần chạy trước, process khác): chờ tới khi nó được thực thi
+        (trả về transaction, kể cả thực thi lỗi) hoặc chắc chắn không còn được thực thi vì đã quá hạn (trả về None).
+        """
+        while True:
+            polled_at = time.time()
+            txn = await self._fetch(txn_hash)
+            if txn and txn.get("type") != "pending_transaction":
+                return txn
+            if polled_at >= expiration + self.expiry_margin:
+                return None
+            await asyncio.sleep(self.poll_max)
+
+    async def _poll_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = self.poll_min
+        next_poll = loop.time() + interval
+        while self._pending:
+            # Transaction mới chỉ kéo lượt hỏi kế tiếp về sớm hơn (tối đa poll_min nữa), không bao giờ lùi nó lại:
+            # gửi liên tục cũng không làm poller ngừng hỏi trạng thái và kiểm tra hạn
+            self._wake.clear()
+            timeout = next_poll - loop.time()
+            if timeout > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                    next_poll = min(next_poll, loop.time() + self.poll_min)
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+
+            hashes = list(self._pending)
+            polled_at = time.time()
+            results = await asyncio.gather(*(self._fetch(h) for h in hashes), return_exceptions=True)
+            confirmed = 0
+            for txn_hash, txn in zip(hashes, results):
+                pending = self._pending[txn_hash]
+                if isinstance(txn, dict) and txn.get("type") != "pending_transaction":
+                    self._resolve(txn_hash, result=txn)
+                    confirmed += 1
+                elif not isinstance(txn, Exception) and polled_at >= pending.expiration + self.expiry_margin:
+                    # Lần đọc bắt đầu sau hạn vẫn chưa thấy transaction thực thi: chain không còn thực thi nó nữa.
+                    # Sequence sau nó sẽ không bao giờ chạy, phải đọc lại từ chain
+                    self.timeouts += 1
+                    pending.lane.next_sequence = None
+                    self._resolve(txn_hash, error=TimeoutError(f"Transaction {txn_hash} expired without being committed"))
+            interval = self.poll_min if confirmed else min(interval * 1.5, self.poll_max)
+            next_poll = loop.time() + interval
+
+    async def _fetch(self, txn_hash: str) -> Optional[Dict[str, Any]]:
+        response = await self.client._get(endpoint=f"transactions/by_hash/{txn_hash}")
+        if response.status_code == 404:
+            return None  # node chưa thấy transaction (chưa lan tới node này)
+        if response.status_code >= 400:
+            raise ApiError(response.text, response.status_code)
+        return response.json()
+
+    def _resolve(self, txn_hash: str, result: Optional[dict] = None, error: Optional[Exception] = None) -> None:
+        pending = self._pending.pop(txn_hash)
+        pending.lane.inflight -= 1
+        pending.lane.slots.release()
+        if pending.future.done():
+            return
+        if error is not None:
+            pending.future.set_exception(error)
+        else:
+            pending.future.set_result(result)
+
+
+def ensure_success(txn: Dict[str, Any]) -> None:
+    if not txn.get("success", False):
+        raise TransactionFailed(txn.get("hash", "?"), txn.get("vm_status", "unknown"))
+
+
+def _sign(sender: Account, raw_txn: RawTransaction) -> SignedTransaction:
+    prefix = hashlib.sha3_256(b"APTOS::RawTransaction").digest()
+    serializer = Serializer()
+    raw_txn.serialize(serializer)
+    signature = sender.sign(prefix + serializer.output())
+    return SignedTransaction(raw_txn, Authenticator(Ed25519Authenticator(sender.public_key(), signature)))
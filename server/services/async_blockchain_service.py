@@ -0,0 +1,282 @@
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import aiohttp
+from eth_account import Account
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
+from web3.exceptions import ContractLogicError, TransactionNotFound
+
+from config.logging_config import NFT, get_logger
+from services.metrics import instrument_async_web3
+from services.nft_service import (
+    GAME_CONTRACT_ADDRESS, NFT_CONTRACT_ADDRESS, OLYM3_RPC_URL, PRIVATE_KEY, BlockchainService, game_contract_abi,
+    nft_contract_abi,
+)
+
+log = get_logger(NFT)
+
+# Số kết nối HTTP giữ sẵn tới RPC
+EVM_RPC_POOL_SIZE = int(os.getenv("EVM_RPC_POOL_SIZE") or 20)
+EVM_RPC_TIMEOUT_SECONDS = float(os.getenv("EVM_RPC_TIMEOUT_SECONDS") or 30)
+# Giá gas đọc từ node được dùng lại trong chừng này giây
+EVM_GAS_PRICE_TTL_SECONDS = float(os.getenv("EVM_GAS_PRICE_TTL_SECONDS") or 15)
+# Chu kỳ hỏi block mới; receipt chỉ được hỏi khi có block mới
+EVM_BLOCK_POLL_SECONDS = float(os.getenv("EVM_BLOCK_POLL_SECONDS") or 1)
+EVM_RECEIPT_TIMEOUT_SECONDS = float(os.getenv("EVM_RECEIPT_TIMEOUT_SECONDS") or 120)
+EVM_GAS_LIMIT = 500000
+
+NONCE_ERRORS = ("nonce too low", "nonce too high", "already known", "replacement transaction underpriced", "invalid nonce")
+
+
+class NonceManager:
+    """
+    Nonce của tài khoản gửi giữ ở local: đọc `get_transaction_count(pending)` một lần, sau đó tăng dần.
+    Việc gửi đi tuần tự dưới lock để node nhận transaction đúng thứ tự nonce; node báo lệch nonce
+    (transaction bị rớt, tài khoản được dùng ở nơi khác) thì đọc lại rồi gửi lại một lần.
+    """
+    def __init__(self, web3: AsyncWeb3, address: str):
+        self.web3 = web3
+        self.address = address
+        self.next_nonce: Optional[int] = None
+        self.lock = asyncio.Lock()
+        self.resyncs = 0
+
+    def reset(self) -> None:
+        self.next_nonce = None
+
+    async def send(self, send_with_nonce: Callable[[int], Awaitable[Any]]) -> Any:
+        async with self.lock:
+            for attempt in range(2):
+                if self.next_nonce is None:
+                    self.next_nonce = await self.web3.eth.get_transaction_count(self.address, "pending")
+                try:
+                    result = await send_with_nonce(self.next_nonce)
+                except Exception as e:
+                    if attempt == 0 and any(message in str(e).lower() for message in NONCE_ERRORS):
+                        log.warning("[EVM] Nonce %s rejected, resyncing: %s", self.next_nonce, e)
+                        self.next_nonce = None
+                        self.resyncs += 1
+                        continue
+                    raise
+                self.next_nonce += 1
+                return result
+        raise RuntimeError("unreachable")
+
+
+class GasPriceOracle:
+    """`eth_gasPrice` dùng lại trong `ttl` giây; nhiều lời gọi cùng lúc khi hết hạn chỉ đọc node một lần."""
+    def __init__(self, web3: AsyncWeb3, ttl: float = EVM_GAS_PRICE_TTL_SECONDS):
+        self.web3 = web3
+        self.ttl = ttl
+        self.value: Optional[int] = None
+        self.expires_at = 0.0
+        self.lock = asyncio.Lock()
+        self.fetches = 0
+
+    async def get(self) -> int:
+        if self.value is not None and time.monotonic() < self.expires_at:
+            return self.value
+        async with self.lock:
+            if self.value is None or time.monotonic() >= self.expires_at:
+                self.value = await self.web3.eth.gas_price
+                self.expires_at = time.monotonic() + self.ttl
+                self.fetches += 1
+            return self.value
+
+
+class ReceiptWatcher:
+    """
+    Chờ receipt mà không chặn: một task hỏi số block mỗi `poll_seconds`, có block mới thì hỏi receipt của mọi
+    transaction đang chờ trong cùng một lượt và trả kết quả cho từng future. Không còn gì chờ thì task dừng.
+    """
+    def __init__(self, web3: AsyncWeb3, poll_seconds: float = EVM_BLOCK_POLL_SECONDS, timeout: float = EVM_RECEIPT_TIMEOUT_SECONDS):
+        self.web3 = web3
+        self.poll_seconds = poll_seconds
+        self.timeout = timeout
+        # tx hash -> (future, deadline)
+        self._pending: Dict[str, tuple] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.block_polls = 0
+        self.receipt_polls = 0
+
+    async def wait(self, tx_hash: str) -> Dict[str, Any]:
+        future = asyncio.get_running_loop().create_future()
+        self._pending[tx_hash] = (future, time.monotonic() + self.timeout)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+        try:
+            return await future
+        finally:
+            self._pending.pop(tx_hash, None)
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        last_block = None
+        while self._pending:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                block = await self.web3.eth.block_number
+            except Exception as e:
+                log.warning("[EVM] Error reading block number: %s", e)
+                continue
+            self.block_polls += 1
+            if block != last_block:
+                last_block = block
+                hashes = list(self._pending)
+                receipts = await asyncio.gather(*(self._receipt(h) for h in hashes), return_exceptions=True)
+                for tx_hash, receipt in zip(hashes, receipts):
+                    entry = self._pending.get(tx_hash)
+                    if entry and isinstance(receipt, dict) and not entry[0].done():
+                        entry[0].set_result(receipt)
+            now = time.monotonic()
+            for tx_hash, (future, deadline) in list(self._pending.items()):
+                if now >= deadline and not future.done():
+                    future.set_exception(TimeoutError(f"Transaction {tx_hash} has no receipt after {self.timeout:.0f}s"))
+
+    async def _receipt(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        self.receipt_polls += 1
+        try:
+            return dict(await self.web3.eth.get_transaction_receipt(tx_hash))
+        except TransactionNotFound:
+            return None
+
+
+class AsyncBlockchainService:
+    """
+    Bản async của BlockchainService (cùng method, cùng dạng kết quả) trên AsyncWeb3 và một aiohttp session
+    dùng chung: không còn chặn event loop trong lúc chờ block. Nonce cấp ở local, giá gas cache theo TTL,
+    receipt được chờ qua ReceiptWatcher, nên nhiều transaction có thể cùng chờ xác nhận.
+    Transaction revert (status 0) thì chạy lại bằng eth_call để lấy lý do và ném lỗi như web3 đồng bộ
+    ("execution reverted: NFT already exists").
+    """
+    _convert_uuid_to_bytes16 = BlockchainService._convert_uuid_to_bytes16
+
+    def __init__(
+        self,
+        rpc_url: str = OLYM3_RPC_URL,
+        private_key: str = PRIVATE_KEY,
+        nft_contract_address: str = NFT_CONTRACT_ADDRESS,
+        game_contract_address: str = GAME_CONTRACT_ADDRESS,
+        pool_size: int = EVM_RPC_POOL_SIZE,
+    ):
+        self.rpc_url = rpc_url
+        self.pool_size = pool_size
+        self.web3 = AsyncWeb3(AsyncHTTPProvider(rpc_url, request_kwargs={"timeout": aiohttp.ClientTimeout(total=EVM_RPC_TIMEOUT_SECONDS)}))
+        instrument_async_web3(self.web3)
+        self.account = Account.from_key(private_key)
+        self.nft_contract = self.web3.eth.contract(address=nft_contract_address, abi=nft_contract_abi())
+        self.game_contract = self.web3.eth.contract(address=game_contract_address, abi=game_contract_abi())
+
+        self.nonces = NonceManager(self.web3, self.account.address)
+        self.gas_price = GasPriceOracle(self.web3)
+        self.receipts = ReceiptWatcher(self.web3)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._chain_id: Optional[int] = None
+        self._setup_lock = asyncio.Lock()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "nonce_resyncs": self.nonces.resyncs, "gas_price_fetches": self.gas_price.fetches,
+            "block_polls": self.receipts.block_polls, "receipt_polls": self.receipts.receipt_polls,
+        }
+
+    async def _ensure_session(self) -> None:
+        if self._chain_id is not None:
+            return
+        async with self._setup_lock:
+            if self._session is None:
+                self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.pool_size))
+                await self.web3.provider.cache_async_session(self._session)
+            if self._chain_id is None:
+                self._chain_id = await self.web3.eth.chain_id
+
+    async def close(self) -> None:
+        await self.receipts.close()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _transact(self, function, value: int = 0) -> Dict[str, Any]:
+        """Ký, gửi với nonce local rồi chờ receipt; revert thì ném lỗi kèm lý do."""
+        await self._ensure_session()
+        gas_price = await self.gas_price.get()
+
+        async def send(nonce: int):
+            txn = await function.build_transaction({
+                'from': self.account.address,
+                'nonce': nonce,
+                'gas': EVM_GAS_LIMIT,
+                'gasPrice': gas_price,
+                'value': value,
+                'chainId': self._chain_id,
+            })
+            signed_txn = self.account.sign_transaction(txn)
+            return await self.web3.eth.send_raw_transaction(signed_txn.raw_transaction)
+
+        tx_hash = Web3.to_hex(await self.nonces.send(send))
+        try:
+            receipt = await self.receipts.wait(tx_hash)
+        except TimeoutError:
+            # Transaction có thể đã bị rớt khỏi mempool: nonce sau nó sẽ không bao giờ được đào
+            self.nonces.reset()
+            raise
+        if receipt['status'] == 0:
+            raise Exception(await self._revert_reason(function, value, tx_hash, receipt))
+        return receipt
+
+    async def _revert_reason(self, function, value: int, tx_hash: str, receipt: Dict[str, Any]) -> str:
+        try:
+            await function.call({'from': self.account.address, 'value': value}, block_identifier=receipt['blockNumber'] - 1)
+        except ContractLogicError as e:
+            return str(e)
+        except Exception as e:
+            log.warning("[EVM] Could not replay reverted transaction %s: %s", tx_hash, e)
+        return f"Transaction {tx_hash} reverted"
+
+    async def mint_nft(self, room_id: str, metadata_uri: str) -> dict:
+        """Mint NFT for a room (deployer becomes owner)"""
+        room_id_bytes = self._convert_uuid_to_bytes16(room_id)
+        receipt = await self._transact(
+            self.nft_contract.functions.mintGameNFT(room_id_bytes, metadata_uri), value=Web3.to_wei(0.01, 'ether'),
+        )
+        return {
+            'transactionHash': Web3.to_hex(receipt['transactionHash']),
+            'blockNumber': receipt['blockNumber'],
+            'gasUsed': receipt['gasUsed'],
+            'status': receipt['status'],
+            'room_id': room_id,
+            'metadata_uri': metadata_uri
+        }
+
+    async def submit_game_result(self, room_id: str, winner_address: str, score: int, zk_proof: str) -> dict:
+        """Submit game result and transfer NFT to winner via Game contract"""
+        room_id_bytes = self._convert_uuid_to_bytes16(room_id)
+        zk_proof_bytes = bytes.fromhex(zk_proof[2:]) if zk_proof.startswith('0x') else Web3.keccak(text=zk_proof)
+        log.debug("Submitting game result for room %s: winner %s, score %s, proof %s bytes", room_id, winner_address, score, len(zk_proof_bytes))
+
+        receipt = await self._transact(
+            self.game_contract.functions.submitGameResult(room_id_bytes, winner_address, score, zk_proof_bytes)
+        )
+        log.info("Transaction successful: %s", Web3.to_hex(receipt['transactionHash']))
+        return {
+            'transactionHash': Web3.to_hex(receipt['transactionHash']),
+            'blockNumber': receipt['blockNumber'],
+            'gasUsed': receipt['gasUsed'],
+            'status': receipt['status'],
+            'room_id': room_id,
+            'winner_address': winner_address,
+            'score': score
+        }
+
+    async def get_nft_by_room(self, room_id: str):
+        """Get NFT information by room ID"""
+        await self._ensure_session()
+        room_id_bytes = self._convert_uuid_to_bytes16(room_id)
+        return await self.nft_contract.functions.getNFTByRoom(room_id_bytes).call()
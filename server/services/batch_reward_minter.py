@@ -0,0 +1,144 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from config.chain import resolve
+from config.logging_config import NFT, get_logger
+
+log = get_logger(NFT)
+
+# Số người thắng tối đa mỗi transaction batch_mint_and_offer; 1 = tắt, mỗi người thắng mint riêng
+APTOS_BATCH_SIZE = int(os.getenv("APTOS_BATCH_SIZE") or 1)
+# Người thắng đầu tiên của lô chờ tối đa chừng này trước khi lô được gửi dù chưa đủ
+APTOS_BATCH_MAX_DELAY_MS = int(os.getenv("APTOS_BATCH_MAX_DELAY_MS") or 2000)
+
+
+class BatchRewardMinter:
+    """
+    Gom các lần mint NFT Aptos của nhiều phòng vừa kết thúc thành một transaction
+    (AptosService.batch_mint_to_players → game_module::batch_mint_and_offer) thay vì 2-3 transaction mỗi người thắng.
+    - Cùng chữ ký `mint_nft_to_player` với AptosService, nên RewardQueue dùng thay được; mỗi lời gọi chờ kết quả
+      của riêng người thắng đó, job và `nft_awarded` vẫn theo từng phòng.
+    - Lô được gửi khi đủ `batch_size` hoặc sau `max_delay_ms` tính từ người đầu tiên; mỗi collection (và mỗi tài khoản
+      mint với token `exact_name`) một lô.
+    - Cả lô bị Move hủy (một phần tử lỗi là hủy cả transaction) thì mint lại từng người riêng, để một người
+      lỗi không kéo cả lô vào vòng thử lại của RewardQueue. Lỗi khác (hết hạn chờ, lỗi mạng) thì lô có thể vẫn
+      được thực thi, nên từng người nhận lỗi và được thử lại qua RewardQueue.
+    """
+    def __init__(self, aptos_service, batch_size: int = APTOS_BATCH_SIZE, max_delay_ms: int = APTOS_BATCH_MAX_DELAY_MS):
+        self.aptos_service = aptos_service
+        self.batch_size = batch_size
+        self.max_delay = max_delay_ms / 1000
+        # (collection, tài khoản mint hoặc None) -> [(item, future)]
+        self._batches: Dict[Tuple[str, Optional[str]], List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+        self._timers: Dict[Tuple[str, Optional[str]], asyncio.TimerHandle] = {}
+        self._flushing: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.batched_mints = 0
+        self.fallback_mints = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "waiting": sum(len(batch) for batch in self._batches.values()), "batches": self.batches,
+            "batched_mints": self.batched_mints, "fallback_mints": self.fallback_mints,
+        }
+
+    async def stop(self) -> None:
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for batch in self._batches.values():
+            for _, future in batch:
+                future.cancel()
+        self._batches.clear()
+        for task in list(self._flushing):
+            task.cancel()
+        await asyncio.gather(*self._flushing, return_exceptions=True)
+
+    async def mint_nft_to_player(
+        self,
+        recipient_address: str,
+        collection_name: str,
+        token_name: str,
+        token_description: str,
+        token_uri: str,
+        exact_name: bool = False,
+        on_submitted: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    ) -> Dict[str, Any]:
+        await resolve(self.aptos_service)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        item = {
+            "recipient_address": recipient_address, "token_name": token_name,
+            "token_description": token_description, "token_uri": token_uri,
+            "exact_name": exact_name, "on_submitted": on_submitted,
+        }
+        # Token giữ nguyên tên luôn được mint từ tài khoản cố định theo tên (như khi mint riêng), nên lô gom theo tài khoản đó
+        key = (collection_name, self.aptos_service.creator_for(token_name) if exact_name else None)
+        batch = self._batches.setdefault(key, [])
+        batch.append((item, future))
+        if len(batch) >= self.batch_size:
+            self._flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = loop.call_later(self.max_delay, self._flush, key)
+        return await future
+
+    def _flush(self, key: Tuple[str, Optional[str]]) -> None:
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        # Job bị hủy trong lúc chờ (worker tắt) thì không mint hộ nữa
+        batch = [(item, future) for item, future in self._batches.pop(key, []) if not future.done()]
+        if not batch:
+            return
+        collection_name = key[0]
+        task = asyncio.create_task(self._mint_batch(collection_name, batch))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def _mint_batch(self, collection_name: str, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+
+        async def on_submitted(record: Dict[str, Any]) -> None:
+            # Mỗi người thắng lưu bản ghi của riêng mình (cùng transaction của lô), như khi mint riêng
+            for item, token_name in zip(items, record["token_names"]):
+                if item["on_submitted"]:
+                    await item["on_submitted"]({
+                        "transaction_hash": record["transaction_hash"], "expiration": record["expiration"],
+                        "creator": record["creator"], "collection_name": collection_name, "token_name": token_name,
+                        "recipient_address": item["recipient_address"],
+                    })
+
+        log.info("[APTOS_BATCH] Minting %s tokens in one transaction", len(items))
+        result = await self.aptos_service.batch_mint_to_players(collection_name, items, on_submitted=on_submitted)
+        if result.get("success"):
+            self.batches += 1
+            self.batched_mints += len(batch)
+            for (item, future), token_name in zip(batch, result["token_names"]):
+                if not future.done():
+                    future.set_result({
+                        "success": True,
+                        "message": f"Successfully minted '{token_name}' and offered to {item['recipient_address']}.",
+                        "transaction_hash": result["transaction_hash"],
+                        "explorer_url": result["explorer_url"],
+                    })
+            return
+
+        if not result.get("aborted"):
+            # Lô có thể vẫn được thực thi (hết hạn chờ, lỗi mạng): mint lại từng người có thể tạo token thứ hai.
+            # Trả lỗi cho từng người, RewardQueue thử lại qua bản ghi on_submitted
+            log.warning("[APTOS_BATCH] Batch of %s failed: %s", len(items), result.get("error"))
+            for _, future in batch:
+                if not future.done():
+                    future.set_result({"success": False, "error": result.get("error")})
+            return
+
+        log.warning("[APTOS_BATCH] Batch of %s aborted, minting individually: %s", len(items), result.get("error"))
+        self.fallback_mints += len(batch)
+
+        async def mint_one(item: Dict[str, Any], future: asyncio.Future) -> None:
+            one = await self.aptos_service.mint_nft_to_player(collection_name=collection_name, **item)
+            if not future.done():
+                future.set_result(one)
+
+        await asyncio.gather(*(mint_one(item, future) for item, future in batch))
@@ -0,0 +1,315 @@
+import argparse
+import asyncio
+import json
+import os
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+from config.logging_config import WS, get_logger, setup_logging
+from helpers.json_helper import encode_frame
+
+log = get_logger(WS)
+
+BROADCAST_BUS = (os.getenv("BROADCAST_BUS") or "memory").lower()
+BROADCAST_BUS_URL = os.getenv("BROADCAST_BUS_URL") or "redis://127.0.0.1:6379"
+BROADCAST_BUS_MAX_PENDING = int(os.getenv("BROADCAST_BUS_MAX_PENDING") or 10000)
+
+# on_message(channel, message)
+MessageHandler = Callable[[str, dict], None]
+
+
+class BroadcastBus(ABC):
+    """
+    Kênh pub/sub giữa các worker. Message là dict JSON.
+    - `publish` không bao giờ chờ: chỉ đưa message vào hàng đợi gửi (giống Outbox của WebSocket).
+    - Best effort: message có thể mất khi backend mất kết nối, bên gửi không được phụ thuộc vào việc nhận.
+    """
+
+    @abstractmethod
+    async def start(self, channels: List[str], on_message: MessageHandler) -> None:
+        pass
+
+    @abstractmethod
+    def publish(self, channel: str, message: dict) -> None:
+        pass
+
+    @abstractmethod
+    async def stop(self) -> None:
+        pass
+
+
+# ==================================
+# In-memory
+# ==================================
+
+class InMemoryHub:
+    """Điểm gặp chung của các InMemoryBroadcastBus, đóng vai trò broker cho nhiều worker trong cùng process."""
+    def __init__(self):
+        self.subscribers: Dict[str, List["InMemoryBroadcastBus"]] = defaultdict(list)
+
+
+class InMemoryBroadcastBus(BroadcastBus):
+    """Backend trong bộ nhớ: mặc định khi chạy một worker, và dùng để giả lập nhiều worker khi test."""
+    def __init__(self, hub: Optional[InMemoryHub] = None):
+        self.hub = hub or InMemoryHub()
+        self.channels: List[str] = []
+        self.on_message: Optional[MessageHandler] = None
+
+    async def start(self, channels: List[str], on_message: MessageHandler) -> None:
+        self.channels = list(channels)
+        self.on_message = on_message
+        for channel in self.channels:
+            self.hub.subscribers[channel].append(self)
+
+    def publish(self, channel: str, message: dict) -> None:
+        subscribers = self.hub.subscribers.get(channel)
+        if not subscribers:
+            return
+        # Đi qua JSON như trên dây để bên nhận không dùng chung object với bên gửi
+        data = encode_frame(message)
+        loop = asyncio.get_running_loop()
+        for bus in subscribers:
+            loop.call_soon(bus._deliver, channel, data)
+
+    async def stop(self) -> None:
+        for channel in self.channels:
+            subscribers = self.hub.subscribers.get(channel, [])
+            if self in subscribers:
+                subscribers.remove(self)
+        self.on_message = None
+
+    def _deliver(self, channel: str, data: str) -> None:
+        if self.on_message:
+            self.on_message(channel, json.loads(data))
+
+
+# ==================================
+# Redis protocol (RESP)
+# ==================================
+
+def _encode_command(*args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed")
+    prefix, body = line[:1], line[1:-2]
+    if prefix == b"+":
+        return body.decode()
+    if prefix == b"-":
+        raise RuntimeError(body.decode())
+    if prefix == b":":
+        return int(body)
+    if prefix == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if prefix == b"*":
+        length = int(body)
+        if length < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(length)]
+    raise RuntimeError(f"Unexpected RESP reply: {line!r}")
+
+
+class RespBroadcastBus(BroadcastBus):
+    """
+    Backend dùng giao thức Redis (PUBLISH/SUBSCRIBE) qua asyncio streams, không cần thư viện redis.
+    Chạy được với Redis thật hoặc với LocalPubSubServer bên dưới.
+    - Một kết nối để SUBSCRIBE, một kết nối để PUBLISH; mỗi kết nối tự kết nối lại với backoff.
+    """
+    def __init__(self, url: str = BROADCAST_BUS_URL, max_pending: int = BROADCAST_BUS_MAX_PENDING):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+
+        self.channels: List[str] = []
+        self.on_message: Optional[MessageHandler] = None
+        self._pending: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._tasks: List[asyncio.Task] = []
+        self.dropped = 0
+
+    async def start(self, channels: List[str], on_message: MessageHandler) -> None:
+        self.channels = list(channels)
+        self.on_message = on_message
+        self._tasks = [
+            asyncio.create_task(self._subscribe_loop()),
+            asyncio.create_task(self._publish_loop()),
+        ]
+
+    def publish(self, channel: str, message: dict) -> None:
+        if self._pending.full():
+            # Backend không theo kịp: bỏ message cũ nhất thay vì chặn event loop
+            self._pending.get_nowait()
+            self.dropped += 1
+        self._pending.put_nowait((channel, encode_frame(message)))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ==================================
+    # Helpers
+    # ==================================
+
+    async def _connect(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            writer.write(_encode_command("AUTH", self.password))
+            await writer.drain()
+            await _read_reply(reader)
+        return reader, writer
+
+    async def _publish_loop(self) -> None:
+        item = None
+        delay = 0.5
+        while True:
+            writer = None
+            try:
+                reader, writer = await self._connect()
+                delay = 0.5
+                while True:
+                    if item is None:
+                        item = await self._pending.get()
+                    channel, data = item
+                    writer.write(_encode_command("PUBLISH", channel, data))
+                    await writer.drain()
+                    await _read_reply(reader)
+                    item = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("[BUS] Publish connection to %s:%s failed: %s", self.host, self.port, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 10)
+            finally:
+                if writer:
+                    writer.close()
+
+    async def _subscribe_loop(self) -> None:
+        delay = 0.5
+        while True:
+            writer = None
+            try:
+                reader, writer = await self._connect()
+                writer.write(_encode_command("SUBSCRIBE", *self.channels))
+                await writer.drain()
+                delay = 0.5
+                while True:
+                    reply = await _read_reply(reader)
+                    if not isinstance(reply, list) or len(reply) != 3 or reply[0] != b"message":
+                        continue
+                    channel, data = reply[1].decode(), reply[2]
+                    try:
+                        self.on_message(channel, json.loads(data))
+                    except Exception as e:
+                        log.error("[BUS] Failed to handle message on %s: %s", channel, e)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("[BUS] Subscribe connection to %s:%s failed: %s", self.host, self.port, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 10)
+            finally:
+                if writer:
+                    writer.close()
+
+
+class LocalPubSubServer:
+    """
+    Server tối giản nói giao thức Redis, chỉ hỗ trợ SUBSCRIBE / PUBLISH / PING / AUTH.
+    Dùng thay Redis khi chạy nhiều worker trên máy dev hoặc khi load test:
+
+        python -m services.broadcast_bus --port 6379
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379):
+        self.host = host
+        self.port = port
+        self.subscribers: Dict[str, Set[asyncio.StreamWriter]] = defaultdict(set)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        subscribed: Set[str] = set()
+        try:
+            while True:
+                command = await _read_reply(reader)
+                if not isinstance(command, list) or not command:
+                    continue
+                name = command[0].decode().upper()
+                args = command[1:]
+
+                if name == "SUBSCRIBE":
+                    for raw in args:
+                        channel = raw.decode()
+                        self.subscribers[channel].add(writer)
+                        subscribed.add(channel)
+                        writer.write(b"*3\r\n$9\r\nsubscribe\r\n" + _bulk(raw) + b":%d\r\n" % len(subscribed))
+                elif name == "PUBLISH":
+                    channel, data = args[0], args[1]
+                    receivers = list(self.subscribers.get(channel.decode(), ()))
+                    frame = b"*3\r\n$7\r\nmessage\r\n" + _bulk(channel) + _bulk(data)
+                    for receiver in receivers:
+                        receiver.write(frame)
+                    writer.write(b":%d\r\n" % len(receivers))
+                elif name == "PING":
+                    writer.write(b"+PONG\r\n")
+                elif name == "AUTH":
+                    writer.write(b"+OK\r\n")
+                else:
+                    writer.write(b"-ERR unknown command '%s'\r\n" % name.encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in subscribed:
+                self.subscribers[channel].discard(writer)
+            writer.close()
+
+
+def _bulk(data: bytes) -> bytes:
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+def create_broadcast_bus() -> BroadcastBus:
+    """Chọn backend theo BROADCAST_BUS: `memory` (mặc định, một worker) hoặc `redis`."""
+    if BROADCAST_BUS == "redis":
+        return RespBroadcastBus(BROADCAST_BUS_URL)
+    return InMemoryBroadcastBus()
+
+
+async def _serve(host: str, port: int) -> None:
+    server = LocalPubSubServer(host, port)
+    await server.start()
+    log.info("[BUS] Local pub/sub server listening on %s:%s", host, port)
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Redis-protocol pub/sub server for multi-worker development")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+    setup_logging()
+    asyncio.run(_serve(args.host, args.port))
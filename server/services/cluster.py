@@ -0,0 +1,257 @@
+import asyncio
+import hashlib
+import inspect
+import itertools
+import os
+import uuid
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+
+from config.logging_config import GAME, get_logger
+from helpers.json_helper import encode_frame
+from services.broadcast_bus import BroadcastBus, InMemoryBroadcastBus
+
+log = get_logger(GAME)
+
+WORKER_ID = os.getenv("WORKER_ID") or "local"
+# Danh sách worker cố định của cluster, ví dụ "w0,w1,w2". Mặc định chỉ có worker hiện tại.
+CLUSTER_WORKERS = [w.strip() for w in (os.getenv("CLUSTER_WORKERS") or WORKER_ID).split(",") if w.strip()]
+CLUSTER_CALL_TIMEOUT_SECONDS = float(os.getenv("CLUSTER_CALL_TIMEOUT_SECONDS") or 10)
+
+BROADCAST_CHANNEL = "cw:broadcast"
+
+Handler = Callable[[dict], Union[Any, Awaitable[Any]]]
+
+
+def _worker_channel(worker_id: str) -> str:
+    return f"cw:worker:{worker_id}"
+
+
+def _weight(worker_id: str, room_id: str) -> int:
+    # hash() của Python bị random theo process, nên dùng blake2b để mọi worker tính ra cùng kết quả
+    digest = hashlib.blake2b(f"{worker_id}|{room_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class Cluster:
+    """
+    Điều phối nhiều worker cùng phục vụ WebSocket qua một BroadcastBus.
+    - Mỗi phòng có đúng một worker sở hữu (rendezvous hashing trên CLUSTER_WORKERS): trạng thái phòng,
+      game loop và các timer của phòng chỉ chạy ở worker đó.
+    - Worker giữ lease của phòng (RoomOwnership) được ưu tiên hơn kết quả hashing, để phòng đi theo
+      worker đã tiếp quản nó khi owner cũ chết.
+    - `publish(kind, payload)`: gửi tới mọi worker khác (broadcast WebSocket, delta của sảnh chờ...).
+    - `send(worker, name, payload)`: gửi một chiều tới handler `name` của một worker.
+    - `call(room_id, name, payload)`: gọi handler `name` ở worker sở hữu phòng và chờ kết quả.
+    Khi cluster chỉ có một worker thì mọi thứ chạy trực tiếp, không đi qua bus.
+    """
+    def __init__(
+        self,
+        bus: Optional[BroadcastBus] = None,
+        worker_id: str = WORKER_ID,
+        workers: Optional[List[str]] = None,
+        call_timeout: float = CLUSTER_CALL_TIMEOUT_SECONDS,
+    ):
+        self.bus = bus or InMemoryBroadcastBus()
+        self.worker_id = worker_id
+        self.workers = sorted(set(workers or CLUSTER_WORKERS) | {worker_id})
+        self.call_timeout = call_timeout
+
+        # {name: handler} cho send/call
+        self.handlers: Dict[str, Handler] = {}
+        # {kind: [handler]} cho publish
+        self.subscribers: Dict[str, List[Callable[[dict], None]]] = defaultdict(list)
+
+        # {room_id: worker_id} - owner theo lease, ghi đè kết quả hashing
+        self.owners: Dict[str, str] = {}
+        self.subscribe("owner", self._on_owner_changed)
+
+        self._calls: Dict[str, asyncio.Future] = {}
+        self._call_ids = itertools.count()
+
+    @property
+    def single(self) -> bool:
+        return len(self.workers) == 1
+
+    # ==================================
+    # Room affinity
+    # ==================================
+
+    def owner_of(self, room_id: str) -> str:
+        if self.single:
+            return self.worker_id
+        return self.owners.get(room_id) or self.candidates(room_id)[0]
+
+    def candidates(self, room_id: str) -> List[str]:
+        """Các worker theo thứ tự ưu tiên sở hữu phòng."""
+        return sorted(self.workers, key=lambda worker_id: _weight(worker_id, room_id), reverse=True)
+
+    def set_owner(self, room_id: str, worker_id: str, publish: bool = True) -> None:
+        self.owners[room_id] = worker_id
+        if publish:
+            self.publish("owner", {"roomId": room_id, "workerId": worker_id})
+
+    def clear_owner(self, room_id: str) -> None:
+        if self.owners.pop(room_id, None) is not None:
+            self.publish("owner", {"roomId": room_id, "workerId": None})
+
+    def _on_owner_changed(self, payload: dict) -> None:
+        if payload["workerId"]:
+            self.owners[payload["roomId"]] = payload["workerId"]
+        else:
+            self.owners.pop(payload["roomId"], None)
+
+    def is_owner(self, room_id: str) -> bool:
+        return self.owner_of(room_id) == self.worker_id
+
+    def new_room_id(self) -> str:
+        """Sinh id cho phòng mới sao cho worker hiện tại là owner (trung bình len(workers) lần thử)."""
+        while True:
+            room_id = str(uuid.uuid4())
+            if self.is_owner(room_id):
+                return room_id
+
+    # ==================================
+    # Vòng đời
+    # ==================================
+
+    async def start(self) -> None:
+        await self.bus.start([BROADCAST_CHANNEL, _worker_channel(self.worker_id)], self._on_message)
+
+    async def stop(self) -> None:
+        for future in self._calls.values():
+            if not future.done():
+                future.cancel()
+        self._calls.clear()
+        await self.bus.stop()
+
+    # ==================================
+    # Gửi
+    # ==================================
+
+    def register(self, name: str, handler: Handler) -> None:
+        self.handlers[name] = handler
+
+    def subscribe(self, kind: str, handler: Callable[[dict], None]) -> None:
+        self.subscribers[kind].append(handler)
+
+    def publish(self, kind: str, payload: dict) -> None:
+        if self.single:
+            return
+        self.bus.publish(BROADCAST_CHANNEL, {"kind": kind, "origin": self.worker_id, "payload": payload})
+
+    def send(self, worker_id: str, name: str, payload: dict) -> None:
+        if worker_id == self.worker_id:
+            self._run_handler(name, payload)
+            return
+        self.bus.publish(_worker_channel(worker_id), {
+            "kind": "send", "origin": self.worker_id, "name": name, "payload": payload,
+        })
+
+    async def call(self, room_id: str, name: str, payload: dict) -> Any:
+        owner = self.owner_of(room_id)
+        if owner == self.worker_id:
+            result = self.handlers[name](payload)
+            return await result if inspect.isawaitable(result) else result
+
+        call_id = f"{self.worker_id}:{next(self._call_ids)}"
+        future = asyncio.get_running_loop().create_future()
+        self._calls[call_id] = future
+        self.bus.publish(_worker_channel(owner), {
+            "kind": "call", "origin": self.worker_id, "id": call_id, "name": name, "payload": payload,
+        })
+        try:
+            return await asyncio.wait_for(future, self.call_timeout)
+        except asyncio.TimeoutError:
+            log.error("[CLUSTER] Call %s for room %s to worker %s timed out", name, room_id, owner)
+            raise HTTPException(status_code=503, detail="Room owner is unavailable")
+        finally:
+            self._calls.pop(call_id, None)
+
+    # ==================================
+    # Nhận
+    # ==================================
+
+    def _on_message(self, channel: str, message: dict) -> None:
+        kind = message.get("kind")
+        if kind == "send":
+            self._run_handler(message["name"], message["payload"])
+        elif kind == "call":
+            asyncio.create_task(self._answer(message))
+        elif kind == "reply":
+            future = self._calls.get(message["id"])
+            if future and not future.done():
+                error = message.get("error")
+                if error:
+                    future.set_exception(HTTPException(status_code=error["status_code"], detail=error["detail"]))
+                else:
+                    future.set_result(message.get("result"))
+        elif message.get("origin") != self.worker_id:
+            for handler in self.subscribers.get(kind, ()):
+                try:
+                    handler(message["payload"])
+                except Exception as e:
+                    log.error("[CLUSTER] Subscriber for %s failed: %s", kind, e)
+
+    def _run_handler(self, name: str, payload: dict) -> None:
+        # Handler đồng bộ chạy ngay để giữ đúng thứ tự message; handler async chạy ở background
+        handler = self.handlers.get(name)
+        if not handler:
+            log.error("[CLUSTER] No handler registered for %s", name)
+            return
+        try:
+            result = handler(payload)
+            if inspect.isawaitable(result):
+                asyncio.ensure_future(result)
+        except Exception as e:
+            log.error("[CLUSTER] Handler %s failed: %s", name, e)
+
+    async def _answer(self, message: dict) -> None:
+        reply = {"kind": "reply", "origin": self.worker_id, "id": message["id"]}
+        handler = self.handlers.get(message["name"])
+        try:
+            if not handler:
+                raise HTTPException(status_code=500, detail=f"No handler for {message['name']}")
+            result = handler(message["payload"])
+            if inspect.isawaitable(result):
+                result = await result
+            reply["result"] = jsonable_encoder(result)
+        except HTTPException as e:
+            reply["error"] = {"status_code": e.status_code, "detail": e.detail}
+        except Exception as e:
+            log.error("[CLUSTER] Call %s failed: %s", message["name"], e)
+            reply["error"] = {"status_code": 500, "detail": "Internal server error"}
+        self.bus.publish(_worker_channel(message["origin"]), reply)
+
+
+class RemoteSocket:
+    """
+    Đại diện (ở worker owner) cho một WebSocket đang được giữ ở worker khác.
+    Frame gửi tới nó được chuyển qua bus về worker đang giữ kết nối thật.
+    """
+    def __init__(self, cluster: Cluster, origin: str, conn_id: str):
+        self.cluster = cluster
+        self.origin = origin
+        self.conn_id = conn_id
+
+    def deliver(self, frame: str, msg_type: Optional[str] = None) -> bool:
+        self.cluster.send(self.origin, "ws.frame", {"conn": self.conn_id, "frame": frame, "type": msg_type})
+        return True
+
+    async def send_text(self, frame: str) -> None:
+        self.deliver(frame)
+
+    async def send_json(self, data: dict) -> None:
+        self.deliver(encode_frame(data), data.get("type"))
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        self.cluster.send(self.origin, "ws.close", {"conn": self.conn_id, "code": code, "reason": reason})
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, RemoteSocket) and (self.origin, self.conn_id) == (other.origin, other.conn_id)
+
+    def __hash__(self) -> int:
+        return hash((self.origin, self.conn_id))
@@ -0,0 +1,252 @@
+import asyncio
+import os
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, List, Optional, Set
+
+from sortedcontainers import SortedKeyList
+
+from config.logging_config import DB, get_logger
+from enums.leaderboard_period import LEADERBOARD_PERIOD
+from models.leaderboard_entry import LeaderboardEntry
+from repositories.implement.user_repo_impl import UserStatsRepository
+
+log = get_logger(DB)
+
+LEADERBOARD_RECONCILE_SECONDS = int(os.getenv("LEADERBOARD_RECONCILE_SECONDS") or 300)
+
+PERIOD_WINDOWS = {
+    LEADERBOARD_PERIOD.THIS_WEEK: timedelta(days=7),
+    LEADERBOARD_PERIOD.THIS_MONTH: timedelta(days=30),
+}
+
+
+class _Board:
+    """Bảng xếp hạng của một period: điểm theo wallet + chỉ mục đã sắp xếp (điểm giảm dần, hòa thì theo wallet)."""
+    def __init__(self):
+        self.scores: Dict[str, int] = {}
+        self.games_won: Dict[str, int] = {}
+        self.games_played: Dict[str, int] = {}
+        self.index = SortedKeyList(key=self._key)
+
+    def _key(self, wallet_id: str):
+        return (-self.scores[wallet_id], wallet_id)
+
+    def set(self, wallet_id: str, score: int, won: int = 0, played: int = 0) -> None:
+        # Phải bỏ khỏi chỉ mục trước khi đổi điểm vì key được tính từ điểm hiện tại
+        if wallet_id in self.scores:
+            self.index.remove(wallet_id)
+        self.scores[wallet_id] = score
+        self.games_won[wallet_id] = self.games_won.get(wallet_id, 0) + won
+        self.games_played[wallet_id] = self.games_played.get(wallet_id, 0) + played
+        if score > 0 or self.games_played[wallet_id] > 0:
+            self.index.add(wallet_id)
+        else:
+            self._drop(wallet_id)
+
+    def add(self, wallet_id: str, score: int, won: int = 0, played: int = 0) -> None:
+        self.set(wallet_id, self.scores.get(wallet_id, 0) + score, won, played)
+
+    def rank(self, wallet_id: str) -> Optional[int]:
+        if wallet_id not in self.scores:
+            return None
+        return self.index.bisect_key_left(self._key(wallet_id)) + 1
+
+    def _drop(self, wallet_id: str) -> None:
+        self.scores.pop(wallet_id, None)
+        self.games_won.pop(wallet_id, None)
+        self.games_played.pop(wallet_id, None)
+
+
+class LeaderboardService:
+    """
+    Leaderboard giữ trong bộ nhớ cho từng LEADERBOARD_PERIOD.
+    - Tra rank của một wallet O(log n), top-K và "xung quanh tôi" O(log n + k).
+    - ALL_TIME dùng tổng điểm trong user_stats; THIS_WEEK/THIS_MONTH là cửa sổ trượt
+      chỉ tính các game kết thúc trong 7/30 ngày gần nhất.
+    - Được cập nhật từ `_handle_game_end` và đối chiếu lại với DB định kỳ.
+    """
+    def __init__(self, user_stats_repo: UserStatsRepository, reconcile_seconds: int = LEADERBOARD_RECONCILE_SECONDS):
+        self.user_stats_repo = user_stats_repo
+        self.reconcile_seconds = reconcile_seconds
+
+        self.boards: Dict[LEADERBOARD_PERIOD, _Board] = {period: _Board() for period in LEADERBOARD_PERIOD}
+        # Các game trong mỗi cửa sổ, theo thứ tự thời gian kết thúc, để trừ điểm khi game hết hạn
+        self.events: Dict[LEADERBOARD_PERIOD, Deque[dict]] = {period: deque() for period in PERIOD_WINDOWS}
+        # {(room_id, wallet_id)} đã có trong cửa sổ, tránh cộng trùng sau khi đối chiếu với DB
+        self.seen: Dict[LEADERBOARD_PERIOD, Set[tuple]] = {period: set() for period in PERIOD_WINDOWS}
+        self.usernames: Dict[str, str] = {}
+        self.tiers: Dict[str, Optional[str]] = {}
+
+        self.ready = False
+        self._reconciling = False
+        self._recorded_while_reconciling: List[dict] = []
+        self._task: Optional[asyncio.Task] = None
+
+    # ==================================
+    # Cập nhật
+    # ==================================
+
+    def record_game(self, room_id: str, ended_at: datetime, results: List[dict]) -> None:
+        """
+        Ghi nhận kết quả một game. Mỗi phần tử của `results`:
+        {wallet_id, username, score, is_winner, total_score (tổng điểm mới trong user_stats, có thể None)}.
+        """
+        events = [
+            {
+                "room_id": room_id,
+                "wallet_id": r["wallet_id"],
+                "score": r["score"],
+                "is_winner": r["is_winner"],
+                "ended_at": ended_at,
+            }
+            for r in results
+        ]
+        for r in results:
+            if r.get("username"):
+                self.usernames[r["wallet_id"]] = r["username"]
+
+            board = self.boards[LEADERBOARD_PERIOD.ALL_TIME]
+            won = 1 if r["is_winner"] else 0
+            if r.get("total_score") is not None:
+                board.set(r["wallet_id"], r["total_score"], won, 1)
+            else:
+                board.add(r["wallet_id"], r["score"], won, 1)
+
+        self._add_window_events(events)
+        if self._reconciling:
+            self._recorded_while_reconciling.extend(events)
+
+    def _add_window_events(self, events: List[dict]) -> None:
+        for period in PERIOD_WINDOWS:
+            board = self.boards[period]
+            for event in events:
+                key = (event["room_id"], event["wallet_id"])
+                if key in self.seen[period]:
+                    continue
+                self.events[period].append(event)
+                board.add(event["wallet_id"], event["score"], 1 if event["is_winner"] else 0, 1)
+                self.seen[period].add(key)
+        self._expire()
+
+    def _expire(self) -> None:
+        now = datetime.now(timezone.utc)
+        for period, window in PERIOD_WINDOWS.items():
+            events, board = self.events[period], self.boards[period]
+            while events and events[0]["ended_at"] < now - window:
+                event = events.popleft()
+                board.set(
+                    event["wallet_id"],
+                    board.scores.get(event["wallet_id"], 0) - event["score"],
+                    -1 if event["is_winner"] else 0,
+                    -1,
+                )
+                self.seen[period].discard((event["room_id"], event["wallet_id"]))
+
+    # ==================================
+    # Tra cứu
+    # ==================================
+
+    def get_top(self, period: LEADERBOARD_PERIOD = LEADERBOARD_PERIOD.ALL_TIME, limit: int = 10) -> List[LeaderboardEntry]:
+        self._expire()
+        board = self.boards[period]
+        return [self._entry(period, w, i + 1) for i, w in enumerate(board.index.islice(0, limit))]
+
+    def get_rank(self, wallet_id: str, period: LEADERBOARD_PERIOD = LEADERBOARD_PERIOD.ALL_TIME) -> Optional[LeaderboardEntry]:
+        self._expire()
+        rank = self.boards[period].rank(wallet_id)
+        return self._entry(period, wallet_id, rank) if rank else None
+
+    def get_around(self, wallet_id: str, period: LEADERBOARD_PERIOD = LEADERBOARD_PERIOD.ALL_TIME, radius: int = 5) -> List[LeaderboardEntry]:
+        self._expire()
+        board = self.boards[period]
+        rank = board.rank(wallet_id)
+        if not rank:
+            return []
+        start = max(rank - 1 - radius, 0)
+        return [
+            self._entry(period, w, start + i + 1)
+            for i, w in enumerate(board.index.islice(start, rank + radius))
+        ]
+
+    def _entry(self, period: LEADERBOARD_PERIOD, wallet_id: str, rank: int) -> LeaderboardEntry:
+        board = self.boards[period]
+        entry = LeaderboardEntry(
+            wallet_id=wallet_id,
+            username=self.usernames.get(wallet_id, ""),
+            total_score=board.scores.get(wallet_id, 0),
+            games_played=board.games_played.get(wallet_id, 0),
+            games_won=board.games_won.get(wallet_id, 0),
+            rank=rank,
+            leaderboard_period=period,
+        )
+        # Tier luôn theo tổng điểm toàn thời gian
+        entry.tier = self.tiers.get(wallet_id) or self._tier(wallet_id)
+        return entry
+
+    def _tier(self, wallet_id: str) -> Optional[str]:
+        all_time = LeaderboardEntry(
+            wallet_id=wallet_id,
+            total_score=self.boards[LEADERBOARD_PERIOD.ALL_TIME].scores.get(wallet_id, 0),
+        )
+        all_time.calculate_tier()
+        return all_time.tier
+
+    # ==================================
+    # Đối chiếu với DB
+    # ==================================
+
+    async def reconcile(self) -> None:
+        """Dựng lại toàn bộ leaderboard từ DB rồi thay thế bản trong bộ nhớ."""
+        self._reconciling = True
+        self._recorded_while_reconciling = []
+        try:
+            now = datetime.now(timezone.utc)
+            stats = await self.user_stats_repo.get_all_stats()
+            longest = max(PERIOD_WINDOWS.values())
+            game_events = await self.user_stats_repo.get_game_events_since(now - longest)
+        except Exception as e:
+            self._reconciling = False
+            log.error("[LEADERBOARD] Reconcile failed: %s", e)
+            return
+
+        boards = {period: _Board() for period in LEADERBOARD_PERIOD}
+        for row in stats:
+            boards[LEADERBOARD_PERIOD.ALL_TIME].set(
+                row["wallet_id"], row.get("total_score") or 0, row.get("games_won") or 0, row.get("games_played") or 0
+            )
+
+        # Không có await từ đây: thay thế trạng thái một lần
+        all_time = self.boards[LEADERBOARD_PERIOD.ALL_TIME]
+        self.boards = boards
+        self.events = {period: deque() for period in PERIOD_WINDOWS}
+        self.seen = {period: set() for period in PERIOD_WINDOWS}
+        self.usernames.update({row["wallet_id"]: row["username"] for row in stats if row.get("username")})
+        self.tiers = {row["wallet_id"]: row.get("tier") for row in stats}
+
+        self._add_window_events(sorted(game_events, key=lambda e: e["ended_at"]))
+        # Game kết thúc trong lúc đang đọc DB có thể chưa có trong snapshot
+        self._add_window_events(self._recorded_while_reconciling)
+        for event in self._recorded_while_reconciling:
+            wallet_id = event["wallet_id"]
+            if all_time.scores.get(wallet_id, 0) > boards[LEADERBOARD_PERIOD.ALL_TIME].scores.get(wallet_id, 0):
+                boards[LEADERBOARD_PERIOD.ALL_TIME].set(wallet_id, all_time.scores[wallet_id])
+
+        self._recorded_while_reconciling = []
+        self._reconciling = False
+        self.ready = True
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.reconcile()
+            await asyncio.sleep(self.reconcile_seconds)
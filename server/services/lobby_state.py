@@ -0,0 +1,127 @@
+import os
+import uuid
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from enums.game_status import GAME_STATUS
+from models.room import Room
+from repositories.interfaces.room_repo import IRoomRepository
+from services.cluster import Cluster
+from services.websocket_manager import WebSocketManager
+
+LOBBY_DELTA_BUFFER = int(os.getenv("LOBBY_DELTA_BUFFER") or 512)
+
+# Các trạng thái phòng được hiển thị ở sảnh chờ
+LOBBY_STATUSES = (GAME_STATUS.WAITING, GAME_STATUS.IN_PROGRESS)
+
+
+class LobbyState:
+    """
+    Danh sách phòng đang mở ở sảnh chờ, giữ trong bộ nhớ và đẩy thay đổi qua /ws/lobby.
+    - Mỗi thay đổi có `version` tăng dần: room_added, room_updated (số người, trạng thái...), room_removed.
+    - Giữ `buffer_size` delta gần nhất: client kết nối lại gửi version cuối đã biết để nhận phần còn thiếu,
+      quá xa thì nhận lại snapshot.
+    - Chỉ phát delta khi thông tin hiển thị ở sảnh thay đổi, không phát khi điểm/câu hỏi trong game đổi.
+    - Khi chạy nhiều worker, thay đổi của phòng được worker owner chia sẻ qua cluster; mỗi worker tự đánh
+      version cho client của mình, `epoch` giúp client nhận ra khi đã kết nối sang worker khác.
+    """
+    def __init__(
+        self,
+        manager: WebSocketManager,
+        room_repo: IRoomRepository,
+        cluster: Optional[Cluster] = None,
+        buffer_size: int = LOBBY_DELTA_BUFFER,
+    ):
+        self.manager = manager
+        self.room_repo = room_repo
+        self.cluster = cluster
+        if cluster:
+            cluster.subscribe("lobby", self._on_remote_change)
+
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+        self.rooms: Dict[str, dict] = {}
+        self.deltas: Deque[dict] = deque(maxlen=buffer_size)
+
+    # ==================================
+    # Cập nhật
+    # ==================================
+
+    async def load(self) -> None:
+        """Nạp các phòng đang mở từ DB (khi khởi động)."""
+        for status in LOBBY_STATUSES:
+            for room in await self.room_repo.get_all(status):
+                self.rooms[room.id] = self._summary(room)
+        self.version += 1
+
+    def on_room_changed(self, room_id: str, room: Optional[Room]) -> None:
+        """Được RoomStateStore gọi sau mỗi thay đổi của một phòng (`room` là None khi phòng bị xóa)."""
+        visible = room is not None and room.status in LOBBY_STATUSES and len(room.players) > 0
+        summary = self._summary(room) if visible else None
+        if self._apply(room_id, summary) and self.cluster:
+            self.cluster.publish("lobby", {"roomId": room_id, "room": summary})
+
+    def _on_remote_change(self, payload: dict) -> None:
+        self._apply(payload["roomId"], payload["room"])
+
+    # ==================================
+    # Đọc
+    # ==================================
+
+    def snapshot(self) -> dict:
+        return {"type": "lobby_snapshot", "epoch": self.epoch, "version": self.version, "rooms": list(self.rooms.values())}
+
+    def changes_since(self, version: int, epoch: Optional[str] = None) -> List[dict]:
+        """Các delta sau `version`, hoặc một snapshot nếu buffer không còn đủ để nối tiếp."""
+        if epoch is not None and epoch != self.epoch:
+            return [self.snapshot()]
+        if version == self.version:
+            return []
+        oldest = self.deltas[0]["version"] if self.deltas else self.version + 1
+        if version > self.version or version < oldest - 1:
+            return [self.snapshot()]
+        return [d for d in self.deltas if d["version"] > version]
+
+    # ==================================
+    # Helpers
+    # ==================================
+
+    def _apply(self, room_id: str, summary: Optional[dict]) -> bool:
+        """Cập nhật danh sách phòng và phát delta cho client ở worker này. Trả về False nếu không có gì đổi."""
+        if summary is None:
+            if self.rooms.pop(room_id, None) is None:
+                return False
+            self._publish("room_removed", room_id, None)
+            return True
+
+        previous = self.rooms.get(room_id)
+        if previous == summary:
+            return False
+        self.rooms[room_id] = summary
+        self._publish("room_added" if previous is None else "room_updated", room_id, summary)
+        return True
+
+    def _publish(self, op: str, room_id: str, room: Optional[dict]) -> None:
+        self.version += 1
+        delta = {"type": "lobby_delta", "epoch": self.epoch, "version": self.version, "op": op, "roomId": room_id, "room": room}
+        self.deltas.append(delta)
+        # Các worker khác tự phát delta với version của mình
+        self.manager.publish_to_lobby(delta, propagate=False)
+
+    @staticmethod
+    def _summary(room: Room) -> dict:
+        return {
+            "id": room.id,
+            "roomCode": room.room_code,
+            "status": room.status,
+            "players": [
+                {"walletId": p.wallet_id, "username": p.username, "isHost": p.is_host, "isReady": p.is_ready}
+                for p in room.players
+            ],
+            "totalQuestions": room.total_questions,
+            "timePerQuestion": room.time_per_question,
+            "countdownDuration": room.countdown_duration,
+            "entryFee": room.entry_fee,
+            "prize": room.prize,
+            "createdAt": room.created_at.isoformat() if room.created_at else None,
+        }
@@ -0,0 +1,255 @@
+import functools
+import inspect
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, TypeVar
+
+from config.logging_config import GAME, get_logger
+
+log = get_logger(GAME)
+
+T = TypeVar("T")
+
+# Giây; bucket cuối cùng (+Inf) được thêm khi render
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Nguồn gốc của lời gọi hiện tại: loại message WebSocket (`submit_answer`, `start_game`...),
+# `timer:<purpose>`, `http`; việc chạy nền (write-behind, refresh...) là `background`
+ORIGIN: ContextVar[str] = ContextVar("metrics_origin", default="background")
+
+
+class _Series:
+    __slots__ = ("buckets", "count", "total", "errors")
+
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+
+
+class Metrics:
+    """
+    Đếm số lần gọi, histogram độ trễ và số lỗi của repositories và các lời gọi ra ngoài (PostgREST, Aptos, web3),
+    theo (component, method, origin). Mỗi lần ghi chỉ là vài phép cộng trên dict, đủ rẻ để bật khi chạy thật.
+    `gauges` chứa các hàm trả về dict số liệu hiện tại (timer wheel, actors...) để xuất cùng ở /metrics.
+    """
+    def __init__(self):
+        self.series: Dict[Tuple[str, str, str], _Series] = {}
+        self.gauges: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def observe(self, component: str, method: str, seconds: float, error: bool = False) -> None:
+        key = (component, method, ORIGIN.get())
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = _Series()
+        series.count += 1
+        series.total += seconds
+        index = bisect_left(LATENCY_BUCKETS, seconds)
+        if index < len(LATENCY_BUCKETS):
+            series.buckets[index] += 1
+        if error:
+            series.errors += 1
+
+    def render(self) -> str:
+        """Prometheus text format (version 0.0.4)."""
+        lines: List[str] = [
+            "# HELP app_call_duration_seconds Latency of repository and outbound calls.",
+            "# TYPE app_call_duration_seconds histogram",
+        ]
+        for (component, method, origin), series in sorted(self.series.items()):
+            labels = f'component="{component}",method="{_escape(method)}",origin="{_escape(origin)}"'
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS, series.buckets):
+                cumulative += n
+                lines.append(f'app_call_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'app_call_duration_seconds_bucket{{{labels},le="+Inf"}} {series.count}')
+            lines.append(f"app_call_duration_seconds_sum{{{labels}}} {series.total:.6f}")
+            lines.append(f"app_call_duration_seconds_count{{{labels}}} {series.count}")
+
+        lines += [
+            "# HELP app_call_errors_total Repository and outbound calls that raised or returned an error status.",
+            "# TYPE app_call_errors_total counter",
+        ]
+        for (component, method, origin), series in sorted(self.series.items()):
+            labels = f'component="{component}",method="{_escape(method)}",origin="{_escape(origin)}"'
+            lines.append(f"app_call_errors_total{{{labels}}} {series.errors}")
+
+        for name, collect in self.gauges.items():
+            try:
+                values = collect()
+            except Exception as e:
+                log.error("[METRICS] Gauge %s failed: %s", name, e)
+                continue
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    metric = f"app_{name}_{key}"
+                    lines.append(f"# TYPE {metric} gauge")
+                    lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ==================================
+# Gắn origin
+# ==================================
+
+def with_origin(origin: str, event: Callable[[], Awaitable[T]]) -> Callable[[], Awaitable[T]]:
+    """Bọc event (của actor / timer) để mọi lời gọi bên trong được gắn nhãn `origin`."""
+    async def wrapped() -> T:
+        token = ORIGIN.set(origin)
+        try:
+            return await event()
+        finally:
+            ORIGIN.reset(token)
+    return wrapped
+
+
+# ==================================
+# Đo các lời gọi
+# ==================================
+
+def timed(component: str, method: str, fn: Callable) -> Callable:
+    """Bọc một hàm (sync hoặc async) để ghi nhận số lần gọi, độ trễ và exception."""
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception:
+                metrics.observe(component, method, time.perf_counter() - started, error=True)
+                raise
+            metrics.observe(component, method, time.perf_counter() - started)
+            return result
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            metrics.observe(component, method, time.perf_counter() - started, error=True)
+            raise
+        metrics.observe(component, method, time.perf_counter() - started)
+        return result
+    return wrapper
+
+
+def instrument(obj: T, component: str = "repository") -> T:
+    """
+    Đo mọi method public của object (repository). Repository thường tự bắt exception và trả về giá trị rỗng,
+    nên lỗi của chúng được thấy rõ hơn ở lớp PostgREST (`instrument_httpx`).
+    """
+    name = type(obj).__name__
+    for attr in dir(obj):
+        if attr.startswith("_"):
+            continue
+        fn = getattr(obj, attr)
+        if inspect.ismethod(fn):
+            setattr(obj, attr, timed(component, f"{name}.{attr}", fn))
+    return obj
+
+
+def instrument_httpx(client, component: str, label: Callable[[Any], str]) -> None:
+    """
+    Đo mọi request đi qua một httpx.AsyncClient (session của PostgREST, RestClient của Aptos).
+    Status >= 400 và lỗi kết nối đều được tính là lỗi; `label(request)` đặt tên method.
+    """
+    send = client.send
+
+    @functools.wraps(send)
+    async def instrumented_send(request, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await send(request, *args, **kwargs)
+        except Exception:
+            metrics.observe(component, label(request), time.perf_counter() - started, error=True)
+            raise
+        metrics.observe(component, label(request), time.perf_counter() - started, error=response.status_code >= 400)
+        return response
+
+    client.send = instrumented_send
+
+
+def instrument_supabase(supabase) -> None:
+    """Đo các request PostgREST của supabase AsyncClient, đặt tên theo `<HTTP method> <bảng hoặc rpc/tên hàm>`."""
+    session = getattr(getattr(supabase, "postgrest", None), "session", None)
+    if session is None:
+        return  # client giả (SUPABASE_BACKEND=fake) đã tự đếm số lần gọi
+
+    def label(request) -> str:
+        path = request.url.path
+        return f"{request.method} {path.split('/rest/v1/', 1)[-1]}"
+
+    instrument_httpx(session, "postgrest", label)
+
+
+def instrument_web3(web3, component: str = "web3") -> None:
+    """Đo các JSON-RPC của một Web3 (đồng bộ), đặt tên theo RPC method; response có `error` cũng là lỗi."""
+    provider = web3.provider
+    make_request = provider.make_request
+
+    @functools.wraps(make_request)
+    def instrumented(method, params):
+        started = time.perf_counter()
+        try:
+            response = make_request(method, params)
+        except Exception:
+            metrics.observe(component, str(method), time.perf_counter() - started, error=True)
+            raise
+        metrics.observe(component, str(method), time.perf_counter() - started, error="error" in response)
+        return response
+
+    provider.make_request = instrumented
+
+
+def instrument_async_web3(web3, component: str = "web3") -> None:
+    """Như instrument_web3 cho AsyncWeb3."""
+    provider = web3.provider
+    make_request = provider.make_request
+
+    @functools.wraps(make_request)
+    async def instrumented(method, params):
+        started = time.perf_counter()
+        try:
+            response = await make_request(method, params)
+        except Exception:
+            metrics.observe(component, str(method), time.perf_counter() - started, error=True)
+            raise
+        metrics.observe(component, str(method), time.perf_counter() - started, error="error" in response)
+        return response
+
+    provider.make_request = instrumented
+
+
+def route_label(request) -> str:
+    """`GET /v1/accounts/0xabc/resource/...` -> `GET /v1/accounts/:id/resource/...`: không để địa chỉ / hash làm nổ số series."""
+    segments = [
+        ":id" if segment.startswith("0x") or segment.isdigit() or len(segment) > 40 else segment
+        for segment in request.url.path.split("/")
+    ]
+    return f"{request.method} {'/'.join(segments)}"
+
+
+class OriginMiddleware:
+    """ASGI middleware: mọi lời gọi trong một HTTP request được gắn origin `http`."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        token = ORIGIN.set("http")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ORIGIN.reset(token)
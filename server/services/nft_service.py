@@ -1,9 +1,15 @@
+import functools
 import os
 import uuid
 from web3 import Web3
 from dotenv import load_dotenv
 import json
 
+from config.logging_config import NFT, get_logger
+from services.metrics import instrument_web3
+
+log = get_logger(NFT)
+
 load_dotenv()
 
 OLYM3_RPC_URL = os.getenv("OLYM3_RPC_URL", "https://rpc1.olym3.xyz")
@@ -11,19 +17,31 @@ PRIVATE_KEY = os.getenv("PRIVATE_KEY")
 NFT_CONTRACT_ADDRESS = os.getenv("NFT_CONTRACT_ADDRESS")
 GAME_CONTRACT_ADDRESS = os.getenv("GAME_CONTRACT_ADDRESS")
 
-# Load ABI from artifact files
-with open(os.path.join(os.path.dirname(__file__), '../../artifacts/contracts/contracts/ChallengeWaveNFT.sol/ChallengeWaveNFT.json'), 'r') as f:
-    NFT_CONTRACT_ABI = json.load(f)["abi"]
+ARTIFACTS_DIR = os.path.join(os.path.dirname(__file__), '../../artifacts/contracts/contracts')
+
+
+@functools.lru_cache(maxsize=None)
+def load_contract_abi(contract_name: str) -> list:
+    """ABI trong artifact Hardhat của contract; file chỉ được đọc và parse ở lần gọi đầu tiên."""
+    with open(os.path.join(ARTIFACTS_DIR, f"{contract_name}.sol", f"{contract_name}.json"), 'r') as f:
+        return json.load(f)["abi"]
+
+
+def nft_contract_abi() -> list:
+    return load_contract_abi("ChallengeWaveNFT")
+
+
+def game_contract_abi() -> list:
+    return load_contract_abi("ChallengeWaveGame")
 
-with open(os.path.join(os.path.dirname(__file__), '../../artifacts/contracts/contracts/ChallengeWaveGame.sol/ChallengeWaveGame.json'), 'r') as f:
-    GAME_CONTRACT_ABI = json.load(f)["abi"]
 
 class BlockchainService:
     def __init__(self):
         self.web3 = Web3(Web3.HTTPProvider(OLYM3_RPC_URL))
+        instrument_web3(self.web3)
         self.account = self.web3.eth.account.from_key(PRIVATE_KEY)
-        self.nft_contract = self.web3.eth.contract(address=NFT_CONTRACT_ADDRESS, abi=NFT_CONTRACT_ABI)
-        self.game_contract = self.web3.eth.contract(address=GAME_CONTRACT_ADDRESS, abi=GAME_CONTRACT_ABI)
+        self.nft_contract = self.web3.eth.contract(address=NFT_CONTRACT_ADDRESS, abi=nft_contract_abi())
+        self.game_contract = self.web3.eth.contract(address=GAME_CONTRACT_ADDRESS, abi=game_contract_abi())
 
     def _convert_uuid_to_bytes16(self, room_id: str) -> bytes:
         """Convert UUID string to bytes16 for smart contract"""
@@ -33,7 +51,6 @@ class BlockchainService:
             if len(uuid_str) != 32:
                 raise ValueError("Invalid UUID format")
             result = bytes.fromhex(uuid_str)
-            print(f"DEBUG: Converting UUID '{room_id}' to bytes16: {result.hex()}")
             return result
         except Exception as e:
             raise ValueError(f"Invalid UUID format: {room_id}. Error: {str(e)}")
@@ -76,11 +93,7 @@ class BlockchainService:
         room_id_bytes = self._convert_uuid_to_bytes16(room_id)
         zk_proof_bytes = bytes.fromhex(zk_proof[2:]) if zk_proof.startswith('0x') else self.web3.keccak(text=zk_proof)
 
-        print(f"DEBUG: Submitting game result for room {room_id}")
-        print(f"DEBUG: Room ID bytes: {room_id_bytes.hex()}")
-        print(f"DEBUG: Winner address: {winner_address}")
-        print(f"DEBUG: Score: {score}")
-        print(f"DEBUG: ZK Proof: {zk_proof_bytes.hex()}")
+        log.debug("Submitting game result for room %s: winner %s, score %s, proof %s bytes", room_id, winner_address, score, len(zk_proof_bytes))
 
         # Gọi Game contract để submit game result và transfer NFT
         txn = self.game_contract.functions.submitGameResult(
@@ -101,7 +114,7 @@ class BlockchainService:
         tx_hash = self.web3.eth.send_raw_transaction(raw_tx)
         receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
         
-        print(f"DEBUG: Transaction successful: {receipt['transactionHash'].hex()}")
+        log.info("Transaction successful: %s", receipt['transactionHash'].hex())
         
         # Convert receipt to dict for JSON serialization
         return {
@@ -9,10 +9,12 @@ from models.room import Room
 from models.player import Player
 from repositories.interfaces.player_repo import IPlayerRepository
 from repositories.interfaces.room_repo import IRoomRepository
+from services.room_state_store import RoomStateStore
 class PlayerService:
-    def __init__(self, player_repo: IPlayerRepository, room_repo: IRoomRepository):
+    def __init__(self, player_repo: IPlayerRepository, room_repo: IRoomRepository, room_state: Optional[RoomStateStore] = None):
         self.room_repo = room_repo
         self.player_repo = player_repo
+        self.room_state = room_state
 
     async def save_players(self, room_id: str, players: List[Player]) -> None:
         await self.player_repo.save_all(room_id, players)
@@ -21,21 +23,24 @@ class PlayerService:
         return await self.player_repo.get_by_room(room_id)
 
     async def get_players_by_wallet_and_room_id(self, room_id: str, wallet_id: str) -> Optional[Player]:
+        room = self.room_state.get_cached(room_id) if self.room_state else None
+        if room:
+            return next((p for p in room.players if p.wallet_id == wallet_id), None)
         return await self.player_repo.get_player_by_wallet_and_room_id(room_id, wallet_id)
 
     async def get_player_by_wallet_id(self, wallet_id: str) -> List[Player]:
         return await self.player_repo.get_by_wallet_id(wallet_id)
 
     async def update_player_status(self, room_id: str, wallet_id: str, status: PLAYER_STATUS):
-        player = await self.player_repo.get_player_by_wallet_and_room_id(room_id, wallet_id)
+        player = await self.get_players_by_wallet_and_room_id(room_id, wallet_id)
 
         if not player:
             return Response(content="Not found player", status_code=404)
 
-        await self.player_repo.update_player(
+        await self._update_player(
+            room_id,
             wallet_id,
             {"player_status": status, "is_ready": status == PLAYER_STATUS.READY},
-            room_id=room_id
         )
 
         return {
@@ -44,32 +49,42 @@ class PlayerService:
         }
 
     async def leave_room(self, wallet_id: str, room_id: str) -> dict:
-        room: Optional[Room] = await self.room_repo.get(room_id)
+        if self.room_state:
+            room: Optional[Room] = await self.room_state.get(room_id)
+            players = list(room.players) if room else []
+        else:
+            room = await self.room_repo.get(room_id)
+            players = await self.player_repo.get_by_room(room_id) if room else []
         if not room:
             return {"success": True, "message": "Room not found."}
 
-        players = await self.player_repo.get_by_room(room_id)
         current_player = next((p for p in players if p.wallet_id == wallet_id), None)
 
         if not current_player:
             return {"success": True, "message": "Player is not in the room."}
         
         if room.status == GAME_STATUS.WAITING:
-            await self.player_repo.delete_player_by_room(wallet_id, room_id)
+            if self.room_state:
+                self.room_state.remove_player(room_id, wallet_id)
+            else:
+                await self.player_repo.delete_player_by_room(wallet_id, room_id)
         else:
-            await self.player_repo.update_player(
+            await self._update_player(
+                room_id,
                 wallet_id,
                 {
                     "player_status": PLAYER_STATUS.QUIT,
                     "quit_at": datetime.now(timezone.utc),
                 },
-                room_id=room_id,
             )
 
         updated_players = [p for p in players if p.wallet_id != wallet_id]
 
         if not updated_players:
-            await self.room_repo.delete_room(room_id)
+            if self.room_state:
+                self.room_state.delete(room_id)
+            else:
+                await self.room_repo.delete_room(room_id)
             return {
                 "success": True,
                 "message": "Room deleted because no players left.",
@@ -79,10 +94,10 @@ class PlayerService:
         host_transfer_info = None
         if current_player.is_host:
             new_host = updated_players[0] 
-            await self.player_repo.update_player(
+            await self._update_player(
+                room_id,
                 new_host.wallet_id,
                 {"is_host": True, "is_ready": True}, 
-                room_id=room_id,
             )
             host_transfer_info = {
                 "new_host_wallet_id": new_host.wallet_id,
@@ -101,18 +116,21 @@ class PlayerService:
 
 
     async def update_is_winner(self, room_id: str, wallet_id: str, is_winner: bool) -> None:
-        await self.player_repo.update_player(
-            wallet_id,
-            {"is_winner": is_winner},
-            room_id=room_id
-        )
+        await self._update_player(room_id, wallet_id, {"is_winner": is_winner})
         
     async def update_player(self, wallet_id, room_id, data: dict) -> None:
         if not wallet_id or not room_id:
             return
         
-        player = await self.player_repo.get_player_by_wallet_and_room_id(room_id, wallet_id)
+        player = await self.get_players_by_wallet_and_room_id(room_id, wallet_id)
         if not player:
             return Response(content="Not found player", status_code=404)
 
-        await self.player_repo.update_player(wallet_id, data, room_id)
+        await self._update_player(room_id, wallet_id, data)
+
+    async def _update_player(self, room_id: str, wallet_id: str, data: dict) -> None:
+        # Phòng đang được giữ trong bộ nhớ: cập nhật tại chỗ, ghi DB theo thứ tự của phòng
+        if self.room_state:
+            self.room_state.update_player(room_id, wallet_id, data)
+        else:
+            await self.player_repo.update_player(wallet_id, data, room_id)
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import random
+from typing import Dict, List, Optional, Set, Tuple
+
+from config.logging_config import DB, get_logger
+from enums.question_difficulty import QUESTION_DIFFICULTY
+from models.question import Question
+from repositories.interfaces.question_repo import IQuestionRepository
+from services.seen_questions import sample_excluding
+
+log = get_logger(DB)
+
+QUESTION_BANK_REFRESH_SECONDS = int(os.getenv("QUESTION_BANK_REFRESH_SECONDS") or 60)
+
+
+class QuestionBank:
+    """
+    Ngân hàng câu hỏi nạp sẵn trong bộ nhớ.
+    - Mỗi độ khó là một list, lấy ngẫu nhiên k câu không lặp tốn O(k).
+    - Mỗi `refresh_seconds` kiểm tra (số câu, updated_at mới nhất) và chỉ nạp lại khi có thay đổi.
+      Mỗi lần nạp lại tăng `version` và thay toàn bộ pools cùng lúc.
+    - Câu hỏi trả ra là bản sao, người gọi có thể sửa (vd. xáo trộn options) mà không ảnh hưởng tới bank.
+    """
+    def __init__(self, question_repo: IQuestionRepository, refresh_seconds: int = QUESTION_BANK_REFRESH_SECONDS):
+        self.question_repo = question_repo
+        self.refresh_seconds = refresh_seconds
+
+        self.version = 0
+        self.pools: Dict[QUESTION_DIFFICULTY, List[Question]] = {d: [] for d in QUESTION_DIFFICULTY}
+        self.all: List[Question] = []
+        self._fingerprint: Optional[Tuple[int, Optional[str]]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.version > 0
+
+    # ==================================
+    # Lấy câu hỏi
+    # ==================================
+
+    def sample(self, difficulty: QUESTION_DIFFICULTY, k: int, exclude: Optional[Set[str]] = None) -> List[Question]:
+        """Lấy k câu không lặp, tránh các id trong `exclude` nếu pool còn đủ câu khác."""
+        pool = self.pools.get(QUESTION_DIFFICULTY(difficulty), [])
+        picked = sample_excluding(pool, k, exclude or set(), key=lambda q: q.id)
+        return [q.model_copy() for q in picked]
+
+    def random_one(self) -> Optional[Question]:
+        return random.choice(self.all).model_copy() if self.all else None
+
+    # ==================================
+    # Nạp / làm mới
+    # ==================================
+
+    async def load(self) -> None:
+        fingerprint = await self.question_repo.get_fingerprint()
+        questions = await self.question_repo.get_all()
+
+        pools: Dict[QUESTION_DIFFICULTY, List[Question]] = {d: [] for d in QUESTION_DIFFICULTY}
+        for q in questions:
+            pools[QUESTION_DIFFICULTY(q.difficulty)].append(q)
+
+        self.pools = pools
+        self.all = questions
+        self._fingerprint = fingerprint
+        self.version += 1
+        log.info("[QUESTION_BANK] Loaded v%s: %s", self.version, ", ".join(f"{d.value}={len(p)}" for d, p in pools.items()))
+
+    async def refresh_if_changed(self) -> bool:
+        fingerprint = await self.question_repo.get_fingerprint()
+        if self.ready and fingerprint == self._fingerprint:
+            return False
+        await self.load()
+        return True
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh_if_changed()
+            except Exception as e:
+                log.error("[QUESTION_BANK] Refresh failed: %s", e)
+            await asyncio.sleep(self.refresh_seconds)
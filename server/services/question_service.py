@@ -1,16 +1,70 @@
+from typing import Dict, Iterable, List, Optional
+
 from enums.question_difficulty import QUESTION_DIFFICULTY
+from models.question import Question
 from repositories.interfaces.question_repo import IQuestionRepository
+from services.question_bank import QuestionBank
+from services.seen_questions import SeenQuestions
+
 class QuestionService:
-    def __init__(self, question_repo: IQuestionRepository):
+    def __init__(
+        self,
+        question_repo: IQuestionRepository,
+        question_bank: Optional[QuestionBank] = None,
+        seen_questions: Optional[SeenQuestions] = None,
+    ):
         self.question_repo = question_repo
+        self.question_bank = question_bank
+        self.seen_questions = seen_questions or SeenQuestions()
+
+    def _bank_ready(self) -> bool:
+        # Trước khi bank nạp xong lần đầu thì vẫn đọc trực tiếp từ DB
+        return self.question_bank is not None and self.question_bank.ready
 
     async def get_random_question(self):
+        if self._bank_ready():
+            return self.question_bank.random_one()
         return await self.question_repo.get_random()
 
     async def get_random_question_by_difficulty(self, difficulty: QUESTION_DIFFICULTY):
         """Get a single random question by difficulty"""
-        questions = await self.question_repo.get_random_by_difficulty(difficulty, 1)
+        questions = await self.get_random_questions_by_difficulty(difficulty, 1)
         return questions[0] if questions else None
 
     async def get_random_questions_by_difficulty(self, difficulty: QUESTION_DIFFICULTY, limit: int):
+        if self._bank_ready():
+            return self.question_bank.sample(difficulty, limit)
         return await self.question_repo.get_random_by_difficulty(difficulty, limit)
+
+    async def sample_for_players(self, counts: Dict[QUESTION_DIFFICULTY, int], wallet_ids: Iterable[str]) -> List[Question]:
+        """
+        Lấy câu hỏi cho một phòng theo số lượng từng độ khó, tránh các câu người chơi trong phòng đã gặp gần đây.
+        Nếu một độ khó không đủ câu thì bù bằng câu của độ khó khác, không bao giờ lặp câu trong cùng một game.
+        """
+        if not self._bank_ready():
+            questions = []
+            for difficulty, count in counts.items():
+                questions.extend(await self.question_repo.get_random_by_difficulty(difficulty, count))
+            return questions
+
+        exclude = self.seen_questions.recently_seen(wallet_ids)
+        questions: List[Question] = []
+        missing = 0
+        for difficulty, count in counts.items():
+            picked = self.question_bank.sample(difficulty, count, exclude)
+            questions.extend(picked)
+            missing += count - len(picked)
+
+        for difficulty in counts:
+            if missing <= 0:
+                break
+            chosen = {q.id for q in questions}
+            extra = [q for q in self.question_bank.sample(difficulty, missing, exclude | chosen) if q.id not in chosen]
+            questions.extend(extra)
+            missing -= len(extra)
+        return questions
+
+    def mark_seen(self, wallet_ids: Iterable[str], questions: List[Question]) -> None:
+        question_ids = [q.id for q in questions]
+        for wallet_id in wallet_ids:
+            self.seen_questions.mark_seen(wallet_id, question_ids)
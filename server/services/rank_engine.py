@@ -0,0 +1,119 @@
+from typing import Dict, List, Optional, Tuple
+
+from supabase import AsyncClient
+
+from config.logging_config import DB, get_logger
+from helpers.postgrest_helper import is_schema_error
+
+log = get_logger(DB)
+
+RANK_PAGE_SIZE = 1000
+RANK_UPSERT_CHUNK = 500
+
+
+class RankEngine:
+    """
+    Tính rank cho bảng user_stats (rank 1 = total_score cao nhất, hòa điểm thì theo wallet_id).
+    - Ưu tiên gọi hàm SQL `recalculate_user_ranks` (sql/recalculate_user_ranks.sql):
+      một câu lệnh set-based, chỉ UPDATE các dòng có rank thay đổi.
+    - Nếu DB chưa có hàm đó: tính rank ở Python và upsert theo lô chỉ các dòng thay đổi.
+    - Chế độ incremental: sau một game chỉ xếp hạng lại khoảng điểm bị ảnh hưởng.
+    """
+    def __init__(self, supabase: AsyncClient, table: str = "user_stats", rpc_name: str = "recalculate_user_ranks"):
+        self.supabase = supabase
+        self.table = table
+        self.rpc_name = rpc_name
+        self._rpc_supported = True
+
+    async def recalculate_all(self) -> int:
+        """Xếp hạng lại toàn bộ. Trả về số dòng đã đổi rank."""
+        return await self._recalculate(None, None)
+
+    async def apply_score_changes(self, changes: Dict[str, Tuple[Optional[int], int]]) -> int:
+        """
+        Xếp hạng lại sau khi điểm của một số user thay đổi.
+        `changes` = {wallet_id: (điểm cũ hoặc None nếu user mới, điểm mới)}.
+
+        Chỉ các dòng có điểm nằm giữa điểm thấp nhất và cao nhất trong `changes` mới có thể đổi rank:
+        số người đứng trên một dòng ngoài khoảng đó không thay đổi.
+        """
+        if not changes:
+            return 0
+
+        scores = [s for old, new in changes.values() for s in (old, new) if s is not None]
+        hi = max(scores)
+        # User mới chen vào bảng xếp hạng đẩy mọi dòng điểm thấp hơn xuống một bậc
+        has_new_user = any(old is None for old, _ in changes.values())
+        lo = None if has_new_user else min(scores)
+        return await self._recalculate(lo, hi)
+
+    # ==================================
+    # Helpers
+    # ==================================
+
+    async def _recalculate(self, lo: Optional[int], hi: Optional[int]) -> int:
+        if self._rpc_supported:
+            try:
+                res = await self.supabase.rpc(self.rpc_name, {"p_min_score": lo, "p_max_score": hi}).execute()
+                return res.data or 0
+            except Exception as e:
+                # Chỉ tắt hẳn RPC khi DB không có hàm; lỗi khác chỉ làm lần gọi này dùng bulk upsert
+                if is_schema_error(e):
+                    log.warning("[RANK] %s unavailable, falling back to bulk upsert: %s", self.rpc_name, e)
+                    self._rpc_supported = False
+                else:
+                    log.warning("[RANK] %s failed, using bulk upsert for this call: %s", self.rpc_name, e)
+
+        try:
+            return await self._recalculate_in_python(lo, hi)
+        except Exception as e:
+            log.error("[RANK] Error recalculating ranks: %s", e)
+            return 0
+
+    async def _recalculate_in_python(self, lo: Optional[int], hi: Optional[int]) -> int:
+        base = await self._count_above(hi) if hi is not None else 0
+        rows = await self._fetch_band(lo, hi)
+
+        changed = []
+        for idx, row in enumerate(rows):
+            new_rank = base + idx + 1
+            if row.get("rank") != new_rank:
+                changed.append({"wallet_id": row["wallet_id"], "rank": new_rank})
+
+        for i in range(0, len(changed), RANK_UPSERT_CHUNK):
+            await self.supabase.table(self.table).upsert(
+                changed[i:i + RANK_UPSERT_CHUNK], on_conflict="wallet_id"
+            ).execute()
+        return len(changed)
+
+    async def _count_above(self, score: int) -> int:
+        res = await (
+            self.supabase.table(self.table)
+            .select("wallet_id", count="exact")
+            .gt("total_score", score)
+            .limit(1)
+            .execute()
+        )
+        return res.count or 0
+
+    async def _fetch_band(self, lo: Optional[int], hi: Optional[int]) -> List[dict]:
+        # PostgREST giới hạn số dòng mỗi response, nên đọc theo trang
+        rows: List[dict] = []
+        start = 0
+        while True:
+            query = self.supabase.table(self.table).select("wallet_id, total_score, rank")
+            if lo is not None:
+                query = query.gte("total_score", lo)
+            if hi is not None:
+                query = query.lte("total_score", hi)
+            res = await (
+                query.order("total_score", desc=True)
+                .order("wallet_id")
+                .range(start, start + RANK_PAGE_SIZE - 1)
+                .execute()
+            )
+            page = res.data or []
+            rows.extend(page)
+            if len(page) < RANK_PAGE_SIZE:
+                return rows
+            start += RANK_PAGE_SIZE
@@ -0,0 +1,301 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from config.chain import resolve
+from config.logging_config import NFT, get_logger
+from models.reward_job import RewardJob
+from repositories.interfaces.reward_job_repo import IRewardJobRepository
+
+log = get_logger(NFT)
+
+# Số job được xử lý cùng lúc trên mỗi worker
+REWARD_WORKERS = int(os.getenv("REWARD_WORKERS") or 4)
+# Chu kỳ quét bảng reward_jobs (job của worker khác, job đến hạn thử lại); enqueue ở worker này thì chạy ngay
+REWARD_POLL_SECONDS = float(os.getenv("REWARD_POLL_SECONDS") or 5)
+REWARD_MAX_ATTEMPTS = int(os.getenv("REWARD_MAX_ATTEMPTS") or 5)
+# Lần thử thứ n thất bại thì chờ BASE * 2^(n-1) giây
+REWARD_RETRY_BASE_SECONDS = float(os.getenv("REWARD_RETRY_BASE_SECONDS") or 10)
+# Job `running` quá thời gian này (worker chết giữa chừng) được worker khác giành lại
+REWARD_JOB_LEASE_SECONDS = int(os.getenv("REWARD_JOB_LEASE_SECONDS") or 300)
+
+# Mọi người thắng cùng nhận một proof giả cho tới khi có proof thật
+DEFAULT_SCORE = 100
+DEFAULT_ZK_PROOF = "0x" + "00" * 32
+
+APTOS_COLLECTION_NAME = "ChallengeWave Winners"
+
+
+class LeaseLost(Exception):
+    """Job đã bị worker khác giành lại sau khi hết lease: worker này bỏ job và không ghi gì thêm."""
+
+
+class RewardQueue:
+    """
+    Trao NFT cho người thắng ở nền, không chặn game loop:
+    - `enqueue` ghi job vào bảng reward_jobs (mỗi phòng một job) rồi trả về ngay; job còn đó nếu process khởi động lại.
+    - Tối đa `workers` job chạy cùng lúc. Transaction EVM và Aptos của các job chạy song song: nonce / sequence
+      number của tài khoản ký do AsyncBlockchainService / AptosTxPipeline cấp ở local.
+    - Mỗi bước xong (mint, transfer) được lưu vào `job.result`: lần thử lại chỉ chạy các bước còn thiếu. Mint Aptos
+      lưu transaction ngay khi gửi, lần thử lại tra transaction đó (xem `mint_aptos`).
+    - Mọi lần ghi job chỉ có tác dụng khi worker còn giữ job; mỗi bước lưu xong thì lease được gia hạn. Job đã bị
+      worker khác giành lại (LeaseLost) thì bị bỏ, không ghi đè trạng thái của worker kia.
+    - Lỗi thì thử lại với backoff tới `max_attempts` lần; xong hoặc bỏ hẳn thì gọi `listeners(job)`
+      (controller đẩy `nft_awarded` / `nft_error` tới phòng).
+    """
+    def __init__(
+        self,
+        repo: IRewardJobRepository,
+        blockchain_service,
+        aptos_service,
+        user_repo,
+        worker_id: str,
+        workers: int = REWARD_WORKERS,
+        poll_seconds: float = REWARD_POLL_SECONDS,
+        max_attempts: int = REWARD_MAX_ATTEMPTS,
+        retry_base_seconds: float = REWARD_RETRY_BASE_SECONDS,
+        lease_seconds: int = REWARD_JOB_LEASE_SECONDS,
+        aptos_minter=None,
+    ):
+        self.repo = repo
+        self.blockchain_service = blockchain_service
+        self.aptos_service = aptos_service
+        # AptosService hoặc BatchRewardMinter (gom nhiều người thắng vào một transaction)
+        self.aptos_minter = aptos_minter or aptos_service
+        self.user_repo = user_repo
+        self.worker_id = worker_id
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lease_seconds = lease_seconds
+        self.listeners: List[Callable[[RewardJob], Awaitable[None]]] = []
+
+        self._running: Set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Dừng nhận job. Job đang chạy bị hủy và trả về pending, lần sau được chạy tiếp từ bước còn thiếu."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for task in list(self._running):
+            task.cancel()
+        await asyncio.gather(*self._running, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {"running": len(self._running), "completed": self.completed, "failed": self.failed, "retried": self.retried}
+
+    async def enqueue(self, room_id: str, winner_wallet: str) -> bool:
+        """Thêm job trao thưởng cho phòng. Trả về False nếu phòng đã có job (game end được xử lý lại)."""
+        job = RewardJob(room_id=room_id, winner_wallet=winner_wallet, run_at=datetime.now(timezone.utc))
+        created = await self.repo.enqueue(job)
+        self._wake.set()
+        return created
+
+    # ==================================
+    # Vòng lặp giành job
+    # ==================================
+
+    async def _loop(self) -> None:
+        while True:
+            self._wake.clear()
+            free = self.workers - len(self._running)
+            if free > 0:
+                try:
+                    jobs = await self.repo.claim(self.worker_id, free, self.lease_seconds)
+                except Exception as e:
+                    log.error("[REWARD] Error claiming jobs: %s", e)
+                    jobs = []
+                for job in jobs:
+                    task = asyncio.create_task(self._run(job))
+                    self._running.add(task)
+                    task.add_done_callback(self._on_task_done)
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._wake.set()
+
+    async def _run(self, job: RewardJob) -> None:
+        log.info("[REWARD] Processing reward for room %s (attempt %s)", job.room_id, job.attempts)
+        try:
+            result = await self._process(job)
+        except LeaseLost as e:
+            log.warning("[REWARD] %s", e)
+            return
+        except asyncio.CancelledError:
+            # Worker tắt giữa chừng: trả job về pending để chạy tiếp ngay khi có worker, không phải chờ hết lease
+            # (job đã bị worker khác giành lại thì không có gì để trả)
+            try:
+                await self.repo.retry(job, self.worker_id, "worker stopped", datetime.now(timezone.utc))
+            except Exception as e:
+                log.error("[REWARD] Error releasing job for room %s: %s", job.room_id, e)
+            raise
+        except Exception as e:
+            await self._on_error(job, e)
+            return
+
+        try:
+            if not await self.repo.complete(job, self.worker_id, result):
+                log.warning("[REWARD] Lost the lease on room %s before completing, leaving the job to its new worker", job.room_id)
+                return
+        except Exception as e:
+            # Các bước đã lưu trong result: lần chạy lại (sau khi lease hết hạn) chỉ ghi lại trạng thái done
+            log.error("[REWARD] Error completing job for room %s: %s", job.room_id, e)
+            return
+        job.status, job.result = "done", result
+        self.completed += 1
+        log.info("[REWARD] Reward for room %s done", job.room_id)
+        await self._notify(job)
+
+    async def _on_error(self, job: RewardJob, error: Exception) -> None:
+        job.last_error = str(error)
+        try:
+            if job.attempts >= self.max_attempts:
+                log.error("[REWARD] Giving up on room %s after %s attempts: %s", job.room_id, job.attempts, error)
+                if not await self.repo.fail(job, self.worker_id, job.last_error):
+                    log.warning("[REWARD] Lost the lease on room %s, not recording the failure", job.room_id)
+                    return
+                job.status = "failed"
+                self.failed += 1
+                await self._notify(job)
+                return
+            delay = self.retry_base_seconds * 2 ** (job.attempts - 1)
+            log.warning("[REWARD] Attempt %s for room %s failed, retrying in %.1fs: %s", job.attempts, job.room_id, delay, error)
+            if not await self.repo.retry(job, self.worker_id, job.last_error, datetime.now(timezone.utc) + timedelta(seconds=delay)):
+                log.warning("[REWARD] Lost the lease on room %s, not scheduling a retry", job.room_id)
+                return
+            self.retried += 1
+        except Exception as e:
+            log.error("[REWARD] Error recording failure for room %s: %s", job.room_id, e)
+
+    async def _notify(self, job: RewardJob) -> None:
+        for listener in self.listeners:
+            try:
+                await listener(job)
+            except Exception as e:
+                log.error("[REWARD] Listener failed for room %s: %s", job.room_id, e)
+
+    # ==================================
+    # Các bước trao thưởng
+    # ==================================
+
+    async def _process(self, job: RewardJob) -> Dict[str, Any]:
+        result = dict(job.result or {})
+        job.result = result
+        if "blockchain_nft" not in result:
+            await resolve(self.blockchain_service)
+
+        if "blockchain_mint" not in result:
+            metadata_uri = f"https://challengewave.com/nft/{job.room_id}"
+            result["blockchain_mint"] = await self._mint_room_nft(job.room_id, metadata_uri)
+            await self._save_progress(job)
+
+        if "blockchain_nft" not in result:
+            transfer_result = await self.blockchain_service.submit_game_result(
+                job.room_id, job.winner_wallet, DEFAULT_SCORE, DEFAULT_ZK_PROOF,
+            )
+            result["blockchain_nft"] = {
+                "message": "NFT minted and transferred successfully",
+                "mint_result": result["blockchain_mint"],
+                "transfer_result": transfer_result,
+                "winner_wallet": job.winner_wallet,
+            }
+            await self._save_progress(job)
+
+        if "aptos_nft" not in result:
+            result["aptos_nft"] = await self.mint_aptos(job.room_id, job.winner_wallet, job)
+        return result
+
+    async def _save_progress(self, job: RewardJob) -> None:
+        """Lưu `job.result` và gia hạn lease; ném LeaseLost nếu job đã bị worker khác giành lại."""
+        if not await self.repo.save_progress(job, self.worker_id, job.result, self.lease_seconds):
+            raise LeaseLost(f"Lost the lease on room {job.room_id}, abandoning the job")
+
+    async def _mint_room_nft(self, room_id: str, metadata_uri: str):
+        """Mint NFT của phòng (deployer giữ); đã mint ở lần thử trước thì bỏ qua."""
+        try:
+            return await self.blockchain_service.mint_nft(room_id, metadata_uri)
+        except Exception as e:
+            if "NFT already exists" in str(e):
+                return "NFT already existed"
+            raise
+
+    async def mint_aptos(self, room_id: str, winner_wallet: str, job: Optional[RewardJob] = None) -> Dict[str, Any]:
+        """
+        Mint NFT Aptos cho người thắng. Người thắng chưa liên kết ví Aptos là kết quả cuối (không thử lại);
+        mint thất bại thì ném lỗi để job được thử lại.
+        Chạy trong `job`: token mang đúng tên theo phòng, transaction đã gửi được lưu vào
+        `job.result["aptos_submitted"]` trước khi chờ xác nhận, và lần thử sau tra lại transaction đó thay vì mint lần nữa
+        (complete() lỗi, worker tắt giữa chừng hay hết lease đều không làm người thắng nhận hai NFT).
+        """
+        user = await self.user_repo.get_by_wallet(winner_wallet)
+        if not user or not user.aptos_wallet:
+            return {
+                "success": False,
+                "message": "Winner does not have an Aptos wallet connected",
+                "error": "No aptos_wallet found for winner",
+                "winner_wallet": winner_wallet
+            }
+
+        aptos_wallet_address = user.aptos_wallet
+        await resolve(self.aptos_service)
+        token_name = f"Winner Trophy - Room {room_id}"
+        mint_result = None
+        progress = job.result if job else None
+        submitted = (progress or {}).get("aptos_submitted")
+        if submitted:
+            log.info("[APTOS_NFT] Checking mint %s submitted earlier for room %s", submitted["transaction_hash"], room_id)
+            mint_result = await self.aptos_service.find_mint(submitted)
+            if mint_result:
+                token_name = submitted["token_name"]
+
+        if mint_result is None:
+            async def save_submitted(record: Dict[str, Any]) -> None:
+                progress["aptos_submitted"] = record
+                try:
+                    # Mất lease thì vẫn chờ transaction: complete() sau đó sẽ thấy và bỏ job
+                    await self._save_progress(job)
+                except LeaseLost as e:
+                    log.warning("[APTOS_NFT] %s", e)
+                except Exception as e:
+                    # Token mang tên theo phòng nên lần mint lặp lại vẫn bị chain từ chối
+                    log.error("[APTOS_NFT] Error saving submitted mint for room %s: %s", room_id, e)
+
+            log.info("[APTOS_NFT] Minting NFT for winner %s (Aptos: %s) in room %s", winner_wallet, aptos_wallet_address, room_id)
+            mint_result = await self.aptos_minter.mint_nft_to_player(
+                recipient_address=aptos_wallet_address,
+                collection_name=APTOS_COLLECTION_NAME,
+                token_name=token_name,
+                token_description=f"Winner NFT for ChallengeWave game room {room_id}",
+                token_uri=f"https://challengewave.com/nft/{room_id}/metadata.json",
+                exact_name=progress is not None,
+                on_submitted=save_submitted if progress is not None else None,
+            )
+        if not mint_result.get("success"):
+            raise RuntimeError(f"Aptos mint failed: {mint_result.get('error')}")
+
+        log.info("[APTOS_NFT] Successfully minted NFT for winner %s to Aptos wallet %s", winner_wallet, aptos_wallet_address)
+        return {
+            "success": True,
+            "message": "Aptos NFT minted and transferred successfully",
+            "transaction_hash": mint_result.get("transaction_hash"),
+            "explorer_url": mint_result.get("explorer_url"),
+            "winner_wallet": winner_wallet,
+            "aptos_wallet": aptos_wallet_address,
+            "token_name": token_name
+        }
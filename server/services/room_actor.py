@@ -0,0 +1,131 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from config.logging_config import GAME, get_logger
+
+log = get_logger(GAME)
+
+T = TypeVar("T")
+
+Event = Callable[[], Awaitable[Any]]
+
+
+class _RoomActor:
+    __slots__ = ("room_id", "inbox", "task")
+
+    def __init__(self, room_id: str):
+        self.room_id = room_id
+        self.inbox: Deque[Tuple[Event, Optional[asyncio.Future]]] = deque()
+        self.task: Optional[asyncio.Task] = None
+
+
+class RoomActors:
+    """
+    Mỗi phòng một actor: mọi event của phòng (message WebSocket, timer hết hạn, thao tác REST, tiếp quản lease)
+    được đưa vào inbox của phòng và chạy lần lượt, event sau chỉ bắt đầu khi event trước đã xong.
+    - Trạng thái phòng trong bộ nhớ chỉ bị thay đổi bởi một event tại một thời điểm, không cần khóa.
+    - Actor chỉ có task khi inbox còn event; inbox rỗng thì task kết thúc, không có task nào nằm chờ.
+    - Event chạy trong actor gọi lại `run` cho chính phòng đó thì chạy trực tiếp, không xếp hàng (tránh tự chờ mình).
+    - `on_drained(room_id)` được gọi mỗi khi actor xử lý hết inbox, để gom việc lưu trạng thái của cả loạt event.
+    """
+    def __init__(self):
+        self.actors: Dict[str, _RoomActor] = {}
+        self.on_drained: List[Callable[[str], None]] = []
+
+        # Metrics
+        self.processed = 0
+        self.failed = 0
+        self.max_inbox = 0
+
+    async def run(self, room_id: str, event: Callable[[], Awaitable[T]]) -> T:
+        """Chạy event trong actor của phòng và chờ kết quả (exception của event được ném lại cho bên gọi)."""
+        if self.in_actor(room_id):
+            return await event()
+
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(room_id, event, future)
+        return await future
+
+    def post(self, room_id: str, event: Event) -> None:
+        """Đưa event vào actor của phòng mà không chờ (timer, thông báo nội bộ)."""
+        self._enqueue(room_id, event, None)
+
+    def by_room(self, handler: Callable[[dict], Awaitable[T]]) -> Callable[[dict], Awaitable[T]]:
+        """Bọc handler nhận payload có `room_id` (handler của cluster) để chạy trong actor của phòng đó."""
+        def wrapped(payload: dict) -> Awaitable[T]:
+            return self.run(payload["room_id"], lambda: handler(payload))
+        return wrapped
+
+    def in_actor(self, room_id: str) -> bool:
+        """Code hiện tại có đang chạy trong actor của phòng không."""
+        actor = self.actors.get(room_id)
+        return actor is not None and actor.task is asyncio.current_task()
+
+    def pending(self, room_id: str) -> int:
+        actor = self.actors.get(room_id)
+        return len(actor.inbox) if actor else 0
+
+    async def stop(self) -> None:
+        tasks = [actor.task for actor in self.actors.values() if actor.task]
+        for actor in self.actors.values():
+            for _, future in actor.inbox:
+                if future and not future.done():
+                    future.cancel()
+            actor.inbox.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.actors.clear()
+
+    def stats(self) -> dict:
+        return {
+            "rooms": len(self.actors),
+            "queued": sum(len(actor.inbox) for actor in self.actors.values()),
+            "processed": self.processed,
+            "failed": self.failed,
+            "max_inbox": self.max_inbox,
+        }
+
+    # ==================================
+    # Helpers
+    # ==================================
+
+    def _enqueue(self, room_id: str, event: Event, future: Optional[asyncio.Future]) -> None:
+        actor = self.actors.get(room_id)
+        if actor is None:
+            actor = self.actors[room_id] = _RoomActor(room_id)
+        actor.inbox.append((event, future))
+        self.max_inbox = max(self.max_inbox, len(actor.inbox))
+        if actor.task is None:
+            actor.task = asyncio.create_task(self._drain(actor))
+
+    async def _drain(self, actor: _RoomActor) -> None:
+        try:
+            while actor.inbox:
+                event, future = actor.inbox.popleft()
+                if future and future.done():
+                    continue  # bên gọi đã hủy (ví dụ kết nối đóng) trước khi tới lượt
+                try:
+                    result = await event()
+                except Exception as e:
+                    self.failed += 1
+                    if future:
+                        if not future.done():
+                            future.set_exception(e)
+                    else:
+                        log.error("[ROOM_ACTOR] Event for room %s failed: %s", actor.room_id, e)
+                else:
+                    if future and not future.done():
+                        future.set_result(result)
+                finally:
+                    self.processed += 1
+        finally:
+            # Inbox rỗng: actor nghỉ, event tiếp theo sẽ tạo task mới
+            if self.actors.get(actor.room_id) is actor:
+                del self.actors[actor.room_id]
+            for callback in self.on_drained:
+                try:
+                    callback(actor.room_id)
+                except Exception as e:
+                    log.error("[ROOM_ACTOR] on_drained failed for room %s: %s", actor.room_id, e)
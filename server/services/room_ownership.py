@@ -0,0 +1,213 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List
+
+from config.logging_config import GAME, get_logger
+from enums.game_status import GAME_STATUS
+from repositories.interfaces.room_lease_repo import IRoomLeaseRepository
+from repositories.interfaces.room_repo import IRoomRepository
+from services.cluster import Cluster
+
+log = get_logger(GAME)
+
+ROOM_LEASE_TTL_SECONDS = int(os.getenv("ROOM_LEASE_TTL_SECONDS") or 15)
+
+# Game IN_PROGRESS không có hoạt động (câu hỏi mới) lâu hơn chừng này lúc khởi động thì bị hủy thay vì chạy tiếp:
+# process đã chết từ lâu, người chơi không còn chờ, không nên phát lại game và trao thưởng
+ROOM_RESUME_MAX_AGE_SECONDS = int(os.getenv("ROOM_RESUME_MAX_AGE_SECONDS") or 600)
+
+# Chỉ tin lease trong phần đầu thời hạn để trừ hao độ trễ tới DB và lệch đồng hồ giữa các máy
+LEASE_SAFETY_RATIO = 0.8
+
+
+class RoomOwnership:
+    """
+    Lease cho game loop của từng phòng: chỉ worker giữ lease còn hạn mới được chạy timer của phòng.
+    - `claim` khi game bắt đầu, `release` khi phòng đã được dọn; lease được gia hạn theo lô mỗi ttl/3 giây.
+    - Lease không gia hạn được (worker khác đã lấy, hoặc DB lỗi quá lâu) thì gọi `on_lost`: dừng timer, bỏ cache.
+    - Lease hết hạn (worker giữ nó đã chết) được worker khác tiếp quản theo thứ tự ưu tiên của cluster,
+      sau đó gọi `on_acquired` để chạy tiếp game loop từ trạng thái đã lưu.
+    - Khi khởi động, lease cũ của chính worker và các game IN_PROGRESS chưa có lease cũng được tiếp quản;
+      game đã ngừng hoạt động quá `max_resume_age` giây thì được đánh dấu CANCELLED thay vì chạy tiếp.
+    """
+    def __init__(
+        self,
+        lease_repo: IRoomLeaseRepository,
+        room_repo: IRoomRepository,
+        cluster: Cluster,
+        ttl: int = ROOM_LEASE_TTL_SECONDS,
+        max_resume_age: int = ROOM_RESUME_MAX_AGE_SECONDS,
+    ):
+        self.lease_repo = lease_repo
+        self.room_repo = room_repo
+        self.cluster = cluster
+        self.ttl = ttl
+        self.max_resume_age = max_resume_age
+
+        # {room_id: hạn lease theo time.monotonic() của worker này}
+        self.held: Dict[str, float] = {}
+
+        self.on_acquired: List[Callable[[str], Awaitable[None]]] = []
+        self.on_lost: List[Callable[[str], None]] = []
+
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def worker_id(self) -> str:
+        return self.cluster.worker_id
+
+    def holds(self, room_id: str) -> bool:
+        deadline = self.held.get(room_id)
+        return deadline is not None and time.monotonic() < deadline
+
+    # ==================================
+    # Giành / trả lease
+    # ==================================
+
+    async def claim(self, room_id: str) -> bool:
+        started = time.monotonic()
+        if not await self.lease_repo.acquire(room_id, self.worker_id, self.ttl):
+            return False
+        self.held[room_id] = started + self.ttl * LEASE_SAFETY_RATIO
+        self.cluster.set_owner(room_id, self.worker_id)
+        return True
+
+    async def release(self, room_id: str) -> None:
+        if self.held.pop(room_id, None) is None:
+            return
+        await self.lease_repo.release(room_id, self.worker_id)
+        self.cluster.clear_owner(room_id)
+
+    # ==================================
+    # Vòng đời
+    # ==================================
+
+    async def start(self) -> None:
+        """Gọi sau khi các controller đã đăng ký on_acquired/on_lost."""
+        leased = set()
+        own_leases = []
+        for lease in await self.lease_repo.get_all():
+            leased.add(lease.room_id)
+            if lease.holder == self.worker_id:
+                own_leases.append(lease.room_id)
+            else:
+                self.cluster.set_owner(lease.room_id, lease.holder, publish=False)
+
+        in_progress = await self.room_repo.get_all(GAME_STATUS.IN_PROGRESS)
+        now = datetime.now(timezone.utc)
+        stale = {room.id: room for room in in_progress if self._idle_seconds(room, now) > self.max_resume_age}
+
+        # Worker khởi động lại với cùng WORKER_ID: các lease cũ vẫn là của nó
+        for room_id in own_leases:
+            if room_id in stale:
+                await self._abandon(stale[room_id])
+                await self.lease_repo.release(room_id, self.worker_id)
+            else:
+                await self._take_over(room_id)
+
+        # Game đang chạy nhưng không có lease (lease trong bộ nhớ đã mất theo process cũ)
+        for room in in_progress:
+            if room.id in leased or not self.cluster.is_owner(room.id):
+                continue
+            if room.id in stale:
+                await self._abandon(room)
+            else:
+                await self._take_over(room.id)
+
+        self._tasks = [
+            asyncio.create_task(self._heartbeat_loop()),
+            asyncio.create_task(self._takeover_loop()),
+        ]
+
+    async def stop(self) -> None:
+        # Không trả lease khi tắt: chúng hết hạn sau ttl và được worker khác
+        # (hoặc chính worker này khi khởi động lại) tiếp quản
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ==================================
+    # Helpers
+    # ==================================
+
+    async def _take_over(self, room_id: str) -> None:
+        if not await self.claim(room_id):
+            return
+        log.info("[ROOM_LEASE] Worker %s took over room %s", self.worker_id, room_id)
+        for callback in self.on_acquired:
+            try:
+                await callback(room_id)
+            except Exception as e:
+                log.error("[ROOM_LEASE] Error resuming room %s: %s", room_id, e)
+
+    @staticmethod
+    def _idle_seconds(room, now: datetime) -> float:
+        last_activity = room.current_question_started_at or room.started_at or room.created_at
+        if last_activity.tzinfo is None:
+            last_activity = last_activity.replace(tzinfo=timezone.utc)
+        return (now - last_activity).total_seconds()
+
+    async def _abandon(self, room) -> None:
+        log.warning(
+            "[ROOM_LEASE] Room %s idle for %.0fs, marking cancelled instead of resuming",
+            room.id, self._idle_seconds(room, datetime.now(timezone.utc)),
+        )
+        room.status = GAME_STATUS.CANCELLED
+        room.ended_at = datetime.now(timezone.utc)
+        if not await self.room_repo.save(room):
+            log.error("[ROOM_LEASE] Could not mark room %s cancelled", room.id)
+
+    def _lose(self, room_id: str) -> None:
+        self.held.pop(room_id, None)
+        log.warning("[ROOM_LEASE] Worker %s lost lease for room %s", self.worker_id, room_id)
+        for callback in self.on_lost:
+            try:
+                callback(room_id)
+            except Exception as e:
+                log.error("[ROOM_LEASE] Error suspending room %s: %s", room_id, e)
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            room_ids = list(self.held)
+            if not room_ids:
+                continue
+
+            started = time.monotonic()
+            try:
+                renewed = set(await self.lease_repo.renew(self.worker_id, room_ids, self.ttl))
+            except Exception:
+                renewed = None
+
+            for room_id in room_ids:
+                if room_id not in self.held:
+                    continue  # đã release trong lúc chờ DB
+                if renewed is None:
+                    # DB lỗi: giữ hạn cũ, chỉ bỏ lease khi đã quá hạn
+                    if not self.holds(room_id):
+                        self._lose(room_id)
+                elif room_id in renewed:
+                    self.held[room_id] = started + self.ttl * LEASE_SAFETY_RATIO
+                else:
+                    self._lose(room_id)
+
+    async def _takeover_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl / 2)
+            try:
+                expired = await self.lease_repo.get_expired()
+                now = datetime.now(timezone.utc)
+                for lease in expired:
+                    if lease.room_id in self.held:
+                        continue
+                    # Worker đứng đầu danh sách ưu tiên thử ngay, các worker sau chờ thêm để tránh tranh nhau
+                    candidates = [w for w in self.cluster.candidates(lease.room_id) if w != lease.holder]
+                    rank = candidates.index(self.worker_id) if self.worker_id in candidates else len(candidates)
+                    overdue = (now - lease.expires_at).total_seconds()
+                    if overdue >= rank * self.ttl / 2:
+                        await self._take_over(lease.room_id)
+            except Exception as e:
+                log.error("[ROOM_LEASE] Error scanning expired leases: %s", e)
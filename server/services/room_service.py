@@ -7,6 +7,9 @@ from repositories.interfaces.room_repo import IRoomRepository
 from repositories.interfaces.player_repo import IPlayerRepository
 from models.room import Room
 from models.player import Player
+from models.answer import Answer
+from services.answer_tally import AnswerTally
+from services.room_state_store import RoomStateStore
 
 class RoomService:
     def __init__(
@@ -14,10 +17,12 @@ class RoomService:
         room_repo: IRoomRepository,
         player_repo: IPlayerRepository,
         answer_repo: IAnswerRepository,
+        room_state: Optional[RoomStateStore] = None,
     ):
         self.room_repo = room_repo
         self.player_repo = player_repo
         self.answer_repo = answer_repo
+        self.room_state = room_state or RoomStateStore(room_repo, player_repo, answer_repo)
 
     async def get_rooms(self, status: str = None) -> List[Room]:
         return await self.room_repo.get_all(status)
@@ -27,48 +32,66 @@ class RoomService:
             players=[player],
             created_at=datetime.now(timezone.utc),
         )
-        await self.room_repo.save(room)
-        await self.player_repo.save_all(room.id, room.players)
+        self.room_state.put(room)
         return room
 
     async def get_room(self, room_id: str) -> Optional[Room]:
-        room = await self.room_repo.get(room_id)
-        if not room:
-            return None
-
-        room.players = await self.player_repo.get_by_room(room_id)
-
-        for p in room.players:
-            answers = await self.answer_repo.get_answers_by_wallet_id(room_id, p.wallet_id)
-            p.answers = answers
-
-        return room
+        return await self.room_state.get(room_id)
 
     async def get_room_by_code(self, room_code: str) -> Optional[Room]:
+        # Phòng vừa tạo chỉ có trong bộ nhớ cho tới khi write-behind ghi xuống DB
+        cached = self.room_state.get_cached_by_code(room_code)
+        if cached:
+            return cached
+
         room = await self.room_repo.get_by_code(room_code)
         if not room:
             return None
 
+        cached = self.room_state.get_cached(room.id)
+        if cached:
+            return cached
+
         room.players = await self.player_repo.get_by_room(room.id)
         return room
 
     async def save_room(self, room: Room):
-        await self.room_repo.save(room)
-        await self.player_repo.save_all(room.id, room.players)
+        self.room_state.put(room)
+        await self.room_state.wait_for_capacity()
+
+    async def record_answer(self, answer: Answer) -> None:
+        """Ghi answer vào trạng thái phòng trong bộ nhớ, lưu DB theo lô ở background"""
+        self.room_state.add_answer(answer)
+        await self.room_state.wait_for_capacity()
+
+    def get_question_answers(self, room: Room, question_id: str) -> List[Answer]:
+        return [
+            a for p in room.players for a in p.answers
+            if a.question_id == question_id
+        ]
+
+    def get_answer_tally(self, room: Room) -> AnswerTally:
+        """Tally câu trả lời của câu hỏi hiện tại, không cần quét answers của các player"""
+        return self.room_state.tally(room)
+
+    def release_room(self, room_id: str) -> None:
+        self.room_state.evict(room_id)
+
+    async def flush(self) -> None:
+        await self.room_state.flush()
 
     async def get_host_room_wallet(self, room_id: str) -> Optional[str]:
-        room = await self.room_repo.get(room_id)
+        room = await self.room_state.get(room_id)
         if not room:
             return None
 
-        players = await self.player_repo.get_by_room(room_id)
-        for player in players:
+        for player in room.players:
             if player.is_host:
                 return player.wallet_id
         return None
 
     async def get_room_settings(self, room_id: str) -> Optional[GameSettings]:
-        room = await self.room_repo.get(room_id)
+        room = await self.room_state.get(room_id)
         if not room:
             return None
 
@@ -82,7 +105,7 @@ class RoomService:
         )
 
     async def update_game_settings(self, room_id: str, game_settings: GameSettings) -> bool:
-        room = await self.room_repo.get(room_id)
+        room = await self.room_state.get(room_id)
         if not room:
             return False
 
@@ -93,7 +116,7 @@ class RoomService:
         room.total_questions = q.easy + q.medium + q.hard
         room.time_per_question = game_settings.time_per_question
 
-        await self.room_repo.save(room)
+        self.room_state.put(room)
         return True
 
     async def get_user_game_histories(self, wallet_id: str, status: Optional[str], limit: int, offset: int) -> List[Room]:
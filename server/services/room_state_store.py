@@ -0,0 +1,222 @@
+import asyncio
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from config.logging_config import GAME, get_logger
+from enums.game_status import GAME_STATUS
+from enums.player_status import PLAYER_STATUS
+from models.answer import Answer
+from models.player import Player
+from models.room import Room
+from services.answer_tally import AnswerTally
+from repositories.interfaces.answer_repo import IAnswerRepository
+from repositories.interfaces.player_repo import IPlayerRepository
+from repositories.interfaces.room_repo import IRoomRepository
+from services.write_behind_queue import WriteBehindQueue
+
+log = get_logger(GAME)
+
+
+class RoomStateStore:
+    """
+    Trạng thái "nguồn chân lý" của các phòng đang được process này xử lý.
+    - Room, players và answers được giữ trong bộ nhớ: đọc khi cache hit không tốn query nào.
+    - Mọi thay đổi được áp dụng vào bộ nhớ trước, sau đó được đưa vào WriteBehindQueue
+      để ghi xuống Supabase theo lô ở background.
+    - Cache miss (lần đầu truy cập, sau khi restart) sẽ nạp lại phòng từ repositories.
+    - Khi chạy nhiều worker, chỉ phòng mà worker này sở hữu (`owns`) mới được giữ trong bộ nhớ;
+      phòng của worker khác luôn được đọc mới từ DB.
+    - Khi `defer(room_id)` đúng (đang chạy trong actor của phòng), `put` chỉ cập nhật bộ nhớ; việc đưa room vào
+      hàng đợi ghi và báo listener được gom lại tới `flush_deferred` (khi actor xử lý hết inbox).
+    - Mỗi phòng trong bộ nhớ có một AnswerTally cho câu hỏi hiện tại, được cập nhật cùng lúc với answers/players.
+    """
+    def __init__(
+        self,
+        room_repo: IRoomRepository,
+        player_repo: IPlayerRepository,
+        answer_repo: IAnswerRepository,
+        writer: Optional[WriteBehindQueue] = None,
+        owns: Optional[Callable[[str], bool]] = None,
+        defer: Optional[Callable[[str], bool]] = None,
+    ):
+        self.room_repo = room_repo
+        self.player_repo = player_repo
+        self.answer_repo = answer_repo
+        self.writer = writer or WriteBehindQueue(room_repo, player_repo, answer_repo)
+        self.owns = owns or (lambda room_id: True)
+        self.defer = defer or (lambda room_id: False)
+
+        # {room_id: Room} - room kèm players và answers của từng player
+        self.rooms: Dict[str, Room] = {}
+        # {room_id: AnswerTally} - chỉ cho phòng đang nằm trong self.rooms
+        self.tallies: Dict[str, AnswerTally] = {}
+        # {room_id: Room} - room đã put nhưng chưa đưa vào hàng đợi ghi
+        self._deferred: Dict[str, Room] = {}
+        # {room_code: room_id} - cho phòng đang nằm trong self.rooms: phòng vừa tạo chưa có trong DB
+        # cho tới khi write-behind ghi xong, nên tìm theo mã phải xem ở đây trước
+        self.codes: Dict[str, str] = {}
+
+        # Tránh nhiều coroutine cùng nạp một phòng khi cache miss
+        self._load_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+        # Được gọi sau mỗi thay đổi của một phòng: listener(room_id, room hoặc None nếu phòng bị xóa)
+        self.listeners: List[Callable[[str, Optional[Room]], None]] = []
+
+    # ==================================
+    # Đọc
+    # ==================================
+
+    async def get(self, room_id: str) -> Optional[Room]:
+        room = self.rooms.get(room_id)
+        if room:
+            return room
+        if not self.owns(room_id):
+            return await self._load(room_id)
+
+        async with self._load_locks[room_id]:
+            room = self.rooms.get(room_id)
+            if room:
+                return room
+
+            room = await self._load(room_id)
+            # Phòng đã kết thúc chỉ được đọc, không cần giữ lại trong bộ nhớ
+            if room and room.status not in (GAME_STATUS.FINISHED, GAME_STATUS.CANCELLED):
+                self.rooms[room_id] = room
+                self.codes[room.room_code] = room_id
+        self._load_locks.pop(room_id, None)
+        return room
+
+    def get_cached(self, room_id: str) -> Optional[Room]:
+        return self.rooms.get(room_id)
+
+    def get_cached_by_code(self, room_code: str) -> Optional[Room]:
+        room_id = self.codes.get(room_code)
+        return self.rooms.get(room_id) if room_id else None
+
+    def tally(self, room: Room) -> AnswerTally:
+        tally = self.tallies.get(room.id)
+        if tally is None:
+            tally = AnswerTally.from_room(room)
+            # Phòng không nằm trong bộ nhớ (thuộc worker khác) thì tally chỉ dùng một lần
+            if self.rooms.get(room.id) is room:
+                self.tallies[room.id] = tally
+        return tally
+
+    async def _load(self, room_id: str) -> Optional[Room]:
+        # Một lần gọi lấy room + players + answers thay vì một query cho mỗi bảng/player
+        return await self.room_repo.get_hydrated(room_id)
+
+    # ==================================
+    # Ghi
+    # ==================================
+
+    def put(self, room: Room) -> None:
+        """Ghi nhận room là trạng thái mới nhất và đưa room + players vào hàng đợi ghi."""
+        previous = self.rooms.get(room.id)
+        self.rooms[room.id] = room
+        self.codes[room.room_code] = room.id
+        tally = self.tallies.get(room.id)
+        if tally and (previous is not room or tally.roster is not room.players or tally.roster_size != len(room.players)):
+            # Danh sách players bị thay (bắt đầu game, nạp lại, có người vào...): tính lại bitset active
+            tally.sync_players(room.players)
+
+        if self.defer(room.id):
+            self._deferred[room.id] = room
+            return
+        self._deferred.pop(room.id, None)
+        self._write(room)
+
+    def flush_deferred(self, room_id: str) -> None:
+        room = self._deferred.pop(room_id, None)
+        if room:
+            self._write(room)
+
+    def add_answer(self, answer: Answer) -> None:
+        room_id = str(answer.room_id)
+        room = self.rooms.get(room_id)
+        if room:
+            player = self._find_player(room, answer.wallet_id)
+            if player:
+                player.answers.append(answer)
+            # Answer đã được ghi nhận vào tally lúc submit thì record là no-op;
+            # answer đến muộn của câu cũ không được kéo tally về câu đó
+            tally = self.tallies.get(room_id)
+            question = room.current_question
+            if tally and question and str(question.id) == str(answer.question_id):
+                tally.record(answer.question_id, answer.wallet_id, answer.is_correct)
+
+        self.writer.add_answer(answer)
+
+    def update_player(self, room_id: str, wallet_id: str, updates: dict) -> None:
+        room = self.rooms.get(room_id)
+        player = self._find_player(room, wallet_id) if room else None
+        if player:
+            for key, value in updates.items():
+                if key in Player.model_fields:
+                    setattr(player, key, value)
+            tally = self.tallies.get(room_id)
+            if tally and "player_status" in updates:
+                tally.set_active(wallet_id, player.player_status != PLAYER_STATUS.DISCONNECTED)
+            self.writer.mark_players(room_id, [player])
+            self._notify(room_id, room)
+        else:
+            self.writer.patch_player(room_id, wallet_id, updates)
+
+    def remove_player(self, room_id: str, wallet_id: str) -> None:
+        room = self.rooms.get(room_id)
+        if room:
+            room.players = [p for p in room.players if p.wallet_id != wallet_id]
+            tally = self.tallies.get(room_id)
+            if tally:
+                tally.remove_player(wallet_id)
+                tally.roster, tally.roster_size = room.players, len(room.players)
+            self._notify(room_id, room)
+
+        self.writer.delete_player(room_id, wallet_id)
+
+    def delete(self, room_id: str) -> None:
+        self._drop_code(self.rooms.pop(room_id, None))
+        self.tallies.pop(room_id, None)
+        self._deferred.pop(room_id, None)
+        self.writer.delete_room(room_id)
+        self._notify(room_id, None)
+
+    def evict(self, room_id: str) -> None:
+        """Bỏ phòng khỏi bộ nhớ. Các lần ghi đang chờ vẫn được hoàn tất."""
+        self.flush_deferred(room_id)
+        self._drop_code(self.rooms.pop(room_id, None))
+        self.tallies.pop(room_id, None)
+
+    async def wait_for_capacity(self) -> None:
+        await self.writer.wait_for_capacity()
+
+    async def flush(self) -> None:
+        """Ghi toàn bộ thay đổi đang chờ xuống DB."""
+        for room_id in list(self._deferred):
+            self.flush_deferred(room_id)
+        await self.writer.flush()
+
+    # ==================================
+    # Helpers
+    # ==================================
+
+    def _write(self, room: Room) -> None:
+        self.writer.mark_room(room)
+        self.writer.mark_players(room.id, room.players)
+        self._notify(room.id, room)
+
+    def _drop_code(self, room: Optional[Room]) -> None:
+        # Mã phòng chỉ có 4 ký tự, có thể đã được một phòng mới hơn dùng lại
+        if room and self.codes.get(room.room_code) == room.id:
+            del self.codes[room.room_code]
+
+    def _notify(self, room_id: str, room: Optional[Room]) -> None:
+        for listener in self.listeners:
+            try:
+                listener(room_id, room)
+            except Exception as e:
+                log.error("[ROOM_STATE] Listener failed for room %s: %s", room_id, e)
+
+    @staticmethod
+    def _find_player(room: Room, wallet_id: str) -> Optional[Player]:
+        return next((p for p in room.players if p.wallet_id == wallet_id), None)
@@ -0,0 +1,104 @@
+import os
+import random
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, TypeVar
+
+SEEN_QUESTIONS_PER_WALLET = int(os.getenv("SEEN_QUESTIONS_PER_WALLET") or 64)
+SEEN_QUESTIONS_MAX_WALLETS = int(os.getenv("SEEN_QUESTIONS_MAX_WALLETS") or 100_000)
+
+T = TypeVar("T")
+
+
+class SeenQuestions:
+    """
+    Các câu hỏi mỗi wallet đã gặp gần đây, với trần bộ nhớ cố định.
+    - Mỗi wallet là một ring buffer `array('I')` gồm `per_wallet` số nguyên 4 byte;
+      id câu hỏi được đổi sang số nguyên qua một bảng intern dùng chung.
+    - Tối đa `max_wallets` wallet, bỏ wallet ít dùng nhất (LRU) khi vượt.
+    Trần bộ nhớ ~ max_wallets * (per_wallet * 4 byte + overhead mỗi wallet) + bảng intern.
+    """
+    # Ô trống trong ring buffer (0 không bao giờ là id đã intern)
+    _EMPTY = 0
+
+    def __init__(self, per_wallet: int = SEEN_QUESTIONS_PER_WALLET, max_wallets: int = SEEN_QUESTIONS_MAX_WALLETS):
+        self.per_wallet = per_wallet
+        self.max_wallets = max_wallets
+        # {wallet_id: (ring buffer, vị trí ghi tiếp theo)}
+        self._rings: "OrderedDict[str, List]" = OrderedDict()
+        self._ids: Dict[Hashable, int] = {}
+        self._keys: List[Hashable] = [None]
+
+    def mark_seen(self, wallet_id: str, question_ids: Iterable[Hashable]) -> None:
+        entry = self._rings.get(wallet_id)
+        if entry is None:
+            entry = [array("I", bytes(4 * self.per_wallet)), 0]
+            self._rings[wallet_id] = entry
+            if len(self._rings) > self.max_wallets:
+                self._rings.popitem(last=False)
+        else:
+            self._rings.move_to_end(wallet_id)
+
+        ring = entry[0]
+        for question_id in question_ids:
+            ring[entry[1]] = self._intern(question_id)
+            entry[1] = (entry[1] + 1) % self.per_wallet
+
+    def recently_seen(self, wallet_ids: Iterable[str]) -> Set[Hashable]:
+        """Hợp các câu hỏi mà những wallet này đã gặp gần đây. O(số wallet * per_wallet)."""
+        seen = set()
+        for wallet_id in wallet_ids:
+            entry = self._rings.get(wallet_id)
+            if entry:
+                seen.update(self._keys[i] for i in entry[0] if i != self._EMPTY)
+        return seen
+
+    def __len__(self) -> int:
+        return len(self._rings)
+
+    def _intern(self, question_id: Hashable) -> int:
+        idx = self._ids.get(question_id)
+        if idx is None:
+            idx = len(self._keys)
+            self._ids[question_id] = idx
+            self._keys.append(question_id)
+        return idx
+
+
+def sample_excluding(
+    pool: Sequence[T],
+    k: int,
+    exclude: Set[Hashable],
+    key: Callable[[T], Hashable],
+    max_draws: Optional[int] = None,
+) -> List[T]:
+    """
+    Lấy ngẫu nhiên k phần tử không lặp từ `pool`, ưu tiên phần tử có key không nằm trong `exclude`.
+    Dùng rejection sampling nên chi phí là O(k) khi `exclude` nhỏ so với `pool`;
+    sau `max_draws` lần rút mà chưa đủ thì bù bằng các phần tử còn lại (kể cả đã bị loại trừ).
+    """
+    n = len(pool)
+    k = min(k, n)
+    if k == 0:
+        return []
+    if not exclude:
+        return random.sample(pool, k)
+
+    max_draws = max_draws if max_draws is not None else 4 * k + 16
+    chosen: Dict[int, None] = {}
+    for _ in range(max_draws):
+        if len(chosen) == k:
+            break
+        i = random.randrange(n)
+        if i not in chosen and key(pool[i]) not in exclude:
+            chosen[i] = None
+
+    if len(chosen) < k:
+        # Pool gần như đã bị loại trừ hết: quét một lần để lấy nốt, ưu tiên câu chưa gặp
+        rest = [i for i in range(n) if i not in chosen]
+        random.shuffle(rest)
+        rest.sort(key=lambda i: key(pool[i]) in exclude)
+        for i in rest[:k - len(chosen)]:
+            chosen[i] = None
+
+    return [pool[i] for i in chosen]
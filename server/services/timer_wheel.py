@@ -0,0 +1,236 @@
+import asyncio
+import inspect
+import math
+import os
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from config.logging_config import GAME, get_logger
+
+log = get_logger(GAME)
+
+TIMER_WHEEL_TICK_SECONDS = float(os.getenv("TIMER_WHEEL_TICK_SECONDS") or 0.1)
+TIMER_WHEEL_SLOTS = int(os.getenv("TIMER_WHEEL_SLOTS") or 512)
+
+# Các mốc (ms) của histogram độ trễ timer
+LAG_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000)
+
+# (room_id, purpose), ví dụ ("abc", "question_timeout")
+TimerKey = Tuple[str, str]
+TimerCallback = Callable[[], Union[None, Awaitable[None]]]
+
+
+class _Timer:
+    __slots__ = ("key", "deadline", "slot", "rounds", "callback")
+
+    def __init__(self, key: TimerKey, deadline: float, slot: int, rounds: int, callback: TimerCallback):
+        self.key = key
+        self.deadline = deadline
+        self.slot = slot
+        self.rounds = rounds
+        self.callback = callback
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel dùng chung cho mọi timer của các phòng, thay cho mỗi timer một task `asyncio.sleep`.
+    - Một task duy nhất quay bánh xe mỗi `tick` giây; timer nằm trong slot `deadline / tick % slots`,
+      timer xa hơn một vòng bánh xe thì đếm thêm `rounds`.
+    - Timer được định danh bằng (room_id, purpose): `schedule` cùng key thì thay timer cũ,
+      `schedule` / `cancel` đều O(1); `cancel_room` hủy mọi timer của một phòng.
+    - Timer chạy muộn nhất một tick so với hạn; độ trễ thực tế được đo trong `stats()`.
+    - Callback async chạy thành task riêng để callback chậm không giữ bánh xe.
+    """
+    def __init__(self, tick: float = TIMER_WHEEL_TICK_SECONDS, slots: int = TIMER_WHEEL_SLOTS):
+        self.tick = tick
+        self.slots = slots
+
+        self._buckets: List[Dict[TimerKey, _Timer]] = [{} for _ in range(slots)]
+        self._timers: Dict[TimerKey, _Timer] = {}
+        # {room_id: {purpose}} - để hủy mọi timer của phòng
+        self._rooms: Dict[str, Set[str]] = defaultdict(set)
+
+        # Tick tiếp theo cần xử lý, tính từ `_origin`
+        self._origin = time.monotonic()
+        self._ticks = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        # Callback async đang chạy, giữ tham chiếu để task không bị GC và để hủy khi dừng
+        self._running: Set[asyncio.Task] = set()
+
+        # Metrics
+        self.scheduled = 0
+        self.cancelled = 0
+        self.fired = 0
+        self.failed = 0
+        self.lag_max = 0.0
+        self._lag_total = 0.0
+        self._lag_histogram = [0] * (len(LAG_BUCKETS_MS) + 1)
+
+    # ==================================
+    # Lập lịch
+    # ==================================
+
+    def schedule(self, room_id: str, purpose: str, delay: float, callback: TimerCallback) -> None:
+        key = (room_id, purpose)
+        self._remove(key)
+
+        now = time.monotonic()
+        if not self._timers:
+            # Bánh xe đang trống: nhảy thẳng tới tick hiện tại thay vì quay bù các tick rỗng
+            self._ticks = max(self._ticks, int((now - self._origin) / self.tick))
+
+        deadline = now + max(delay, 0)
+        target = max(math.ceil((deadline - self._origin) / self.tick), self._ticks)
+        timer = _Timer(key, deadline, target % self.slots, (target - self._ticks) // self.slots, callback)
+
+        self._buckets[timer.slot][key] = timer
+        self._timers[key] = timer
+        self._rooms[room_id].add(purpose)
+        self.scheduled += 1
+        self._ensure_running()
+
+    def cancel(self, room_id: str, purpose: str) -> bool:
+        if self._remove((room_id, purpose)):
+            self.cancelled += 1
+            return True
+        return False
+
+    def cancel_room(self, room_id: str) -> None:
+        for purpose in list(self._rooms.get(room_id, ())):
+            self.cancel(room_id, purpose)
+
+    def is_scheduled(self, room_id: str, purpose: str) -> bool:
+        return (room_id, purpose) in self._timers
+
+    def remaining(self, room_id: str, purpose: str) -> Optional[float]:
+        timer = self._timers.get((room_id, purpose))
+        return max(timer.deadline - time.monotonic(), 0) if timer else None
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    # ==================================
+    # Vòng đời
+    # ==================================
+
+    async def stop(self) -> None:
+        tasks = list(self._running)
+        if self._task:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._running.clear()
+        for bucket in self._buckets:
+            bucket.clear()
+        self._timers.clear()
+        self._rooms.clear()
+
+    def stats(self) -> dict:
+        histogram = {}
+        cumulative = 0
+        for bound, count in zip(LAG_BUCKETS_MS + (math.inf,), self._lag_histogram):
+            cumulative += count
+            histogram["+Inf" if bound == math.inf else str(bound)] = cumulative
+        return {
+            "pending": len(self._timers),
+            "running": len(self._running),
+            "scheduled": self.scheduled,
+            "cancelled": self.cancelled,
+            "fired": self.fired,
+            "failed": self.failed,
+            "lag_avg_ms": round(self._lag_total / self.fired * 1000, 3) if self.fired else 0.0,
+            "lag_max_ms": round(self.lag_max * 1000, 3),
+            "lag_histogram_ms": histogram,
+        }
+
+    # ==================================
+    # Helpers
+    # ==================================
+
+    def _remove(self, key: TimerKey) -> bool:
+        timer = self._timers.pop(key, None)
+        if not timer:
+            return False
+        self._buckets[timer.slot].pop(key, None)
+        purposes = self._rooms.get(key[0])
+        if purposes is not None:
+            purposes.discard(key[1])
+            if not purposes:
+                del self._rooms[key[0]]
+        return True
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            if not self._timers:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            delay = self._origin + self._ticks * self.tick - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            # Event loop bị chặn lâu hơn một tick thì xử lý bù mọi tick đã qua
+            now = time.monotonic()
+            while self._timers and self._origin + self._ticks * self.tick <= now:
+                self._advance(now)
+
+    def _advance(self, now: float) -> None:
+        bucket = self._buckets[self._ticks % self.slots]
+        self._ticks += 1
+        if not bucket:
+            return
+
+        due = []
+        for timer in bucket.values():
+            if timer.rounds > 0:
+                timer.rounds -= 1
+            else:
+                due.append(timer)
+
+        for timer in due:
+            self._remove(timer.key)
+            self._record_lag(now - timer.deadline)
+            self._fire(timer)
+
+    def _fire(self, timer: _Timer) -> None:
+        self.fired += 1
+        try:
+            result = timer.callback()
+        except Exception as e:
+            self.failed += 1
+            log.error("[TIMER] Timer %s failed: %s", timer.key, e)
+            return
+        if inspect.isawaitable(result):
+            task = asyncio.ensure_future(self._await_callback(timer.key, result))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _await_callback(self, key: TimerKey, result: Awaitable[None]) -> None:
+        try:
+            await result
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failed += 1
+            log.error("[TIMER] Timer %s failed: %s", key, e)
+
+    def _record_lag(self, lag: float) -> None:
+        lag = max(lag, 0.0)
+        self._lag_total += lag
+        self.lag_max = max(self.lag_max, lag)
+        lag_ms = lag * 1000
+        for index, bound in enumerate(LAG_BUCKETS_MS):
+            if lag_ms <= bound:
+                self._lag_histogram[index] += 1
+                return
+        self._lag_histogram[-1] += 1
@@ -1,19 +1,31 @@
 import asyncio
+import uuid
 from fastapi import WebSocket
 from collections import defaultdict
 from typing import Dict, Set, Optional, Callable, List
 
+from config.logging_config import WS, get_logger
 from enums.game_status import GAME_STATUS
-from helpers.json_helper import send_json_safe
+from helpers.json_helper import encode_frame, send_text_safe
+from services.cluster import Cluster, RemoteSocket
+from services.timer_wheel import TimerWheel
+from services.ws_outbox import Outbox
+
+log = get_logger(WS)
+
+# Purpose của timer đóng phòng chờ trên TimerWheel
+ROOM_TIMEOUT = "room_timeout"
 
 class WebSocketManager:
     """
     Quản lý tập trung các kết nối WebSocket cho toàn bộ ứng dụng.
     - Hỗ trợ nhiều phòng và một sảnh chờ (lobby).
     - Hỗ trợ một người chơi có thể có nhiều kết nối (ví dụ: nhiều tab).
-    - Có cơ chế timeout cho các phòng chờ.
+    - Có cơ chế timeout cho các phòng chờ (chạy trên TimerWheel dùng chung).
+    - Mỗi kết nối có một Outbox riêng: gửi/broadcast chỉ đưa frame vào hàng đợi, không chờ client.
+    - Khi có `cluster`, broadcast tới phòng/sảnh chờ/feed/người chơi cũng tới được kết nối ở các worker khác.
     """
-    def __init__(self):
+    def __init__(self, cluster: Optional[Cluster] = None, timers: Optional[TimerWheel] = None):
         # {room_id: {websocket1, websocket2, ...}}
         # Lưu tất cả các kết nối đang hoạt động theo từng phòng.
         self.room_connections: Dict[str, Set[WebSocket]] = defaultdict(set)
@@ -34,7 +46,21 @@ class WebSocketManager:
         
         # Quản lý trạng thái và timeout của phòng (tùy chọn, có thể di chuyển ra service riêng)
         self.room_states: Dict[str, str] = {}
-        self.room_timeouts: Dict[str, asyncio.Task] = {}
+        self.timers = timers or TimerWheel()
+
+        # {websocket: Outbox} - hàng đợi gửi của từng kết nối
+        self.outboxes: Dict[WebSocket, Outbox] = {}
+        # {websocket: room_id} - để dọn dẹp đúng phòng khi một kết nối bị ngắt vì quá chậm
+        self.socket_to_room: Dict[WebSocket, str] = {}
+
+        # {conn_id: websocket} - kết nối phòng mà worker này giữ nhưng phòng thuộc worker khác
+        self.proxied_sockets: Dict[str, WebSocket] = {}
+
+        self.cluster = cluster
+        if cluster:
+            cluster.subscribe("ws", self._on_remote_broadcast)
+            cluster.register("ws.frame", self._on_remote_frame)
+            cluster.register("ws.close", self._on_remote_close)
 
     # ==================================
     # Quản lý Kết nối Phòng Chơi
@@ -43,14 +69,18 @@ class WebSocketManager:
     async def connect_room(self, websocket: WebSocket, room_id: str, wallet_id: str):
         """Chấp nhận và đăng ký một kết nối mới vào một phòng."""
         await websocket.accept()
+        self._open_outbox(websocket)
         self.room_connections[room_id].add(websocket)
         self.player_connections[wallet_id].add(websocket)
         self.socket_to_wallet[websocket] = wallet_id
-        print(f"CONNECT: Player {wallet_id} connected. Total for player: {len(self.player_connections[wallet_id])}. Total in room {room_id}: {len(self.room_connections[room_id])}.")
+        self.socket_to_room[websocket] = room_id
+        log.debug("CONNECT: Player %s connected. Total for player: %s. Total in room %s: %s.", wallet_id, len(self.player_connections[wallet_id]), room_id, len(self.room_connections[room_id]))
 
     def disconnect_room(self, websocket: WebSocket, room_id: str):
         """Xóa một kết nối cụ thể khỏi phòng và khỏi người chơi tương ứng."""
         wallet_id = self.socket_to_wallet.pop(websocket, None)
+        self.socket_to_room.pop(websocket, None)
+        self._close_outbox(websocket)
 
         # Xóa khỏi danh sách kết nối của phòng
         if room_id in self.room_connections:
@@ -65,18 +95,24 @@ class WebSocketManager:
                 del self.player_connections[wallet_id] # Dọn dẹp nếu người chơi không còn kết nối nào
 
         if wallet_id:
-             print(f"DISCONNECT: Player {wallet_id} disconnected. Remaining for player: {len(self.player_connections.get(wallet_id, set()))}.")
+             log.debug("DISCONNECT: Player %s disconnected. Remaining for player: %s.", wallet_id, len(self.player_connections.get(wallet_id, set())))
 
-    def disconnect_room_by_room_id(self, room_id: str):
+    def disconnect_room_by_room_id(self, room_id: str, propagate: bool = True):
         """Đóng tất cả kết nối và dọn dẹp một phòng."""
+        if propagate and self.cluster:
+            self.cluster.publish("ws", {"scope": "close_room", "target": room_id})
         sockets_in_room = self.room_connections.pop(room_id, set())
         if not sockets_in_room:
             return
 
-        print(f"CLEANUP: Closing all {len(sockets_in_room)} connections for room {room_id}.")
+        log.info("CLEANUP: Closing all %s connections for room %s.", len(sockets_in_room), room_id)
         for ws in sockets_in_room:
-            # Chủ động đóng kết nối
-            asyncio.create_task(ws.close(1000, "Room is being closed"))
+            # Chủ động đóng kết nối sau khi gửi nốt các message đang chờ
+            outbox = self.outboxes.pop(ws, None)
+            if outbox is not None:
+                outbox.close_after_drain(1000, "Room is being closed")
+            else:
+                asyncio.create_task(ws.close(1000, "Room is being closed"))
             # Dọn dẹp các map liên quan
             self.disconnect_room(ws, room_id)
         
@@ -91,26 +127,25 @@ class WebSocketManager:
             return next(iter(connections), None) # Trả về một phần tử bất kỳ từ set
         return None
 
+    def detach_player(self, room_id: str, wallet_id: str, propagate: bool = True):
+        """Bỏ các kết nối của người chơi khỏi phòng (ở mọi worker), không đóng kết nối."""
+        if propagate and self.cluster:
+            self.cluster.publish("ws", {"scope": "detach", "target": room_id, "walletId": wallet_id})
+        for ws in list(self.player_connections.get(wallet_id, ())):
+            if self.socket_to_room.get(ws) == room_id:
+                self.disconnect_room(ws, room_id)
+
     def get_connections_in_room(self, room_id: str) -> List[WebSocket]:
         """Lấy danh sách tất cả kết nối trong một phòng."""
         return list(self.room_connections.get(room_id, []))
 
     async def broadcast_to_room(self, room_id: str, message: dict):
         """Gửi một thông điệp tới tất cả các kết nối trong một phòng."""
-        # Sao chép set thành list để tránh lỗi khi kích thước thay đổi trong lúc lặp
-        connections_to_send = self.get_connections_in_room(room_id)
-        
-        if connections_to_send:
-            print(f"[BROADCAST] Sending to {len(connections_to_send)} connection(s) in room {room_id}.")
-            tasks = [send_json_safe(conn, message) for conn in connections_to_send]
-            # Sử dụng gather để gửi song song và xử lý lỗi
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for result, conn in zip(results, connections_to_send):
-                if isinstance(result, Exception):
-                    print(f"  - Failed to send message to a client, it might be disconnected: {result}")
-                    # Nếu gửi thất bại, có thể đây là một kết nối chết cần được dọn dẹp
-                    self.disconnect_room(conn, room_id)
+        self._broadcast("room", room_id, message)
+
+    async def send_to_player(self, wallet_id: str, message: dict):
+        """Gửi tới mọi kết nối của một người chơi, kể cả kết nối ở worker khác."""
+        self._broadcast("player", wallet_id, message)
 
     # ==================================
     # Quản lý Sảnh Chờ (Lobby)
@@ -118,16 +153,22 @@ class WebSocketManager:
     
     async def connect_lobby(self, websocket: WebSocket):
         await websocket.accept()
+        self._open_outbox(websocket)
         self.lobby_connections.add(websocket)
 
     def disconnect_lobby(self, websocket: WebSocket):
         self.lobby_connections.discard(websocket)
+        self._close_outbox(websocket)
 
     async def broadcast_to_lobby(self, message: dict):
-        connections_to_send = list(self.lobby_connections)
-        if connections_to_send:
-            tasks = [send_json_safe(ws, message) for ws in connections_to_send]
-            await asyncio.gather(*tasks, return_exceptions=True)
+        self.publish_to_lobby(message)
+
+    def publish_to_lobby(self, message: dict, propagate: bool = True):
+        """
+        Như broadcast_to_lobby nhưng gọi được từ code đồng bộ (chỉ đưa frame vào hàng đợi).
+        `propagate=False`: chỉ gửi cho kết nối của worker này.
+        """
+        self._broadcast("lobby", None, message, propagate)
 
     # ==================================
     # Quản lý Feed (Bài Post)
@@ -135,38 +176,143 @@ class WebSocketManager:
     
     async def connect_feed(self, websocket: WebSocket):
         await websocket.accept()
+        self._open_outbox(websocket)
         self.feed_connections.add(websocket)
 
     def disconnect_feed(self, websocket: WebSocket):
         self.feed_connections.discard(websocket)
+        self._close_outbox(websocket)
 
     async def broadcast_to_feed(self, message: dict):
-        connections_to_send = list(self.feed_connections)
-        if connections_to_send:
-            tasks = [send_json_safe(ws, message) for ws in connections_to_send]
-            await asyncio.gather(*tasks, return_exceptions=True)
+        self._broadcast("feed", None, message)
+
+    # ==================================
+    # Gửi
+    # ==================================
+
+    def send_personal(self, websocket: WebSocket, message: dict) -> bool:
+        """Gửi message cho một kết nối qua Outbox của nó (không chờ client nhận)."""
+        return self._enqueue(websocket, encode_frame(message), message.get("type"))
+
+    def _broadcast(self, scope: str, target: Optional[str], message: dict, propagate: bool = True) -> None:
+        """Encode message đúng một lần, gửi cho kết nối ở worker này rồi chuyển cùng frame cho các worker khác."""
+        frame = encode_frame(message)
+        msg_type = message.get("type")
+        self._fan_out(scope, target, frame, msg_type)
+        if propagate and self.cluster:
+            self.cluster.publish("ws", {"scope": scope, "target": target, "frame": frame, "type": msg_type})
+
+    def _fan_out(self, scope: str, target: Optional[str], frame: str, msg_type: Optional[str]) -> None:
+        if scope == "room":
+            connections = self.room_connections.get(target, ())
+        elif scope == "player":
+            connections = self.player_connections.get(target, ())
+        elif scope == "lobby":
+            connections = self.lobby_connections
+        else:
+            connections = self.feed_connections
+        # Sao chép thành list để tránh lỗi khi kích thước thay đổi trong lúc lặp
+        for conn in list(connections):
+            self._enqueue(conn, frame, msg_type)
+
+    def _enqueue(self, websocket: WebSocket, frame: str, msg_type: Optional[str]) -> bool:
+        if isinstance(websocket, RemoteSocket):
+            return websocket.deliver(frame, msg_type)
+        outbox = self.outboxes.get(websocket)
+        if outbox is not None:
+            return outbox.enqueue(frame, msg_type)
+        # Kết nối chưa (hoặc không còn) được đăng ký: gửi trực tiếp ở background
+        asyncio.create_task(send_text_safe(websocket, frame))
+        return True
+
+    def _open_outbox(self, websocket: WebSocket) -> None:
+        if websocket not in self.outboxes:
+            self.outboxes[websocket] = Outbox(websocket, on_evict=self._evict)
+
+    def _close_outbox(self, websocket: WebSocket) -> None:
+        # Kết nối vẫn có thể còn ở lobby/feed/phòng khác thì giữ lại Outbox
+        if (
+            websocket in self.socket_to_wallet
+            or websocket in self.lobby_connections
+            or websocket in self.feed_connections
+        ):
+            return
+        outbox = self.outboxes.pop(websocket, None)
+        if outbox is not None:
+            outbox.stop()
+
+    def _evict(self, websocket: WebSocket, reason: str) -> None:
+        """Ngắt kết nối một client quá chậm hoặc đã chết."""
+        self.outboxes.pop(websocket, None)
+        room_id = self.socket_to_room.get(websocket)
+        if room_id:
+            self.disconnect_room(websocket, room_id)
+        self.disconnect_lobby(websocket)
+        self.disconnect_feed(websocket)
+        asyncio.create_task(self._close_quietly(websocket, reason))
+
+    # ==================================
+    # Cluster
+    # ==================================
+
+    def register_proxy(self, websocket: WebSocket) -> str:
+        """Đăng ký một kết nối phòng mà owner nằm ở worker khác, trả về conn_id để owner gửi frame về."""
+        conn_id = uuid.uuid4().hex
+        self.proxied_sockets[conn_id] = websocket
+        return conn_id
+
+    def unregister_proxy(self, conn_id: str) -> None:
+        self.proxied_sockets.pop(conn_id, None)
+
+    def _on_remote_broadcast(self, payload: dict) -> None:
+        scope, target = payload["scope"], payload.get("target")
+        if scope == "close_room":
+            self.disconnect_room_by_room_id(target, propagate=False)
+        elif scope == "detach":
+            self.detach_player(target, payload["walletId"], propagate=False)
+        else:
+            self._fan_out(scope, target, payload["frame"], payload.get("type"))
+
+    def _on_remote_frame(self, payload: dict) -> None:
+        websocket = self.proxied_sockets.get(payload["conn"])
+        if websocket:
+            self._enqueue(websocket, payload["frame"], payload.get("type"))
+
+    def _on_remote_close(self, payload: dict) -> None:
+        websocket = self.proxied_sockets.get(payload["conn"])
+        if not websocket:
+            return
+        outbox = self.outboxes.get(websocket)
+        if outbox is not None:
+            outbox.close_after_drain(payload.get("code", 1000), payload.get("reason", ""))
+        else:
+            asyncio.create_task(self._close_quietly(websocket, payload.get("reason", "")))
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket, reason: str = ""):
+        try:
+            await websocket.close(1013, reason[:120])
+        except Exception:
+            pass
 
     # ==================================
     # Quản lý Trạng Thái & Timeout (tùy chọn)
     # ==================================
     
     def start_room_timeout(self, room_id: str, timeout_seconds: int, on_timeout: Callable[[], asyncio.Future]):
-        if room_id in self.room_timeouts:
+        if self.timers.is_scheduled(room_id, ROOM_TIMEOUT):
             return
 
         async def timeout_task():
-            await asyncio.sleep(timeout_seconds)
             # Chỉ chạy callback nếu phòng vẫn đang ở trạng thái chờ
             if self.get_room_state(room_id) == GAME_STATUS.WAITING.value:
-                print(f"Room {room_id} timed out.")
+                log.info("Room %s timed out.", room_id)
                 await on_timeout()
 
-        task = asyncio.create_task(timeout_task())
-        self.room_timeouts[room_id] = task
+        self.timers.schedule(room_id, ROOM_TIMEOUT, timeout_seconds, timeout_task)
 
     def clear_room_timeout(self, room_id: str):
-        if room_id in self.room_timeouts:
-            self.room_timeouts.pop(room_id).cancel()
+        self.timers.cancel(room_id, ROOM_TIMEOUT)
 
     def set_room_state(self, room_id: str, state: str):
         self.room_states[room_id] = state
@@ -0,0 +1,270 @@
+import asyncio
+import os
+from typing import Dict, List, Optional, Tuple
+
+from config.logging_config import DB, get_logger
+from models.answer import Answer
+from models.player import Player
+from models.room import Room
+from repositories.interfaces.answer_repo import IAnswerRepository
+from repositories.interfaces.player_repo import IPlayerRepository
+from repositories.interfaces.room_repo import IRoomRepository
+
+log = get_logger(DB)
+
+WRITE_BEHIND_FLUSH_MS = int(os.getenv("WRITE_BEHIND_FLUSH_MS") or 50)
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE") or 200)
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING") or 5000)
+WRITE_BEHIND_MAX_RETRIES = 3
+
+
+class WriteBehindQueue:
+    """
+    Gom các thay đổi của rooms, players và answers rồi ghi xuống DB theo lô.
+    - Flush mỗi `flush_interval_ms` hoặc ngay khi có đủ `batch_size` bản ghi.
+    - Room/player chỉ giữ bản mới nhất theo khóa, nên nhiều lần save liên tiếp
+      của cùng một phòng chỉ tốn một dòng upsert.
+    - Chỉ có một lô được ghi tại một thời điểm: mọi thay đổi của một phòng
+      được ghi theo đúng thứ tự chúng được đưa vào.
+    - Khi số bản ghi chờ vượt `max_pending`, `wait_for_capacity` sẽ chặn người ghi (backpressure).
+    - Lô ghi lỗi sau các lần thử lại không bị bỏ: phần chưa ghi quay lại hàng đợi và được thử lại ở lần flush sau.
+    """
+    def __init__(
+        self,
+        room_repo: IRoomRepository,
+        player_repo: IPlayerRepository,
+        answer_repo: IAnswerRepository,
+        flush_interval_ms: int = WRITE_BEHIND_FLUSH_MS,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        max_pending: int = WRITE_BEHIND_MAX_PENDING,
+    ):
+        self.room_repo = room_repo
+        self.player_repo = player_repo
+        self.answer_repo = answer_repo
+        self.flush_interval = flush_interval_ms / 1000
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+
+        # Các thay đổi chờ ghi, giữ bản mới nhất theo khóa
+        self._rooms: Dict[str, Room] = {}
+        self._players: Dict[Tuple[str, str], Player] = {}
+        self._player_patches: Dict[Tuple[str, str], dict] = {}
+        self._answers: Dict[str, Answer] = {}
+        self._player_deletes: Dict[Tuple[str, str], None] = {}
+        self._room_deletes: Dict[str, None] = {}
+        # Số bản ghi của lô đang được ghi: vẫn tính vào backpressure cho tới khi ghi xong
+        self._in_flight = 0
+
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    # ==================================
+    # Đưa thay đổi vào hàng đợi
+    # ==================================
+
+    def mark_room(self, room: Room) -> None:
+        self._rooms[room.id] = room
+        self._room_deletes.pop(room.id, None)
+        self._on_enqueue()
+
+    def mark_players(self, room_id: str, players: List[Player]) -> None:
+        for p in players:
+            key = (room_id, p.wallet_id)
+            if p.room_id != room_id:
+                p.room_id = room_id
+            self._players[key] = p
+            self._player_deletes.pop(key, None)
+        self._on_enqueue()
+
+    def patch_player(self, room_id: str, wallet_id: str, updates: dict) -> None:
+        """Cập nhật một phần cho player không có trong bộ nhớ."""
+        key = (room_id, wallet_id)
+        self._player_patches.setdefault(key, {}).update(updates)
+        self._on_enqueue()
+
+    def add_answer(self, answer: Answer) -> None:
+        self._answers[str(answer.id)] = answer
+        self._on_enqueue()
+
+    def delete_player(self, room_id: str, wallet_id: str) -> None:
+        key = (room_id, wallet_id)
+        self._players.pop(key, None)
+        self._player_patches.pop(key, None)
+        self._player_deletes[key] = None
+        self._on_enqueue()
+
+    def delete_room(self, room_id: str) -> None:
+        self._rooms.pop(room_id, None)
+        for store in (self._players, self._player_patches, self._player_deletes):
+            for key in [k for k in store if k[0] == room_id]:
+                store.pop(key, None)
+        for answer_id in [k for k, a in self._answers.items() if str(a.room_id) == room_id]:
+            self._answers.pop(answer_id, None)
+        self._room_deletes[room_id] = None
+        self._on_enqueue()
+
+    @property
+    def pending(self) -> int:
+        return (
+            len(self._rooms) + len(self._players) + len(self._player_patches)
+            + len(self._answers) + len(self._player_deletes) + len(self._room_deletes)
+            + self._in_flight
+        )
+
+    async def wait_for_capacity(self) -> None:
+        """Chặn người ghi khi hàng đợi đã đầy, cho tới khi lô hiện tại được ghi xong."""
+        while self.pending >= self.max_pending and not self._closed:
+            self._wakeup.set()
+            self._drained.clear()
+            await self._drained.wait()
+
+    # ==================================
+    # Vòng đời
+    # ==================================
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._closed = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush toàn bộ thay đổi còn lại rồi dừng (gọi khi shutdown)."""
+        self._closed = True
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            log.error("[WRITE_BEHIND] %s pending changes could not be written at shutdown: %s", self.pending, e)
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            while self.pending:
+                await self._flush_batch()
+        self._drained.set()
+
+    def _on_enqueue(self) -> None:
+        if self._closed:
+            return
+        if self._task is None or self._task.done():
+            try:
+                self.start()
+            except RuntimeError:
+                # Không có event loop đang chạy: dữ liệu sẽ được ghi khi flush
+                return
+        if self.pending >= self.batch_size:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            if not self.pending:
+                continue
+            try:
+                async with self._flush_lock:
+                    await self._flush_batch()
+            except Exception as e:
+                log.error("[WRITE_BEHIND] Flush failed: %s", e)
+            if self.pending < self.max_pending:
+                self._drained.set()
+
+    # ==================================
+    # Ghi một lô
+    # ==================================
+
+    async def _flush_batch(self) -> None:
+        # Lấy toàn bộ thay đổi hiện có làm một lô; thay đổi mới sẽ vào lô sau
+        batch = {
+            "rooms": list(self._rooms.values()),
+            "players": list(self._players.values()),
+            "patches": self._player_patches,
+            "answers": list(self._answers.values()),
+            "player_deletes": list(self._player_deletes),
+            "room_deletes": list(self._room_deletes),
+        }
+        self._rooms, self._players, self._player_patches = {}, {}, {}
+        self._answers, self._player_deletes, self._room_deletes = {}, {}, {}
+        self._in_flight = sum(len(part) for part in batch.values())
+        try:
+            await self._write_batch(batch)
+        except Exception:
+            # Không bỏ dữ liệu: phần chưa ghi quay lại hàng đợi và vẫn tính vào backpressure
+            self._requeue(batch)
+            raise
+        finally:
+            self._in_flight = 0
+
+    async def _write_batch(self, batch: dict) -> None:
+        """Ghi lô theo thứ tự; phần nào ghi xong thì bỏ khỏi `batch`, phần còn lại là phần chưa ghi."""
+        # Thứ tự: room -> players -> answers (khóa ngoại), sau đó mới tới các lệnh xóa.
+        # Patch (cũ hơn) được ghi trước snapshot đầy đủ của player để không đè lên dữ liệu mới.
+        rooms = batch["rooms"]
+        await self._write_with_retry("rooms", lambda: self.room_repo.save_many(rooms), rooms)
+        batch["rooms"] = []
+        patches = batch["patches"]
+        for key in list(patches):
+            room_id, wallet_id = key
+            await self._write_with_retry(
+                "player patches", lambda: self.player_repo.update_player(wallet_id, patches[key], room_id=room_id), [key],
+            )
+            patches.pop(key)
+        players = batch["players"]
+        await self._write_with_retry("players", lambda: self.player_repo.save_many(players), players)
+        batch["players"] = []
+        answers = batch["answers"]
+        await self._write_with_retry("answers", lambda: self.answer_repo.save_many(answers), answers)
+        batch["answers"] = []
+
+        player_deletes = batch["player_deletes"]
+        while player_deletes:
+            room_id, wallet_id = player_deletes[0]
+            await self._write_with_retry(
+                "player deletes", lambda: self.player_repo.delete_player_by_room(wallet_id, room_id), player_deletes[:1],
+            )
+            player_deletes.pop(0)
+        room_deletes = batch["room_deletes"]
+        while room_deletes:
+            await self._write_with_retry("room deletes", lambda: self.room_repo.delete_room(room_deletes[0]), room_deletes[:1])
+            room_deletes.pop(0)
+
+    def _requeue(self, batch: dict) -> None:
+        """Đưa phần chưa ghi của lô lỗi trở lại hàng đợi; thay đổi mới hơn cùng khóa được giữ nguyên."""
+        for room in batch["rooms"]:
+            if room.id not in self._room_deletes:
+                self._rooms.setdefault(room.id, room)
+        for key, updates in batch["patches"].items():
+            if key not in self._player_deletes and key[0] not in self._room_deletes:
+                self._player_patches[key] = {**updates, **self._player_patches.get(key, {})}
+        for p in batch["players"]:
+            key = (p.room_id, p.wallet_id)
+            if key not in self._player_deletes and key[0] not in self._room_deletes:
+                self._players.setdefault(key, p)
+        for answer in batch["answers"]:
+            if str(answer.room_id) not in self._room_deletes:
+                self._answers.setdefault(str(answer.id), answer)
+        for key in batch["player_deletes"]:
+            if key not in self._players:
+                self._player_deletes.setdefault(key, None)
+        for room_id in batch["room_deletes"]:
+            if room_id not in self._rooms:
+                self._room_deletes.setdefault(room_id, None)
+
+    async def _write_with_retry(self, name: str, write, items: list) -> None:
+        if not items:
+            return
+        for attempt in range(WRITE_BEHIND_MAX_RETRIES):
+            if await write():
+                return
+            await asyncio.sleep(self.flush_interval * (2 ** attempt))
+        raise RuntimeError(f"{len(items)} {name} not written after {WRITE_BEHIND_MAX_RETRIES} attempts")
@@ -0,0 +1,131 @@
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from fastapi import WebSocket
+
+from config.constants import WS_OUTBOX_MAX_FRAMES, WS_OUTBOX_MAX_LAG_SECONDS, WS_SEND_TIMEOUT_SECONDS
+from config.logging_config import WS, get_logger
+from helpers.json_helper import send_text_safe
+
+log = get_logger(WS)
+
+# Các loại message mà bản mới thay thế hoàn toàn bản cũ: client chỉ cần trạng thái mới nhất
+SUPERSEDING_TYPES = {"game_sync", "next_question", "question_result"}
+
+# Các loại message không ảnh hưởng tới tiến trình game: khi hàng đợi đầy thì bỏ frame mới thay vì ngắt kết nối
+DROPPABLE_TYPES = {"answer_submitted", "chat", "pong", "new_post", "like_post"}
+
+# Đóng kết nối sau khi gửi hết các frame trước nó
+_CLOSE = object()
+
+
+class Outbox:
+    """
+    Hàng đợi gửi riêng của một WebSocket, có một writer task gửi tuần tự.
+    - `enqueue` không bao giờ chờ: broadcast chỉ còn là thao tác đưa frame vào hàng đợi.
+    - Message thuộc SUPERSEDING_TYPES thay thế frame cùng loại đang chờ; đó là cách duy nhất một frame
+      đang chờ bị bỏ.
+    - Khi đầy, frame mới thuộc DROPPABLE_TYPES bị bỏ; frame khác, hoặc khi frame cũ nhất đã chờ quá
+      `max_lag` giây, thì client bị coi là quá chậm và bị ngắt kết nối (`on_evict`).
+    """
+    _seq = itertools.count()
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        on_evict: Callable[[WebSocket, str], None],
+        max_frames: int = WS_OUTBOX_MAX_FRAMES,
+        max_lag: float = WS_OUTBOX_MAX_LAG_SECONDS,
+        send_timeout: float = WS_SEND_TIMEOUT_SECONDS,
+    ):
+        self.websocket = websocket
+        self.on_evict = on_evict
+        self.max_frames = max_frames
+        self.max_lag = max_lag
+        self.send_timeout = send_timeout
+
+        # {key: (enqueued_at, frame)} theo thứ tự gửi
+        self._frames: "OrderedDict[object, tuple]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.dropped = 0
+        self._task = asyncio.create_task(self._run())
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def enqueue(self, frame: str, msg_type: Optional[str] = None) -> bool:
+        if self._closed:
+            return False
+        if self._lagging():
+            self._evict("lag")
+            return False
+
+        if msg_type in SUPERSEDING_TYPES:
+            key = msg_type
+            if self._frames.pop(key, None) is not None:
+                self.dropped += 1
+        else:
+            key = next(self._seq)
+
+        if len(self._frames) >= self.max_frames:
+            if msg_type in DROPPABLE_TYPES:
+                self.dropped += 1
+            else:
+                self._evict("queue full")
+            return False
+
+        self._frames[key] = (time.monotonic(), frame)
+        self._ready.set()
+        return True
+
+    def close_after_drain(self, code: int = 1000, reason: str = "") -> None:
+        if self._closed:
+            return
+        self._frames[next(self._seq)] = (time.monotonic(), (_CLOSE, code, reason))
+        self._ready.set()
+
+    def stop(self) -> None:
+        self._closed = True
+        self._frames.clear()
+        self._task.cancel()
+
+    # ==================================
+    # Helpers
+    # ==================================
+
+    def _lagging(self) -> bool:
+        if not self._frames:
+            return False
+        oldest_at, _ = next(iter(self._frames.values()))
+        return time.monotonic() - oldest_at > self.max_lag
+
+    def _evict(self, reason: str) -> None:
+        if self._closed:
+            return
+        log.warning("[WS] Evicting slow consumer (%s, %s frames pending)", reason, len(self._frames))
+        self.stop()
+        self.on_evict(self.websocket, reason)
+
+    async def _run(self) -> None:
+        while True:
+            if not self._frames:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            _, frame = self._frames.popitem(last=False)[1]
+            if isinstance(frame, tuple) and frame[0] is _CLOSE:
+                self._closed = True
+                try:
+                    await self.websocket.close(frame[1], frame[2])
+                except Exception:
+                    pass
+                return
+
+            if not await send_text_safe(self.websocket, frame, timeout=self.send_timeout):
+                self._evict("send failed")
+                return
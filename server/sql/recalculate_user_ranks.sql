@@ -0,0 +1,47 @@
+-- Tính lại rank của user_stats bằng một câu lệnh set-based.
+-- Chỉ cập nhật các dòng có rank thay đổi.
+--
+-- Gọi không tham số: xếp hạng lại toàn bộ.
+-- Gọi với p_min_score/p_max_score: chỉ xếp hạng lại các dòng có total_score nằm trong
+-- khoảng [p_min_score, p_max_score]. Rank của các dòng ngoài khoảng không đổi vì
+-- số người đứng trên họ không đổi.
+--
+--   select recalculate_user_ranks();
+--   select recalculate_user_ranks(p_min_score => 120, p_max_score => 340);
+
+create index if not exists user_stats_total_score_wallet_idx
+    on user_stats (total_score desc, wallet_id asc);
+
+create or replace function recalculate_user_ranks(
+    p_min_score integer default null,
+    p_max_score integer default null
+)
+returns integer
+language plpgsql
+as $$
+declare
+    v_base integer := 0;
+    v_updated integer := 0;
+begin
+    if p_max_score is not null then
+        select count(*) into v_base from user_stats where total_score > p_max_score;
+    end if;
+
+    with ranked as (
+        select
+            wallet_id,
+            v_base + row_number() over (order by total_score desc, wallet_id asc) as new_rank
+        from user_stats
+        where (p_min_score is null or total_score >= p_min_score)
+          and (p_max_score is null or total_score <= p_max_score)
+    )
+    update user_stats s
+    set rank = r.new_rank
+    from ranked r
+    where s.wallet_id = r.wallet_id
+      and s.rank is distinct from r.new_rank;
+
+    get diagnostics v_updated = row_count;
+    return v_updated;
+end;
+$$;
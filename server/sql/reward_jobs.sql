@@ -0,0 +1,20 @@
+-- Hàng đợi trao NFT cho người thắng, được xử lý nền bởi RewardQueue (services/reward_queue.py).
+-- Mỗi phòng có tối đa một job (room_id là khóa chính): enqueue lại cùng phòng không tạo job mới.
+-- Worker giành job bằng update có điều kiện trên (status, attempts); job `running` quá `locked_until`
+-- (worker chết giữa chừng) được worker khác giành lại.
+
+create table if not exists reward_jobs (
+    room_id       text primary key,
+    winner_wallet text not null,
+    status        text not null default 'pending',
+    attempts      integer not null default 0,
+    result        jsonb not null default '{}'::jsonb,
+    last_error    text,
+    run_at        timestamptz not null default now(),
+    locked_by     text,
+    locked_until  timestamptz,
+    created_at    timestamptz not null default now()
+);
+
+create index if not exists reward_jobs_pending_idx on reward_jobs (run_at) where status = 'pending';
+create index if not exists reward_jobs_running_idx on reward_jobs (locked_until) where status = 'running';
@@ -0,0 +1,45 @@
+-- Lease điều khiển game loop của từng phòng khi chạy nhiều worker.
+-- Một phòng chỉ có một holder; holder gia hạn định kỳ, worker khác chỉ giành được khi lease đã hết hạn.
+--
+--   select acquire_room_lease('room-id', 'w0', 15);
+--   select * from renew_room_leases('w0', array['room-a', 'room-b'], 15);
+
+create table if not exists room_leases (
+    room_id    text primary key,
+    holder     text not null,
+    expires_at timestamptz not null
+);
+
+create index if not exists room_leases_expires_at_idx on room_leases (expires_at);
+
+create or replace function acquire_room_lease(
+    p_room_id text,
+    p_holder text,
+    p_ttl_seconds integer
+)
+returns timestamptz
+language sql
+as $$
+    insert into room_leases as l (room_id, holder, expires_at)
+    values (p_room_id, p_holder, now() + make_interval(secs => p_ttl_seconds))
+    on conflict (room_id) do update
+        set holder = excluded.holder,
+            expires_at = excluded.expires_at
+        where l.holder = excluded.holder or l.expires_at < now()
+    returning expires_at;
+$$;
+
+create or replace function renew_room_leases(
+    p_holder text,
+    p_room_ids text[],
+    p_ttl_seconds integer
+)
+returns setof text
+language sql
+as $$
+    update room_leases
+       set expires_at = now() + make_interval(secs => p_ttl_seconds)
+     where holder = p_holder
+       and room_id = any(p_room_ids)
+    returning room_id;
+$$;